@@ -18,6 +18,7 @@ from config import (
     GNEWS_API_KEY,
 )
 from graph.state import RawArticle
+from utils.http import limited_transport
 from utils.text import detect_language
 
 logger = structlog.get_logger()
@@ -70,7 +71,7 @@ class APIAgent(BaseAgent):
         lat = config.get("lat", 42.8614)   # Niseko default
         lon = config.get("lon", 140.6882)
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, transport=limited_transport("api", config)) as client:
             resp = await client.get(
                 "https://api.openweathermap.org/data/2.5/weather",
                 params={
@@ -131,7 +132,7 @@ class APIAgent(BaseAgent):
         query = config.get("query", "Niseko OR Hokkaido")
         page_size = config.get("max_entries", 10)
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, transport=limited_transport("api", config)) as client:
             resp = await client.get(
                 "https://newsapi.org/v2/everything",
                 params={
@@ -184,7 +185,7 @@ class APIAgent(BaseAgent):
         query = config.get("query", "Niseko OR Kutchan OR Hokkaido ski")
         max_results = config.get("max_entries", 10)
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, transport=limited_transport("api", config)) as client:
             resp = await client.post(
                 "https://api.tavily.com/search",
                 json={
@@ -235,7 +236,7 @@ class APIAgent(BaseAgent):
         query = config.get("query", "Niseko OR Kutchan OR Hokkaido ski")
         count = config.get("max_entries", 10)
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, transport=limited_transport("api", config)) as client:
             resp = await client.get(
                 "https://api.search.brave.com/res/v1/web/search",
                 headers={
@@ -280,7 +281,7 @@ class APIAgent(BaseAgent):
         config = source.get("config", {}) or {}
         query = config.get("query", "Niseko OR Kutchan OR Hokkaido")
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, transport=limited_transport("api", config)) as client:
             resp = await client.get(
                 "https://api.currentsapi.services/v1/search",
                 params={
@@ -330,7 +331,7 @@ class APIAgent(BaseAgent):
         query = config.get("query", "Niseko OR Kutchan OR Hokkaido")
         max_entries = config.get("max_entries", 10)
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, transport=limited_transport("api", config)) as client:
             resp = await client.get(
                 "https://gnews.io/api/v4/search",
                 params={
@@ -376,7 +377,7 @@ class APIAgent(BaseAgent):
         headers = config.get("headers", {})
         params = config.get("params", {})
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, transport=limited_transport("api", config)) as client:
             resp = await client.get(url, headers=headers, params=params)
             resp.raise_for_status()
             data = resp.json()
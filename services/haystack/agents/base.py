@@ -24,7 +24,7 @@ class BaseAgent(ABC):
 
         Returns:
             Tuple of (articles, errors) where articles is a list of RawArticle
-            dicts and errors is a list of error dicts.
+            records and errors is a list of error dicts.
         """
         ...
 
@@ -39,7 +39,7 @@ class BaseAgent(ABC):
         language: str = "en",
         raw_metadata: dict | None = None,
     ) -> RawArticle:
-        """Helper to create a RawArticle dict with consistent fields."""
+        """Helper to create a RawArticle with consistent fields."""
         metadata = raw_metadata or {}
         # Propagate source reliability tier for quality gate decisions
         if source.get("reliability_tier"):
@@ -59,12 +59,29 @@ class BaseAgent(ABC):
             fetched_at=datetime.now(timezone.utc).isoformat(),
         )
 
-    def _make_error(self, source: dict, error: str) -> dict:
-        """Helper to create an error dict."""
-        return {
+    def _make_error(self, source: dict, error: str, warning: bool = False, **details) -> dict:
+        """Helper to create an error dict.
+
+        warning=True marks partial results (e.g. truncated responses): the
+        source still counts as fetched successfully.
+        """
+        result = {
             "source_id": source.get("id", "unknown"),
             "source_name": source.get("name", "Unknown"),
             "agent_type": self.agent_type,
             "error": error,
             "timestamp": datetime.now(timezone.utc).isoformat(),
+            **details,
         }
+        if warning:
+            result["warning"] = True
+        return result
+
+    def _truncation_warning(self, source: dict, count: int, max_bytes: int) -> dict:
+        """Warning for responses of a source cut at the byte limit (utils/http.py)."""
+        return self._make_error(
+            source,
+            f"{count} response(s) truncated at {max_bytes} bytes",
+            warning=True,
+            truncated=count,
+        )
@@ -6,6 +6,7 @@ import structlog
 
 from agents.base import BaseAgent
 from graph.state import RawArticle
+from utils.http import limited_transport, truncated
 from utils.text import html_to_text, detect_language
 
 logger = structlog.get_logger()
@@ -22,29 +23,42 @@ class RSSAgent(BaseAgent):
 
         for source in sources:
             try:
-                fetched = await self._fetch_feed(source)
+                stats = {"truncated": 0}
+                fetched = await self._fetch_feed(source, stats)
                 articles.extend(fetched)
                 logger.info(
                     "rss.collected",
                     source=source.get("name"),
                     count=len(fetched),
                 )
+                if stats["truncated"]:
+                    errors.append(self._truncation_warning(source, stats["truncated"], stats["max_bytes"]))
             except Exception as e:
                 logger.error("rss.fetch_failed", source=source.get("name"), error=str(e))
                 errors.append(self._make_error(source, str(e)))
 
         return articles, errors
 
-    async def _fetch_feed(self, source: dict) -> list[RawArticle]:
-        """Fetch and parse a single RSS/Atom feed."""
+    async def _fetch_feed(self, source: dict, stats: dict) -> list[RawArticle]:
+        """Fetch and parse a single RSS/Atom feed.
+
+        A feed over the size limit is parsed as far as it was read and
+        counted in stats["truncated"].
+        """
         url = source["url"]
         config = source.get("config", {}) or {}
         timeout = config.get("timeout", 30)
+        transport = limited_transport("rss", config)
+        stats["max_bytes"] = transport.max_bytes
 
-        async with httpx.AsyncClient(timeout=float(timeout)) as client:
+        async with httpx.AsyncClient(timeout=float(timeout), transport=transport) as client:
             resp = await client.get(url, follow_redirects=True)
             resp.raise_for_status()
 
+        if truncated(resp):
+            stats["truncated"] += 1
+            logger.warning("rss.truncated", url=url, max_bytes=transport.max_bytes)
+
         feed = feedparser.parse(resp.text)
 
         if feed.bozo and not feed.entries:
@@ -2,8 +2,23 @@
 
 Uses httpx + BeautifulSoup4 for HTML extraction.
 Respects robots.txt and per-domain rate limits.
+
+With deep fetch (source config "deep_fetch", on by default in deep_scrape
+cycles) the linked article pages of a listing are fetched concurrently and
+their main content replaces the listing snippet. Pages are cached by URL
+(utils/page_cache.py). Full pages are reduced to their main content by
+utils/extract.py.
+
+Structured metadata (utils/structured.py) is read first. A listing that
+describes its articles in a JSON-LD ItemList is used without selectors, as
+is one with at least as many structured entries as selector containers.
+Otherwise the selector results are kept and structured entries fill in
+their dates and authors (and add stories no container matched). An article
+page's articleBody, datePublished and author are taken as is. Source config
+"structured_data": false turns structured listings off.
 """
 
+import asyncio
 import hashlib
 from datetime import datetime, timezone
 
@@ -12,13 +27,22 @@ import structlog
 from bs4 import BeautifulSoup
 
 from agents.base import BaseAgent
-from graph.state import RawArticle
+from graph.state import RawArticle, with_fields
+from utils import page_cache
+from utils.extract import extract
+from utils.http import limited_transport, truncated
+from utils.structured import StructuredArticle, articles_from_html, page_article
 from utils.rate_limiter import rate_limiter
-from utils.robots import USER_AGENT, is_allowed, get_crawl_delay
+from utils.robots import USER_AGENT, filter_allowed, is_allowed, get_crawl_delay
 from utils.text import html_to_text, detect_language
 
 logger = structlog.get_logger()
 
+# Article pages fetched at once per listing (the per-domain limiter still applies)
+DEEP_FETCH_CONCURRENCY = 4
+# Shortest structured articleBody used instead of extracting the page
+MIN_STRUCTURED_BODY = 200
+
 
 class ScraperAgent(BaseAgent):
     """Scrapes articles from websites without RSS feeds."""
@@ -40,65 +64,240 @@ class ScraperAgent(BaseAgent):
                         burst=1,
                     )
 
-                fetched = await self._scrape_source(source)
+                stats = {"truncated": 0}
+                fetched = await self._scrape_source(source, stats)
                 articles.extend(fetched)
                 logger.info(
                     "scraper.collected",
                     source=source.get("name"),
                     count=len(fetched),
                 )
+                if stats["truncated"]:
+                    errors.append(self._truncation_warning(source, stats["truncated"], stats["max_bytes"]))
             except Exception as e:
                 logger.error("scraper.failed", source=source.get("name"), error=str(e))
                 errors.append(self._make_error(source, str(e)))
 
+        if any((s.get("config") or {}).get("deep_fetch") for s in sources):
+            page_cache.prune()
+
         return articles, errors
 
-    async def _scrape_source(self, source: dict) -> list[RawArticle]:
-        """Scrape a single source website."""
+    async def _scrape_source(self, source: dict, stats: dict) -> list[RawArticle]:
+        """Scrape a single source website.
+
+        Pages over the size limit are parsed as far as they were read and
+        counted in stats["truncated"].
+        """
         url = source["url"]
         config = source.get("config", {}) or {}
         timeout = config.get("timeout", 30)
+        transport = limited_transport("scrape", config)
+        stats["max_bytes"] = transport.max_bytes
 
         # Check robots.txt
         if not await is_allowed(url):
             logger.warning("scraper.robots_blocked", url=url)
             return []
 
-        # Rate limit
-        await rate_limiter.acquire(url)
+        # Fetch the page (rate limit + per-domain concurrency cap), then let
+        # the limiter adapt to 429/503 and Retry-After
+        async with rate_limiter.limit(url):
+            async with httpx.AsyncClient(
+                timeout=float(timeout),
+                headers={"User-Agent": USER_AGENT},
+                follow_redirects=True,
+                transport=transport,
+            ) as client:
+                resp = await client.get(url)
+        await rate_limiter.record_response(url, resp.status_code, resp.headers.get("retry-after"))
+        resp.raise_for_status()
+        if truncated(resp):
+            stats["truncated"] += 1
+            logger.warning("scraper.truncated", url=url, max_bytes=transport.max_bytes)
+
+        max_articles = config.get("max_entries", 15)
+
+        # Articles the page lists in JSON-LD / microdata
+        listed = []
+        if config.get("structured_data", True):
+            listed = [a for a in articles_from_html(resp.text, url) if a.url and a.url != url]
+
+        if any(a.in_list for a in listed):
+            # Fast path: an ItemList is the page's own list of articles
+            candidates = [
+                self._structured_article(source, a, url) for a in listed[:max_articles]
+            ]
+        else:
+            soup = BeautifulSoup(resp.text, "lxml")
+
+            # Extract articles based on config selectors
+            article_selector = config.get("article_selector", "article")
+
+            # Find article containers
+            containers = soup.select(article_selector)[:max_articles]
+
+            if listed and len(listed) >= len(containers):
+                candidates = [
+                    self._structured_article(source, a, url) for a in listed[:max_articles]
+                ]
+            elif not containers:
+                # Fall back: treat the whole page as one article
+                return await self._extract_single_page(source, soup, url, resp.text)
+            else:
+                candidates = []
+                for container in containers:
+                    article = await self._extract_article(source, container, url, config)
+                    if article:
+                        candidates.append(article)
+                if listed:
+                    candidates = self._merge_structured(source, candidates, listed, url)[:max_articles]
+
+        # Check robots.txt for all article links of the page in one batch
+        links = [a["source_url"] for a in candidates if a["source_url"] != url]
+        allowed = set(await filter_allowed(links)) if links else set()
+        results = [a for a in candidates if a["source_url"] == url or a["source_url"] in allowed]
+        if len(results) < len(candidates):
+            logger.debug(
+                "scraper.article_robots_blocked",
+                url=url,
+                blocked=len(candidates) - len(results),
+            )
+
+        if config.get("deep_fetch"):
+            results = await self._deep_fetch(results, url, config, stats)
+
+        return results
+
+    async def _deep_fetch(
+        self, articles: list[RawArticle], page_url: str, config: dict, stats: dict
+    ) -> list[RawArticle]:
+        """Replace listing snippets with the linked pages' main content.
+
+        Pages are fetched concurrently (config "deep_fetch_concurrency"),
+        each under the domain rate limiter. An article whose page fails or
+        yields less text than the snippet keeps the snippet.
+        """
+        limit = asyncio.Semaphore(config.get("deep_fetch_concurrency", DEEP_FETCH_CONCURRENCY))
+        counts = {"fetched": 0, "cached": 0, "failed": 0, "truncated": 0}
 
-        # Fetch the page
         async with httpx.AsyncClient(
-            timeout=float(timeout),
+            timeout=float(config.get("timeout", 30)),
             headers={"User-Agent": USER_AGENT},
             follow_redirects=True,
+            transport=limited_transport("scrape", config),
         ) as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
-
-        soup = BeautifulSoup(resp.text, "lxml")
 
-        # Extract articles based on config selectors
-        article_selector = config.get("article_selector", "article")
-        title_selector = config.get("title_selector", "h1, h2, h3")
-        body_selector = config.get("body_selector", "p")
-        link_selector = config.get("link_selector", "a")
-        max_articles = config.get("max_entries", 15)
-
-        # Find article containers
-        containers = soup.select(article_selector)[:max_articles]
-
-        if not containers:
-            # Fall back: treat the whole page as one article
-            return await self._extract_single_page(source, soup, url)
+            async def deepen(article: RawArticle) -> RawArticle:
+                article_url = article["source_url"]
+                if article_url == page_url:
+                    return article
+                async with limit:
+                    try:
+                        page = await self._fetch_article_page(client, article_url, counts)
+                    except Exception as e:
+                        counts["failed"] += 1
+                        logger.debug("scraper.deep_fetch_failed", url=article_url, error=str(e))
+                        return article
+                # The article page's own metadata dates/credits it more precisely
+                changes = {
+                    "published_at": page.get("published_at") or article["published_at"],
+                    "author": article["author"] or page.get("author"),
+                }
+                if len(page["body"]) > len(article["body"]):
+                    changes.update(
+                        body=page["body"],
+                        language=detect_language(page["body"]),
+                        raw_metadata={
+                            **article["raw_metadata"],
+                            "scrape_method": "bs4_deep",
+                            "snippet": article["body"][:500],
+                        },
+                    )
+                return with_fields(article, **changes)
+
+            results = await asyncio.gather(*(deepen(a) for a in articles))
+
+        logger.info("scraper.deep_fetched", page=page_url, **counts)
+        stats["truncated"] += counts["truncated"]
+        return list(results)
+
+    async def _fetch_article_page(self, client: httpx.AsyncClient, url: str, counts: dict) -> dict:
+        """Extracted title/body of an article page, from the page cache when valid."""
+        cached = page_cache.load(url)
+        if page_cache.is_fresh(cached):
+            counts["cached"] += 1
+            return cached
+
+        async with rate_limiter.limit(url):
+            resp = await client.get(url, headers=page_cache.validators(cached))
+        await rate_limiter.record_response(url, resp.status_code, resp.headers.get("retry-after"))
+
+        if resp.status_code == 304 and cached:
+            counts["cached"] += 1
+            return page_cache.touch(cached)
+        resp.raise_for_status()
+
+        counts["fetched"] += 1
+        if truncated(resp):
+            counts["truncated"] += 1
+        meta = page_article(resp.text, url)
+        if meta and meta.body and len(meta.body) >= MIN_STRUCTURED_BODY:
+            title, body = meta.title, meta.body
+        else:
+            page = extract(resp.text, url)
+            title, body = page.title, page.body
+        return page_cache.store(
+            url,
+            title,
+            body,
+            resp.headers,
+            published_at=meta.published_at if meta else None,
+            author=meta.author if meta else None,
+        )
 
-        results = []
-        for container in containers:
-            article = await self._extract_article(source, container, url, config)
-            if article:
-                results.append(article)
+    def _structured_article(self, source: dict, item: StructuredArticle, page_url: str) -> RawArticle:
+        """RawArticle from a listing page's JSON-LD / microdata entry."""
+        body = item.body or item.description or item.title
+        return self._make_raw_article(
+            source=source,
+            title=item.title,
+            body=body,
+            source_url=item.url,
+            published_at=item.published_at,
+            author=item.author,
+            language=detect_language(body),
+            raw_metadata={
+                "scrape_method": item.method,
+                "page_url": page_url,
+            },
+        )
 
-        return results
+    def _merge_structured(
+        self,
+        source: dict,
+        articles: list[RawArticle],
+        listed: list[StructuredArticle],
+        page_url: str,
+    ) -> list[RawArticle]:
+        """Selector results with dates/authors from matching structured entries.
+
+        Structured entries that no container matched (a featured story
+        outside the article list, say) are appended.
+        """
+        by_url = {item.url: item for item in listed}
+        merged = []
+        for article in articles:
+            item = by_url.pop(article["source_url"], None)
+            if item:
+                article = with_fields(
+                    article,
+                    published_at=article["published_at"] or item.published_at,
+                    author=article["author"] or item.author,
+                )
+            merged.append(article)
+        merged.extend(self._structured_article(source, item, page_url) for item in by_url.values())
+        return merged
 
     async def _extract_article(
         self, source: dict, container, base_url: str, config: dict
@@ -135,11 +334,6 @@ class ScraperAgent(BaseAgent):
                 from urllib.parse import urljoin
                 article_url = urljoin(base_url, href)
 
-        # Check robots.txt for the article URL
-        if article_url != base_url and not await is_allowed(article_url):
-            logger.debug("scraper.article_robots_blocked", url=article_url)
-            return None
-
         # Date — look for time element or common date patterns
         date_el = container.select_one("time[datetime]")
         published_at = None
@@ -169,22 +363,19 @@ class ScraperAgent(BaseAgent):
         )
 
     async def _extract_single_page(
-        self, source: dict, soup: BeautifulSoup, url: str
+        self, source: dict, soup: BeautifulSoup, url: str, html: str = ""
     ) -> list[RawArticle]:
-        """Extract content from a page treated as a single article."""
-        # Remove nav, footer, sidebar, script, style
-        for tag in soup.select("nav, footer, aside, script, style, header, .sidebar, .menu"):
-            tag.decompose()
-
-        title_el = soup.select_one("h1") or soup.select_one("title")
-        title = title_el.get_text(strip=True) if title_el else "Untitled"
-
-        # Get main content area
-        main = soup.select_one("main, article, .content, #content, .post")
-        if main:
-            body = html_to_text(str(main))
+        """Extract content from a page treated as a single article.
+
+        Structured metadata supplies the text when it carries the full
+        articleBody, and the date/author either way.
+        """
+        meta = page_article(html, url) if html else None
+        if meta and meta.body and len(meta.body) >= MIN_STRUCTURED_BODY:
+            title, body, method = meta.title, meta.body, meta.method
         else:
-            body = html_to_text(str(soup.body)) if soup.body else ""
+            page = extract(soup, url)
+            title, body, method = (meta.title if meta else page.title), page.body, page.method
 
         if not body or len(body) < 50:
             return []
@@ -197,7 +388,10 @@ class ScraperAgent(BaseAgent):
                 title=title,
                 body=body,
                 source_url=url,
+                published_at=meta.published_at if meta else None,
+                author=meta.author if meta else None,
                 language=language,
-                raw_metadata={"scrape_method": "bs4_single_page"},
+                raw_metadata={"scrape_method": "bs4_single_page", "extraction": method},
             )
         ]
+
@@ -6,12 +6,19 @@ Converts approved user-submitted tips into raw articles for the pipeline.
 import structlog
 
 from agents.base import BaseAgent
-from db.client import _request
+from db.client import claim_approved_tips
 from graph.state import RawArticle
 from utils.text import detect_language
 
 logger = structlog.get_logger()
 
+# Tips claimed per round trip, and at most per cycle
+CLAIM_PAGE_SIZE = 20
+MAX_TIPS_PER_CYCLE = 100
+
+# Keys the claim adds to a tip's metadata
+_CLAIM_KEYS = ("ingested", "ingested_at")
+
 
 class TipIngester(BaseAgent):
     """Ingests approved tips from the moderation queue."""
@@ -19,35 +26,36 @@ class TipIngester(BaseAgent):
     agent_type = "tip"
 
     async def collect(self, sources: list[dict]) -> tuple[list[RawArticle], list[dict]]:
-        """Fetch approved tips that haven't been processed yet.
+        """Claim approved tips that haven't been processed yet.
 
         The 'sources' param is ignored — tips come from the moderation queue.
+        Tips are claimed atomically (filtered and marked ingested server-side),
+        a page at a time; an idle queue costs a single query.
         """
         articles: list[RawArticle] = []
         errors: list[dict] = []
 
         try:
-            # Get approved tips that haven't been ingested into the pipeline
-            tips = await _request(
-                "GET",
-                "moderation_queue",
-                params={
-                    "type": "eq.tip",
-                    "status": "eq.approved",
-                    "order": "created_at.asc",
-                    "limit": "20",
-                },
-            )
+            tips: list[dict] = []
+            cursor = None
+            while len(tips) < MAX_TIPS_PER_CYCLE:
+                page = await claim_approved_tips(
+                    limit=min(CLAIM_PAGE_SIZE, MAX_TIPS_PER_CYCLE - len(tips)),
+                    after=cursor,
+                )
+                tips.extend(page)
+                if len(page) < CLAIM_PAGE_SIZE:
+                    break
+                cursor = page[-1]
 
             if not tips:
                 return [], []
 
             for tip in tips:
-                metadata = tip.get("metadata", {}) or {}
-
-                # Skip if already ingested (has pipeline_run_id in metadata)
-                if metadata.get("ingested"):
-                    continue
+                metadata = {
+                    k: v for k, v in (tip.get("metadata") or {}).items()
+                    if k not in _CLAIM_KEYS
+                }
 
                 content = tip.get("content", "")
                 if not content:
@@ -80,16 +88,7 @@ class TipIngester(BaseAgent):
                 )
                 articles.append(article)
 
-                # Mark as ingested
-                await _request(
-                    "PATCH",
-                    f"moderation_queue?id=eq.{tip['id']}",
-                    json={
-                        "metadata": {**metadata, "ingested": True},
-                    },
-                )
-
-            logger.info("tip_ingester.collected", count=len(articles))
+            logger.info("tip_ingester.collected", claimed=len(tips), count=len(articles))
 
         except Exception as e:
             logger.error("tip_ingester.failed", error=str(e))
@@ -29,14 +29,26 @@ async def create_field_note(
     safety_legal_flags: list[str] | None = None,
     raw_text: str | None = None,
     source_url: str | None = None,
+    field_note_id: str | None = None,
 ) -> dict:
     """Create a field note directly in Supabase.
 
     This inserts into the field_notes table with status='raw' and
     author_id set to the Haystack bot user. The field note then enters
     the existing editorial pipeline (Field Note -> Cizer -> Story).
+
+    If field_note_id is given and a note with that ID already exists (a
+    resumed run retrying its write), the existing note is returned instead.
     """
-    field_note_id = str(uuid4())
+    if field_note_id:
+        existing = await _request(
+            "GET", "field_notes", params={"id": f"eq.{field_note_id}", "select": "id"}
+        )
+        if existing:
+            logger.info("field_note.exists", field_note_id=field_note_id, source_url=source_url)
+            return existing[0]
+    else:
+        field_note_id = str(uuid4())
 
     data = {
         "id": field_note_id,
@@ -6,15 +6,53 @@ load_dotenv()
 # Service
 HAYSTACK_PORT = int(os.getenv("HAYSTACK_PORT", "8001"))
 HAYSTACK_HOST = os.getenv("HAYSTACK_HOST", "0.0.0.0")
+# Local state (analytics snapshots, caches); safe to delete
+HAYSTACK_DATA_DIR = os.getenv("HAYSTACK_DATA_DIR") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".data"
+)
 
 # LLM (Ollama)
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "qwen2.5-coder:7b")
+OLLAMA_EMBED_MODEL = os.getenv("OLLAMA_EMBED_MODEL", "bge-m3")  # Multilingual (JA/EN)
+# Concurrent generate() calls across all runs, queued by priority (llm/scheduler.py)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "2"))
 
 # Supabase
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
 
+# Storage backend for pipeline records: "supabase" (PostgREST), "postgres"
+# (direct asyncpg connection to the same database) or "sqlite" (local/dev/edge)
+HAYSTACK_STORAGE_BACKEND = os.getenv("HAYSTACK_STORAGE_BACKEND", "supabase").lower()
+DATABASE_URL = os.getenv("DATABASE_URL", "")
+DATABASE_POOL_MIN = int(os.getenv("DATABASE_POOL_MIN", "1"))
+DATABASE_POOL_MAX = int(os.getenv("DATABASE_POOL_MAX", "5"))
+HAYSTACK_SQLITE_PATH = os.getenv("HAYSTACK_SQLITE_PATH") or os.path.join(
+    HAYSTACK_DATA_DIR, "haystack.db"
+)
+# LangGraph checkpoints of in-flight runs (deleted when a run completes)
+HAYSTACK_CHECKPOINT_PATH = os.getenv("HAYSTACK_CHECKPOINT_PATH") or os.path.join(
+    HAYSTACK_DATA_DIR, "checkpoints.db"
+)
+# Checkpoints of failed or interrupted runs are kept this long for a resume
+HAYSTACK_CHECKPOINT_RETENTION_HOURS = float(os.getenv("HAYSTACK_CHECKPOINT_RETENTION_HOURS", "72"))
+
+# Crawl politeness: in-flight requests per domain (per worker), and an optional
+# SQLite file so all workers on a host share per-domain rate budgets
+DOMAIN_MAX_CONCURRENCY = int(os.getenv("DOMAIN_MAX_CONCURRENCY", "2"))
+RATE_LIMIT_STATE_PATH = os.getenv("RATE_LIMIT_STATE_PATH", "")
+# Response body limits per source type (bytes, after decompression). Larger
+# HTML/XML bodies are truncated, larger JSON bodies rejected (utils/http.py)
+RSS_MAX_BYTES = int(os.getenv("RSS_MAX_BYTES", str(5 * 1024 * 1024)))
+SCRAPE_MAX_BYTES = int(os.getenv("SCRAPE_MAX_BYTES", str(5 * 1024 * 1024)))
+API_MAX_BYTES = int(os.getenv("API_MAX_BYTES", str(10 * 1024 * 1024)))
+# Shared connection pool (utils/connections.py): DNS cache lifetime when the
+# record TTL is unknown, idle keep-alive, and connection warm-up per cycle
+DNS_CACHE_TTL = float(os.getenv("DNS_CACHE_TTL", "300"))
+CONNECTION_KEEPALIVE_SECONDS = float(os.getenv("CONNECTION_KEEPALIVE_SECONDS", "120"))
+CONNECTION_WARMUP_ENABLED = os.getenv("CONNECTION_WARMUP_ENABLED", "true").lower() == "true"
+
 # Next.js API (for field note creation)
 NEXTJS_API_URL = os.getenv("NEXTJS_API_URL", "http://localhost:3000")
 HAYSTACK_BOT_EMAIL = os.getenv("HAYSTACK_BOT_EMAIL", "haystack-bot@niseko-gazet.local")
@@ -43,8 +81,19 @@ OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 MAIN_POLL_INTERVAL_MINUTES = int(os.getenv("MAIN_POLL_INTERVAL_MINUTES", "15"))
 WEATHER_POLL_INTERVAL_MINUTES = int(os.getenv("WEATHER_POLL_INTERVAL_MINUTES", "60"))
 TIP_POLL_INTERVAL_MINUTES = int(os.getenv("TIP_POLL_INTERVAL_MINUTES", "5"))
+# Tip ingestion: "poll" (tips cycle every TIP_POLL_INTERVAL_MINUTES) or "listen"
+# (LISTEN/NOTIFY on DATABASE_URL, migration 006; tips cycles run when tips are
+# approved, batched over TIP_BATCH_WINDOW_SECONDS, with a slow safety sweep)
+TIP_INGESTION_MODE = os.getenv("TIP_INGESTION_MODE", "poll").lower()
+TIP_BATCH_WINDOW_SECONDS = float(os.getenv("TIP_BATCH_WINDOW_SECONDS", "5"))
+TIP_SWEEP_INTERVAL_MINUTES = int(os.getenv("TIP_SWEEP_INTERVAL_MINUTES", "60"))
 
 # Quality thresholds
 MIN_RELEVANCE_SCORE = float(os.getenv("MIN_RELEVANCE_SCORE", "0.3"))
 MIN_CONFIDENCE_SCORE = int(os.getenv("MIN_CONFIDENCE_SCORE", "30"))
 DUPLICATE_SIMILARITY_THRESHOLD = float(os.getenv("DUPLICATE_SIMILARITY_THRESHOLD", "0.85"))
+
+# Cross-language dedup (embedding similarity)
+CROSS_LANG_WINDOW_HOURS = int(os.getenv("CROSS_LANG_WINDOW_HOURS", "48"))
+CROSS_LANG_MATCH_THRESHOLD = float(os.getenv("CROSS_LANG_MATCH_THRESHOLD", "0.88"))
+CROSS_LANG_BORDERLINE_THRESHOLD = float(os.getenv("CROSS_LANG_BORDERLINE_THRESHOLD", "0.75"))
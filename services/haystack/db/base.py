@@ -0,0 +1,112 @@
+"""Storage backend interface for the Haystack db layer.
+
+db/client.py builds rows (IDs, timestamps, defaults) and hands them to the
+configured backend; backends only persist and query. Rows are plain dicts
+using the Supabase column names, with JSON columns as Python objects.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+class StorageBackend(ABC):
+    """Persistence for sources, crawl history, pipeline runs and moderation items."""
+
+    name: str = "base"
+
+    @abstractmethod
+    async def get_active_sources(self, source_type: Optional[str] = None) -> list[dict]:
+        """Active source feeds, least recently fetched first (never-fetched first)."""
+
+    @abstractmethod
+    async def check_duplicate(self, content_fingerprint: str) -> Optional[dict]:
+        """A crawl_history row ({id, source_url, field_note_id}) with this fingerprint."""
+
+    @abstractmethod
+    async def insert_crawl(self, row: dict) -> dict:
+        """Insert a crawl_history row and return it."""
+
+    async def insert_crawls(self, rows: list[dict]) -> list[dict]:
+        """Insert several crawl_history rows (one at a time unless overridden)."""
+        return [await self.insert_crawl(row) for row in rows]
+
+    @abstractmethod
+    async def query_crawls(
+        self,
+        columns: list[str],
+        *,
+        since: Optional[str] = None,
+        source_feed_id: Optional[str] = None,
+        relevant_only: bool = False,
+        exclude_duplicates: bool = False,
+        newest_first: bool = True,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> list[dict]:
+        """crawl_history rows (only the given columns), ordered by fetched_at.
+
+        since is an ISO timestamp: only rows fetched after it are returned.
+        """
+
+    @abstractmethod
+    async def insert_run(self, row: dict) -> dict:
+        """Insert a pipeline_runs row and return it."""
+
+    @abstractmethod
+    async def update_run(self, run_id: str, fields: dict) -> None:
+        """Update columns of a pipeline_runs row."""
+
+    @abstractmethod
+    async def get_run(self, run_id: str) -> Optional[dict]:
+        """A pipeline_runs row by ID."""
+
+    @abstractmethod
+    async def list_runs(self, limit: int = 20) -> list[dict]:
+        """The most recently started pipeline_runs rows, newest first."""
+
+    @abstractmethod
+    async def update_sources(self, source_ids: list[str], fields: dict) -> None:
+        """Set the same column values on several source_feeds rows."""
+
+    async def finish_run(
+        self,
+        run_id: str,
+        fields: dict,
+        source_updates: list[tuple[list[str], dict]],
+    ) -> None:
+        """Write back polled-source status and close the run.
+
+        source_updates is a list of (source_ids, fields) groups. Backends
+        with transactions apply everything atomically; by default each
+        group is written independently and failures are only logged, so
+        the run record is always closed.
+        """
+        for source_ids, source_fields in source_updates:
+            try:
+                await self.update_sources(source_ids, source_fields)
+            except Exception as e:
+                logger.error("db.sources_update_failed", count=len(source_ids), error=str(e))
+        await self.update_run(run_id, fields)
+
+    @abstractmethod
+    async def insert_moderation_item(self, row: dict) -> dict:
+        """Insert a moderation_queue row and return it."""
+
+    @abstractmethod
+    async def get_moderation_ids(self, ids: list[str]) -> set[str]:
+        """The subset of ids that exist in moderation_queue."""
+
+    async def insert_moderation_items(self, rows: list[dict]) -> list[dict]:
+        """Insert several moderation_queue rows, returned in input order (one at a time unless overridden)."""
+        return [await self.insert_moderation_item(row) for row in rows]
+
+    @abstractmethod
+    async def check_health(self) -> dict:
+        """{"status": "connected"} or {"status": "error", "error": str}."""
+
+    async def close(self) -> None:
+        """Release connections (no-op by default)."""
@@ -1,35 +1,66 @@
-"""Supabase REST client for Haystack pipeline data."""
+"""Haystack pipeline data access.
+
+Functions here build rows and delegate persistence to the configured
+StorageBackend (Supabase by default; direct Postgres or SQLite via
+HAYSTACK_STORAGE_BACKEND).
+Only the tip RPCs and admin source routes, which exist in Supabase alone,
+go straight to it through _request.
+"""
 
-import httpx
 import structlog
 from datetime import datetime, timezone
 from typing import Optional
-from uuid import uuid4
-
-from config import SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY
+from uuid import UUID, uuid4, uuid5
+
+from config import (
+    HAYSTACK_STORAGE_BACKEND,
+    HAYSTACK_SQLITE_PATH,
+    DATABASE_URL,
+    DATABASE_POOL_MIN,
+    DATABASE_POOL_MAX,
+)
+from db.base import StorageBackend
+from db.supabase_backend import _request
 
 logger = structlog.get_logger()
 
-_headers = {
-    "apikey": SUPABASE_SERVICE_ROLE_KEY,
-    "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}",
-    "Content-Type": "application/json",
-    "Prefer": "return=representation",
-}
+_backend: Optional[StorageBackend] = None
+
+# Namespace for IDs derived from a run and an article (idempotency_id)
+_IDEMPOTENCY_NAMESPACE = UUID("5d1c3f0e-8a47-4b8e-9f6a-2c0e7b9d4a11")
+
+
+def get_backend() -> StorageBackend:
+    """The configured storage backend (created on first use)."""
+    global _backend
+    if _backend is None:
+        if HAYSTACK_STORAGE_BACKEND == "sqlite":
+            from db.sqlite_backend import SQLiteBackend
+            _backend = SQLiteBackend(HAYSTACK_SQLITE_PATH)
+        elif HAYSTACK_STORAGE_BACKEND == "postgres":
+            from db.postgres_backend import PostgresBackend
+            _backend = PostgresBackend(DATABASE_URL, DATABASE_POOL_MIN, DATABASE_POOL_MAX)
+        else:
+            from db.supabase_backend import SupabaseBackend
+            _backend = SupabaseBackend()
+        logger.info("db.backend", backend=_backend.name)
+    return _backend
+
 
+def set_backend(backend: Optional[StorageBackend]) -> None:
+    """Override the storage backend (tests, benchmarks); None resets to config."""
+    global _backend
+    _backend = backend
 
-def _url(table: str) -> str:
-    return f"{SUPABASE_URL}/rest/v1/{table}"
 
+def idempotency_id(run_id: str, *parts: str) -> str:
+    """Stable row ID for a write made once per run and article.
 
-async def _request(method: str, table: str, **kwargs) -> dict | list | None:
-    """Make an authenticated request to Supabase REST API."""
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.request(method, _url(table), headers=_headers, **kwargs)
-        resp.raise_for_status()
-        if resp.status_code == 204:
-            return None
-        return resp.json()
+    A resumed run re-executes the node it was interrupted in; deriving the
+    ID from the run and article fingerprint lets the retry recognise the
+    rows the first attempt already wrote.
+    """
+    return str(uuid5(_IDEMPOTENCY_NAMESPACE, ":".join((run_id, *parts))))
 
 
 # ── Source Feeds ───────────────────────────────────────
@@ -37,30 +68,48 @@ async def _request(method: str, table: str, **kwargs) -> dict | list | None:
 
 async def get_active_sources(source_type: Optional[str] = None) -> list[dict]:
     """Get all active source feeds, optionally filtered by type."""
-    params = {"is_active": "eq.true", "order": "last_fetched_at.asc.nullsfirst"}
-    if source_type:
-        params["source_type"] = f"eq.{source_type}"
-    return await _request("GET", "source_feeds", params=params) or []
-
-
-async def update_source_fetched(source_id: str, error: Optional[str] = None) -> None:
-    """Update a source feed's last_fetched_at timestamp."""
-    data = {
-        "last_fetched_at": datetime.now(timezone.utc).isoformat(),
-        "updated_at": datetime.now(timezone.utc).isoformat(),
-    }
-    if error:
-        data["last_error"] = error
-        # Increment consecutive errors via a separate read+write
-    else:
-        data["last_error"] = None
-        data["consecutive_errors"] = 0
-
-    await _request(
-        "PATCH",
-        f"source_feeds?id=eq.{source_id}",
-        json=data,
-    )
+    return await get_backend().get_active_sources(source_type)
+
+
+def _source_updates(status: dict[str, dict], sources: list[dict]) -> list[tuple[list[str], dict]]:
+    """Group a run's poll outcomes into as few source_feeds writes as possible.
+
+    status maps source_id -> {"fetched_at": iso, "error": str | None} as
+    tracked by collect_node. Successful sources fetched at the same time
+    share one update; failed sources get their own, since each needs its
+    consecutive_errors incremented from the value loaded at the start of
+    the run.
+    """
+    previous_errors = {s.get("id"): s.get("consecutive_errors") or 0 for s in sources}
+    now = datetime.now(timezone.utc).isoformat()
+
+    ok_by_time: dict[str, list[str]] = {}
+    updates = []
+    for source_id, outcome in status.items():
+        if not outcome.get("error"):
+            ok_by_time.setdefault(outcome["fetched_at"], []).append(source_id)
+            continue
+        updates.append(([source_id], {
+            "last_fetched_at": outcome["fetched_at"],
+            "updated_at": now,
+            "last_error": outcome["error"][:500],
+            "consecutive_errors": previous_errors.get(source_id, 0) + 1,
+        }))
+
+    return [
+        (source_ids, {
+            "last_fetched_at": fetched_at,
+            "updated_at": now,
+            "last_error": None,
+            "consecutive_errors": 0,
+        })
+        for fetched_at, source_ids in ok_by_time.items()
+    ] + updates
+
+
+async def update_source(source_id: str, fields: dict) -> None:
+    """Update columns of one source feed."""
+    await get_backend().update_sources([source_id], fields)
 
 
 # ── Crawl History ──────────────────────────────────────
@@ -68,19 +117,15 @@ async def update_source_fetched(source_id: str, error: Optional[str] = None) ->
 
 async def check_duplicate(content_fingerprint: str) -> Optional[dict]:
     """Check if a content fingerprint already exists in crawl history."""
-    result = await _request(
-        "GET",
-        "crawl_history",
-        params={
-            "content_fingerprint": f"eq.{content_fingerprint}",
-            "select": "id,source_url,field_note_id",
-            "limit": "1",
-        },
-    )
-    return result[0] if result else None
+    return await get_backend().check_duplicate(content_fingerprint)
 
 
-async def record_crawl(
+async def query_crawls(columns: list[str], **filters) -> list[dict]:
+    """Read crawl_history rows (see StorageBackend.query_crawls for filters)."""
+    return await get_backend().query_crawls(columns, **filters)
+
+
+def _crawl_row(
     source_feed_id: str,
     source_url: str,
     content_fingerprint: str,
@@ -94,8 +139,8 @@ async def record_crawl(
     field_note_id: Optional[str] = None,
     moderation_item_id: Optional[str] = None,
     error_message: Optional[str] = None,
+    embedding: Optional[list[float]] = None,
 ) -> dict:
-    """Record a crawled article in history."""
     data = {
         "id": str(uuid4()),
         "source_feed_id": source_feed_id,
@@ -113,8 +158,77 @@ async def record_crawl(
         "error_message": error_message,
         "fetched_at": datetime.now(timezone.utc).isoformat(),
     }
-    result = await _request("POST", "crawl_history", json=data)
-    return result[0] if isinstance(result, list) else result
+    if embedding is not None:
+        data["embedding"] = embedding
+    return data
+
+
+async def record_crawl(
+    source_feed_id: str,
+    source_url: str,
+    content_fingerprint: str,
+    pipeline_run_id: str,
+    raw_data: dict,
+    status: str = "processed",
+    relevance_score: Optional[float] = None,
+    was_relevant: bool = False,
+    was_duplicate: bool = False,
+    classification_data: Optional[dict] = None,
+    field_note_id: Optional[str] = None,
+    moderation_item_id: Optional[str] = None,
+    error_message: Optional[str] = None,
+    embedding: Optional[list[float]] = None,
+) -> dict:
+    """Record a crawled article in history."""
+    data = _crawl_row(
+        source_feed_id=source_feed_id,
+        source_url=source_url,
+        content_fingerprint=content_fingerprint,
+        pipeline_run_id=pipeline_run_id,
+        raw_data=raw_data,
+        status=status,
+        relevance_score=relevance_score,
+        was_relevant=was_relevant,
+        was_duplicate=was_duplicate,
+        classification_data=classification_data,
+        field_note_id=field_note_id,
+        moderation_item_id=moderation_item_id,
+        error_message=error_message,
+        embedding=embedding,
+    )
+    result = await get_backend().insert_crawl(data)
+    _notify_crawl_written(data)
+    return result
+
+
+async def record_crawls(records: list[dict]) -> list[dict]:
+    """Record several crawled articles in one bulk write.
+
+    Each item holds record_crawl's keyword arguments. The write is all or
+    nothing; callers that need per-row isolation can fall back to
+    record_crawl on failure.
+    """
+    rows = [_crawl_row(**record) for record in records]
+    if not rows:
+        return []
+    result = await get_backend().insert_crawls(rows)
+    for row in rows:
+        _notify_crawl_written(row)
+    return result
+
+
+def _notify_crawl_written(record: dict) -> None:
+    """Feed a freshly written crawl_history row to the in-memory aggregates
+    (analytics store, adaptive-threshold and source-reliability windows)."""
+    from utils import adaptive_threshold, reliability
+    from utils.analytics import observe
+
+    try:
+        observe(record)
+        adaptive_threshold.observe_crawl(record)
+        reliability.observe_crawl(record)
+    except Exception as e:
+        logger.warning("db.crawl_observers_failed", error=str(e))
 
 
 # ── Pipeline Runs ──────────────────────────────────────
@@ -131,8 +245,7 @@ async def create_run(run_type: str) -> dict:
         "errors": [],
         "sources_polled": [],
     }
-    result = await _request("POST", "pipeline_runs", json=data)
-    return result[0] if isinstance(result, list) else result
+    return await get_backend().insert_run(data)
 
 
 async def complete_run(
@@ -141,67 +254,123 @@ async def complete_run(
     errors: list,
     sources_polled: list[str],
     status: str = "completed",
+    source_status: Optional[dict[str, dict]] = None,
+    sources: Optional[list[dict]] = None,
 ) -> None:
-    """Mark a pipeline run as completed."""
-    await _request(
-        "PATCH",
-        f"pipeline_runs?id=eq.{run_id}",
-        json={
-            "status": status,
-            "completed_at": datetime.now(timezone.utc).isoformat(),
-            "stats": stats,
-            "errors": errors,
-            "sources_polled": sources_polled,
-        },
-    )
+    """Mark a pipeline run as completed.
+
+    If source_status (from collect_node) is given, the polled sources'
+    last_fetched_at / error state is written back in the same step —
+    atomically on backends with transactions. sources are the source_feeds
+    rows loaded at the start of the run (for consecutive_errors).
+    """
+    fields = {
+        "status": status,
+        "completed_at": datetime.now(timezone.utc).isoformat(),
+        "stats": stats,
+        "errors": errors,
+        "sources_polled": sources_polled,
+    }
+    updates = _source_updates(source_status, sources or []) if source_status else []
+    await get_backend().finish_run(run_id, fields, updates)
 
 
 async def get_recent_runs(limit: int = 20) -> list[dict]:
     """Get recent pipeline runs."""
-    return await _request(
-        "GET",
-        "pipeline_runs",
-        params={"order": "started_at.desc", "limit": str(limit)},
-    ) or []
+    return await get_backend().list_runs(limit)
 
 
 async def get_run_by_id(run_id: str) -> Optional[dict]:
     """Get a specific pipeline run."""
-    result = await _request(
-        "GET",
-        "pipeline_runs",
-        params={"id": f"eq.{run_id}"},
-    )
-    return result[0] if result else None
+    return await get_backend().get_run(run_id)
 
 
 # ── Moderation Queue ──────────────────────────────────
 
 
-async def create_moderation_item(
+def _moderation_row(
     content: str,
     item_type: str = "haystack_flagged",
     metadata: dict | None = None,
+    item_id: Optional[str] = None,
 ) -> dict:
-    """Insert a flagged article into the moderation queue."""
-    data = {
-        "id": str(uuid4()),
+    return {
+        "id": item_id or str(uuid4()),
         "type": item_type,
         "content": content,
         "status": "pending",
         "metadata": metadata or {},
     }
-    result = await _request("POST", "moderation_queue", json=data)
-    return result[0] if isinstance(result, list) else result
+
+
+async def create_moderation_item(
+    content: str,
+    item_type: str = "haystack_flagged",
+    metadata: dict | None = None,
+    item_id: Optional[str] = None,
+) -> dict:
+    """Insert a flagged article into the moderation queue."""
+    return await get_backend().insert_moderation_item(
+        _moderation_row(content, item_type, metadata, item_id)
+    )
+
+
+async def create_moderation_items(items: list[dict]) -> list[dict]:
+    """Insert several moderation items in one bulk write.
+
+    Each item holds create_moderation_item's keyword arguments, plus an
+    optional item_id (see idempotency_id). Rows are returned in input
+    order; the write is all or nothing.
+    """
+    rows = [_moderation_row(**item) for item in items]
+    if not rows:
+        return []
+    return await get_backend().insert_moderation_items(rows)
+
+
+async def existing_moderation_ids(ids: list[str]) -> set[str]:
+    """Which of these moderation item IDs have already been written."""
+    return await get_backend().get_moderation_ids(ids)
+
+
+# ── Tips ──────────────────────────────────────────────
+
+
+async def claim_approved_tips(limit: int = 20, after: Optional[dict] = None) -> list[dict]:
+    """Claim approved tips that have not been ingested yet.
+
+    Calls the claim_approved_tips RPC (migration 005), which marks the rows
+    metadata.ingested in the same statement and skips rows another cycle is
+    claiming, so each tip is handed out once. `after` is the last row of the
+    previous page (keyset cursor on created_at, id). Rows come back oldest first.
+    """
+    body = {"p_limit": limit}
+    if after:
+        body["p_after_created_at"] = after["created_at"]
+        body["p_after_id"] = after["id"]
+    rows = await _request("POST", "rpc/claim_approved_tips", json=body) or []
+    return sorted(rows, key=lambda r: (r.get("created_at") or "", r.get("id") or ""))
+
+
+async def has_pending_tips() -> bool:
+    """Whether any approved tip is waiting to be claimed (one-row index probe)."""
+    rows = await _request(
+        "GET",
+        "moderation_queue",
+        params={
+            "select": "id",
+            "type": "eq.tip",
+            "status": "eq.approved",
+            "or": "(metadata->>ingested.is.null,metadata->>ingested.neq.true)",
+            "limit": "1",
+        },
+    )
+    return bool(rows)
 
 
 # ── Health Check ───────────────────────────────────────
 
 
 async def check_health() -> dict:
-    """Check Supabase connectivity."""
-    try:
-        await _request("GET", "pipeline_runs", params={"limit": "1"})
-        return {"status": "connected"}
-    except Exception as e:
-        return {"status": "error", "error": str(e)}
+    """Check storage backend connectivity."""
+    return await get_backend().check_health()
@@ -0,0 +1,269 @@
+"""Direct PostgreSQL storage backend (asyncpg) for the Supabase database.
+
+Talks to Postgres over a pooled binary-protocol connection instead of
+PostgREST. This saves the HTTP and JSON round trips and makes transactions
+and COPY available:
+
+- Hot queries (duplicate check, crawl insert) use fixed SQL text, so asyncpg
+  prepares them once per pooled connection and reuses the plan.
+- insert_crawls bulk-loads with COPY (copy_records_to_table).
+- finish_run writes source status and the run record in one transaction.
+
+asyncpg is an optional dependency, imported only when this backend is
+selected (HAYSTACK_STORAGE_BACKEND=postgres). Use Supabase's direct or
+session-mode connection string: transaction-mode poolers (port 6543) do not
+support prepared statements. Requires migrations up to 004 (embedding).
+"""
+
+import asyncio
+import json
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from db.base import StorageBackend
+
+_TIMESTAMP_COLUMNS = {"fetched_at", "started_at", "completed_at", "last_fetched_at", "updated_at"}
+
+_CRAWL_COLUMNS = (
+    "id", "source_feed_id", "source_url", "content_fingerprint", "pipeline_run_id",
+    "raw_data", "status", "relevance_score", "was_relevant", "was_duplicate",
+    "classification_data", "field_note_id", "moderation_item_id", "error_message",
+    "fetched_at", "embedding",
+)
+
+_CHECK_DUPLICATE_SQL = (
+    "SELECT id, source_url, field_note_id FROM crawl_history"
+    " WHERE content_fingerprint = $1 LIMIT 1"
+)
+_INSERT_CRAWL_SQL = (
+    f"INSERT INTO crawl_history ({', '.join(_CRAWL_COLUMNS)})"
+    f" VALUES ({', '.join(f'${i}' for i in range(1, len(_CRAWL_COLUMNS) + 1))})"
+)
+_INSERT_MODERATION_SQL = (
+    "INSERT INTO moderation_queue (id, type, content, status, metadata)"
+    " VALUES ($1, $2, $3, $4, $5)"
+)
+
+
+def _to_db(column: str, value):
+    """Python/JSON-shaped value -> asyncpg argument."""
+    if value is not None and column in _TIMESTAMP_COLUMNS and isinstance(value, str):
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value
+
+
+def _from_db(record) -> dict:
+    """asyncpg Record -> the dict shape PostgREST returns (ISO strings, str UUIDs)."""
+    row = {}
+    for key, value in record.items():
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, uuid.UUID):
+            value = str(value)
+        row[key] = value
+    return row
+
+
+def _assignments(fields: dict, start: int) -> tuple[str, list]:
+    columns = list(fields)
+    sql = ", ".join(f"{c} = ${i}" for i, c in enumerate(columns, start=start))
+    return sql, [_to_db(c, fields[c]) for c in columns]
+
+
+async def _init_connection(conn) -> None:
+    # json/jsonb columns exchange Python objects, as with PostgREST. Binary
+    # codecs so COPY (which is binary-only) can encode them too; binary jsonb
+    # is a version byte followed by the JSON text.
+    await conn.set_type_codec(
+        "json", schema="pg_catalog", format="binary",
+        encoder=lambda v: json.dumps(v).encode(), decoder=json.loads,
+    )
+    await conn.set_type_codec(
+        "jsonb", schema="pg_catalog", format="binary",
+        encoder=lambda v: b"\x01" + json.dumps(v).encode(), decoder=lambda b: json.loads(b[1:]),
+    )
+
+
+class PostgresBackend(StorageBackend):
+    """Stores everything in Postgres through an asyncpg connection pool."""
+
+    name = "postgres"
+
+    def __init__(self, dsn: str, min_size: int = 1, max_size: int = 5):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self._pool = None
+        self._pool_lock = asyncio.Lock()
+
+    async def pool(self):
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    import asyncpg
+
+                    self._pool = await asyncpg.create_pool(
+                        self.dsn,
+                        min_size=self.min_size,
+                        max_size=self.max_size,
+                        init=_init_connection,
+                    )
+        return self._pool
+
+    async def get_active_sources(self, source_type: Optional[str] = None) -> list[dict]:
+        sql = "SELECT * FROM source_feeds WHERE is_active"
+        args = []
+        if source_type:
+            sql += " AND source_type = $1"
+            args.append(source_type)
+        sql += " ORDER BY last_fetched_at ASC NULLS FIRST"
+        pool = await self.pool()
+        return [_from_db(r) for r in await pool.fetch(sql, *args)]
+
+    async def check_duplicate(self, content_fingerprint: str) -> Optional[dict]:
+        pool = await self.pool()
+        record = await pool.fetchrow(_CHECK_DUPLICATE_SQL, content_fingerprint)
+        return _from_db(record) if record else None
+
+    async def insert_crawl(self, row: dict) -> dict:
+        pool = await self.pool()
+        await pool.execute(_INSERT_CRAWL_SQL, *(_to_db(c, row.get(c)) for c in _CRAWL_COLUMNS))
+        return row
+
+    async def insert_crawls(self, rows: list[dict]) -> list[dict]:
+        if not rows:
+            return []
+        pool = await self.pool()
+        async with pool.acquire() as conn:
+            await conn.copy_records_to_table(
+                "crawl_history",
+                columns=list(_CRAWL_COLUMNS),
+                records=[tuple(_to_db(c, row.get(c)) for c in _CRAWL_COLUMNS) for row in rows],
+            )
+        return rows
+
+    async def query_crawls(
+        self,
+        columns: list[str],
+        *,
+        since: Optional[str] = None,
+        source_feed_id: Optional[str] = None,
+        relevant_only: bool = False,
+        exclude_duplicates: bool = False,
+        newest_first: bool = True,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> list[dict]:
+        conditions, args = ["TRUE"], []
+        if since:
+            args.append(_to_db("fetched_at", since))
+            conditions.append(f"fetched_at > ${len(args)}")
+        if source_feed_id:
+            args.append(source_feed_id)
+            conditions.append(f"source_feed_id = ${len(args)}::uuid")
+        if relevant_only:
+            conditions.append("was_relevant")
+        if exclude_duplicates:
+            conditions.append("NOT was_duplicate")
+        args.extend([limit, offset])
+        sql = (
+            f"SELECT {', '.join(columns)} FROM crawl_history WHERE {' AND '.join(conditions)}"
+            f" ORDER BY fetched_at {'DESC' if newest_first else 'ASC'}"
+            f" LIMIT ${len(args) - 1} OFFSET ${len(args)}"
+        )
+        pool = await self.pool()
+        return [_from_db(r) for r in await pool.fetch(sql, *args)]
+
+    async def get_run(self, run_id: str) -> Optional[dict]:
+        pool = await self.pool()
+        record = await pool.fetchrow("SELECT * FROM pipeline_runs WHERE id = $1::uuid", run_id)
+        return _from_db(record) if record else None
+
+    async def list_runs(self, limit: int = 20) -> list[dict]:
+        pool = await self.pool()
+        records = await pool.fetch(
+            "SELECT * FROM pipeline_runs ORDER BY started_at DESC LIMIT $1", limit
+        )
+        return [_from_db(r) for r in records]
+
+    async def insert_run(self, row: dict) -> dict:
+        columns = list(row)
+        placeholders = ", ".join(f"${i}" for i in range(1, len(columns) + 1))
+        pool = await self.pool()
+        await pool.execute(
+            f"INSERT INTO pipeline_runs ({', '.join(columns)}) VALUES ({placeholders})",
+            *(_to_db(c, row[c]) for c in columns),
+        )
+        return row
+
+    async def update_run(self, run_id: str, fields: dict, conn=None) -> None:
+        assignments, args = _assignments(fields, start=2)
+        executor = conn or await self.pool()
+        await executor.execute(
+            f"UPDATE pipeline_runs SET {assignments} WHERE id = $1", run_id, *args
+        )
+
+    async def update_sources(self, source_ids: list[str], fields: dict, conn=None) -> None:
+        assignments, args = _assignments(fields, start=2)
+        executor = conn or await self.pool()
+        await executor.execute(
+            f"UPDATE source_feeds SET {assignments} WHERE id = ANY($1::uuid[])",
+            source_ids, *args,
+        )
+
+    async def finish_run(
+        self,
+        run_id: str,
+        fields: dict,
+        source_updates: list[tuple[list[str], dict]],
+    ) -> None:
+        """Source status and run completion in a single transaction."""
+        pool = await self.pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                for source_ids, source_fields in source_updates:
+                    await self.update_sources(source_ids, source_fields, conn=conn)
+                await self.update_run(run_id, fields, conn=conn)
+
+    async def insert_moderation_item(self, row: dict) -> dict:
+        pool = await self.pool()
+        await pool.execute(
+            _INSERT_MODERATION_SQL,
+            row["id"], row["type"], row["content"], row["status"], row["metadata"],
+        )
+        return row
+
+    async def get_moderation_ids(self, ids: list[str]) -> set[str]:
+        if not ids:
+            return set()
+        pool = await self.pool()
+        records = await pool.fetch(
+            "SELECT id FROM moderation_queue WHERE id = ANY($1::uuid[])", ids
+        )
+        return {str(r["id"]) for r in records}
+
+    async def insert_moderation_items(self, rows: list[dict]) -> list[dict]:
+        if not rows:
+            return []
+        pool = await self.pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.executemany(
+                    _INSERT_MODERATION_SQL,
+                    [(r["id"], r["type"], r["content"], r["status"], r["metadata"]) for r in rows],
+                )
+        return rows
+
+    async def check_health(self) -> dict:
+        try:
+            pool = await self.pool()
+            await pool.fetchval("SELECT 1")
+            return {"status": "connected", "backend": self.name}
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
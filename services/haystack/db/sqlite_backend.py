@@ -0,0 +1,281 @@
+"""Embedded SQLite storage backend for development, tests and edge deployments.
+
+Uses the stdlib sqlite3 module with one connection in WAL mode. Queries run
+in a worker thread, one at a time: a write can wait up to the busy timeout
+for another process holding the database lock, and that wait must not stall
+the event loop. JSON columns are stored as TEXT.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from typing import Callable, Optional
+
+from db.base import StorageBackend
+
+_JSON_COLUMNS = {
+    "raw_data", "classification_data", "embedding", "stats", "errors",
+    "sources_polled", "metadata", "config", "default_topics", "default_geo_tags",
+}
+_BOOL_COLUMNS = {"is_active", "was_relevant", "was_duplicate"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS source_feeds (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    source_type TEXT NOT NULL,
+    url TEXT,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    reliability_tier TEXT DEFAULT 'standard',
+    reliability_score REAL DEFAULT 50.0,
+    default_topics TEXT,
+    default_geo_tags TEXT,
+    poll_interval_minutes INTEGER,
+    config TEXT,
+    last_fetched_at TEXT,
+    last_error TEXT,
+    consecutive_errors INTEGER DEFAULT 0,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_source_feeds_active
+    ON source_feeds (is_active, source_type, last_fetched_at);
+
+CREATE TABLE IF NOT EXISTS crawl_history (
+    id TEXT PRIMARY KEY,
+    source_feed_id TEXT,
+    source_url TEXT,
+    content_fingerprint TEXT,
+    pipeline_run_id TEXT,
+    raw_data TEXT,
+    status TEXT,
+    relevance_score REAL,
+    was_relevant INTEGER,
+    was_duplicate INTEGER,
+    classification_data TEXT,
+    field_note_id TEXT,
+    moderation_item_id TEXT,
+    error_message TEXT,
+    embedding TEXT,
+    fetched_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_crawl_history_fingerprint
+    ON crawl_history (content_fingerprint);
+CREATE INDEX IF NOT EXISTS idx_crawl_history_fetched
+    ON crawl_history (fetched_at);
+CREATE INDEX IF NOT EXISTS idx_crawl_history_source
+    ON crawl_history (source_feed_id, fetched_at);
+
+CREATE TABLE IF NOT EXISTS pipeline_runs (
+    id TEXT PRIMARY KEY,
+    run_type TEXT,
+    status TEXT,
+    started_at TEXT,
+    completed_at TEXT,
+    stats TEXT,
+    errors TEXT,
+    sources_polled TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pipeline_runs_started
+    ON pipeline_runs (started_at);
+
+CREATE TABLE IF NOT EXISTS moderation_queue (
+    id TEXT PRIMARY KEY,
+    type TEXT,
+    content TEXT,
+    status TEXT,
+    metadata TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_moderation_queue_status
+    ON moderation_queue (status, type);
+"""
+
+
+def _encode(row: dict) -> dict:
+    return {
+        k: json.dumps(v, ensure_ascii=False) if k in _JSON_COLUMNS and v is not None else v
+        for k, v in row.items()
+    }
+
+
+def _decode(row: sqlite3.Row) -> dict:
+    result = {}
+    for key in row.keys():
+        value = row[key]
+        if key in _JSON_COLUMNS and value is not None:
+            value = json.loads(value)
+        elif key in _BOOL_COLUMNS and value is not None:
+            value = bool(value)
+        result[key] = value
+    return result
+
+
+class SQLiteBackend(StorageBackend):
+    """Stores pipeline records in a local SQLite file (or ":memory:")."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    async def _run(self, fn: Callable, *args):
+        """fn(*args) on a worker thread, serialized on the connection."""
+        return await asyncio.to_thread(self._locked, fn, *args)
+
+    def _locked(self, fn: Callable, *args):
+        with self._lock:
+            return fn(*args)
+
+    def _insert(self, table: str, row: dict) -> dict:
+        encoded = _encode(row)
+        columns = ", ".join(encoded)
+        placeholders = ", ".join(f":{c}" for c in encoded)
+        self._conn.execute(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", encoded)
+        return row
+
+    def _insert_many(self, table: str, rows: list[dict]) -> list[dict]:
+        self._conn.execute("BEGIN")
+        try:
+            for row in rows:
+                self._insert(table, row)
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+        return rows
+
+    def _select(self, sql: str, params=()) -> list[dict]:
+        return [_decode(r) for r in self._conn.execute(sql, params)]
+
+    def _select_one(self, sql: str, params=()) -> Optional[dict]:
+        row = self._conn.execute(sql, params).fetchone()
+        return _decode(row) if row else None
+
+    def _execute(self, sql: str, params) -> None:
+        self._conn.execute(sql, params)
+
+    def upsert_source(self, row: dict) -> dict:
+        """Insert or replace a source feed (seeding local databases)."""
+        encoded = _encode(row)
+        columns = ", ".join(encoded)
+        placeholders = ", ".join(f":{c}" for c in encoded)
+        self._locked(
+            self._execute,
+            f"INSERT OR REPLACE INTO source_feeds ({columns}) VALUES ({placeholders})",
+            encoded,
+        )
+        return row
+
+    async def get_active_sources(self, source_type: Optional[str] = None) -> list[dict]:
+        sql = "SELECT * FROM source_feeds WHERE is_active = 1"
+        params: tuple = ()
+        if source_type:
+            sql += " AND source_type = ?"
+            params = (source_type,)
+        sql += " ORDER BY last_fetched_at IS NOT NULL, last_fetched_at"
+        return await self._run(self._select, sql, params)
+
+    async def check_duplicate(self, content_fingerprint: str) -> Optional[dict]:
+        return await self._run(
+            self._select_one,
+            "SELECT id, source_url, field_note_id FROM crawl_history"
+            " WHERE content_fingerprint = ? LIMIT 1",
+            (content_fingerprint,),
+        )
+
+    async def insert_crawl(self, row: dict) -> dict:
+        return await self._run(self._insert, "crawl_history", row)
+
+    async def insert_crawls(self, rows: list[dict]) -> list[dict]:
+        return await self._run(self._insert_many, "crawl_history", rows)
+
+    async def query_crawls(
+        self,
+        columns: list[str],
+        *,
+        since: Optional[str] = None,
+        source_feed_id: Optional[str] = None,
+        relevant_only: bool = False,
+        exclude_duplicates: bool = False,
+        newest_first: bool = True,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> list[dict]:
+        sql, params = f"SELECT {', '.join(columns)} FROM crawl_history WHERE 1 = 1", []
+        if since:
+            sql += " AND fetched_at > ?"
+            params.append(since)
+        if source_feed_id:
+            sql += " AND source_feed_id = ?"
+            params.append(source_feed_id)
+        if relevant_only:
+            sql += " AND was_relevant = 1"
+        if exclude_duplicates:
+            sql += " AND was_duplicate = 0"
+        sql += f" ORDER BY fetched_at {'DESC' if newest_first else 'ASC'} LIMIT ? OFFSET ?"
+        return await self._run(self._select, sql, (*params, limit, offset))
+
+    async def insert_run(self, row: dict) -> dict:
+        return await self._run(self._insert, "pipeline_runs", row)
+
+    async def get_run(self, run_id: str) -> Optional[dict]:
+        return await self._run(self._select_one, "SELECT * FROM pipeline_runs WHERE id = ?", (run_id,))
+
+    async def list_runs(self, limit: int = 20) -> list[dict]:
+        return await self._run(
+            self._select, "SELECT * FROM pipeline_runs ORDER BY started_at DESC LIMIT ?", (limit,)
+        )
+
+    async def update_run(self, run_id: str, fields: dict) -> None:
+        encoded = _encode(fields)
+        assignments = ", ".join(f"{c} = :{c}" for c in encoded)
+        await self._run(
+            self._execute,
+            f"UPDATE pipeline_runs SET {assignments} WHERE id = :_run_id",
+            {**encoded, "_run_id": run_id},
+        )
+
+    async def update_sources(self, source_ids: list[str], fields: dict) -> None:
+        encoded = _encode(fields)
+        assignments = ", ".join(f"{c} = ?" for c in encoded)
+        placeholders = ", ".join("?" for _ in source_ids)
+        await self._run(
+            self._execute,
+            f"UPDATE source_feeds SET {assignments} WHERE id IN ({placeholders})",
+            (*encoded.values(), *source_ids),
+        )
+
+    async def insert_moderation_item(self, row: dict) -> dict:
+        return await self._run(self._insert, "moderation_queue", row)
+
+    async def get_moderation_ids(self, ids: list[str]) -> set[str]:
+        if not ids:
+            return set()
+        placeholders = ", ".join("?" for _ in ids)
+        rows = await self._run(
+            self._select, f"SELECT id FROM moderation_queue WHERE id IN ({placeholders})", ids
+        )
+        return {row["id"] for row in rows}
+
+    async def insert_moderation_items(self, rows: list[dict]) -> list[dict]:
+        return await self._run(self._insert_many, "moderation_queue", rows)
+
+    async def check_health(self) -> dict:
+        try:
+            await self._run(self._execute, "SELECT 1", ())
+            return {"status": "connected", "backend": self.name}
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
+
+    async def close(self) -> None:
+        await self._run(self._conn.close)
@@ -0,0 +1,141 @@
+"""Supabase PostgREST storage backend."""
+
+from typing import Optional
+
+import httpx
+
+from config import SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY
+from db.base import StorageBackend
+
+_headers = {
+    "apikey": SUPABASE_SERVICE_ROLE_KEY,
+    "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}",
+    "Content-Type": "application/json",
+    "Prefer": "return=representation",
+}
+
+
+def _url(table: str) -> str:
+    return f"{SUPABASE_URL}/rest/v1/{table}"
+
+
+async def _request(method: str, table: str, **kwargs) -> dict | list | None:
+    """Make an authenticated request to Supabase REST API."""
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        resp = await client.request(method, _url(table), headers=_headers, **kwargs)
+        resp.raise_for_status()
+        if resp.status_code == 204:
+            return None
+        return resp.json()
+
+
+def _first(result: dict | list | None) -> dict:
+    return result[0] if isinstance(result, list) else result
+
+
+class SupabaseBackend(StorageBackend):
+    """Stores everything in the shared Supabase Postgres via PostgREST."""
+
+    name = "supabase"
+
+    async def get_active_sources(self, source_type: Optional[str] = None) -> list[dict]:
+        params = {"is_active": "eq.true", "order": "last_fetched_at.asc.nullsfirst"}
+        if source_type:
+            params["source_type"] = f"eq.{source_type}"
+        return await _request("GET", "source_feeds", params=params) or []
+
+    async def check_duplicate(self, content_fingerprint: str) -> Optional[dict]:
+        result = await _request(
+            "GET",
+            "crawl_history",
+            params={
+                "content_fingerprint": f"eq.{content_fingerprint}",
+                "select": "id,source_url,field_note_id",
+                "limit": "1",
+            },
+        )
+        return result[0] if result else None
+
+    async def insert_crawl(self, row: dict) -> dict:
+        return _first(await _request("POST", "crawl_history", json=row))
+
+    async def insert_crawls(self, rows: list[dict]) -> list[dict]:
+        if not rows:
+            return []
+        # PostgREST bulk inserts need every object to carry the same keys
+        columns = {key for row in rows for key in row}
+        result = await _request(
+            "POST", "crawl_history", json=[{c: row.get(c) for c in columns} for row in rows]
+        )
+        return result if isinstance(result, list) else [result]
+
+    async def query_crawls(
+        self,
+        columns: list[str],
+        *,
+        since: Optional[str] = None,
+        source_feed_id: Optional[str] = None,
+        relevant_only: bool = False,
+        exclude_duplicates: bool = False,
+        newest_first: bool = True,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> list[dict]:
+        params = {
+            "select": ",".join(columns),
+            "order": "fetched_at.desc" if newest_first else "fetched_at.asc",
+            "limit": str(limit),
+        }
+        if offset:
+            params["offset"] = str(offset)
+        if since:
+            params["fetched_at"] = f"gt.{since}"
+        if source_feed_id:
+            params["source_feed_id"] = f"eq.{source_feed_id}"
+        if relevant_only:
+            params["was_relevant"] = "eq.true"
+        if exclude_duplicates:
+            params["was_duplicate"] = "eq.false"
+        return await _request("GET", "crawl_history", params=params) or []
+
+    async def insert_run(self, row: dict) -> dict:
+        return _first(await _request("POST", "pipeline_runs", json=row))
+
+    async def get_run(self, run_id: str) -> Optional[dict]:
+        result = await _request("GET", "pipeline_runs", params={"id": f"eq.{run_id}"})
+        return result[0] if result else None
+
+    async def list_runs(self, limit: int = 20) -> list[dict]:
+        return await _request(
+            "GET", "pipeline_runs", params={"order": "started_at.desc", "limit": str(limit)}
+        ) or []
+
+    async def update_run(self, run_id: str, fields: dict) -> None:
+        await _request("PATCH", f"pipeline_runs?id=eq.{run_id}", json=fields)
+
+    async def update_sources(self, source_ids: list[str], fields: dict) -> None:
+        await _request("PATCH", f"source_feeds?id=in.({','.join(source_ids)})", json=fields)
+
+    async def insert_moderation_item(self, row: dict) -> dict:
+        return _first(await _request("POST", "moderation_queue", json=row))
+
+    async def get_moderation_ids(self, ids: list[str]) -> set[str]:
+        if not ids:
+            return set()
+        rows = await _request(
+            "GET", "moderation_queue", params={"id": f"in.({','.join(ids)})", "select": "id"}
+        ) or []
+        return {row["id"] for row in rows}
+
+    async def insert_moderation_items(self, rows: list[dict]) -> list[dict]:
+        if not rows:
+            return []
+        result = await _request("POST", "moderation_queue", json=rows)
+        return result if isinstance(result, list) else [result]
+
+    async def check_health(self) -> dict:
+        try:
+            await _request("GET", "pipeline_runs", params={"limit": "1"})
+            return {"status": "connected", "backend": self.name}
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
@@ -2,7 +2,7 @@
 
 import structlog
 
-from db.client import record_crawl
+from db.client import record_crawl, record_crawls
 from graph.state import PipelineState
 
 logger = structlog.get_logger()
@@ -18,71 +18,60 @@ async def archive_node(state: PipelineState) -> dict:
     flagged = state.get("flagged_articles", [])
     run_id = state["run_id"]
 
-    archived_count = 0
+    rejected_records = [
+        dict(
+            source_feed_id=article["raw"]["source_id"],
+            source_url=article["raw"]["source_url"],
+            content_fingerprint=article["content_fingerprint"],
+            pipeline_run_id=run_id,
+            raw_data={
+                "title": article["raw"]["title"],
+                "body": article["raw"]["body"][:500],
+            },
+            status="rejected",
+            relevance_score=article["relevance_score"],
+            was_relevant=False,
+            was_duplicate=article["is_duplicate"],
+            classification_data={
+                "topics": article["topics"],
+                "reasoning": article["classification_reasoning"],
+            },
+        )
+        for article in rejected
+    ]
 
-    # Archive rejected articles
-    for article in rejected:
-        raw = article["raw"]
-        try:
-            await record_crawl(
-                source_feed_id=raw["source_id"],
-                source_url=raw["source_url"],
-                content_fingerprint=article["content_fingerprint"],
-                pipeline_run_id=run_id,
-                raw_data={
-                    "title": raw["title"],
-                    "body": raw["body"][:500],
-                },
-                status="rejected",
-                relevance_score=article["relevance_score"],
-                was_relevant=False,
-                was_duplicate=article["is_duplicate"],
-                classification_data={
-                    "topics": article["topics"],
-                    "reasoning": article["classification_reasoning"],
-                },
-            )
-            archived_count += 1
-        except Exception as e:
-            logger.error(
-                "archive.error",
-                title=raw["title"][:60],
-                error=str(e),
-            )
-
-    # Archive flagged articles (they go to moderation, but still track them)
+    # Flagged articles go to moderation, but still track them
+    flagged_records = []
     for article in flagged:
-        raw = article["classified"]["raw"]
         classified = article["classified"]
-        try:
-            await record_crawl(
-                source_feed_id=raw["source_id"],
-                source_url=raw["source_url"],
-                content_fingerprint=classified["content_fingerprint"],
-                pipeline_run_id=run_id,
-                raw_data={
-                    "title": raw["title"],
-                    "body": raw["body"][:500],
-                },
-                status="flagged",
-                relevance_score=classified["relevance_score"],
-                was_relevant=True,
-                classification_data={
-                    "topics": classified["topics"],
-                    "risk_flags": [f.get("type") for f in article.get("risk_flags", [])],
-                },
-            )
-        except Exception as e:
-            logger.error(
-                "archive.flagged_error",
-                title=raw["title"][:60],
-                error=str(e),
-            )
+        raw = classified["raw"]
+        flagged_records.append(dict(
+            source_feed_id=raw["source_id"],
+            source_url=raw["source_url"],
+            content_fingerprint=classified["content_fingerprint"],
+            pipeline_run_id=run_id,
+            raw_data={
+                "title": raw["title"],
+                "body": raw["body"][:500],
+                "language": raw.get("language", "en"),
+            },
+            status="flagged",
+            relevance_score=classified["relevance_score"],
+            was_relevant=True,
+            classification_data={
+                "topics": classified["topics"],
+                "risk_flags": [f.get("type") for f in article.get("risk_flags", [])],
+            },
+            embedding=classified.get("embedding"),
+        ))
+
+    archived_count = await write_crawl_records(rejected_records, "archive.error")
+    flagged_count = await write_crawl_records(flagged_records, "archive.flagged_error")
 
     logger.info(
         "archive.done",
         rejected_archived=archived_count,
-        flagged_archived=len(flagged),
+        flagged_archived=flagged_count,
     )
 
     return {
@@ -91,3 +80,30 @@ async def archive_node(state: PipelineState) -> dict:
             "archived_count": archived_count,
         },
     }
+
+
+async def write_crawl_records(records: list[dict], error_event: str) -> int:
+    """Write crawl records in one bulk insert, falling back to one at a time.
+
+    Returns the number of records written.
+    """
+    if not records:
+        return 0
+    try:
+        await record_crawls(records)
+        return len(records)
+    except Exception as e:
+        logger.warning("archive.bulk_failed", count=len(records), error=str(e))
+
+    written = 0
+    for record in records:
+        try:
+            await record_crawl(**record)
+            written += 1
+        except Exception as e:
+            logger.error(
+                error_event,
+                title=record["raw_data"].get("title", record["source_url"])[:60],
+                error=str(e),
+            )
+    return written
@@ -1,24 +1,37 @@
-"""Breaking News detection node: identifies and alerts on high-priority stories."""
+"""Breaking News node: alerts on high-priority stories and fast-tracks them to field notes."""
+
+import asyncio
+import time
 
 import structlog
-import httpx
 from datetime import datetime, timezone
 
-from config import SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY
-from graph.state import PipelineState
+from db.client import create_moderation_items, existing_moderation_ids, idempotency_id
+from graph.nodes.enrich import enrich_article
+from graph.nodes.field_note_creator import create_note
+from graph.nodes.quality_gate import route_article
+from graph.state import ClassifiedArticle, PipelineState
+from llm.scheduler import PRIORITY_BREAKING, llm_context
 
 logger = structlog.get_logger()
 
+# LLM deadline for fast-lane calls (earliest-deadline-first within the breaking class)
+FAST_LANE_DEADLINE_SECONDS = 60
+
 
 async def breaking_news_node(state: PipelineState) -> dict:
-    """Detect breaking news articles and trigger alerts.
+    """Detect breaking news articles, alert editors and fast-track them.
 
     Articles classified as priority="breaking" get:
     1. Logged as breaking news alerts
     2. A notification record in the moderation_queue for immediate editor attention
-    3. Boosted confidence threshold (bypass quality gate minimum)
+    3. Enriched, quality-gated and (if approved) published as field notes right
+       away, concurrently and ahead of normal items for LLM slots
 
-    This node passes articles through unchanged — it only adds side-effects.
+    Fast-tracked articles are removed from classified_articles so the normal
+    enrich lane skips them; their field notes and flagged items are merged
+    into created_field_notes / flagged_articles. The alert-to-field-note
+    latency of each note is reported in stats.
     """
     classified = state.get("classified_articles", [])
 
@@ -38,76 +51,104 @@ async def breaking_news_node(state: PipelineState) -> dict:
         titles=[a["raw"]["title"][:80] for a in breaking_articles],
     )
 
-    # Create a moderation queue alert for each breaking article
-    for article in breaking_articles:
-        raw = article["raw"]
-        try:
-            await _send_breaking_alert(
-                title=raw["title"],
-                source_name=raw["source_name"],
-                source_url=raw["source_url"],
-                topics=article.get("topics", []),
-                relevance_score=article.get("relevance_score", 0),
-                reasoning=article.get("classification_reasoning", ""),
-            )
-        except Exception as e:
-            logger.error("breaking_news.alert_failed", title=raw["title"][:60], error=str(e))
+    run_id = state.get("run_id", "")
+
+    # Alert editors first: all of the run's alerts in one moderation_queue insert
+    try:
+        await _send_breaking_alerts(breaking_articles, run_id)
+    except Exception as e:
+        logger.error("breaking_news.alert_failed", count=len(breaking_articles), error=str(e))
+    alerted = time.monotonic()
+
+    with llm_context(priority=PRIORITY_BREAKING, deadline_seconds=FAST_LANE_DEADLINE_SECONDS):
+        results = await asyncio.gather(
+            *(_fast_track(a, run_id, alerted) for a in breaking_articles)
+        )
+
+    notes = [r["note"] for r in results if r["note"]]
+    flagged = [r["enriched"] for r in results if r["decision"] == "flagged"]
+    latencies = [r["latency_ms"] for r in results if r["note"]]
+    created = [*state.get("created_field_notes", []), *notes]
+
+    logger.info(
+        "breaking_news.fast_lane_done",
+        field_notes=len(notes),
+        flagged=len(flagged),
+        alert_to_note_ms=latencies,
+    )
 
     return {
+        "classified_articles": [a for a in classified if a.get("priority") != "breaking"],
+        "created_field_notes": created,
+        "flagged_articles": [*state.get("flagged_articles", []), *flagged],
         "stats": {
             **state.get("stats", {}),
             "breaking_count": len(breaking_articles),
+            "breaking_field_notes": len(notes),
+            "breaking_alert_to_note_ms": latencies,
+            "field_notes_created": len(created),
         },
     }
 
 
-async def _send_breaking_alert(
-    title: str,
-    source_name: str,
-    source_url: str,
-    topics: list[str],
-    relevance_score: float,
-    reasoning: str,
-) -> None:
-    """Send a breaking news alert to the moderation queue."""
-    from uuid import uuid4
-
-    content = (
-        f"🔴 BREAKING NEWS ALERT\n\n"
-        f"Title: {title}\n"
-        f"Source: {source_name}\n"
-        f"URL: {source_url}\n"
-        f"Topics: {', '.join(topics)}\n"
-        f"Relevance: {relevance_score:.0%}\n\n"
-        f"Classification: {reasoning}"
-    )
+async def _fast_track(article: ClassifiedArticle, run_id: str, alerted: float) -> dict:
+    """Enrich, gate and publish one breaking article (alerted = monotonic alert time)."""
+    enriched, _ = await enrich_article(article)
+    decision = route_article(enriched)
+    note = await create_note(enriched, run_id) if decision == "approved" else None
 
-    headers = {
-        "apikey": SUPABASE_SERVICE_ROLE_KEY,
-        "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}",
-        "Content-Type": "application/json",
-        "Prefer": "return=representation",
+    return {
+        "enriched": enriched,
+        "decision": decision,
+        "note": note,
+        "latency_ms": round((time.monotonic() - alerted) * 1000) if note else None,
     }
 
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        await client.post(
-            f"{SUPABASE_URL}/rest/v1/moderation_queue",
-            headers=headers,
-            json={
-                "id": str(uuid4()),
-                "type": "breaking_alert",
-                "content": content,
-                "status": "pending",
-                "metadata": {
-                    "alert_type": "breaking_news",
-                    "title": title,
-                    "source_name": source_name,
-                    "source_url": source_url,
-                    "topics": topics,
-                    "relevance_score": relevance_score,
-                    "detected_at": datetime.now(timezone.utc).isoformat(),
-                },
-            },
+
+async def _send_breaking_alerts(articles: list[ClassifiedArticle], run_id: str = "") -> None:
+    """Queue one breaking news alert per article in a single moderation_queue insert.
+
+    Alert IDs derive from the run and article, so a resumed run does not
+    alert editors twice for the same story.
+    """
+    detected_at = datetime.now(timezone.utc).isoformat()
+    items = []
+    for article in articles:
+        raw = article["raw"]
+        topics = article.get("topics", [])
+        relevance_score = article.get("relevance_score", 0)
+        content = (
+            f"🔴 BREAKING NEWS ALERT\n\n"
+            f"Title: {raw['title']}\n"
+            f"Source: {raw['source_name']}\n"
+            f"URL: {raw['source_url']}\n"
+            f"Topics: {', '.join(topics)}\n"
+            f"Relevance: {relevance_score:.0%}\n\n"
+            f"Classification: {article.get('classification_reasoning', '')}"
         )
+        items.append({
+            "item_id": idempotency_id(
+                run_id, "breaking_alert", article.get("content_fingerprint") or raw["source_url"]
+            ),
+            "content": content,
+            "item_type": "breaking_alert",
+            "metadata": {
+                "alert_type": "breaking_news",
+                "title": raw["title"],
+                "source_name": raw["source_name"],
+                "source_url": raw["source_url"],
+                "topics": topics,
+                "relevance_score": relevance_score,
+                "detected_at": detected_at,
+            },
+        })
+
+    existing = await existing_moderation_ids([item["item_id"] for item in items])
+    items = [item for item in items if item["item_id"] not in existing]
+    if existing:
+        logger.info("breaking_news.alerts_already_sent", count=len(existing))
+    if not items:
+        return
 
-    logger.info("breaking_news.alert_sent", title=title[:60])
+    await create_moderation_items(items)
+    logger.info("breaking_news.alerts_sent", count=len(items))
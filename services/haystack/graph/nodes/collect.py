@@ -1,16 +1,25 @@
 """Collection node: dispatches to agents and gathers raw articles."""
 
 import structlog
+from datetime import datetime, timezone
 
 from agents.rss_agent import RSSAgent
 from agents.scraper_agent import ScraperAgent
 from agents.api_agent import APIAgent
 from agents.social_agent import SocialAgent
 from agents.tip_ingester import TipIngester
+from config import CONNECTION_WARMUP_ENABLED
 from graph.state import PipelineState
+from utils.connections import warm_up
+from utils.robots import prefetch as prefetch_robots
 
 logger = structlog.get_logger()
 
+# Source types fetched over HTTP(S) from their source_feeds url
+WARMUP_SOURCE_TYPES = ("rss", "scrape", "api")
+# Of those, the ones whose agent checks robots.txt before fetching
+ROBOTS_SOURCE_TYPES = ("scrape",)
+
 # Agent registry
 _agents = {
     "rss": RSSAgent(),
@@ -25,7 +34,9 @@ async def collect_node(state: PipelineState) -> dict:
     """Run collection agents for the loaded sources.
 
     Groups sources by type and dispatches to the appropriate agent.
-    Returns accumulated raw_articles and collection_errors.
+    Returns accumulated raw_articles and collection_errors, plus the
+    per-source fetch status that run_pipeline writes back to source_feeds
+    once at the end of the run.
     """
     sources = state.get("_sources", [])
     cycle_type = state.get("cycle_type", "main")
@@ -40,6 +51,16 @@ async def collect_node(state: PipelineState) -> dict:
         logger.warning("collect.no_sources")
         return {"raw_articles": [], "collection_errors": []}
 
+    # Deep scrape cycles fetch full article pages unless a source opts out
+    if cycle_type == "deep_scrape":
+        sources = [
+            {**s, "config": {"deep_fetch": True, **(s.get("config") or {})}}
+            for s in sources
+        ]
+
+    if CONNECTION_WARMUP_ENABLED:
+        await _warm_up(sources)
+
     # Group sources by type
     by_type: dict[str, list[dict]] = {}
     for source in sources:
@@ -48,6 +69,8 @@ async def collect_node(state: PipelineState) -> dict:
 
     all_articles = []
     all_errors = []
+    status: dict[str, dict] = {}
+    polled_ids = {s.get("id") for s in state.get("_sources", [])}
 
     for source_type, type_sources in by_type.items():
         agent = _agents.get(source_type)
@@ -59,11 +82,13 @@ async def collect_node(state: PipelineState) -> dict:
                     "source_name": s.get("name"),
                     "error": f"No agent for source_type={source_type}",
                 })
+            _track_status(status, type_sources, all_errors, polled_ids)
             continue
 
         articles, errors = await agent.collect(type_sources)
         all_articles.extend(articles)
         all_errors.extend(errors)
+        _track_status(status, type_sources, errors, polled_ids)
 
     logger.info(
         "collect.done",
@@ -74,4 +99,63 @@ async def collect_node(state: PipelineState) -> dict:
     return {
         "raw_articles": all_articles,
         "collection_errors": all_errors,
+        "_source_status": status,
     }
+
+
+async def _warm_up(sources: list[dict]) -> None:
+    """Resolve and connect to the sources' hosts in parallel before collecting.
+
+    Scrape sources are warmed by the robots.txt lookup the scraper makes
+    before fetching (its rules are then cached for the agent). RSS and API
+    agents don't read robots.txt, so their hosts only get a TCP connection
+    that their first request takes over; no request reaches a source before
+    its agent's own robots and rate-limit checks.
+    Logs DNS/connect/TLS times per host; a failed warm-up is only logged
+    (the agent's own request reports the error).
+    """
+    warmed = [s for s in sources if s.get("source_type") in WARMUP_SOURCE_TYPES and s.get("url")]
+    if not warmed:
+        return
+    try:
+        hosts = await warm_up(
+            [s["url"] for s in warmed if s["source_type"] not in ROBOTS_SOURCE_TYPES],
+            probe_urls=[s["url"] for s in warmed if s["source_type"] in ROBOTS_SOURCE_TYPES],
+            probe=prefetch_robots,
+        )
+    except Exception as e:
+        logger.warning("collect.warm_up_failed", error=str(e))
+        return
+    for host, timings in hosts.items():
+        logger.debug("collect.host_warmed", host=host, **timings)
+    slowest = sorted(
+        hosts,
+        key=lambda h: hosts[h].get("connect_ms", 0) + hosts[h].get("tls_ms", 0),
+        reverse=True,
+    )[:3]
+    logger.info(
+        "collect.warmed",
+        hosts=len(hosts),
+        failed=sum(1 for t in hosts.values() if "error" in t),
+        connected=sum(1 for t in hosts.values() if t.get("connected")),
+        slowest={h: hosts[h] for h in slowest if hosts[h].get("connected")},
+    )
+
+
+def _track_status(
+    status: dict[str, dict], sources: list[dict], errors: list[dict], polled_ids: set
+) -> None:
+    """Record fetch time and error (if any) for each polled source_feeds record.
+
+    Errors marked "warning" (partial results) do not count as failures.
+    """
+    fetched_at = datetime.now(timezone.utc).isoformat()
+    failed = {
+        e.get("source_id"): e.get("error")
+        for e in errors
+        if not e.get("warning")
+    }
+    for source in sources:
+        source_id = source.get("id")
+        if source_id in polled_ids:
+            status[source_id] = {"fetched_at": fetched_at, "error": failed.get(source_id)}
@@ -1,15 +1,24 @@
 """Dedup & Classify node: fingerprint articles and classify relevance."""
 
+from collections import deque
+
 import structlog
 
 from config import MIN_RELEVANCE_SCORE
-from db.client import check_duplicate, update_source_fetched
-from llm.client import generate_json
+from db.client import check_duplicate
+from llm.client import embed, generate_json
 from llm.prompts import CLASSIFY_SYSTEM, CLASSIFY_PROMPT, CLASSIFY_BATCH_PROMPT
 from graph.state import PipelineState, ClassifiedArticle
 from utils.fingerprint import simhash
 from utils.text import truncate
-from utils.cross_lang_dedup import check_cross_language_duplicate
+from utils.cross_lang_dedup import (
+    EMBEDDING_UNAVAILABLE,
+    SKIP_SOURCE_TYPES as CROSS_LANG_SKIP_TYPES,
+    check_cross_language_duplicate,
+    embedding_text,
+    load_recent_history,
+    remember,
+)
 from utils.adaptive_threshold import get_relevance_threshold
 
 logger = structlog.get_logger()
@@ -21,22 +30,26 @@ async def dedup_classify_node(state: PipelineState) -> dict:
     """Fingerprint articles for dedup, then classify relevance with LLM.
 
     1. Compute SimHash fingerprint for each article
-    2. Check against crawl_history for duplicates
-    3. Send non-duplicate articles to LLM in batches for relevance classification
-    4. Split into classified (relevant) and rejected (irrelevant/duplicate)
+    2. Check against crawl_history for exact duplicates
+    3. Embed survivors in one batch
+    4. Check each for cross-language duplicates of recent relevant articles,
+       then classify the non-duplicates with the LLM in batches
+    5. Split into classified (relevant) and rejected (irrelevant/duplicate)
     """
     raw_articles = state.get("raw_articles", [])
+    articles = state.get("unique_articles") or raw_articles
+    # Intra-run duplicates were already rejected by the intra_dedup node
+    rejected = list(state.get("rejected_articles", []))
 
-    if not raw_articles:
-        return {"classified_articles": [], "rejected_articles": []}
+    if not articles:
+        return {"classified_articles": [], "rejected_articles": rejected}
 
     classified = []
-    rejected = []
 
     # Phase 1: Dedup — filter out duplicates before any LLM calls
-    to_classify: list[tuple[dict, str]] = []  # (article, fingerprint)
+    unique: list[tuple[dict, str]] = []  # (article, fingerprint)
 
-    for article in raw_articles:
+    for article in articles:
         try:
             fingerprint = simhash(article["title"] + " " + article["body"])
 
@@ -49,78 +62,77 @@ async def dedup_classify_node(state: PipelineState) -> dict:
                     duplicate_of=existing.get("field_note_id") or existing.get("id"),
                     content_fingerprint=fingerprint,
                     classification_reasoning="Duplicate content detected via SimHash",
+                    embedding=None,
                 ))
                 continue
 
-            cross_lang = await check_cross_language_duplicate(
-                title=article["title"], body=article["body"],
-                language=article.get("language", "en"),
-                source_url=article["source_url"],
-                source_type=article.get("source_type", ""),
-            )
-            if cross_lang and cross_lang.get("is_duplicate"):
-                logger.info("classify.cross_lang_duplicate", title=article["title"][:60])
-                rejected.append(ClassifiedArticle(
-                    raw=article, relevance_score=0.0, topics=[], geo_tags=[],
-                    priority="low", is_duplicate=True,
-                    duplicate_of=cross_lang.get("duplicate_of"),
-                    content_fingerprint=fingerprint,
-                    classification_reasoning=f"Cross-language duplicate: {cross_lang.get('reasoning', '')}",
-                ))
-                continue
-
-            to_classify.append((article, fingerprint))
+            unique.append((article, fingerprint))
 
         except Exception as e:
             logger.error("classify.dedup_error", title=article.get("title", "?")[:60], error=str(e))
-            rejected.append(ClassifiedArticle(
-                raw=article, relevance_score=0.0, topics=[], geo_tags=[],
-                priority="low", is_duplicate=False, duplicate_of=None,
-                content_fingerprint=simhash(article.get("title", "") + article.get("body", "")),
-                classification_reasoning=f"Dedup error: {str(e)}",
-            ))
-
-    # Phase 2: Batch LLM classification
-    for batch_start in range(0, len(to_classify), BATCH_SIZE):
-        batch = to_classify[batch_start:batch_start + BATCH_SIZE]
-
+            rejected.append(_dedup_error(article, e))
+
+    # Embed all surviving articles in one call (None if the model is unavailable)
+    embeddings = await embed([
+        embedding_text(article["title"], article["body"]) for article, _ in unique
+    ]) or [None] * len(unique)
+
+    # Recent history is loaded once per run and grows with this run's relevant
+    # articles. It is kept out of the (checkpointed) state: a resumed run
+    # reloads it. Runs of only tips/social posts never consult it.
+    history: dict = {}
+    if any(a.get("source_type") not in CROSS_LANG_SKIP_TYPES for a, _ in unique):
         try:
-            results = await _classify_batch(batch)
-
-            for (article, fingerprint), result in zip(batch, results):
-                score = float(result.get("relevance_score", 0))
-                topics = result.get("topics", [])
-                ca = ClassifiedArticle(
-                    raw=article, relevance_score=score, topics=topics,
-                    geo_tags=result.get("geo_tags", []),
-                    priority=result.get("priority", "normal"),
-                    is_duplicate=False, duplicate_of=None,
-                    content_fingerprint=fingerprint,
-                    classification_reasoning=result.get("reasoning", ""),
-                )
+            history = await load_recent_history()
+        except Exception as e:
+            logger.error("classify.history_load_failed", error=str(e))
+            history = {"en": [], "ja": []}
+
+    # Phase 2: cross-language dedup and batch LLM classification. An article
+    # enters the history only once it is classified relevant, so a rejected
+    # article can't take its other-language twin down with it. An article
+    # matching one still waiting in the current batch is deferred to a later
+    # batch, where it is checked against the outcome. Without embeddings
+    # (LLM fallback) the in-batch check is skipped: it would cost more LLM
+    # calls per article than it saves.
+    queue = deque((article, fp, emb) for (article, fp), emb in zip(unique, embeddings))
+    while queue:
+        batch: list[tuple[dict, str, list[float] | None]] = []
+        deferred = []
+        pending: dict[str, list[dict]] = {"en": [], "ja": []}
+
+        while queue and len(batch) < BATCH_SIZE:
+            article, fingerprint, embedding = queue.popleft()
+            try:
+                cross_lang = await _cross_lang_check(article, embedding, history)
+                if cross_lang and cross_lang.get("is_duplicate"):
+                    logger.info("classify.cross_lang_duplicate", title=article["title"][:60])
+                    rejected.append(ClassifiedArticle(
+                        raw=article, relevance_score=0.0, topics=[], geo_tags=[],
+                        priority="low", is_duplicate=True,
+                        duplicate_of=cross_lang.get("duplicate_of"),
+                        content_fingerprint=fingerprint,
+                        classification_reasoning=f"Cross-language duplicate: {cross_lang.get('reasoning', '')}",
+                        embedding=embedding,
+                    ))
+                    continue
+
+                waiting = embedding is not None and await _cross_lang_check(article, embedding, pending)
+                if waiting and waiting.get("is_duplicate"):
+                    deferred.append((article, fingerprint, embedding))
+                    continue
+
+            except Exception as e:
+                logger.error("classify.dedup_error", title=article.get("title", "?")[:60], error=str(e))
+                rejected.append(_dedup_error(article, e))
+                continue
 
-                threshold = get_relevance_threshold(topics)
-                if score >= threshold:
-                    classified.append(ca)
-                else:
-                    rejected.append(ca)
+            batch.append((article, fingerprint, embedding))
+            remember(pending, article, fingerprint, embedding)
 
-                logger.info(
-                    "classify.result", title=article["title"][:60],
-                    score=score, threshold=threshold, relevant=score >= threshold,
-                )
-                await update_source_fetched(article["source_id"])
-
-        except Exception as e:
-            logger.error("classify.batch_error", batch_size=len(batch), error=str(e))
-            # Fallback: reject the entire batch
-            for article, fingerprint in batch:
-                rejected.append(ClassifiedArticle(
-                    raw=article, relevance_score=0.0, topics=[], geo_tags=[],
-                    priority="low", is_duplicate=False, duplicate_of=None,
-                    content_fingerprint=fingerprint,
-                    classification_reasoning=f"Batch classification error: {str(e)}",
-                ))
+        for article, fingerprint, embedding in await _classify_into(batch, classified, rejected):
+            remember(history, article, fingerprint, embedding)
+        queue.extendleft(reversed(deferred))
 
     logger.info("classify.done", classified=len(classified), rejected=len(rejected))
 
@@ -136,6 +148,80 @@ async def dedup_classify_node(state: PipelineState) -> dict:
     }
 
 
+async def _cross_lang_check(article: dict, embedding: list[float] | None, history: dict) -> dict | None:
+    return await check_cross_language_duplicate(
+        title=article["title"], body=article["body"],
+        language=article.get("language", "en"),
+        source_url=article["source_url"],
+        source_type=article.get("source_type", ""),
+        # The batch embed failed: don't retry the model for each check
+        embedding=EMBEDDING_UNAVAILABLE if embedding is None else embedding,
+        history=history,
+    )
+
+
+async def _classify_into(
+    batch: list[tuple[dict, str, list[float] | None]],
+    classified: list,
+    rejected: list,
+) -> list[tuple[dict, str, list[float] | None]]:
+    """Classify a batch into classified/rejected; returns the relevant entries."""
+    if not batch:
+        return []
+    relevant = []
+    try:
+        results = await _classify_batch([(article, fp) for article, fp, _ in batch])
+
+        for (article, fingerprint, embedding), result in zip(batch, results):
+            score = float(result.get("relevance_score", 0))
+            topics = result.get("topics", [])
+            ca = ClassifiedArticle(
+                raw=article, relevance_score=score, topics=topics,
+                geo_tags=result.get("geo_tags", []),
+                priority=result.get("priority", "normal"),
+                is_duplicate=False, duplicate_of=None,
+                content_fingerprint=fingerprint,
+                classification_reasoning=result.get("reasoning", ""),
+                embedding=embedding,
+            )
+
+            threshold = get_relevance_threshold(topics)
+            if score >= threshold:
+                classified.append(ca)
+                relevant.append((article, fingerprint, embedding))
+            else:
+                rejected.append(ca)
+
+            logger.info(
+                "classify.result", title=article["title"][:60],
+                score=score, threshold=threshold, relevant=score >= threshold,
+            )
+
+    except Exception as e:
+        logger.error("classify.batch_error", batch_size=len(batch), error=str(e))
+        # Fallback: reject the entire batch
+        for article, fingerprint, embedding in batch:
+            rejected.append(ClassifiedArticle(
+                raw=article, relevance_score=0.0, topics=[], geo_tags=[],
+                priority="low", is_duplicate=False, duplicate_of=None,
+                content_fingerprint=fingerprint,
+                classification_reasoning=f"Batch classification error: {str(e)}",
+                embedding=embedding,
+            ))
+    return relevant
+
+
+def _dedup_error(article: dict, error: Exception) -> ClassifiedArticle:
+    """Reject an article whose dedup checks failed."""
+    return ClassifiedArticle(
+        raw=article, relevance_score=0.0, topics=[], geo_tags=[],
+        priority="low", is_duplicate=False, duplicate_of=None,
+        content_fingerprint=simhash(article.get("title", "") + article.get("body", "")),
+        classification_reasoning=f"Dedup error: {str(error)}",
+        embedding=None,
+    )
+
+
 async def _classify_batch(batch: list[tuple[dict, str]]) -> list[dict]:
     """Classify a batch of articles in a single LLM call.
 
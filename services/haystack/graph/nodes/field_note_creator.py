@@ -3,9 +3,9 @@
 import structlog
 
 from api_client.nextjs import create_field_note
-from db.client import record_crawl
-from graph.state import PipelineState
-from utils.reliability import update_source_reliability
+from db.client import check_duplicate, idempotency_id, record_crawl
+from graph.state import EnrichedArticle, PipelineState
+from utils.reliability import mark_source_dirty
 
 logger = structlog.get_logger()
 
@@ -19,136 +19,168 @@ async def field_note_creator_node(state: PipelineState) -> dict:
     3. Record in crawl_history with field_note_id link
     """
     approved = state.get("approved_articles", [])
+    # Notes already created by the breaking-news fast lane
+    created = list(state.get("created_field_notes", []))
 
     if not approved:
-        return {"created_field_notes": []}
-
-    created = []
+        return {"created_field_notes": created}
 
     for article in approved:
-        raw = article["classified"]["raw"]
-        classified = article["classified"]
+        note = await create_note(article, state["run_id"])
+        if note:
+            created.append(note)
+
+    return {
+        "created_field_notes": created,
+        "stats": {
+            **state.get("stats", {}),
+            "field_notes_created": len(created),
+        },
+    }
 
-        try:
-            # Map risk flags to the API's expected format
-            safety_flags = [
-                flag["type"]
-                for flag in article.get("risk_flags", [])
-                if isinstance(flag, dict) and "type" in flag
-            ]
-
-            # Map quotes to API format
-            quotes = [
-                {
-                    "speaker": q.get("speaker", "Unknown"),
-                    "text": q.get("text", ""),
-                    "context": q.get("context", ""),
-                }
-                for q in article.get("quotes", [])
-                if q.get("text")
-            ]
-
-            # Map evidence refs
-            evidence_refs = [
-                {
-                    "type": ref.get("type", "link"),
-                    "url": ref.get("url", raw["source_url"]),
-                    "description": ref.get("description", ""),
-                }
-                for ref in article.get("evidence_refs", [])
-                if ref.get("url")
-            ]
-
-            # Always include original source as evidence
-            evidence_refs.append({
-                "type": "link",
-                "url": raw["source_url"],
-                "description": f"Original source: {raw['source_name']}",
-            })
-
-            # Create the field note
-            field_note = await create_field_note(
-                what=article["what"],
-                who=article.get("who"),
-                when_occurred=article.get("when_occurred"),
-                where_location=article.get("where_location"),
-                why=article.get("why"),
-                how=article.get("how"),
-                quotes=quotes if quotes else None,
-                evidence_refs=evidence_refs,
-                confidence_score=article.get("confidence_score", 0),
-                safety_legal_flags=safety_flags if safety_flags else None,
-                raw_text=raw["body"][:5000],
-                source_url=raw["source_url"],
-            )
 
-            field_note_id = field_note.get("id")
+async def create_note(article: EnrichedArticle, run_id: str) -> dict | None:
+    """Create the field note for one approved article and record it in crawl history.
 
-            # Record in crawl history
+    Safe to repeat for the same run: a note the run already created and
+    recorded is returned as is, and the note ID derives from the run and
+    article so a retry after a crash between the two writes reuses it.
+
+    Returns the created_field_notes entry, or None if creation failed.
+    """
+    raw = article["classified"]["raw"]
+    classified = article["classified"]
+
+    try:
+        recorded = await check_duplicate(classified["content_fingerprint"])
+        if recorded and recorded.get("field_note_id"):
+            logger.info(
+                "field_note_creator.already_created",
+                field_note_id=recorded["field_note_id"],
+                title=raw["title"][:60],
+            )
+            return _note_entry(article, recorded["field_note_id"])
+
+        # Map risk flags to the API's expected format
+        safety_flags = [
+            flag["type"]
+            for flag in article.get("risk_flags", [])
+            if isinstance(flag, dict) and "type" in flag
+        ]
+
+        # Map quotes to API format
+        quotes = [
+            {
+                "speaker": q.get("speaker", "Unknown"),
+                "text": q.get("text", ""),
+                "context": q.get("context", ""),
+            }
+            for q in article.get("quotes", [])
+            if q.get("text")
+        ]
+
+        # Map evidence refs
+        evidence_refs = [
+            {
+                "type": ref.get("type", "link"),
+                "url": ref.get("url", raw["source_url"]),
+                "description": ref.get("description", ""),
+            }
+            for ref in article.get("evidence_refs", [])
+            if ref.get("url")
+        ]
+
+        # Always include original source as evidence
+        evidence_refs.append({
+            "type": "link",
+            "url": raw["source_url"],
+            "description": f"Original source: {raw['source_name']}",
+        })
+
+        # Create the field note
+        field_note = await create_field_note(
+            what=article["what"],
+            who=article.get("who"),
+            when_occurred=article.get("when_occurred"),
+            where_location=article.get("where_location"),
+            why=article.get("why"),
+            how=article.get("how"),
+            quotes=quotes if quotes else None,
+            evidence_refs=evidence_refs,
+            confidence_score=article.get("confidence_score", 0),
+            safety_legal_flags=safety_flags if safety_flags else None,
+            raw_text=raw["body"][:5000],
+            source_url=raw["source_url"],
+            field_note_id=idempotency_id(run_id, "field_note", classified["content_fingerprint"]),
+        )
+
+        field_note_id = field_note.get("id")
+
+        # Record in crawl history
+        await record_crawl(
+            source_feed_id=raw["source_id"],
+            source_url=raw["source_url"],
+            content_fingerprint=classified["content_fingerprint"],
+            pipeline_run_id=run_id,
+            raw_data={
+                "title": raw["title"],
+                "body": raw["body"][:1000],
+                "source_name": raw["source_name"],
+                "language": raw.get("language", "en"),
+            },
+            status="processed",
+            relevance_score=classified["relevance_score"],
+            was_relevant=True,
+            was_duplicate=False,
+            classification_data={
+                "topics": classified["topics"],
+                "geo_tags": classified["geo_tags"],
+                "priority": classified["priority"],
+            },
+            field_note_id=field_note_id,
+            embedding=classified.get("embedding"),
+        )
+
+        logger.info(
+            "field_note_creator.created",
+            field_note_id=field_note_id,
+            title=raw["title"][:60],
+        )
+
+        # Reliability is recomputed once per source at the end of the run
+        mark_source_dirty(raw["source_id"])
+
+        return _note_entry(article, field_note_id)
+
+    except Exception as e:
+        logger.error(
+            "field_note_creator.error",
+            title=raw["title"][:60],
+            error=str(e),
+        )
+        # Record failed crawl
+        try:
             await record_crawl(
                 source_feed_id=raw["source_id"],
                 source_url=raw["source_url"],
                 content_fingerprint=classified["content_fingerprint"],
-                pipeline_run_id=state["run_id"],
-                raw_data={
-                    "title": raw["title"],
-                    "body": raw["body"][:1000],
-                    "source_name": raw["source_name"],
-                },
-                status="processed",
+                pipeline_run_id=run_id,
+                raw_data={"title": raw["title"]},
+                status="error",
                 relevance_score=classified["relevance_score"],
                 was_relevant=True,
-                was_duplicate=False,
-                classification_data={
-                    "topics": classified["topics"],
-                    "geo_tags": classified["geo_tags"],
-                    "priority": classified["priority"],
-                },
-                field_note_id=field_note_id,
-            )
-
-            created.append({
-                "field_note_id": field_note_id,
-                "headline": article["what"][:100],
-                "source": raw["source_name"],
-                "source_url": raw["source_url"],
-            })
-
-            logger.info(
-                "field_note_creator.created",
-                field_note_id=field_note_id,
-                title=raw["title"][:60],
+                error_message=str(e),
             )
+        except Exception:
+            pass
+        return None
 
-            # Update source reliability score
-            await update_source_reliability(raw["source_id"])
-
-        except Exception as e:
-            logger.error(
-                "field_note_creator.error",
-                title=raw["title"][:60],
-                error=str(e),
-            )
-            # Record failed crawl
-            try:
-                await record_crawl(
-                    source_feed_id=raw["source_id"],
-                    source_url=raw["source_url"],
-                    content_fingerprint=classified["content_fingerprint"],
-                    pipeline_run_id=state["run_id"],
-                    raw_data={"title": raw["title"]},
-                    status="error",
-                    relevance_score=classified["relevance_score"],
-                    was_relevant=True,
-                    error_message=str(e),
-                )
-            except Exception:
-                pass
 
+def _note_entry(article: EnrichedArticle, field_note_id: str) -> dict:
+    raw = article["classified"]["raw"]
     return {
-        "created_field_notes": created,
-        "stats": {
-            **state.get("stats", {}),
-            "field_notes_created": len(created),
-        },
+        "field_note_id": field_note_id,
+        "headline": article["what"][:100],
+        "source": raw["source_name"],
+        "source_url": raw["source_url"],
     }
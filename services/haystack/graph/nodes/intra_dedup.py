@@ -0,0 +1,142 @@
+"""Intra-run Dedup node: collapse syndicated copies collected in the same run."""
+
+import structlog
+
+from config import DUPLICATE_SIMILARITY_THRESHOLD
+from graph.state import PipelineState, ClassifiedArticle, with_fields
+from utils.fingerprint import canonicalize_url, simhash
+
+logger = structlog.get_logger()
+
+# Lower rank wins when picking which copy of a story to keep
+_TIER_RANK = {"official": 0, "standard": 1, "yellow_press": 2}
+
+_HASH_BITS = 64
+_MAX_DISTANCE = int(_HASH_BITS * (1.0 - DUPLICATE_SIMILARITY_THRESHOLD))
+
+
+async def intra_run_dedup_node(state: PipelineState) -> dict:
+    """Cluster articles from this run that carry the same story.
+
+    Runs right after collection, before any DB, embedding or LLM calls.
+    Two articles are in the same cluster if they share a canonical URL, have
+    the same SimHash fingerprint, or their fingerprints are within
+    DUPLICATE_SIMILARITY_THRESHOLD of each other (same language only).
+
+    Each cluster keeps one article — the most reliable source, then the
+    longest body — and records the other copies in its
+    raw_metadata["syndicated_from"] so enrichment can merge them into the
+    source_log. Dropped copies go to rejected_articles as duplicates so they
+    are archived and caught by check_duplicate in later runs.
+    """
+    raw_articles = state.get("raw_articles", [])
+
+    if len(raw_articles) < 2:
+        return {"unique_articles": list(raw_articles)}
+
+    fingerprints = [simhash(a["title"] + " " + a["body"]) for a in raw_articles]
+    hashes = [int(fp, 16) for fp in fingerprints]
+
+    # Union-find over article indexes
+    parent = list(range(len(raw_articles)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int) -> None:
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[root_j] = root_i
+
+    # Exact keys: canonical article URL and exact fingerprint
+    seen: dict[tuple[str, str], int] = {}
+    for i, article in enumerate(raw_articles):
+        keys = [("fp", fingerprints[i])]
+        url = article.get("source_url", "")
+        # Articles without their own link carry the listing page URL — not an identity
+        if url and url != article.get("raw_metadata", {}).get("page_url"):
+            keys.append(("url", canonicalize_url(url)))
+        for key in keys:
+            if key in seen:
+                union(seen[key], i)
+            else:
+                seen[key] = i
+
+    # Near-duplicates: SimHash proximity within the same language
+    for i in range(len(raw_articles)):
+        for j in range(i + 1, len(raw_articles)):
+            if raw_articles[i].get("language") != raw_articles[j].get("language"):
+                continue
+            if bin(hashes[i] ^ hashes[j]).count("1") <= _MAX_DISTANCE:
+                union(i, j)
+
+    clusters: dict[int, list[int]] = {}
+    for i in range(len(raw_articles)):
+        clusters.setdefault(find(i), []).append(i)
+
+    unique = []
+    rejected = list(state.get("rejected_articles", []))
+    duplicate_count = 0
+
+    for members in clusters.values():
+        members.sort(key=lambda i: _rank(raw_articles[i]))
+        keep = raw_articles[members[0]]
+
+        if len(members) > 1:
+            dropped = [raw_articles[i] for i in members[1:]]
+            keep = with_fields(keep, raw_metadata={
+                **keep.get("raw_metadata", {}),
+                "syndicated_from": [
+                    *keep.get("raw_metadata", {}).get("syndicated_from", []),
+                    *(_source_entry(a) for a in dropped),
+                ],
+            })
+            for i in members[1:]:
+                rejected.append(ClassifiedArticle(
+                    raw=raw_articles[i], relevance_score=0.0, topics=[], geo_tags=[],
+                    priority="low", is_duplicate=True,
+                    # The kept copy has no field note or crawl row yet; its URL
+                    # is in the reasoning and its syndicated_from entries
+                    duplicate_of=None,
+                    content_fingerprint=fingerprints[i],
+                    classification_reasoning=f"Intra-run duplicate of {keep['source_url']}",
+                    embedding=None,
+                ))
+            duplicate_count += len(dropped)
+            logger.info(
+                "intra_dedup.collapsed",
+                title=keep["title"][:60],
+                kept=keep["source_name"],
+                dropped=[a["source_name"] for a in dropped],
+            )
+
+        unique.append(keep)
+
+    logger.info("intra_dedup.done", raw=len(raw_articles), unique=len(unique))
+
+    return {
+        "unique_articles": unique,
+        "rejected_articles": rejected,
+        "stats": {
+            **state.get("stats", {}),
+            "intra_run_duplicates": duplicate_count,
+        },
+    }
+
+
+def _rank(article: dict) -> tuple[int, int]:
+    tier = article.get("raw_metadata", {}).get("reliability_tier", "standard")
+    return (_TIER_RANK.get(tier, 1), -len(article.get("body", "")))
+
+
+def _source_entry(article: dict) -> dict:
+    return {
+        "source_id": article["source_id"],
+        "source_name": article["source_name"],
+        "source_url": article["source_url"],
+        "source_type": article["source_type"],
+        "fetched_at": article["fetched_at"],
+    }
@@ -1,10 +1,16 @@
 """Moderation Sender node: sends flagged articles to moderation queue."""
 
-import json
 import structlog
 
-from db.client import create_moderation_item, record_crawl
-from graph.state import PipelineState
+from db.client import (
+    check_duplicate,
+    create_moderation_item,
+    create_moderation_items,
+    existing_moderation_ids,
+    idempotency_id,
+)
+from graph.nodes.archive import write_crawl_records
+from graph.state import PipelineState, full_metadata
 
 logger = structlog.get_logger()
 
@@ -15,6 +21,9 @@ async def moderation_sender_node(state: PipelineState) -> dict:
     Flagged articles have either:
     - High-risk flags (minor_involved, allegation, etc.)
     - Low confidence scores below threshold
+
+    Item IDs derive from the run and article, so a resumed run does not
+    queue the same article for editors twice.
     """
     flagged = state.get("flagged_articles", [])
     run_id = state.get("run_id", "")
@@ -22,8 +31,7 @@ async def moderation_sender_node(state: PipelineState) -> dict:
     if not flagged:
         return {}
 
-    sent_count = 0
-
+    items = []
     for article in flagged:
         classified = article.get("classified", {})
         raw = classified.get("raw", {})
@@ -62,48 +70,68 @@ async def moderation_sender_node(state: PipelineState) -> dict:
                 "how": article.get("how"),
             },
         }
-
-        try:
-            mod_item = await create_moderation_item(
-                content=content,
-                item_type="haystack_flagged",
-                metadata=metadata,
-            )
-            mod_id = mod_item.get("id")
-
-            # Record in crawl history with moderation_item_id
-            fingerprint = classified.get("content_fingerprint", "")
-            if fingerprint:
-                await record_crawl(
-                    source_feed_id=raw.get("source_id", ""),
-                    source_url=raw.get("source_url", ""),
-                    content_fingerprint=fingerprint,
-                    pipeline_run_id=run_id,
-                    raw_data=raw.get("raw_metadata", {}),
-                    status="flagged",
-                    relevance_score=classified.get("relevance_score"),
-                    was_relevant=True,
-                    classification_data={
-                        "topics": classified.get("topics", []),
-                        "priority": classified.get("priority"),
-                    },
-                    moderation_item_id=mod_id,
-                )
-
-            sent_count += 1
+        item_id = idempotency_id(
+            run_id, "moderation", classified.get("content_fingerprint") or raw.get("source_url", "")
+        )
+        items.append({
+            "item_id": item_id,
+            "content": content,
+            "item_type": "haystack_flagged",
+            "metadata": metadata,
+        })
+
+    # Items a previous attempt of this run already queued (resume)
+    existing = await existing_moderation_ids([item["item_id"] for item in items])
+    if existing:
+        logger.info("moderation.already_queued", count=len(existing))
+    pending = [i for i, item in enumerate(items) if item["item_id"] not in existing]
+
+    # One bulk insert for the run's moderation items, then one for their crawl records
+    queued = await _queue_items([items[i] for i in pending], [flagged[i] for i in pending])
+    mod_items: list[dict | None] = [{"id": item["item_id"]} for item in items]
+    for i, mod_item in zip(pending, queued):
+        mod_items[i] = mod_item
+
+    crawl_records = []
+    for article, item, mod_item in zip(flagged, items, mod_items):
+        classified = article.get("classified", {})
+        raw = classified.get("raw", {})
+        if mod_item is None:
+            continue
+        fingerprint = classified.get("content_fingerprint", "")
+        if item["item_id"] in existing:
+            # Queued before the interruption; its crawl record may be written too
+            if not fingerprint or await check_duplicate(fingerprint):
+                continue
+        else:
             logger.info(
                 "moderation.sent",
-                title=title[:60],
-                moderation_id=mod_id,
-                risk_flags=risk_summary,
+                title=raw.get("title", "Untitled")[:60],
+                moderation_id=mod_item.get("id"),
+                risk_flags=[f.get("type", "unknown") for f in article.get("risk_flags", [])],
             )
 
-        except Exception as e:
-            logger.error(
-                "moderation.send_failed",
-                title=title[:60],
-                error=str(e),
-            )
+        # Record in crawl history with moderation_item_id
+        if fingerprint:
+            crawl_records.append(dict(
+                source_feed_id=raw.get("source_id", ""),
+                source_url=raw.get("source_url", ""),
+                content_fingerprint=fingerprint,
+                pipeline_run_id=run_id,
+                raw_data=full_metadata(raw),
+                status="flagged",
+                relevance_score=classified.get("relevance_score"),
+                was_relevant=True,
+                classification_data={
+                    "topics": classified.get("topics", []),
+                    "priority": classified.get("priority"),
+                },
+                moderation_item_id=mod_item.get("id"),
+                embedding=classified.get("embedding"),
+            ))
+
+    sent_count = sum(1 for item in mod_items if item is not None)
+    await write_crawl_records(crawl_records, "moderation.crawl_record_failed")
 
     logger.info("moderation_sender.done", sent=sent_count, total=len(flagged))
 
@@ -113,3 +141,27 @@ async def moderation_sender_node(state: PipelineState) -> dict:
             "moderation_sent_count": sent_count,
         },
     }
+
+
+async def _queue_items(items: list[dict], flagged: list) -> list[dict | None]:
+    """Insert moderation items in one bulk write, falling back to one at a time.
+
+    Returns the created row per item (None where the insert failed).
+    """
+    try:
+        return await create_moderation_items(items)
+    except Exception as e:
+        logger.warning("moderation.bulk_failed", count=len(items), error=str(e))
+
+    created = []
+    for item, article in zip(items, flagged):
+        try:
+            created.append(await create_moderation_item(**item))
+        except Exception as e:
+            logger.error(
+                "moderation.send_failed",
+                title=article.get("classified", {}).get("raw", {}).get("title", "Untitled")[:60],
+                error=str(e),
+            )
+            created.append(None)
+    return created
@@ -3,7 +3,7 @@
 import structlog
 
 from config import MIN_CONFIDENCE_SCORE
-from graph.state import PipelineState
+from graph.state import EnrichedArticle, PipelineState
 from utils.reliability import get_tier_config
 
 logger = structlog.get_logger()
@@ -31,71 +31,24 @@ async def quality_gate_node(state: PipelineState) -> dict:
     - standard: uses standard thresholds
     """
     enriched = state.get("enriched_articles", [])
+    # Breaking articles flagged by the fast lane (breaking_check) are kept
+    already_flagged = state.get("flagged_articles", [])
 
     if not enriched:
-        return {"approved_articles": [], "flagged_articles": []}
+        return {"approved_articles": [], "flagged_articles": list(already_flagged)}
 
     approved = []
-    flagged = []
+    flagged = list(already_flagged)
     rejected_count = 0
 
     for article in enriched:
-        confidence = article.get("confidence_score", 0)
-        risk_flags = article.get("risk_flags", [])
-        what = article.get("what", "")
-        raw = article["classified"]["raw"]
-
-        # Get source reliability tier config
-        source_metadata = raw.get("raw_metadata", {})
-        reliability_tier = source_metadata.get("reliability_tier", "standard")
-        tier_config = get_tier_config(reliability_tier)
-
-        # Determine effective confidence threshold
-        min_confidence = tier_config.get("min_confidence_override") or MIN_CONFIDENCE_SCORE
-
-        # Check for high-risk flags
-        has_high_risk = any(
-            flag.get("type") in HIGH_RISK_FLAGS
-            for flag in risk_flags
-        )
-
-        # Reject: missing critical data or very low confidence
-        if not what or confidence < 10:
-            rejected_count += 1
-            logger.info(
-                "quality_gate.rejected",
-                title=raw["title"][:60],
-                confidence=confidence,
-                reason="missing_data" if not what else "very_low_confidence",
-            )
-            continue
-
-        # Flag for review: high risk, low confidence, yellow press, or force_moderation
-        if has_high_risk or confidence < min_confidence or tier_config.get("force_moderation"):
+        decision = route_article(article)
+        if decision == "approved":
+            approved.append(article)
+        elif decision == "flagged":
             flagged.append(article)
-            flag_reason = (
-                "high_risk" if has_high_risk
-                else "yellow_press" if tier_config.get("force_moderation")
-                else "low_confidence"
-            )
-            logger.info(
-                "quality_gate.flagged",
-                title=raw["title"][:60],
-                confidence=confidence,
-                has_high_risk=has_high_risk,
-                tier=reliability_tier,
-                reason=flag_reason,
-            )
-            continue
-
-        # Approved: good confidence and no high risk
-        approved.append(article)
-        logger.info(
-            "quality_gate.approved",
-            title=raw["title"][:60],
-            confidence=confidence,
-            tier=reliability_tier,
-        )
+        else:
+            rejected_count += 1
 
     logger.info(
         "quality_gate.done",
@@ -114,3 +67,61 @@ async def quality_gate_node(state: PipelineState) -> dict:
             "quality_rejected_count": rejected_count,
         },
     }
+
+
+def route_article(article: EnrichedArticle) -> str:
+    """Quality gate decision for one article: "approved", "flagged" or "rejected"."""
+    confidence = article.get("confidence_score", 0)
+    risk_flags = article.get("risk_flags", [])
+    what = article.get("what", "")
+    raw = article["classified"]["raw"]
+
+    # Get source reliability tier config
+    source_metadata = raw.get("raw_metadata", {})
+    reliability_tier = source_metadata.get("reliability_tier", "standard")
+    tier_config = get_tier_config(reliability_tier)
+
+    # Determine effective confidence threshold
+    min_confidence = tier_config.get("min_confidence_override") or MIN_CONFIDENCE_SCORE
+
+    # Check for high-risk flags
+    has_high_risk = any(
+        flag.get("type") in HIGH_RISK_FLAGS
+        for flag in risk_flags
+    )
+
+    # Reject: missing critical data or very low confidence
+    if not what or confidence < 10:
+        logger.info(
+            "quality_gate.rejected",
+            title=raw["title"][:60],
+            confidence=confidence,
+            reason="missing_data" if not what else "very_low_confidence",
+        )
+        return "rejected"
+
+    # Flag for review: high risk, low confidence, yellow press, or force_moderation
+    if has_high_risk or confidence < min_confidence or tier_config.get("force_moderation"):
+        flag_reason = (
+            "high_risk" if has_high_risk
+            else "yellow_press" if tier_config.get("force_moderation")
+            else "low_confidence"
+        )
+        logger.info(
+            "quality_gate.flagged",
+            title=raw["title"][:60],
+            confidence=confidence,
+            has_high_risk=has_high_risk,
+            tier=reliability_tier,
+            reason=flag_reason,
+        )
+        return "flagged"
+
+    # Approved: good confidence and no high risk
+    logger.info(
+        "quality_gate.approved",
+        title=raw["title"][:60],
+        confidence=confidence,
+        tier=reliability_tier,
+    )
+    return "approved"
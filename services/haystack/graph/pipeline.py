@@ -1,14 +1,20 @@
 """LangGraph StateGraph pipeline definition for Haystack."""
 
+import asyncio
 import structlog
+from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
 from langgraph.graph import StateGraph, START, END
 
-from db.client import create_run, complete_run
+from config import HAYSTACK_CHECKPOINT_RETENTION_HOURS
+from db.client import create_run, complete_run, get_run_by_id
+from graph.checkpoint import get_checkpointer
 from graph.state import PipelineState
+from llm.scheduler import CYCLE_PRIORITY, PRIORITY_NORMAL, llm_context, scheduler as llm_scheduler
 from graph.nodes.scheduler import scheduler_node
 from graph.nodes.collect import collect_node
+from graph.nodes.intra_dedup import intra_run_dedup_node
 from graph.nodes.dedup_classify import dedup_classify_node
 from graph.nodes.enrich import enrich_node
 from graph.nodes.quality_gate import quality_gate_node
@@ -16,6 +22,10 @@ from graph.nodes.field_note_creator import field_note_creator_node
 from graph.nodes.moderation_sender import moderation_sender_node
 from graph.nodes.breaking_news import breaking_news_node
 from graph.nodes.archive import archive_node
+from utils.analytics import save_snapshot
+from utils.reliability import flush_reliability_updates
+from utils.extract import save_templates as save_extract_templates
+from utils.robots import save_cache as save_robots_cache
 
 logger = structlog.get_logger()
 
@@ -50,6 +60,7 @@ workflow = StateGraph(PipelineState)
 # Add nodes
 workflow.add_node("schedule", scheduler_node)
 workflow.add_node("collect", collect_node)
+workflow.add_node("intra_dedup", intra_run_dedup_node)
 workflow.add_node("classify", dedup_classify_node)
 workflow.add_node("breaking_check", breaking_news_node)
 workflow.add_node("enrich", enrich_node)
@@ -61,7 +72,8 @@ workflow.add_node("archive", archive_node)
 # Wire edges
 workflow.add_edge(START, "schedule")
 workflow.add_edge("schedule", "collect")
-workflow.add_edge("collect", "classify")
+workflow.add_edge("collect", "intra_dedup")
+workflow.add_edge("intra_dedup", "classify")
 
 # After classify: breaking check if articles, else archive
 workflow.add_conditional_edges(
@@ -104,6 +116,74 @@ workflow.add_edge("archive", END)
 # Compile
 pipeline = workflow.compile()
 
+# Checkpointed variant used by run_pipeline: (checkpointer, workflow, compiled)
+_checkpointed: tuple | None = None
+
+
+def _graph():
+    global _checkpointed
+    checkpointer = get_checkpointer()
+    if _checkpointed is None or _checkpointed[0] is not checkpointer or _checkpointed[1] is not workflow:
+        _checkpointed = (checkpointer, workflow, workflow.compile(checkpointer=checkpointer))
+    return _checkpointed[2]
+
+
+class CheckpointNotFoundError(LookupError):
+    """The run has no checkpoint (never started here, or already completed)."""
+
+
+class RunInProgressError(RuntimeError):
+    """The run is already executing in this process."""
+
+
+class RunCancelledError(RuntimeError):
+    """The run was aborted with cancel_pipeline()."""
+
+
+async def prune_checkpoints() -> list[str]:
+    """Delete the checkpoints of runs that can no longer be resumed.
+
+    That is runs recorded as completed or cancelled (their cleanup failed) and
+    runs whose last checkpoint is older than HAYSTACK_CHECKPOINT_RETENTION_HOURS.
+    Returns the pruned run IDs.
+    """
+    checkpointer = get_checkpointer()
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=HAYSTACK_CHECKPOINT_RETENTION_HOURS)
+    pruned = []
+    for run_id in checkpointer.thread_ids():
+        if run_id in _active_runs:
+            continue
+        try:
+            last = checkpointer.last_checkpoint_at(run_id)
+            expired = last is None or datetime.fromisoformat(last) < cutoff
+            if not expired:
+                run = await get_run_by_id(run_id)
+                expired = bool(run) and run.get("status") in ("completed", "cancelled")
+            if expired:
+                await checkpointer.adelete_thread(run_id)
+                pruned.append(run_id)
+        except Exception as e:
+            logger.error("pipeline.prune_failed", run_id=run_id, error=str(e))
+    if pruned:
+        logger.info("pipeline.checkpoints_pruned", runs=pruned)
+    return pruned
+
+
+# Housekeeping after each completed run: flush aggregates, persist local caches,
+# drop checkpoints of runs that are no longer resumable
+AFTER_RUN_HOOKS = [
+    flush_reliability_updates,
+    save_snapshot,
+    save_robots_cache,
+    save_extract_templates,
+    prune_checkpoints,
+]
+
+# Runs currently executing in this process (guards against double resume)
+_active_runs: set[str] = set()
+# Runs aborted via cancel_pipeline() while executing
+_cancelled_runs: set[str] = set()
+
 
 # ── Runner ────────────────────────────────────────────
 
@@ -112,7 +192,7 @@ async def run_pipeline(run_type: str = "manual", cycle_type: str = "main") -> di
     """Execute the full Haystack pipeline.
 
     Args:
-        run_type: "scheduled", "manual", or "breaking"
+        run_type: "scheduled", "manual", "breaking", or "event" (tip approvals)
         cycle_type: "main", "weather", "deep_scrape", "social", "tips"
 
     Returns:
@@ -135,6 +215,7 @@ async def run_pipeline(run_type: str = "manual", cycle_type: str = "main") -> di
         "cycle_type": cycle_type,
         "raw_articles": [],
         "collection_errors": [],
+        "unique_articles": [],
         "classified_articles": [],
         "rejected_articles": [],
         "enriched_articles": [],
@@ -144,11 +225,76 @@ async def run_pipeline(run_type: str = "manual", cycle_type: str = "main") -> di
         "stats": {},
         "sources_polled": [],
         "_sources": [],
+        "_source_status": {},
     }
 
+    return await _execute(run_id, initial_state, cycle_type)
+
+
+async def resume_pipeline(run_id: str) -> dict:
+    """Continue an interrupted or failed run from its last completed node.
+
+    Raises:
+        CheckpointNotFoundError, RunInProgressError
+    """
+    if run_id in _active_runs:
+        raise RunInProgressError(f"Run {run_id} is already in progress")
+
+    snapshot = await _graph().aget_state({"configurable": {"thread_id": run_id}})
+    if not snapshot.values:
+        raise CheckpointNotFoundError(f"No checkpoint for run {run_id}")
+
+    logger.info("pipeline.resume", run_id=run_id, next=list(snapshot.next))
+    return await _execute(run_id, None, snapshot.values.get("cycle_type", "main"))
+
+
+def cancel_pipeline(run_id: str) -> bool:
+    """Abort a run executing in this process; its LLM calls are cancelled.
+
+    The run ends with status "cancelled" and its checkpoint is discarded.
+    Returns False if the run is not executing here.
+    """
+    if run_id not in _active_runs:
+        return False
+    _cancelled_runs.add(run_id)
+    llm_scheduler.cancel(run_id)
+    return True
+
+
+async def recover_interrupted_runs() -> list[str]:
+    """Resume runs a previous process left in "running" (called at startup).
+
+    Runs marked "failed" keep their checkpoints but are only resumed
+    explicitly via POST /runs/{id}/resume, until prune_checkpoints() drops them.
+    """
+    await prune_checkpoints()
+    resumed = []
+    for run_id in get_checkpointer().thread_ids():
+        if run_id in _active_runs:
+            continue
+        try:
+            run = await get_run_by_id(run_id)
+            if not run or run.get("status") != "running":
+                continue
+            await resume_pipeline(run_id)
+            resumed.append(run_id)
+        except Exception as e:
+            logger.error("pipeline.recovery_failed", run_id=run_id, error=str(e))
+    if resumed:
+        logger.info("pipeline.recovered", runs=resumed)
+    return resumed
+
+
+async def _execute(run_id: str, graph_input: dict | None, cycle_type: str) -> dict:
+    """Run (graph_input=state) or resume (None) the checkpointed graph, then close the run."""
+    config = {"configurable": {"thread_id": run_id}}
+    priority = CYCLE_PRIORITY.get(cycle_type, PRIORITY_NORMAL)
+    _active_runs.add(run_id)
     try:
-        # Run the graph
-        result = await pipeline.ainvoke(initial_state)
+        # Run the graph; durability="sync" persists each node's output before the next starts.
+        # LLM calls made by the nodes are queued under this run and the cycle's priority.
+        with llm_context(priority=priority, run_id=run_id):
+            result = await _graph().ainvoke(graph_input, config, durability="sync")
 
         stats = result.get("stats", {})
         errors = result.get("collection_errors", [])
@@ -161,25 +307,82 @@ async def run_pipeline(run_type: str = "manual", cycle_type: str = "main") -> di
             errors=errors,
             sources_polled=sources,
             status="completed",
+            source_status=result.get("_source_status"),
+            sources=result.get("_sources", []),
         )
 
-        logger.info(
-            "pipeline.complete",
-            run_id=run_id,
-            stats=stats,
-            field_notes_created=len(result.get("created_field_notes", [])),
-        )
-
-        return result
+    except (Exception, asyncio.CancelledError) as e:
+        if run_id in _cancelled_runs:
+            # LangGraph surfaces the cancelled node as NodeCancelledError
+            await _close_cancelled(run_id)
+            raise RunCancelledError(f"Run {run_id} was cancelled") from None
+        if isinstance(e, asyncio.CancelledError):
+            # Process shutdown: leave the run "running" so startup recovery resumes it
+            raise
 
-    except Exception as e:
         logger.error("pipeline.failed", run_id=run_id, error=str(e))
 
+        # Source outcomes collected before the failure, from the last checkpoint
+        try:
+            checkpointed = (await _graph().aget_state(config)).values
+        except Exception as state_error:
+            logger.error("pipeline.state_unavailable", run_id=run_id, error=str(state_error))
+            checkpointed = {}
+
         await complete_run(
             run_id=run_id,
             stats={"error": str(e)},
             errors=[{"error": str(e)}],
             sources_polled=[],
             status="failed",
+            source_status=checkpointed.get("_source_status"),
+            sources=checkpointed.get("_sources", []),
         )
         raise
+
+    finally:
+        _active_runs.discard(run_id)
+        _cancelled_runs.discard(run_id)
+        llm_scheduler.forget(run_id)
+
+    # The run is recorded as completed; housekeeping can no longer fail it
+    await _after_run(run_id)
+
+    logger.info(
+        "pipeline.complete",
+        run_id=run_id,
+        stats=stats,
+        field_notes_created=len(result.get("created_field_notes", [])),
+    )
+
+    return result
+
+
+async def _after_run(run_id: str) -> None:
+    """Run the AFTER_RUN_HOOKS, then drop the run's checkpoint.
+
+    Each step runs even if an earlier one fails; errors are only logged.
+    """
+    for hook in AFTER_RUN_HOOKS:
+        try:
+            outcome = hook()
+            if asyncio.iscoroutine(outcome):
+                await outcome
+        except Exception as e:
+            logger.error("pipeline.after_run_failed", run_id=run_id, hook=hook.__name__, error=str(e))
+    try:
+        await get_checkpointer().adelete_thread(run_id)
+    except Exception as e:
+        logger.error("pipeline.after_run_failed", run_id=run_id, hook="delete_checkpoint", error=str(e))
+
+
+async def _close_cancelled(run_id: str) -> None:
+    logger.warning("pipeline.cancelled", run_id=run_id)
+    await complete_run(
+        run_id=run_id,
+        stats={"cancelled": True},
+        errors=[],
+        sources_polled=[],
+        status="cancelled",
+    )
+    await get_checkpointer().adelete_thread(run_id)
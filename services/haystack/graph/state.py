@@ -1,11 +1,70 @@
 """LangGraph state schemas for the Haystack news gathering pipeline."""
 
 from __future__ import annotations
-from typing import TypedDict, Optional, Literal, Annotated
+
+import json
+import zlib
+from dataclasses import dataclass, field, replace
 from operator import add
+from typing import Annotated, Literal, Optional, TypedDict
+
+
+# Article records are created once per fetched item and then referenced from
+# every stage list (raw -> unique -> classified -> enriched -> approved), so
+# they are slotted dataclasses rather than dicts: no per-instance __dict__ and
+# no copies between stages. _Record keeps the mapping interface (article["title"],
+# .get(), "key" in article, {**article}) so nodes and tests can also pass plain
+# dicts with the same keys.
+
+# Bulky source payloads kept only for the crawl_history audit trail. They are
+# stored zlib-compressed on the RawArticle and inflated by full_metadata().
+HEAVY_METADATA_KEYS = ("raw_response", "raw_item")
+
+
+class _Record:
+    __slots__ = ()
+
+    def __getitem__(self, key: str):
+        if key not in self.keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key not in self.keys():
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.keys()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (_Record, dict)):
+            return self.keys() == tuple(other.keys()) and all(
+                self[k] == other[k] for k in self.keys()
+            )
+        return NotImplemented
+
+    __hash__ = None
 
+    def keys(self) -> tuple[str, ...]:
+        return type(self)._fields
 
-class RawArticle(TypedDict):
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.keys() else default
+
+    def to_dict(self) -> dict:
+        """Shallow dict copy (nested records are left as records)."""
+        return {k: getattr(self, k) for k in self.keys()}
+
+
+@dataclass(slots=True, eq=False)
+class RawArticle(_Record):
     """An article as fetched from a source, before any processing."""
     source_id: str           # UUID of the source_feeds record
     source_type: str         # "rss", "scrape", "api", "social", "tip"
@@ -16,11 +75,29 @@ class RawArticle(TypedDict):
     published_at: Optional[str]  # ISO timestamp from source
     author: Optional[str]
     language: str            # "en", "ja"
-    raw_metadata: dict       # Source-specific metadata
+    raw_metadata: dict       # Source-specific metadata (without HEAVY_METADATA_KEYS)
     fetched_at: str          # When we fetched it
+    _heavy: Optional[bytes] = field(default=None, repr=False)
+
+    _fields = (
+        "source_id", "source_type", "source_url", "source_name", "title", "body",
+        "published_at", "author", "language", "raw_metadata", "fetched_at",
+    )
 
+    def __post_init__(self) -> None:
+        heavy = {k: self.raw_metadata[k] for k in HEAVY_METADATA_KEYS if k in self.raw_metadata}
+        if heavy:
+            self.raw_metadata = {
+                k: v for k, v in self.raw_metadata.items() if k not in HEAVY_METADATA_KEYS
+            }
+            self._heavy = zlib.compress(json.dumps(heavy, default=str).encode())
 
-class ClassifiedArticle(TypedDict):
+    def heavy_metadata(self) -> dict:
+        return json.loads(zlib.decompress(self._heavy)) if self._heavy else {}
+
+
+@dataclass(slots=True, eq=False)
+class ClassifiedArticle(_Record):
     """An article after relevance classification."""
     raw: RawArticle
     relevance_score: float   # 0.0-1.0, how relevant to Niseko
@@ -31,9 +108,16 @@ class ClassifiedArticle(TypedDict):
     duplicate_of: Optional[str]  # field_note_id or crawl_history_id
     content_fingerprint: str  # For dedup tracking
     classification_reasoning: str
+    embedding: Optional[list[float]]  # Multilingual embedding (None if unavailable)
+
+    _fields = (
+        "raw", "relevance_score", "topics", "geo_tags", "priority", "is_duplicate",
+        "duplicate_of", "content_fingerprint", "classification_reasoning", "embedding",
+    )
 
 
-class EnrichedArticle(TypedDict):
+@dataclass(slots=True, eq=False)
+class EnrichedArticle(_Record):
     """An article after 5W1H enrichment and risk analysis."""
     classified: ClassifiedArticle
     who: Optional[str]
@@ -49,6 +133,27 @@ class EnrichedArticle(TypedDict):
     confidence_score: int    # 0-100
     source_log: list[dict]   # Source attribution chain
 
+    _fields = (
+        "classified", "who", "what", "when_occurred", "where_location", "why", "how",
+        "quotes", "evidence_refs", "risk_flags", "fact_check_notes", "confidence_score",
+        "source_log",
+    )
+
+
+def full_metadata(raw: RawArticle | dict) -> dict:
+    """raw_metadata including the compressed heavy keys (for persistence)."""
+    metadata = raw.get("raw_metadata", {})
+    if isinstance(raw, RawArticle) and raw._heavy:
+        return {**metadata, **raw.heavy_metadata()}
+    return metadata
+
+
+def with_fields(article: _Record | dict, **changes) -> _Record | dict:
+    """Shallow copy of an article record (or dict) with some fields replaced."""
+    if isinstance(article, _Record):
+        return replace(article, **changes)
+    return {**article, **changes}
+
 
 class PipelineState(TypedDict):
     """Top-level state that flows through the LangGraph pipeline."""
@@ -61,6 +166,9 @@ class PipelineState(TypedDict):
     raw_articles: Annotated[list[RawArticle], add]
     collection_errors: Annotated[list[dict], add]
 
+    # Intra-run dedup phase (raw_articles minus syndicated copies)
+    unique_articles: list[RawArticle]
+
     # Classification phase
     classified_articles: list[ClassifiedArticle]
     rejected_articles: list[ClassifiedArticle]
@@ -79,5 +187,6 @@ class PipelineState(TypedDict):
     stats: dict
     sources_polled: list[str]
 
-    # Internal (not persisted, used between nodes)
+    # Internal (used between nodes; checkpointed with the run, never written to the database)
     _sources: list[dict]  # Source feed records from scheduler
+    _source_status: dict  # source_id -> {"fetched_at", "error"} from collection, flushed at end of run
@@ -7,11 +7,13 @@ import structlog
 from config import (
     OLLAMA_BASE_URL,
     OLLAMA_MODEL,
+    OLLAMA_EMBED_MODEL,
     ANTHROPIC_API_KEY,
     ANTHROPIC_MODEL,
     OPENAI_API_KEY,
     OPENAI_MODEL,
 )
+from llm.scheduler import scheduler
 
 logger = structlog.get_logger()
 
@@ -99,7 +101,15 @@ async def generate(prompt: str, system: str = "", temperature: float = 0.3) -> s
     Tries Ollama first. If Ollama is unreachable (connection error or timeout),
     falls back to Anthropic Claude, then OpenAI. Fallback is NOT triggered by
     Ollama returning an HTTP error or the model producing bad output.
+
+    Calls are admitted by the shared LLM scheduler (llm/scheduler.py), which
+    orders them by the priority, run and deadline set with llm_context().
     """
+    async with scheduler.slot():
+        return await _generate(prompt, system, temperature)
+
+
+async def _generate(prompt: str, system: str, temperature: float) -> str:
     # --- Try Ollama (primary) ---
     try:
         result = await _generate_ollama(prompt, system, temperature)
@@ -157,6 +167,38 @@ async def generate_json(prompt: str, system: str = "", temperature: float = 0.1)
         raise ValueError(f"LLM returned invalid JSON: {e}")
 
 
+async def embed(texts: list[str], batch_size: int = 32) -> list[list[float]] | None:
+    """Embed texts with the local multilingual embedding model.
+
+    Returns one vector per input text, or None if Ollama is unavailable or the
+    embedding model is missing. There is no cloud fallback: callers are
+    expected to degrade gracefully (e.g. cross-language dedup falls back to
+    LLM comparison).
+    """
+    if not texts:
+        return []
+
+    vectors: list[list[float]] = []
+    try:
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            for start in range(0, len(texts), batch_size):
+                response = await client.post(
+                    f"{OLLAMA_BASE_URL}/api/embed",
+                    json={
+                        "model": OLLAMA_EMBED_MODEL,
+                        "input": texts[start:start + batch_size],
+                    },
+                )
+                response.raise_for_status()
+                vectors.extend(response.json()["embeddings"])
+    except Exception as exc:
+        logger.warning("llm.embed_failed", model=OLLAMA_EMBED_MODEL, error=str(exc))
+        return None
+
+    logger.debug("llm.embed", model=OLLAMA_EMBED_MODEL, count=len(vectors))
+    return vectors
+
+
 async def check_health() -> dict:
     """Check which LLM providers are available."""
     health: dict = {"providers": {}}
@@ -0,0 +1,232 @@
+"""Central scheduler for LLM generate() calls.
+
+Every llm.client.generate() call takes a slot from the shared scheduler
+(LLM_MAX_CONCURRENCY slots). When slots are busy, waiting requests are
+dispatched by:
+
+1. Priority class: breaking < tip < normal < background (deep scrape).
+2. Deadline: requests with a deadline go first within their class, earliest
+   deadline first. A request dispatched after its deadline still runs; it is
+   counted as a deadline miss.
+3. Fair share: other requests round-robin between pipeline runs, FIFO within
+   a run, so one cycle's backlog cannot starve another cycle of the same class.
+
+Callers do not pass any of this to generate(). Each request inherits the
+priority, run and deadline from llm_context(), which is set with contextvars:
+run_pipeline sets it per run and the breaking-news lane raises the priority.
+cancel(run_id) aborts a run's waiting and in-flight requests (they raise
+asyncio.CancelledError), as well as any it makes later.
+"""
+
+import asyncio
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, replace
+from typing import Optional
+
+import structlog
+
+from config import LLM_MAX_CONCURRENCY
+
+logger = structlog.get_logger()
+
+PRIORITY_BREAKING = 0
+PRIORITY_TIP = 1
+PRIORITY_NORMAL = 2
+PRIORITY_BACKGROUND = 3
+
+PRIORITY_NAMES = {
+    PRIORITY_BREAKING: "breaking",
+    PRIORITY_TIP: "tip",
+    PRIORITY_NORMAL: "normal",
+    PRIORITY_BACKGROUND: "background",
+}
+
+# Pipeline cycle -> priority class of its LLM calls
+CYCLE_PRIORITY = {
+    "tips": PRIORITY_TIP,
+    "deep_scrape": PRIORITY_BACKGROUND,
+}
+
+# Waits kept per class for the /health percentiles
+_WAIT_SAMPLES = 500
+
+
+@dataclass(frozen=True)
+class RequestContext:
+    priority: int = PRIORITY_NORMAL
+    run_id: Optional[str] = None
+    deadline: Optional[float] = None  # time.monotonic() value
+
+
+_context: ContextVar[RequestContext] = ContextVar("llm_request_context", default=RequestContext())
+
+
+@contextmanager
+def llm_context(
+    priority: Optional[int] = None,
+    run_id: Optional[str] = None,
+    deadline_seconds: Optional[float] = None,
+):
+    """Scheduling attributes for generate() calls made in this context.
+
+    Unset arguments keep the enclosing context's value. Tasks created inside
+    (asyncio.gather, LangGraph nodes) inherit the context.
+    """
+    changes = {}
+    if priority is not None:
+        changes["priority"] = priority
+    if run_id is not None:
+        changes["run_id"] = run_id
+    if deadline_seconds is not None:
+        changes["deadline"] = time.monotonic() + deadline_seconds
+    token = _context.set(replace(_context.get(), **changes))
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+@dataclass
+class _Request:
+    priority: int
+    run_id: Optional[str]
+    deadline: Optional[float]
+    seq: int
+    enqueued: float
+    task: Optional[asyncio.Task]
+    future: Optional[asyncio.Future] = field(default=None, repr=False)
+
+
+class LLMScheduler:
+    """Priority / deadline / fair-share admission for LLM calls."""
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self._waiting: list[_Request] = []
+        self._running: list[_Request] = []
+        self._seq = itertools.count()
+        self._dispatches = itertools.count(1)
+        self._last_served: dict[Optional[str], int] = {}
+        self._cancelled_runs: set[str] = set()
+        self._waits = {p: deque(maxlen=_WAIT_SAMPLES) for p in PRIORITY_NAMES}
+        self._dispatched = {p: 0 for p in PRIORITY_NAMES}
+        self._deadline_misses = 0
+        self._cancelled = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one LLM slot for the duration of the block."""
+        request = await self.acquire()
+        try:
+            yield
+        finally:
+            self.release(request)
+
+    async def acquire(self) -> _Request:
+        ctx = _context.get()
+        if ctx.run_id in self._cancelled_runs:
+            raise asyncio.CancelledError(f"run {ctx.run_id} cancelled")
+        request = _Request(
+            priority=ctx.priority,
+            run_id=ctx.run_id,
+            deadline=ctx.deadline,
+            seq=next(self._seq),
+            enqueued=time.monotonic(),
+            task=asyncio.current_task(),
+        )
+        if len(self._running) < self.max_concurrency and not self._waiting:
+            self._start(request)
+            return request
+
+        request.future = asyncio.get_running_loop().create_future()
+        self._waiting.append(request)
+        try:
+            await request.future
+        except asyncio.CancelledError:
+            if request in self._waiting:
+                self._waiting.remove(request)
+            elif request in self._running:
+                # Slot was handed over just before cancellation: pass it on
+                self.release(request)
+            raise
+        return request
+
+    def release(self, request: _Request) -> None:
+        if request in self._running:
+            self._running.remove(request)
+        while self._waiting and len(self._running) < self.max_concurrency:
+            nxt = self._next()
+            self._waiting.remove(nxt)
+            self._start(nxt)
+            nxt.future.set_result(None)
+        if not self._waiting:
+            self._last_served.clear()
+
+    def cancel(self, run_id: str) -> int:
+        """Abort a run's queued and in-flight LLM calls (and refuse new ones)."""
+        self._cancelled_runs.add(run_id)
+        count = 0
+        for request in [r for r in self._waiting if r.run_id == run_id]:
+            self._waiting.remove(request)
+            request.future.cancel()
+            count += 1
+        for request in [r for r in self._running if r.run_id == run_id]:
+            if request.task is not None and not request.task.done():
+                request.task.cancel()
+                count += 1
+        self._cancelled += count
+        logger.info("llm_scheduler.cancelled", run_id=run_id, requests=count)
+        return count
+
+    def forget(self, run_id: str) -> None:
+        """Drop per-run state once the run has finished."""
+        self._cancelled_runs.discard(run_id)
+        self._last_served.pop(run_id, None)
+
+    def metrics(self) -> dict:
+        now = time.monotonic()
+        by_class = {}
+        for priority, name in PRIORITY_NAMES.items():
+            waits = sorted(self._waits[priority])
+            waiting = [r for r in self._waiting if r.priority == priority]
+            by_class[name] = {
+                "queued": len(waiting),
+                "running": sum(1 for r in self._running if r.priority == priority),
+                "dispatched": self._dispatched[priority],
+                "oldest_wait_ms": round(max((now - r.enqueued for r in waiting), default=0) * 1000),
+                "wait_avg_ms": round(sum(waits) / len(waits) * 1000) if waits else 0,
+                "wait_p95_ms": round(waits[int(len(waits) * 0.95)] * 1000) if waits else 0,
+            }
+        return {
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": len(self._waiting),
+            "running": len(self._running),
+            "deadline_misses": self._deadline_misses,
+            "cancelled": self._cancelled,
+            "classes": by_class,
+        }
+
+    def _start(self, request: _Request) -> None:
+        now = time.monotonic()
+        self._running.append(request)
+        self._waits[request.priority].append(now - request.enqueued)
+        self._dispatched[request.priority] += 1
+        self._last_served[request.run_id] = next(self._dispatches)
+        if request.deadline is not None and now > request.deadline:
+            self._deadline_misses += 1
+
+    def _next(self) -> _Request:
+        top = min(r.priority for r in self._waiting)
+        candidates = [r for r in self._waiting if r.priority == top]
+        with_deadline = [r for r in candidates if r.deadline is not None]
+        if with_deadline:
+            return min(with_deadline, key=lambda r: (r.deadline, r.seq))
+        # Round-robin: the run served longest ago, FIFO within a run
+        return min(candidates, key=lambda r: (self._last_served.get(r.run_id, 0), r.seq))
+
+
+scheduler = LLMScheduler(LLM_MAX_CONCURRENCY)
@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
@@ -15,11 +16,27 @@ logger = structlog.get_logger()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     from scheduler import start_scheduler, stop_scheduler
+    from graph.pipeline import recover_interrupted_runs
+    from tip_events import start_tip_events, stop_tip_events
 
     logger.info("haystack.starting", port=HAYSTACK_PORT)
-    start_scheduler()
+    start_scheduler(tips_pushed=await start_tip_events())
+    # Continue runs interrupted by a restart (redeploy, OOM) in the background
+    recovery = asyncio.create_task(recover_interrupted_runs())
     yield
+    recovery.cancel()
+    await stop_tip_events()
     stop_scheduler()
+    from utils.analytics import save_snapshot
+    from utils.robots import save_cache as save_robots_cache
+    from utils.extract import save_templates as save_extract_templates
+    from utils.connections import close_pool as close_connection_pool
+    from db.client import get_backend
+    await save_snapshot()
+    save_robots_cache()
+    save_extract_templates()
+    await close_connection_pool()
+    await get_backend().close()
     logger.info("haystack.stopped")
 
 
@@ -50,6 +67,9 @@ async def health():
     from llm.client import check_health as check_ollama
     from db.client import check_health as check_db
     from scheduler import get_scheduler_status
+    from llm.scheduler import scheduler as llm_scheduler
+    from tip_events import get_tip_events_status
+    from utils.connections import connection_stats
 
     ollama_status = await check_ollama()
     db_status = await check_db()
@@ -60,15 +80,18 @@ async def health():
         "status": "running",
         "version": "0.5.0",
         "ollama": ollama_status,
+        "llm_queue": llm_scheduler.metrics(),
         "database": db_status,
         "scheduler": sched,
+        "tip_ingestion": get_tip_events_status(),
+        "network": connection_stats(),
     }
 
 
 @app.post("/trigger/{cycle_type}")
 async def trigger_cycle(cycle_type: str):
     """Manually trigger a collection cycle."""
-    from graph.pipeline import run_pipeline
+    from graph.pipeline import RunCancelledError, run_pipeline
 
     valid_cycles = ["main", "weather", "deep_scrape", "tips", "social"]
     if cycle_type not in valid_cycles:
@@ -82,6 +105,8 @@ async def trigger_cycle(cycle_type: str):
     try:
         result = await run_pipeline(run_type="manual", cycle_type=cycle_type)
         return {"status": "completed", "cycle": cycle_type, "stats": result.get("stats", {})}
+    except RunCancelledError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error("haystack.trigger_failed", cycle_type=cycle_type, error=str(e))
         raise HTTPException(status_code=500, detail=f"Pipeline failed: {str(e)}")
@@ -129,6 +154,40 @@ async def get_run(run_id: str):
     return run
 
 
+@app.post("/runs/{run_id}/resume")
+async def resume_run(run_id: str):
+    """Resume an interrupted or failed run from its last completed node."""
+    from graph.pipeline import (
+        CheckpointNotFoundError, RunCancelledError, RunInProgressError, resume_pipeline,
+    )
+
+    logger.info("haystack.resume", run_id=run_id)
+
+    try:
+        result = await resume_pipeline(run_id)
+        return {"status": "completed", "run_id": run_id, "stats": result.get("stats", {})}
+    except CheckpointNotFoundError:
+        raise HTTPException(status_code=404, detail="No checkpoint for this run")
+    except RunInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except RunCancelledError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error("haystack.resume_failed", run_id=run_id, error=str(e))
+        raise HTTPException(status_code=500, detail=f"Pipeline failed: {str(e)}")
+
+
+@app.post("/runs/{run_id}/cancel")
+async def cancel_run(run_id: str):
+    """Abort a run executing in this process, including its queued LLM calls."""
+    from graph.pipeline import cancel_pipeline
+
+    if not cancel_pipeline(run_id):
+        raise HTTPException(status_code=404, detail="Run is not executing")
+    logger.info("haystack.cancel", run_id=run_id)
+    return {"status": "cancelling", "run_id": run_id}
+
+
 # ── Source Feeds Admin ────────────────────────────────
 
 
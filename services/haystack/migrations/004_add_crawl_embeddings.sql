@@ -0,0 +1,12 @@
+-- Migration 004: Store multilingual embeddings alongside crawl history
+-- Run this in the Supabase Dashboard SQL Editor
+
+ALTER TABLE crawl_history
+ADD COLUMN IF NOT EXISTS embedding REAL[];
+
+-- Cross-language dedup only looks at recent relevant, non-duplicate rows
+CREATE INDEX IF NOT EXISTS crawl_history_recent_relevant_idx
+  ON crawl_history(fetched_at DESC)
+  WHERE was_relevant = true AND was_duplicate = false;
+
+COMMENT ON COLUMN crawl_history.embedding IS 'Unit-normalized sentence embedding (OLLAMA_EMBED_MODEL) of title + body, used for cross-language dedup.';
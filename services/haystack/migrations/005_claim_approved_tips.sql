@@ -0,0 +1,46 @@
+-- Migration 005: Atomic bulk claim of approved tips for the tip ingester
+-- Run this in the Supabase Dashboard SQL Editor
+
+-- Only approved, not-yet-ingested tips are indexed, so the claim query
+-- stays cheap no matter how many tips have been processed historically.
+CREATE INDEX IF NOT EXISTS moderation_queue_pending_tips_idx
+  ON moderation_queue(created_at, id)
+  WHERE type = 'tip'
+    AND status = 'approved'
+    AND NOT COALESCE((metadata->>'ingested')::boolean, false);
+
+-- Claims up to p_limit tips after the (created_at, id) keyset cursor and
+-- marks them ingested in the same statement. FOR UPDATE SKIP LOCKED lets
+-- concurrent tip cycles claim disjoint sets instead of double-ingesting.
+-- Returns the claimed rows (unordered; callers sort by created_at, id).
+CREATE OR REPLACE FUNCTION claim_approved_tips(
+  p_limit integer DEFAULT 20,
+  p_after_created_at timestamptz DEFAULT NULL,
+  p_after_id uuid DEFAULT NULL
+)
+RETURNS SETOF moderation_queue
+LANGUAGE sql
+AS $$
+  WITH claimable AS (
+    SELECT id
+    FROM moderation_queue
+    WHERE type = 'tip'
+      AND status = 'approved'
+      AND NOT COALESCE((metadata->>'ingested')::boolean, false)
+      AND (
+        p_after_created_at IS NULL
+        OR (created_at, id) > (p_after_created_at, p_after_id)
+      )
+    ORDER BY created_at, id
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  UPDATE moderation_queue m
+  SET metadata = COALESCE(m.metadata, '{}'::jsonb)
+    || jsonb_build_object('ingested', true, 'ingested_at', now())
+  FROM claimable
+  WHERE m.id = claimable.id
+  RETURNING m.*;
+$$;
+
+COMMENT ON FUNCTION claim_approved_tips IS 'Atomically claims approved, not-yet-ingested tips for the Haystack tip ingester (keyset-paginated).';
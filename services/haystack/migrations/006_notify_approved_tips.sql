@@ -0,0 +1,26 @@
+-- Migration 006: Notify Haystack when a tip is approved
+-- Run this in the Supabase Dashboard SQL Editor
+
+-- With TIP_INGESTION_MODE=listen, Haystack LISTENs on "haystack_tips" and
+-- runs a tips cycle when notified, instead of polling every few minutes.
+-- The payload is the tip id. Notifications are delivered on commit.
+CREATE OR REPLACE FUNCTION notify_approved_tip()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF NEW.type = 'tip'
+     AND NEW.status = 'approved'
+     AND NOT COALESCE((NEW.metadata->>'ingested')::boolean, false)
+     AND (TG_OP = 'INSERT' OR OLD.status IS DISTINCT FROM NEW.status) THEN
+    PERFORM pg_notify('haystack_tips', NEW.id::text);
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS moderation_queue_tip_approved ON moderation_queue;
+CREATE TRIGGER moderation_queue_tip_approved
+  AFTER INSERT OR UPDATE OF status ON moderation_queue
+  FOR EACH ROW
+  EXECUTE FUNCTION notify_approved_tip();
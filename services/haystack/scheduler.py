@@ -9,6 +9,7 @@ from config import (
     MAIN_POLL_INTERVAL_MINUTES,
     WEATHER_POLL_INTERVAL_MINUTES,
     TIP_POLL_INTERVAL_MINUTES,
+    TIP_SWEEP_INTERVAL_MINUTES,
     SOCIAL_POLL_INTERVAL_MINUTES,
     CONTENT_AGGREGATION_ENABLED,
 )
@@ -36,10 +37,30 @@ async def _run_cycle(cycle_type: str) -> None:
         logger.error("scheduler.cycle_failed", cycle_type=cycle_type, error=str(e))
 
 
-def start_scheduler() -> AsyncIOScheduler:
-    """Create and start the APScheduler with all configured cycles."""
+async def _run_tips_cycle() -> None:
+    """Tips job callback — runs a tips cycle only if approved tips are waiting."""
+    from db.client import has_pending_tips
+
+    try:
+        if not await has_pending_tips():
+            logger.debug("scheduler.tips_idle")
+            return
+    except Exception as e:
+        # Can't tell: fall through and let the cycle find out
+        logger.warning("scheduler.tips_check_failed", error=str(e))
+    await _run_cycle("tips")
+
+
+def start_scheduler(tips_pushed: bool = False) -> AsyncIOScheduler:
+    """Create and start the APScheduler with all configured cycles.
+
+    tips_pushed: tip approvals trigger runs via tip_events, so the tips job
+    only sweeps for missed tips every TIP_SWEEP_INTERVAL_MINUTES.
+    """
     global _scheduler
 
+    tips_interval = TIP_SWEEP_INTERVAL_MINUTES if tips_pushed else TIP_POLL_INTERVAL_MINUTES
+
     _scheduler = AsyncIOScheduler(timezone="UTC")
 
     # Main collection: RSS + standard scrapers
@@ -72,13 +93,12 @@ def start_scheduler() -> AsyncIOScheduler:
         replace_existing=True,
     )
 
-    # Tip ingestion: approved moderation queue items
+    # Tip ingestion: approved moderation queue items (a sweep when tips are pushed)
     _scheduler.add_job(
-        _run_cycle,
-        trigger=IntervalTrigger(minutes=TIP_POLL_INTERVAL_MINUTES),
-        args=["tips"],
+        _run_tips_cycle,
+        trigger=IntervalTrigger(minutes=tips_interval),
         id="tips_cycle",
-        name="Tip Ingestion (Moderation Queue)",
+        name="Tip Sweep (Moderation Queue)" if tips_pushed else "Tip Ingestion (Moderation Queue)",
         replace_existing=True,
     )
 
@@ -100,7 +120,8 @@ def start_scheduler() -> AsyncIOScheduler:
         jobs=len(_scheduler.get_jobs()),
         main_interval=f"{MAIN_POLL_INTERVAL_MINUTES}m",
         weather_interval=f"{WEATHER_POLL_INTERVAL_MINUTES}m",
-        tips_interval=f"{TIP_POLL_INTERVAL_MINUTES}m",
+        tips_interval=f"{tips_interval}m",
+        tips_pushed=tips_pushed,
     )
 
     return _scheduler
@@ -0,0 +1,117 @@
+"""Benchmark main-content extraction on the fixture page corpus.
+
+Compares the old selector heuristic (drop a fixed list of chrome selectors,
+take "main, article, .content, #content, .post" or the whole body) with
+utils/extract.py, cold (scoring) and warm (learned domain template). Prints
+time per page, output size and a rough LLM token estimate, and whether the
+expected article text was kept and the boilerplate dropped.
+
+    python scripts/bench_extraction.py
+    python scripts/bench_extraction.py --repeat 200
+    python scripts/bench_extraction.py --pages path/to/pages   # dir with expected.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add parent dir to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep learned templates out of the real data dir
+os.environ.setdefault("HAYSTACK_DATA_DIR", tempfile.mkdtemp(prefix="haystack-bench-"))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from utils import extract as extractor  # noqa: E402
+from utils.text import html_to_text  # noqa: E402
+
+DEFAULT_PAGES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures", "pages"
+)
+
+
+def legacy_extract(html: str, url: str) -> str:
+    """The scraper's extraction before utils/extract.py."""
+    soup = BeautifulSoup(html, "lxml")
+    for tag in soup.select("nav, footer, aside, script, style, header, .sidebar, .menu"):
+        tag.decompose()
+    main = soup.select_one("main, article, .content, #content, .post")
+    if main:
+        return html_to_text(str(main))
+    return html_to_text(str(soup.body)) if soup.body else ""
+
+
+def cold_extract(html: str, url: str) -> str:
+    return extractor.extract(html).body
+
+
+def warm_extract(html: str, url: str) -> str:
+    return extractor.extract(html, url).body
+
+
+def estimate_tokens(text: str) -> int:
+    """~1 token per CJK character, ~4 characters per token otherwise."""
+    cjk = sum(1 for ch in text if ord(ch) >= 0x3000)
+    return cjk + (len(text) - cjk) // 4
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--pages", default=DEFAULT_PAGES)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with open(os.path.join(args.pages, "expected.json"), encoding="utf-8") as f:
+        expected = json.load(f)
+    pages = {}
+    for name in sorted(expected):
+        with open(os.path.join(args.pages, name), encoding="utf-8") as f:
+            pages[name] = f.read()
+
+    # Learn the templates the warm runs use
+    for name, html in pages.items():
+        for _ in range(extractor.TEMPLATE_CONFIRMATIONS):
+            extractor.extract(html, expected[name]["url"])
+
+    methods = {"legacy": legacy_extract, "cold": cold_extract, "warm": warm_extract}
+    header = f"{'page':<24}{'method':<8}{'ms/page':>9}{'chars':>8}{'tokens':>8}  kept  dropped"
+    print(header)
+    print("-" * len(header))
+
+    totals = {m: {"ms": [], "chars": 0, "tokens": 0} for m in methods}
+    for name, html in pages.items():
+        url = expected[name]["url"]
+        for method, fn in methods.items():
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                body = fn(html, url)
+                times.append(time.perf_counter() - start)
+            ms = statistics.median(times) * 1000
+            kept = sum(t in body for t in expected[name]["include"])
+            dropped = sum(t not in body for t in expected[name]["exclude"])
+            tokens = estimate_tokens(body)
+            totals[method]["ms"].append(ms)
+            totals[method]["chars"] += len(body)
+            totals[method]["tokens"] += tokens
+            print(
+                f"{name:<24}{method:<8}{ms:>9.2f}{len(body):>8}{tokens:>8}"
+                f"  {kept}/{len(expected[name]['include'])}"
+                f"   {dropped}/{len(expected[name]['exclude'])}"
+            )
+
+    print()
+    for method, t in totals.items():
+        print(
+            f"{method:<8} median {statistics.median(t['ms']):.2f} ms/page, "
+            f"{t['chars']} chars, ~{t['tokens']} tokens total"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Measure peak memory of pipeline article state: plain dicts vs slotted records.
+
+Builds a run's worth of articles the way the pipeline does (raw -> classified
+-> enriched, every stage list referencing the previous stage's objects) and
+prints the tracemalloc peak for each representation. Payload text is
+random words drawn from the recorded pages in tests/fixtures/pages, so it
+compresses about as well as real article text (repeated filler would
+compress almost to nothing and overstate the savings).
+
+    python scripts/bench_state_memory.py
+    python scripts/bench_state_memory.py --articles 5000 --payload 4000
+"""
+
+import argparse
+import glob
+import os
+import random
+import re
+import sys
+import tracemalloc
+
+# Add parent dir to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from graph.state import ClassifiedArticle, EnrichedArticle, RawArticle  # noqa: E402
+
+HAYSTACK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(HAYSTACK_DIR, "tests", "fixtures", "pages")
+
+
+def load_words() -> list[str]:
+    """Words (and Japanese runs) from the recorded fixture pages."""
+    words = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            text = BeautifulSoup(f.read(), "html.parser").get_text(" ")
+        words.extend(re.findall(r"\S+", text))
+    return words
+
+
+def random_text(rng: random.Random, words: list[str], size: int) -> str:
+    """About size characters of words sampled from the fixtures."""
+    parts, length = [], 0
+    while length < size:
+        word = rng.choice(words)
+        parts.append(word)
+        length += len(word) + 1
+    return " ".join(parts)
+
+
+def build_state(
+    articles: int, payload: int, words: list[str], raw_cls, classified_cls, enriched_cls
+) -> dict:
+    rng = random.Random(0)
+    raw = [
+        raw_cls(
+            source_id="src-001", source_type="api",
+            source_url=f"https://example.com/article/{i}", source_name="Bench",
+            title=f"Benchmark article {i}", body=random_text(rng, words, 800),
+            published_at="2026-01-01T00:00:00+00:00", author=None, language="en",
+            raw_metadata={
+                "api_type": "generic",
+                "raw_item": {"id": i, "content": random_text(rng, words, payload)},
+            },
+            fetched_at="2026-01-01T00:00:00+00:00",
+        )
+        for i in range(articles)
+    ]
+    classified = [
+        classified_cls(
+            raw=r, relevance_score=0.8, topics=["events"], geo_tags=["niseko"],
+            priority="normal", is_duplicate=False, duplicate_of=None,
+            content_fingerprint=f"{i:016x}", classification_reasoning="bench",
+            embedding=None,
+        )
+        for i, r in enumerate(raw)
+    ]
+    enriched = [
+        enriched_cls(
+            classified=c, who=None, what=c["raw"]["title"], when_occurred=None,
+            where_location="Niseko", why=None, how=None, quotes=[], evidence_refs=[],
+            risk_flags=[], fact_check_notes=[], confidence_score=70, source_log=[],
+        )
+        for c in classified
+    ]
+    return {
+        "raw_articles": raw,
+        "unique_articles": list(raw),
+        "classified_articles": classified,
+        "enriched_articles": enriched,
+        "approved_articles": list(enriched),
+    }
+
+
+def measure(articles: int, payload: int, words: list[str], *classes) -> int:
+    tracemalloc.start()
+    state = build_state(articles, payload, words, *classes)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del state
+    return peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--payload", type=int, default=2000,
+                        help="approximate size in bytes of each raw API item")
+    args = parser.parse_args()
+
+    words = load_words()
+    baseline = measure(args.articles, args.payload, words, dict, dict, dict)
+    records = measure(args.articles, args.payload, words, RawArticle, ClassifiedArticle, EnrichedArticle)
+    print(f"{args.articles} articles, ~{args.payload} B raw payload each")
+    print(f"  dicts    peak {baseline / 1e6:8.2f} MB")
+    print(f"  records  peak {records / 1e6:8.2f} MB  ({records / baseline:.0%} of dicts)")
+
+
+if __name__ == "__main__":
+    main()
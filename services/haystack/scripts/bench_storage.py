@@ -0,0 +1,119 @@
+"""Benchmark per-run DB latency of the storage backends.
+
+Replays the db calls of a typical main cycle — create run, load sources,
+one duplicate check and one crawl record per article, a few moderation
+items, complete run — against each backend and prints timings.
+
+    python scripts/bench_storage.py                 # SQLite only
+    python scripts/bench_storage.py --supabase      # also Supabase (writes real rows!)
+    python scripts/bench_storage.py --postgres      # also direct Postgres via DATABASE_URL
+    python scripts/bench_storage.py --articles 200 --runs 10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from uuid import uuid4
+
+# Add parent dir to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db.client as db  # noqa: E402
+from config import DATABASE_URL  # noqa: E402
+from db.postgres_backend import PostgresBackend  # noqa: E402
+from db.sqlite_backend import SQLiteBackend  # noqa: E402
+from db.supabase_backend import SupabaseBackend  # noqa: E402
+
+
+async def simulate_run(articles: int, source_id: str) -> dict[str, float]:
+    """One run's worth of db calls; returns seconds spent per operation."""
+    timings = {"create_run": 0.0, "sources": 0.0, "check_duplicate": 0.0,
+               "record_crawl": 0.0, "moderation": 0.0, "complete_run": 0.0}
+
+    start = time.perf_counter()
+    run = await db.create_run("manual")
+    timings["create_run"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await db.get_active_sources(source_type="rss")
+    timings["sources"] = time.perf_counter() - start
+
+    for i in range(articles):
+        fingerprint = uuid4().hex[:16]
+        start = time.perf_counter()
+        await db.check_duplicate(fingerprint)
+        timings["check_duplicate"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        await db.record_crawl(
+            source_feed_id=source_id,
+            source_url=f"https://bench.example.com/{fingerprint}",
+            content_fingerprint=fingerprint,
+            pipeline_run_id=run["id"],
+            raw_data={"title": f"Benchmark article {i}", "body": "x" * 800, "language": "en"},
+            was_relevant=i % 3 == 0,
+            classification_data={"topics": ["events"], "geo_tags": ["niseko"], "priority": "normal"},
+        )
+        timings["record_crawl"] += time.perf_counter() - start
+
+    for _ in range(max(1, articles // 10)):
+        start = time.perf_counter()
+        await db.create_moderation_item("Benchmark flagged item", metadata={"bench": True})
+        timings["moderation"] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    await db.complete_run(run["id"], stats={"bench": True}, errors=[], sources_polled=[])
+    timings["complete_run"] = time.perf_counter() - start
+
+    return timings
+
+
+async def bench(backend, articles: int, runs: int, source_id: str) -> None:
+    db.set_backend(backend)
+    totals = []
+    per_op: dict[str, list[float]] = {}
+    for _ in range(runs):
+        timings = await simulate_run(articles, source_id)
+        totals.append(sum(timings.values()))
+        for op, seconds in timings.items():
+            per_op.setdefault(op, []).append(seconds)
+    await backend.close()
+    db.set_backend(None)
+
+    print(f"\n{backend.name}: {runs} runs x {articles} articles")
+    print(f"  per run  median {statistics.median(totals) * 1000:9.2f} ms"
+          f"   max {max(totals) * 1000:9.2f} ms")
+    for op, values in per_op.items():
+        print(f"  {op:<16} median {statistics.median(values) * 1000:9.2f} ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--supabase", action="store_true",
+                        help="also benchmark Supabase (inserts benchmark rows)")
+    parser.add_argument("--postgres", action="store_true",
+                        help="also benchmark direct Postgres at DATABASE_URL (inserts benchmark rows)")
+    parser.add_argument("--source-id", default="bench-source",
+                        help="source_feeds id for crawl rows (must exist for Supabase/Postgres)")
+    args = parser.parse_args()
+
+    # Measure storage only, not the in-memory aggregates fed by record_crawl
+    db._notify_crawl_written = lambda record: None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite = SQLiteBackend(os.path.join(tmp, "bench.db"))
+        await bench(sqlite, args.articles, args.runs, args.source_id)
+    if args.supabase:
+        await bench(SupabaseBackend(), args.articles, args.runs, args.source_id)
+    if args.postgres:
+        await bench(PostgresBackend(DATABASE_URL), args.articles, args.runs, args.source_id)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
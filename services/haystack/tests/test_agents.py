@@ -64,6 +64,36 @@ async def test_rss_agent_collects():
     assert articles[0]["source_id"] == "test-source-001"
 
 
+@pytest.mark.asyncio
+async def test_rss_agent_records_truncation_warning():
+    from agents.rss_agent import RSSAgent
+    from graph.nodes.collect import _track_status
+
+    agent = RSSAgent()
+    mock_resp = MagicMock()
+    mock_resp.text = RSS_FEED_XML
+    mock_resp.raise_for_status = MagicMock()
+
+    with patch("agents.rss_agent.httpx.AsyncClient") as mock_client, \
+         patch("agents.rss_agent.truncated", return_value=True):
+        mock_instance = AsyncMock()
+        mock_client.return_value.__aenter__ = AsyncMock(return_value=mock_instance)
+        mock_client.return_value.__aexit__ = AsyncMock(return_value=False)
+        mock_instance.get.return_value = mock_resp
+
+        articles, errors = await agent.collect([MOCK_SOURCE])
+
+    assert len(articles) == 2
+    assert len(errors) == 1
+    assert errors[0]["warning"] is True
+    assert errors[0]["truncated"] == 1
+
+    # A truncated feed still counts as a successful fetch
+    status = {}
+    _track_status(status, [MOCK_SOURCE], errors, {MOCK_SOURCE["id"]})
+    assert status[MOCK_SOURCE["id"]]["error"] is None
+
+
 @pytest.mark.asyncio
 async def test_rss_agent_handles_error():
     from agents.rss_agent import RSSAgent
@@ -86,6 +116,12 @@ async def test_rss_agent_handles_error():
 # ── Scraper Agent Tests ───────────────────────────────
 
 
+def _mock_limiter():
+    limiter = MagicMock()
+    limiter.record_response = AsyncMock()
+    return limiter
+
+
 MOCK_HTML = """<html>
 <body>
 <article>
@@ -114,8 +150,9 @@ async def test_scraper_agent_collects():
 
     with patch("agents.scraper_agent.httpx.AsyncClient") as mock_client, \
          patch("agents.scraper_agent.is_allowed", return_value=True), \
+         patch("agents.scraper_agent.filter_allowed", side_effect=lambda urls: urls), \
          patch("agents.scraper_agent.get_crawl_delay", return_value=None), \
-         patch("agents.scraper_agent.rate_limiter") as mock_limiter:
+         patch("agents.scraper_agent.rate_limiter", _mock_limiter()) as mock_limiter:
         mock_instance = AsyncMock()
         mock_client.return_value.__aenter__ = AsyncMock(return_value=mock_instance)
         mock_client.return_value.__aexit__ = AsyncMock(return_value=False)
@@ -129,6 +166,189 @@ async def test_scraper_agent_collects():
     assert any("Ski Season" in a["title"] for a in articles)
 
 
+@pytest.mark.asyncio
+async def test_scraper_batch_checks_article_links():
+    from agents.scraper_agent import ScraperAgent
+
+    source = {**MOCK_SOURCE, "source_type": "scrape"}
+    agent = ScraperAgent()
+
+    mock_resp = MagicMock()
+    mock_resp.text = MOCK_HTML
+    mock_resp.raise_for_status = MagicMock()
+
+    with patch("agents.scraper_agent.httpx.AsyncClient") as mock_client, \
+         patch("agents.scraper_agent.is_allowed", return_value=True), \
+         patch("agents.scraper_agent.filter_allowed",
+               side_effect=lambda urls: [u for u in urls if u.endswith("/story/1")]) as mock_filter, \
+         patch("agents.scraper_agent.get_crawl_delay", return_value=None), \
+         patch("agents.scraper_agent.rate_limiter", _mock_limiter()) as mock_limiter:
+        mock_instance = AsyncMock()
+        mock_client.return_value.__aenter__ = AsyncMock(return_value=mock_instance)
+        mock_client.return_value.__aexit__ = AsyncMock(return_value=False)
+        mock_instance.get.return_value = mock_resp
+        mock_limiter.acquire = AsyncMock()
+
+        articles, errors = await agent.collect([source])
+
+    assert mock_filter.await_count == 1
+    assert [a["title"] for a in articles] == ["Ski Season Update"]
+
+
+ARTICLE_PAGE_HTML = """<html><head><title>Ski Season Update</title></head>
+<body>
+<nav>Home | News | Weather</nav>
+<article>
+  <h1>Ski Season Update</h1>
+  <p>The ski season is in full swing at Niseko United, with all four resorts open.</p>
+  <p>Lift lines were short on Monday and the gondola ran until 8pm for night skiing.</p>
+</article>
+<footer>Copyright</footer>
+</body></html>"""
+
+
+def _page_response(text, status_code=200, headers=None):
+    resp = MagicMock()
+    resp.text = text
+    resp.status_code = status_code
+    resp.headers = headers or {}
+    resp.raise_for_status = MagicMock()
+    return resp
+
+
+@pytest.mark.asyncio
+async def test_scraper_deep_fetch_uses_article_pages_and_cache(tmp_path):
+    from agents.scraper_agent import ScraperAgent
+
+    source = {**MOCK_SOURCE, "source_type": "scrape", "config": {"deep_fetch": True}}
+    agent = ScraperAgent()
+    requested = []
+
+    async def get(url, headers=None):
+        requested.append((url, headers or {}))
+        if url == source["url"]:
+            return _page_response(MOCK_HTML)
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return _page_response("", status_code=304)
+        return _page_response(ARTICLE_PAGE_HTML, headers={"etag": '"v1"'})
+
+    with patch("agents.scraper_agent.httpx.AsyncClient") as mock_client, \
+         patch("utils.page_cache.HAYSTACK_DATA_DIR", str(tmp_path)), \
+         patch("agents.scraper_agent.is_allowed", return_value=True), \
+         patch("agents.scraper_agent.filter_allowed", side_effect=lambda urls: urls), \
+         patch("agents.scraper_agent.get_crawl_delay", return_value=None), \
+         patch("agents.scraper_agent.rate_limiter", _mock_limiter()) as mock_limiter:
+        mock_instance = AsyncMock()
+        mock_instance.get.side_effect = get
+        mock_client.return_value.__aenter__ = AsyncMock(return_value=mock_instance)
+        mock_client.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        articles, errors = await agent.collect([source])
+
+        assert errors == []
+        ski = next(a for a in articles if a["title"] == "Ski Season Update")
+        assert "gondola ran until 8pm" in ski["body"]
+        assert "Home | News" not in ski["body"]
+        assert ski["raw_metadata"]["scrape_method"] == "bs4_deep"
+        assert ski["raw_metadata"]["snippet"].startswith("The ski season")
+        assert mock_limiter.record_response.call_count == 3
+
+        # Fresh cache: only the listing is requested again
+        requested.clear()
+        await agent.collect([source])
+        assert [url for url, _ in requested] == [source["url"]]
+
+        # Stale cache: pages are revalidated and a 304 reuses the extraction
+        with patch("utils.page_cache.FRESH_SECONDS", 0):
+            requested.clear()
+            articles, _ = await agent.collect([source])
+        assert all(h.get("If-None-Match") == '"v1"' for url, h in requested if url != source["url"])
+        assert any("gondola" in a["body"] for a in articles)
+
+
+JSON_LD_LISTING_HTML = """<html><head>
+<script type="application/ld+json">
+{"@type": "ItemList", "itemListElement": [
+  {"@type": "ListItem", "item": {"@type": "NewsArticle", "headline": "Road closure on Route 5",
+   "url": "/news/route-5", "datePublished": "2025-02-10T09:00:00+09:00",
+   "description": "Route 5 closed for snow clearing."}}
+]}
+</script>
+</head><body><div class="list"><span>Road closure on Route 5</span></div></body></html>"""
+
+
+@pytest.mark.asyncio
+async def test_scraper_uses_json_ld_listing():
+    from agents.scraper_agent import ScraperAgent
+
+    source = {**MOCK_SOURCE, "source_type": "scrape"}
+    agent = ScraperAgent()
+
+    with patch("agents.scraper_agent.httpx.AsyncClient") as mock_client, \
+         patch("agents.scraper_agent.is_allowed", return_value=True), \
+         patch("agents.scraper_agent.filter_allowed", side_effect=lambda urls: urls), \
+         patch("agents.scraper_agent.get_crawl_delay", return_value=None), \
+         patch("agents.scraper_agent.BeautifulSoup") as mock_soup, \
+         patch("agents.scraper_agent.rate_limiter", _mock_limiter()):
+        mock_instance = AsyncMock()
+        mock_instance.get.return_value = _page_response(JSON_LD_LISTING_HTML)
+        mock_client.return_value.__aenter__ = AsyncMock(return_value=mock_instance)
+        mock_client.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        articles, errors = await agent.collect([source])
+
+    assert errors == []
+    assert mock_soup.call_count == 0  # no DOM parse for the listing
+    assert len(articles) == 1
+    assert articles[0]["source_url"] == "https://example.com/news/route-5"
+    assert articles[0]["published_at"] == "2025-02-10T09:00:00+09:00"
+    assert articles[0]["body"] == "Route 5 closed for snow clearing."
+    assert articles[0]["raw_metadata"]["scrape_method"] == "json_ld"
+
+
+FEATURED_LISTING_HTML = """<html><head>
+<script type="application/ld+json">
+[{"@type": "NewsArticle", "headline": "Featured", "url": "/story/featured",
+  "datePublished": "2025-02-12T07:00:00+09:00", "description": "The featured story."},
+ {"@type": "NewsArticle", "headline": "Story 1", "url": "/story/1",
+  "datePublished": "2025-02-11T07:00:00+09:00", "author": {"name": "K. Sato"}}]
+</script>
+</head><body>""" + "".join(
+    f'<article><h2><a href="/story/{n}">Story {n}</a></h2><p>Body of story {n}.</p></article>'
+    for n in range(1, 9)
+) + "</body></html>"
+
+
+@pytest.mark.asyncio
+async def test_scraper_merges_structured_entries_into_selector_results():
+    """A lone featured NewsArticle does not replace the page's article list."""
+    from agents.scraper_agent import ScraperAgent
+
+    source = {**MOCK_SOURCE, "source_type": "scrape", "url": "https://example.com/news",
+              "config": {"max_entries": 15}}
+    agent = ScraperAgent()
+
+    with patch("agents.scraper_agent.httpx.AsyncClient") as mock_client, \
+         patch("agents.scraper_agent.is_allowed", return_value=True), \
+         patch("agents.scraper_agent.filter_allowed", side_effect=lambda urls: urls), \
+         patch("agents.scraper_agent.get_crawl_delay", return_value=None), \
+         patch("agents.scraper_agent.rate_limiter", _mock_limiter()):
+        mock_instance = AsyncMock()
+        mock_instance.get.return_value = _page_response(FEATURED_LISTING_HTML)
+        mock_client.return_value.__aenter__ = AsyncMock(return_value=mock_instance)
+        mock_client.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        articles, errors = await agent.collect([source])
+
+    assert errors == []
+    assert [a["title"] for a in articles] == [*(f"Story {n}" for n in range(1, 9)), "Featured"]
+    assert articles[0]["raw_metadata"]["scrape_method"] == "bs4"
+    assert articles[0]["published_at"] == "2025-02-11T07:00:00+09:00"
+    assert articles[0]["author"] == "K. Sato"
+    assert articles[-1]["raw_metadata"]["scrape_method"] == "json_ld"
+    assert articles[-1]["source_url"] == "https://example.com/story/featured"
+
+
 @pytest.mark.asyncio
 async def test_scraper_respects_robots():
     from agents.scraper_agent import ScraperAgent
@@ -138,7 +358,7 @@ async def test_scraper_respects_robots():
 
     with patch("agents.scraper_agent.is_allowed", return_value=False), \
          patch("agents.scraper_agent.get_crawl_delay", return_value=None), \
-         patch("agents.scraper_agent.rate_limiter") as mock_limiter:
+         patch("agents.scraper_agent.rate_limiter", _mock_limiter()) as mock_limiter:
         mock_limiter.acquire = AsyncMock()
         articles, errors = await agent.collect([source])
 
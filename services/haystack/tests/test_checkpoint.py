@@ -0,0 +1,183 @@
+"""Tests for run checkpointing and resume."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+
+@pytest.fixture
+def checkpointer():
+    from graph.checkpoint import SQLiteCheckpointSaver, set_checkpointer
+
+    saver = SQLiteCheckpointSaver(":memory:")
+    set_checkpointer(saver)
+    yield saver
+    set_checkpointer(None)
+
+
+def _flaky_workflow(calls: dict, fail_times: int):
+    """collect -> enrich graph whose enrich node fails the first fail_times calls."""
+    from langgraph.graph import StateGraph, START, END
+    from graph.state import PipelineState, RawArticle
+
+    async def collect(state):
+        calls["collect"] += 1
+        return {"raw_articles": [RawArticle(
+            source_id="src-001", source_type="api", source_url="https://example.com/a",
+            source_name="Test", title="Title", body="Body", published_at=None, author=None,
+            language="en", raw_metadata={"raw_item": {"id": 1}},
+            fetched_at="2026-01-01T00:00:00+00:00",
+        )], "_source_status": {"src-001": {"fetched_at": "2026-01-01T00:00:00+00:00", "error": None}}}
+
+    async def enrich(state):
+        calls["enrich"] += 1
+        if calls["enrich"] <= fail_times:
+            raise RuntimeError("process killed")
+        raw = state["raw_articles"][0]
+        return {"stats": {"enriched": len(state["raw_articles"]), "heavy": raw.heavy_metadata()}}
+
+    workflow = StateGraph(PipelineState)
+    workflow.add_node("collect", collect)
+    workflow.add_node("enrich", enrich)
+    workflow.add_edge(START, "collect")
+    workflow.add_edge("collect", "enrich")
+    workflow.add_edge("enrich", END)
+    return workflow
+
+
+@pytest.fixture
+def pipeline_env(checkpointer):
+    """Patch run bookkeeping (no after-run hooks); yields the complete_run mock."""
+    with patch("graph.pipeline.create_run", AsyncMock(return_value={"id": "run-1"})), \
+         patch("graph.pipeline.complete_run", AsyncMock()) as complete, \
+         patch("graph.pipeline.AFTER_RUN_HOOKS", []):
+        yield complete
+
+
+# ── Saver Tests ───────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_saver_resumes_after_last_completed_node(checkpointer):
+    calls = {"collect": 0, "enrich": 0}
+    graph = _flaky_workflow(calls, fail_times=1).compile(checkpointer=checkpointer)
+    config = {"configurable": {"thread_id": "run-1"}}
+
+    with pytest.raises(RuntimeError):
+        await graph.ainvoke({"raw_articles": []}, config, durability="sync")
+
+    snapshot = await graph.aget_state(config)
+    assert snapshot.next == ("enrich",)
+    assert checkpointer.thread_ids() == ["run-1"]
+
+    result = await graph.ainvoke(None, config, durability="sync")
+
+    assert calls == {"collect": 1, "enrich": 2}
+    # Article records (with compressed metadata) survive the round trip
+    assert result["stats"] == {"enriched": 1, "heavy": {"raw_item": {"id": 1}}}
+
+
+def test_saver_delete_thread(checkpointer):
+    from langgraph.checkpoint.base import empty_checkpoint
+
+    config = {"configurable": {"thread_id": "run-1", "checkpoint_ns": ""}}
+    saved = checkpointer.put(config, empty_checkpoint(), {"step": -1}, {})
+
+    assert checkpointer.get_tuple(saved).metadata["step"] == -1
+    checkpointer.delete_thread("run-1")
+    assert checkpointer.get_tuple(config) is None
+    assert checkpointer.thread_ids() == []
+
+
+# ── Pipeline Resume Tests ─────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_failed_run_resumes_and_clears_checkpoint(pipeline_env, checkpointer):
+    from graph.pipeline import run_pipeline, resume_pipeline
+
+    calls = {"collect": 0, "enrich": 0}
+    with patch("graph.pipeline.workflow", _flaky_workflow(calls, fail_times=1)):
+        with pytest.raises(RuntimeError):
+            await run_pipeline()
+        failed = pipeline_env.call_args.kwargs
+        assert failed["status"] == "failed"
+        # Sources polled before the crash are still flushed
+        assert failed["source_status"] == {"src-001": {"fetched_at": "2026-01-01T00:00:00+00:00", "error": None}}
+
+        result = await resume_pipeline("run-1")
+
+    assert calls == {"collect": 1, "enrich": 2}
+    assert result["stats"]["enriched"] == 1
+    assert pipeline_env.call_args.kwargs["status"] == "completed"
+    assert checkpointer.thread_ids() == []
+
+
+@pytest.mark.asyncio
+async def test_failing_after_run_hook_does_not_fail_the_run(pipeline_env, checkpointer):
+    from graph.pipeline import run_pipeline
+
+    broken = AsyncMock(side_effect=OSError("disk full"), __name__="broken")
+    later = MagicMock(__name__="later")
+    calls = {"collect": 0, "enrich": 0}
+    with patch("graph.pipeline.workflow", _flaky_workflow(calls, fail_times=0)), \
+         patch("graph.pipeline.AFTER_RUN_HOOKS", [broken, later]):
+        result = await run_pipeline()
+
+    assert result["stats"]["enriched"] == 1
+    assert [c.kwargs["status"] for c in pipeline_env.call_args_list] == ["completed"]
+    later.assert_called_once()
+    assert checkpointer.thread_ids() == []
+
+
+@pytest.mark.asyncio
+async def test_resume_without_checkpoint_raises(pipeline_env):
+    from graph.pipeline import CheckpointNotFoundError, resume_pipeline
+
+    with pytest.raises(CheckpointNotFoundError):
+        await resume_pipeline("unknown-run")
+
+
+@pytest.mark.asyncio
+async def test_recovery_resumes_only_running_runs(pipeline_env, checkpointer):
+    from graph.pipeline import run_pipeline, recover_interrupted_runs
+
+    calls = {"collect": 0, "enrich": 0}
+    with patch("graph.pipeline.workflow", _flaky_workflow(calls, fail_times=1)):
+        with pytest.raises(RuntimeError):
+            await run_pipeline()
+
+        # Marked failed: left for an explicit resume
+        with patch("graph.pipeline.get_run_by_id", AsyncMock(return_value={"status": "failed"})):
+            assert await recover_interrupted_runs() == []
+        assert calls["enrich"] == 1
+
+        # Still "running" (the process died before recording the failure)
+        with patch("graph.pipeline.get_run_by_id", AsyncMock(return_value={"status": "running"})):
+            assert await recover_interrupted_runs() == ["run-1"]
+
+    assert calls == {"collect": 1, "enrich": 2}
+    assert checkpointer.thread_ids() == []
+
+
+@pytest.mark.asyncio
+async def test_prune_drops_only_unresumable_runs(pipeline_env, checkpointer):
+    from graph.pipeline import prune_checkpoints, run_pipeline
+
+    calls = {"collect": 0, "enrich": 0}
+    with patch("graph.pipeline.workflow", _flaky_workflow(calls, fail_times=1)):
+        with pytest.raises(RuntimeError):
+            await run_pipeline()
+
+    with patch("graph.pipeline.get_run_by_id", AsyncMock(return_value={"status": "failed"})):
+        assert await prune_checkpoints() == []
+        # Past the retention window even a failed run is dropped
+        with patch("graph.pipeline.HAYSTACK_CHECKPOINT_RETENTION_HOURS", 0):
+            assert await prune_checkpoints() == ["run-1"]
+    assert checkpointer.thread_ids() == []
+
+    with patch("graph.pipeline.workflow", _flaky_workflow(calls, fail_times=2)):
+        with pytest.raises(RuntimeError):
+            await run_pipeline()
+    with patch("graph.pipeline.get_run_by_id", AsyncMock(return_value={"status": "cancelled"})):
+        assert await prune_checkpoints() == ["run-1"]
@@ -0,0 +1,417 @@
+"""Tests for deduplication: cross-language embedding index and classify-stage dedup."""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+
+def _history_row(row_id, title, embedding=None, source_url=None):
+    return {
+        "id": row_id,
+        "field_note_id": None,
+        "source_url": source_url or f"https://example.com/{row_id}",
+        "raw_data": {"title": title, "body": title},
+        "embedding": embedding,
+    }
+
+
+# ── Cross-Language Dedup (Embeddings) ────────────────
+
+
+@pytest.mark.asyncio
+async def test_cross_lang_high_similarity_skips_llm():
+    import utils.cross_lang_dedup as cld
+
+    rows = [_history_row("ch-1", "ニセコで大雪警報", embedding=[1.0, 0.0, 0.0])]
+
+    with patch("utils.cross_lang_dedup.query_crawls", new_callable=AsyncMock) as mock_req, \
+         patch("utils.cross_lang_dedup.generate_json", new_callable=AsyncMock) as mock_llm:
+        mock_req.return_value = rows
+        result = await cld.check_cross_language_duplicate(
+            title="Heavy snow warning in Niseko", body="...", language="en",
+            source_url="https://example.com/en", embedding=[0.99, 0.05, 0.0],
+        )
+
+    assert result["is_duplicate"] is True
+    assert result["duplicate_of"] == "ch-1"
+    mock_llm.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_cross_lang_borderline_confirms_with_llm():
+    import utils.cross_lang_dedup as cld
+
+    rows = [_history_row("ch-2", "倶知安町で新しい駅", embedding=[1.0, 0.0])]
+
+    with patch("utils.cross_lang_dedup.query_crawls", new_callable=AsyncMock) as mock_req, \
+         patch("utils.cross_lang_dedup.generate_json", new_callable=AsyncMock) as mock_llm:
+        mock_req.return_value = rows
+        mock_llm.return_value = {"is_same_story": True, "confidence": 0.9, "reasoning": "Same station"}
+        # cosine ≈ 0.8 → borderline band
+        result = await cld.check_cross_language_duplicate(
+            title="New station in Kutchan", body="...", language="en",
+            source_url="https://example.com/en", embedding=[0.8, 0.6],
+        )
+
+    assert result["duplicate_of"] == "ch-2"
+    mock_llm.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_cross_lang_low_similarity_no_llm():
+    import utils.cross_lang_dedup as cld
+
+    rows = [_history_row("ch-3", "ニセコのレストラン", embedding=[1.0, 0.0])]
+
+    with patch("utils.cross_lang_dedup.query_crawls", new_callable=AsyncMock) as mock_req, \
+         patch("utils.cross_lang_dedup.generate_json", new_callable=AsyncMock) as mock_llm:
+        mock_req.return_value = rows
+        result = await cld.check_cross_language_duplicate(
+            title="Road closure on Route 5", body="...", language="en",
+            source_url="https://example.com/en", embedding=[0.0, 1.0],
+        )
+
+    assert result is None
+    mock_llm.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_cross_lang_ignores_same_language():
+    import utils.cross_lang_dedup as cld
+
+    rows = [_history_row("ch-4", "Heavy snow warning", embedding=[1.0, 0.0])]
+
+    with patch("utils.cross_lang_dedup.query_crawls", new_callable=AsyncMock) as mock_req:
+        mock_req.return_value = rows
+        result = await cld.check_cross_language_duplicate(
+            title="Heavy snow warning in Niseko", body="...", language="en",
+            source_url="https://example.com/en", embedding=[1.0, 0.0],
+        )
+
+    assert result is None
+
+
+@pytest.mark.asyncio
+async def test_cross_lang_falls_back_to_llm_without_embeddings():
+    import utils.cross_lang_dedup as cld
+
+    rows = [_history_row("ch-5", "ニセコで大雪警報")]
+
+    with patch("utils.cross_lang_dedup.query_crawls", new_callable=AsyncMock) as mock_req, \
+         patch("utils.cross_lang_dedup.embed", new_callable=AsyncMock) as mock_embed, \
+         patch("utils.cross_lang_dedup.generate_json", new_callable=AsyncMock) as mock_llm:
+        mock_req.return_value = rows
+        mock_embed.return_value = None  # Embedding model down
+        mock_llm.return_value = {"is_same_story": True, "confidence": 0.8}
+        result = await cld.check_cross_language_duplicate(
+            title="Heavy snow warning in Niseko", body="...", language="en",
+            source_url="https://example.com/en",
+        )
+
+    assert result["duplicate_of"] == "ch-5"
+    mock_llm.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_cross_lang_sends_unembedded_candidates_to_llm():
+    import utils.cross_lang_dedup as cld
+
+    rows = [
+        _history_row("ch-7", "ニセコのレストラン", embedding=[0.0, 1.0]),
+        _history_row("ch-8", "ニセコで大雪警報"),  # Stored while the embedding model was down
+    ]
+
+    with patch("utils.cross_lang_dedup.query_crawls", new_callable=AsyncMock) as mock_req, \
+         patch("utils.cross_lang_dedup.embed", new_callable=AsyncMock) as mock_embed, \
+         patch("utils.cross_lang_dedup.generate_json", new_callable=AsyncMock) as mock_llm:
+        mock_req.return_value = rows
+        mock_embed.return_value = None
+        mock_llm.return_value = {"is_same_story": True, "confidence": 0.8}
+        result = await cld.check_cross_language_duplicate(
+            title="Heavy snow warning in Niseko", body="...", language="en",
+            source_url="https://example.com/en", embedding=[1.0, 0.0],
+        )
+
+    # The low-scoring embedded row is skipped; the unembedded one is asked about
+    assert result["duplicate_of"] == "ch-8"
+    mock_llm.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_cross_lang_skips_social():
+    from utils.cross_lang_dedup import check_cross_language_duplicate
+
+    with patch("utils.cross_lang_dedup.query_crawls", new_callable=AsyncMock) as mock_req:
+        result = await check_cross_language_duplicate(
+            title="Powder day!", body="...", language="en",
+            source_url="https://reddit.com/r/niseko/1", source_type="social",
+        )
+
+    assert result is None
+    mock_req.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_cross_lang_uses_snapshot_without_refetch():
+    from utils.cross_lang_dedup import check_cross_language_duplicate
+
+    history = {
+        "en": [],
+        "ja": [{
+            "id": "ch-6", "field_note_id": "fn-6", "fingerprint": "ab" * 8,
+            "source_url": "https://example.jp/6", "title": "ニセコで大雪警報",
+            "body": "", "vector": [1.0, 0.0],
+        }],
+    }
+
+    with patch("utils.cross_lang_dedup.query_crawls", new_callable=AsyncMock) as mock_req:
+        result = await check_cross_language_duplicate(
+            title="Heavy snow warning in Niseko", body="...", language="en",
+            source_url="https://example.com/en", embedding=[1.0, 0.0], history=history,
+        )
+
+    assert result["duplicate_of"] == "fn-6"
+    mock_req.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_cross_lang_reembeds_rows_from_another_model():
+    from utils.cross_lang_dedup import _cosine, check_cross_language_duplicate
+
+    history = {
+        "en": [],
+        "ja": [{
+            "id": "ch-9", "field_note_id": None, "fingerprint": None,
+            "source_url": "https://example.jp/9", "title": "ニセコで大雪警報",
+            "body": "", "vector": [1.0, 0.0, 0.0],  # older 3-dim model
+        }],
+    }
+
+    with patch("utils.cross_lang_dedup.embed", new_callable=AsyncMock) as mock_embed:
+        mock_embed.return_value = [[1.0, 0.0]]
+        result = await check_cross_language_duplicate(
+            title="Heavy snow warning in Niseko", body="...", language="en",
+            source_url="https://example.com/en", embedding=[1.0, 0.0], history=history,
+        )
+
+    assert result["duplicate_of"] == "ch-9"
+    assert history["ja"][0]["vector"] == [1.0, 0.0]
+    with pytest.raises(ValueError):
+        _cosine([1.0, 0.0], [1.0, 0.0, 0.0])
+
+
+@pytest.mark.asyncio
+async def test_load_recent_history_partitions_by_language():
+    from utils.cross_lang_dedup import load_recent_history
+
+    rows = [
+        _history_row("ch-7", "ニセコで大雪警報", embedding=[1.0, 0.0]),
+        _history_row("ch-8", "Snow warning in Niseko", embedding=[0.0, 1.0]),
+    ]
+
+    with patch("utils.cross_lang_dedup.query_crawls", new_callable=AsyncMock) as mock_req:
+        mock_req.return_value = rows
+        history = await load_recent_history()
+
+    assert [e["id"] for e in history["ja"]] == ["ch-7"]
+    assert [e["id"] for e in history["en"]] == ["ch-8"]
+
+
+# ── Classify Node Dedup ──────────────────────────────
+
+
+def _raw(title, language="en", url=None, source_type="rss"):
+    return {
+        "source_id": "src-1", "source_type": source_type,
+        "source_url": url or f"https://example.com/{abs(hash(title))}",
+        "source_name": "Test", "title": title, "body": title,
+        "published_at": None, "author": None, "language": language,
+        "raw_metadata": {}, "fetched_at": "2025-01-01T00:00:00+00:00",
+    }
+
+
+@pytest.mark.asyncio
+async def test_classify_dedups_within_run_across_languages():
+    """A JA article seen earlier in the same run dedups a later EN one."""
+    from graph.nodes.dedup_classify import dedup_classify_node
+
+    state = {
+        "raw_articles": [
+            _raw("ニセコで大雪警報", language="ja"),
+            _raw("Heavy snow warning in Niseko"),
+        ],
+        "stats": {},
+    }
+
+    with patch("graph.nodes.dedup_classify.check_duplicate", new_callable=AsyncMock) as mock_dup, \
+         patch("graph.nodes.dedup_classify.embed", new_callable=AsyncMock) as mock_embed, \
+         patch("graph.nodes.dedup_classify.load_recent_history", new_callable=AsyncMock) as mock_hist, \
+         patch("graph.nodes.dedup_classify._classify_batch", new_callable=AsyncMock) as mock_classify:
+        mock_dup.return_value = None
+        mock_embed.return_value = [[1.0, 0.0], [0.99, 0.01]]
+        mock_hist.return_value = {"en": [], "ja": []}
+        mock_classify.return_value = [{"relevance_score": 0.9, "topics": ["weather"]}]
+
+        result = await dedup_classify_node(state)
+
+    mock_hist.assert_called_once()
+    assert len(result["classified_articles"]) == 1
+    assert result["rejected_articles"][0]["is_duplicate"] is True
+    assert len(mock_hist.return_value["ja"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_classify_keeps_twin_of_rejected_article():
+    """An article rejected as irrelevant doesn't make its twin a duplicate."""
+    from graph.nodes.dedup_classify import dedup_classify_node
+
+    state = {
+        "raw_articles": [
+            _raw("ニセコで大雪警報", language="ja"),
+            _raw("Heavy snow warning in Niseko"),
+        ],
+        "stats": {},
+    }
+
+    with patch("graph.nodes.dedup_classify.check_duplicate", new_callable=AsyncMock) as mock_dup, \
+         patch("graph.nodes.dedup_classify.embed", new_callable=AsyncMock) as mock_embed, \
+         patch("graph.nodes.dedup_classify.load_recent_history", new_callable=AsyncMock) as mock_hist, \
+         patch("graph.nodes.dedup_classify._classify_batch", new_callable=AsyncMock) as mock_classify:
+        mock_dup.return_value = None
+        mock_embed.return_value = [[1.0, 0.0], [0.99, 0.01]]
+        mock_hist.return_value = {"en": [], "ja": []}
+        mock_classify.side_effect = [
+            [{"relevance_score": 0.1, "topics": []}],
+            [{"relevance_score": 0.9, "topics": ["weather"]}],
+        ]
+
+        result = await dedup_classify_node(state)
+
+    assert [a["raw"]["title"] for a in result["classified_articles"]] == ["Heavy snow warning in Niseko"]
+    assert result["rejected_articles"][0]["is_duplicate"] is False
+    history = mock_hist.return_value
+    assert [e["title"] for e in history["en"]] == ["Heavy snow warning in Niseko"]
+    assert history["ja"] == []
+
+
+@pytest.mark.asyncio
+async def test_classify_does_not_retry_failed_batch_embed():
+    """During an embedding outage each article costs at most MAX_LLM_CHECKS LLM calls."""
+    from graph.nodes.dedup_classify import dedup_classify_node
+    from utils.cross_lang_dedup import MAX_LLM_CHECKS
+
+    history = {"en": [], "ja": [
+        {"id": f"ch-{i}", "field_note_id": None, "fingerprint": None, "source_url": f"https://example.jp/{i}",
+         "title": f"ニセコのニュース {i}", "body": "", "vector": None}
+        for i in range(3)
+    ]}
+    state = {"raw_articles": [_raw("Heavy snow warning in Niseko"), _raw("国道5号線が再開", language="ja")],
+             "stats": {}}
+
+    with patch("graph.nodes.dedup_classify.check_duplicate", new_callable=AsyncMock) as mock_dup, \
+         patch("graph.nodes.dedup_classify.embed", new_callable=AsyncMock) as mock_batch_embed, \
+         patch("utils.cross_lang_dedup.embed", new_callable=AsyncMock) as mock_embed, \
+         patch("utils.cross_lang_dedup.generate_json", new_callable=AsyncMock) as mock_llm, \
+         patch("graph.nodes.dedup_classify.load_recent_history", new_callable=AsyncMock) as mock_hist, \
+         patch("graph.nodes.dedup_classify._classify_batch", new_callable=AsyncMock) as mock_classify:
+        mock_dup.return_value = None
+        mock_batch_embed.return_value = None  # Embedding model down
+        mock_hist.return_value = history
+        mock_llm.return_value = {"is_same_story": False}
+        mock_classify.return_value = [{"relevance_score": 0.9}, {"relevance_score": 0.9}]
+
+        result = await dedup_classify_node(state)
+
+    mock_embed.assert_not_called()
+    # The EN article against JA history; the JA article is not compared with
+    # the EN one waiting in its batch
+    assert mock_llm.await_count == MAX_LLM_CHECKS
+    assert len(result["classified_articles"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_classify_skips_history_for_tips_and_social():
+    from graph.nodes.dedup_classify import dedup_classify_node
+
+    state = {
+        "raw_articles": [_raw("Bear seen near Hirafu", source_type="tip"), _raw("Powder day!", source_type="social")],
+        "stats": {},
+    }
+
+    with patch("graph.nodes.dedup_classify.check_duplicate", new_callable=AsyncMock) as mock_dup, \
+         patch("graph.nodes.dedup_classify.embed", new_callable=AsyncMock) as mock_embed, \
+         patch("graph.nodes.dedup_classify.load_recent_history", new_callable=AsyncMock) as mock_hist, \
+         patch("graph.nodes.dedup_classify._classify_batch", new_callable=AsyncMock) as mock_classify:
+        mock_dup.return_value = None
+        mock_embed.return_value = None
+        mock_classify.return_value = [{"relevance_score": 0.9}, {"relevance_score": 0.9}]
+
+        result = await dedup_classify_node(state)
+
+    mock_hist.assert_not_called()
+    assert len(result["classified_articles"]) == 2
+
+
+# ── Intra-Run Dedup Node ─────────────────────────────
+
+
+def test_canonicalize_url_strips_tracking():
+    from utils.fingerprint import canonicalize_url
+
+    assert canonicalize_url(
+        "http://www.Example.com/news/123/?utm_source=rss&b=2&a=1#top"
+    ) == canonicalize_url("https://example.com/news/123?a=1&b=2")
+    assert canonicalize_url("tip://abc") == "tip://abc"
+
+
+@pytest.mark.asyncio
+async def test_intra_dedup_keeps_most_reliable_source():
+    from graph.nodes.intra_dedup import intra_run_dedup_node
+
+    story = "Route 5 closed between Kutchan and Niseko after heavy snowfall overnight"
+    wire = _raw(story, url="https://wire.example.com/route5?utm_source=feed")
+    wire["source_name"] = "Wire"
+    official = _raw(story, url="https://town.example.jp/route5")
+    official["source_name"] = "Town"
+    official["raw_metadata"] = {"reliability_tier": "official"}
+    other = _raw("New ramen shop opens in Hirafu village this weekend")
+
+    result = await intra_run_dedup_node({"raw_articles": [wire, official, other], "stats": {}})
+
+    kept = {a["source_name"]: a for a in result["unique_articles"]}
+    assert len(result["unique_articles"]) == 2
+    assert "Town" in kept
+    assert kept["Town"]["raw_metadata"]["syndicated_from"][0]["source_name"] == "Wire"
+    dropped = result["rejected_articles"][0]
+    assert dropped["raw"] is wire
+    # duplicate_of only ever holds a field note or crawl_history ID
+    assert dropped["duplicate_of"] is None
+    assert "https://town.example.jp/route5" in dropped["classification_reasoning"]
+    assert result["stats"]["intra_run_duplicates"] == 1
+
+
+@pytest.mark.asyncio
+async def test_intra_dedup_merges_same_canonical_url():
+    from graph.nodes.intra_dedup import intra_run_dedup_node
+
+    a = _raw("Snow report: 20cm overnight", url="https://example.com/snow/?utm_medium=rss")
+    b = _raw("Fresh powder in Niseko", url="http://www.example.com/snow")
+
+    result = await intra_run_dedup_node({"raw_articles": [a, b], "stats": {}})
+
+    assert len(result["unique_articles"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_intra_dedup_ignores_shared_listing_page_url():
+    """Scraped items without their own link share the page URL but are distinct."""
+    from graph.nodes.intra_dedup import intra_run_dedup_node
+
+    page = "https://town.example.jp/news"
+    a = _raw("Town council meeting schedule announced", url=page)
+    a["raw_metadata"] = {"page_url": page}
+    b = _raw("Garbage collection changes for the holidays", url=page)
+    b["raw_metadata"] = {"page_url": page}
+
+    result = await intra_run_dedup_node({"raw_articles": [a, b], "stats": {}})
+
+    assert len(result["unique_articles"]) == 2
@@ -0,0 +1,112 @@
+"""Tests for main-content extraction on the fixture page corpus."""
+
+import json
+import os
+
+import pytest
+
+from utils import extract as extractor
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "pages")
+
+with open(os.path.join(FIXTURES, "expected.json"), encoding="utf-8") as f:
+    EXPECTED = json.load(f)
+
+
+def _page(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture(autouse=True)
+def no_templates():
+    extractor.clear_templates()
+    yield
+    extractor.clear_templates()
+
+
+# ── Corpus Tests ──────────────────────────────────────
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_extracts_article_without_boilerplate(name):
+    expected = EXPECTED[name]
+    result = extractor.extract(_page(name), expected["url"])
+
+    assert result.method == "scored"
+    for text in expected["include"]:
+        assert text in result.body
+    for text in expected["exclude"]:
+        assert text not in result.body
+
+
+def test_title_and_fallback_without_text_blocks():
+    result = extractor.extract("<html><head><title>Short</title></head><body>Hi</body></html>")
+
+    assert result.title == "Short"
+    assert result.method == "fallback"
+    assert result.body == "Hi"
+
+
+# ── Template Tests ────────────────────────────────────
+
+
+def test_template_learned_after_confirmations_and_relearned_on_misses():
+    url = EXPECTED["municipal_ja.html"]["url"]
+    html = _page("municipal_ja.html")
+
+    assert extractor.extract(html, url).method == "scored"
+    assert extractor.extract(html, url).method == "scored"
+    result = extractor.extract(html, url)
+    assert result.method == "template"
+    assert result.selector == "div#tmp_contents"
+    assert "町道の除雪作業を実施します" in result.body
+
+    # Site redesign: the template misses, scoring takes over, then relearns
+    redesigned = html.replace('id="tmp_contents"', 'id="main_body"')
+    for _ in range(extractor.TEMPLATE_MAX_MISSES):
+        assert extractor.extract(redesigned, url).method == "scored"
+    extractor.extract(redesigned, url)
+    assert extractor.extract(redesigned, url).selector == "div#main_body"
+    assert extractor.extract(redesigned, url).method == "template"
+
+
+def test_templates_persist(tmp_path, monkeypatch):
+    monkeypatch.setattr(extractor, "HAYSTACK_DATA_DIR", str(tmp_path))
+    url = EXPECTED["blog_sidebar.html"]["url"]
+    html = _page("blog_sidebar.html")
+    for _ in range(extractor.TEMPLATE_CONFIRMATIONS):
+        extractor.extract(html, url)
+    extractor.save_templates()
+
+    extractor._templates.clear()
+    extractor._loaded = False
+    assert extractor.extract(html, url).method == "template"
+
+
+def test_template_selectors_escape_ids_and_classes():
+    url = "https://utility.example.com/news/1"
+    body = "<p>" + "Snow clearing on the town roads starts on Monday, weather permitting. " * 3 + "</p>"
+    html = (
+        '<html><body><div id="1col"><div class="md:w-2/3">' + body + "</div>"
+        '<div class="md:w-2/3"><a href="/a">Other</a></div></div></body></html>'
+    )
+
+    for _ in range(extractor.TEMPLATE_CONFIRMATIONS):
+        assert extractor.extract(html, url).selector == "div#\\31 col > div.md\\:w-2\\/3"
+    result = extractor.extract(html, url)
+    assert result.method == "template"
+    assert "Snow clearing" in result.body
+
+
+def test_unparseable_template_counts_as_miss():
+    url = EXPECTED["news_en.html"]["url"]
+    extractor._loaded = True
+    extractor._templates["nisekotimes.example.com"] = {
+        "selector": "div#1col", "confirmed": extractor.TEMPLATE_CONFIRMATIONS, "misses": 0,
+    }
+
+    result = extractor.extract(_page("news_en.html"), url)
+
+    assert result.method == "scored"
+    assert extractor._templates["nisekotimes.example.com"]["misses"] == 1
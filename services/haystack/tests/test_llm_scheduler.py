@@ -0,0 +1,198 @@
+"""Tests for the priority-aware LLM request scheduler."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from llm.scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_BREAKING,
+    PRIORITY_NORMAL,
+    PRIORITY_TIP,
+    LLMScheduler,
+    llm_context,
+)
+
+
+async def _run_queued(scheduler: LLMScheduler, workers: list[tuple[str, dict]]) -> list[str]:
+    """Queue workers behind a held slot, release it, return dispatch order."""
+    order = []
+
+    async def worker(name, ctx):
+        with llm_context(**ctx):
+            async with scheduler.slot():
+                order.append(name)
+
+    holder = await scheduler.acquire()
+    tasks = []
+    for name, ctx in workers:
+        tasks.append(asyncio.create_task(worker(name, ctx)))
+        await asyncio.sleep(0)
+    scheduler.release(holder)
+    await asyncio.gather(*tasks)
+    return order
+
+
+# ── Dispatch Order Tests ──────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_priority_classes_dispatch_in_order():
+    order = await _run_queued(LLMScheduler(1), [
+        ("deep", {"priority": PRIORITY_BACKGROUND}),
+        ("normal", {"priority": PRIORITY_NORMAL}),
+        ("tip", {"priority": PRIORITY_TIP}),
+        ("breaking", {"priority": PRIORITY_BREAKING}),
+    ])
+
+    assert order == ["breaking", "tip", "normal", "deep"]
+
+
+@pytest.mark.asyncio
+async def test_runs_share_a_class_round_robin():
+    order = await _run_queued(LLMScheduler(1), [
+        ("a1", {"run_id": "run-a"}),
+        ("a2", {"run_id": "run-a"}),
+        ("a3", {"run_id": "run-a"}),
+        ("b1", {"run_id": "run-b"}),
+        ("b2", {"run_id": "run-b"}),
+    ])
+
+    assert order == ["a1", "b1", "a2", "b2", "a3"]
+
+
+@pytest.mark.asyncio
+async def test_earliest_deadline_first_within_class():
+    scheduler = LLMScheduler(1)
+    order = await _run_queued(scheduler, [
+        ("no-deadline", {"priority": PRIORITY_BREAKING}),
+        ("late", {"priority": PRIORITY_BREAKING, "deadline_seconds": 60}),
+        ("soon", {"priority": PRIORITY_BREAKING, "deadline_seconds": 5}),
+        ("expired", {"priority": PRIORITY_BREAKING, "deadline_seconds": -1}),
+    ])
+
+    assert order == ["expired", "soon", "late", "no-deadline"]
+    assert scheduler.metrics()["deadline_misses"] == 1
+
+
+# ── Cancellation Tests ────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_cancel_aborts_queued_running_and_new_requests():
+    scheduler = LLMScheduler(1)
+    started = asyncio.Event()
+
+    async def call(run_id, hold=False):
+        with llm_context(run_id=run_id):
+            async with scheduler.slot():
+                if hold:
+                    started.set()
+                    await asyncio.sleep(10)
+                return run_id
+
+    running = asyncio.create_task(call("run-a", hold=True))
+    await started.wait()
+    queued = asyncio.create_task(call("run-a"))
+    other = asyncio.create_task(call("run-b"))
+    await asyncio.sleep(0)
+
+    assert scheduler.cancel("run-a") == 2
+    assert await other == "run-b"
+    for task in (running, queued):
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    with pytest.raises(asyncio.CancelledError):
+        await call("run-a")
+
+    scheduler.forget("run-a")
+    assert await call("run-a") == "run-a"
+    assert scheduler.metrics()["running"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancel_pipeline_marks_run_cancelled():
+    from langgraph.graph import StateGraph, START, END
+    from graph.checkpoint import SQLiteCheckpointSaver, set_checkpointer
+    from graph.pipeline import RunCancelledError, cancel_pipeline, run_pipeline
+    from graph.state import PipelineState
+    from llm.client import generate
+
+    async def enrich(state):
+        await generate("prompt")
+        return {}
+
+    async def slow_ollama(*args):
+        await asyncio.sleep(10)
+
+    workflow = StateGraph(PipelineState)
+    workflow.add_node("enrich", enrich)
+    workflow.add_edge(START, "enrich")
+    workflow.add_edge("enrich", END)
+
+    saver = SQLiteCheckpointSaver(":memory:")
+    set_checkpointer(saver)
+    try:
+        with patch("graph.pipeline.workflow", workflow), \
+             patch("graph.pipeline.create_run", AsyncMock(return_value={"id": "run-1"})), \
+             patch("graph.pipeline.complete_run", AsyncMock()) as complete, \
+             patch("llm.client._generate_ollama", side_effect=slow_ollama):
+            task = asyncio.create_task(run_pipeline(cycle_type="deep_scrape"))
+            while not cancel_pipeline("run-1"):
+                await asyncio.sleep(0.01)
+            with pytest.raises(RunCancelledError):
+                await task
+    finally:
+        set_checkpointer(None)
+
+    assert complete.call_args.kwargs["status"] == "cancelled"
+    assert saver.thread_ids() == []
+
+
+# ── Context & Metrics Tests ───────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_run_context_reaches_llm_calls_in_nodes():
+    from llm.scheduler import _context
+
+    seen = []
+
+    async def classify(state):
+        seen.append(_context.get())
+        return {}
+
+    from langgraph.graph import StateGraph, START, END
+    from graph.state import PipelineState
+
+    workflow = StateGraph(PipelineState)
+    workflow.add_node("classify", classify)
+    workflow.add_edge(START, "classify")
+    workflow.add_edge("classify", END)
+
+    with llm_context(priority=PRIORITY_TIP, run_id="run-7"):
+        await workflow.compile().ainvoke({"run_id": "run-7"})
+
+    assert seen[0].priority == PRIORITY_TIP
+    assert seen[0].run_id == "run-7"
+
+
+@pytest.mark.asyncio
+async def test_metrics_report_queue_depth_and_waits():
+    scheduler = LLMScheduler(1)
+    holder = await scheduler.acquire()
+    with llm_context(priority=PRIORITY_TIP):
+        waiter = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+
+    metrics = scheduler.metrics()
+    assert metrics["queue_depth"] == 1
+    assert metrics["classes"]["tip"]["queued"] == 1
+
+    scheduler.release(holder)
+    scheduler.release(await waiter)
+    metrics = scheduler.metrics()
+    assert metrics["queue_depth"] == 0
+    assert metrics["classes"]["tip"]["dispatched"] == 1
+    assert metrics["classes"]["normal"]["dispatched"] == 1
@@ -39,10 +39,49 @@ async def test_breaking_news_detects_breaking():
         "stats": {"classified_count": 2},
     }
 
-    with patch("graph.nodes.breaking_news._send_breaking_alert", new_callable=AsyncMock):
+    async def fake_enrich(article):
+        return {"classified": article, "what": article["raw"]["title"],
+                "confidence_score": 90, "risk_flags": []}, False
+
+    with patch("graph.nodes.breaking_news._send_breaking_alerts", new_callable=AsyncMock), \
+         patch("graph.nodes.breaking_news.enrich_article", side_effect=fake_enrich), \
+         patch("graph.nodes.breaking_news.create_note",
+               AsyncMock(return_value={"field_note_id": "fn-1"})) as create:
         result = await breaking_news_node(state)
 
     assert result["stats"]["breaking_count"] == 1
+    # Fast lane: published now, and removed from the normal enrich lane
+    create.assert_awaited_once()
+    assert result["created_field_notes"] == [{"field_note_id": "fn-1"}]
+    assert [a["priority"] for a in result["classified_articles"]] == ["normal"]
+    assert result["stats"]["breaking_field_notes"] == 1
+    assert len(result["stats"]["breaking_alert_to_note_ms"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_breaking_news_flagged_goes_to_moderation():
+    from graph.nodes.breaking_news import breaking_news_node
+
+    article = {
+        "priority": "breaking",
+        "raw": {"title": "Unverified rumour", "source_name": "Forum",
+                "source_url": "https://forum.example.com/1", "raw_metadata": {}},
+    }
+    enriched = {"classified": article, "what": "Rumour", "confidence_score": 15, "risk_flags": []}
+
+    with patch("graph.nodes.breaking_news._send_breaking_alerts", new_callable=AsyncMock), \
+         patch("graph.nodes.breaking_news.enrich_article", AsyncMock(return_value=(enriched, False))), \
+         patch("graph.nodes.breaking_news.create_note", new_callable=AsyncMock) as create:
+        result = await breaking_news_node({
+            "classified_articles": [article],
+            "flagged_articles": [],
+            "stats": {},
+        })
+
+    create.assert_not_awaited()
+    assert result["flagged_articles"] == [enriched]
+    assert result["classified_articles"] == []
+    assert result["stats"]["breaking_alert_to_note_ms"] == []
 
 
 @pytest.mark.asyncio
@@ -86,44 +125,65 @@ async def test_tip_ingester_collects_approved_tips():
             "submitter_ip": "1.2.3.4",
             "related_story_id": None,
             "review_notes": "Verified by moderator",
-            "metadata": {"source": "web_form"},
+            "metadata": {"source": "web_form", "ingested": True, "ingested_at": "2026-01-01T00:00:00Z"},
+            "created_at": "2026-01-01T00:00:00Z",
         },
     ]
 
     ingester = TipIngester()
 
-    with patch("agents.tip_ingester._request", new_callable=AsyncMock) as mock_req:
-        # First call: GET approved tips
-        # Second call: PATCH to mark as ingested
-        mock_req.side_effect = [mock_tips, None]
-
+    with patch("agents.tip_ingester.claim_approved_tips", new_callable=AsyncMock) as mock_claim:
+        mock_claim.return_value = mock_tips
         articles, errors = await ingester.collect([])
 
+    # A short page means the queue is drained: one claim, no per-tip writes
+    mock_claim.assert_awaited_once_with(limit=20, after=None)
     assert len(articles) == 1
     assert len(errors) == 0
     assert "road closure" in articles[0]["body"].lower()
     assert articles[0]["source_type"] == "tip"
+    assert articles[0]["raw_metadata"]["original_metadata"] == {"source": "web_form"}
 
 
 @pytest.mark.asyncio
-async def test_tip_ingester_skips_already_ingested():
-    from agents.tip_ingester import TipIngester
+async def test_tip_ingester_pages_with_cursor():
+    from agents.tip_ingester import CLAIM_PAGE_SIZE, TipIngester
 
-    mock_tips = [
-        {
-            "id": "tip-002",
-            "content": "Already processed tip",
-            "metadata": {"ingested": True},
-        },
-    ]
+    def tips(start, count):
+        return [
+            {"id": f"tip-{i:03d}", "content": f"Tip {i}", "created_at": f"2026-01-01T00:{i:02d}:00Z"}
+            for i in range(start, start + count)
+        ]
 
+    first, second = tips(0, CLAIM_PAGE_SIZE), tips(CLAIM_PAGE_SIZE, 3)
     ingester = TipIngester()
 
-    with patch("agents.tip_ingester._request", new_callable=AsyncMock) as mock_req:
-        mock_req.return_value = mock_tips
+    with patch("agents.tip_ingester.claim_approved_tips", new_callable=AsyncMock) as mock_claim:
+        mock_claim.side_effect = [first, second]
         articles, errors = await ingester.collect([])
 
-    assert len(articles) == 0
+    assert len(articles) == CLAIM_PAGE_SIZE + 3
+    assert mock_claim.await_args_list[1].kwargs["after"] is first[-1]
+
+
+@pytest.mark.asyncio
+async def test_claim_approved_tips_uses_rpc_cursor():
+    from db.client import claim_approved_tips
+
+    rows = [
+        {"id": "b", "created_at": "2026-01-01T00:01:00Z"},
+        {"id": "a", "created_at": "2026-01-01T00:00:00Z"},
+    ]
+    with patch("db.client._request", new_callable=AsyncMock) as mock_req:
+        mock_req.return_value = rows
+        claimed = await claim_approved_tips(limit=5, after={"id": "z", "created_at": "2025-12-31T00:00:00Z"})
+
+    mock_req.assert_awaited_once_with(
+        "POST",
+        "rpc/claim_approved_tips",
+        json={"p_limit": 5, "p_after_created_at": "2025-12-31T00:00:00Z", "p_after_id": "z"},
+    )
+    assert [r["id"] for r in claimed] == ["a", "b"]
 
 
 @pytest.mark.asyncio
@@ -132,8 +192,8 @@ async def test_tip_ingester_handles_empty_queue():
 
     ingester = TipIngester()
 
-    with patch("agents.tip_ingester._request", new_callable=AsyncMock) as mock_req:
-        mock_req.return_value = []
+    with patch("agents.tip_ingester.claim_approved_tips", new_callable=AsyncMock) as mock_claim:
+        mock_claim.return_value = []
         articles, errors = await ingester.collect([])
 
     assert len(articles) == 0
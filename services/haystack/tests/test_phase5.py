@@ -37,6 +37,47 @@ def test_tier_config_unknown_falls_back():
     assert config == get_tier_config("standard")
 
 
+@pytest.mark.asyncio
+async def test_reliability_flush_seeds_per_source_and_updates_incrementally():
+    import utils.reliability as rel
+
+    rel.reset()
+    # s1 is busy (a full window of its own), s2 is quiet
+    history = {
+        "s1": [{"field_note_id": "fn"}] * 75 + [{"field_note_id": None}] * 25,
+        "s2": [{"field_note_id": None}] * 2,
+    }
+
+    async def query(columns, source_feed_id=None, limit=100, **filters):
+        return history[source_feed_id][:limit]
+
+    with patch("utils.reliability.query_crawls", new_callable=AsyncMock) as mock_query, \
+         patch("utils.reliability.update_source", new_callable=AsyncMock) as mock_update:
+        mock_query.side_effect = query
+        for source in ("s1", "s1", "s2", "s1"):
+            rel.mark_source_dirty(source)
+        scores = await rel.flush_reliability_updates()
+
+        # One window query per source, then one update per source
+        assert sorted(c.kwargs["source_feed_id"] for c in mock_query.call_args_list) == ["s1", "s2"]
+        assert mock_update.call_count == 2
+        assert scores == {"s1": 75.0, "s2": 0.0}
+        assert len(rel._windows["s2"]) == 2
+
+        # Later writes update the counters without re-reading crawl_history
+        mock_query.reset_mock()
+        mock_update.reset_mock()
+        rel.observe_crawl({"source_feed_id": "s2", "was_relevant": True, "field_note_id": "fn"})
+        rel.mark_source_dirty("s1")
+        rel.mark_source_dirty("s2")
+        scores = await rel.flush_reliability_updates()
+
+    mock_query.assert_not_called()
+    mock_update.assert_awaited_once_with("s2", {"reliability_score": 33.3})
+    assert scores == {"s2": 33.3}
+    rel.reset()
+
+
 # ── Yellow Press Quality Gate Tests ───────────────────
 
 
@@ -168,6 +209,56 @@ def test_base_agent_no_tier_no_crash():
     assert "reliability_tier" not in article["raw_metadata"]
 
 
+# ── Article Record Tests ──────────────────────────────
+
+
+def _raw_article(**overrides):
+    from graph.state import RawArticle
+
+    fields = dict(
+        source_id="src-001", source_type="api", source_url="https://example.com/a",
+        source_name="Test", title="Title", body="Body", published_at=None,
+        author=None, language="en", raw_metadata={"api_type": "generic"},
+        fetched_at="2026-01-01T00:00:00+00:00",
+    )
+    fields.update(overrides)
+    return RawArticle(**fields)
+
+
+def test_raw_article_is_slotted_mapping():
+    article = _raw_article()
+
+    assert not hasattr(article, "__dict__")
+    assert article["title"] == "Title"
+    assert article.get("missing", "default") == "default"
+    assert "source_url" in article and "_heavy" not in article
+    assert {**article}["source_name"] == "Test"
+    assert article == article.to_dict()
+
+
+def test_raw_article_compresses_heavy_metadata():
+    from graph.state import full_metadata
+
+    item = {"id": 7, "payload": "x" * 5000}
+    article = _raw_article(raw_metadata={"api_type": "generic", "raw_item": item})
+
+    assert article["raw_metadata"] == {"api_type": "generic"}
+    assert len(article._heavy) < 200
+    assert full_metadata(article) == {"api_type": "generic", "raw_item": item}
+    # Plain dict articles pass straight through
+    assert full_metadata({"raw_metadata": {"a": 1}}) == {"a": 1}
+
+
+def test_with_fields_keeps_heavy_metadata():
+    from graph.state import full_metadata, with_fields
+
+    article = _raw_article(raw_metadata={"raw_item": {"id": 1}})
+    updated = with_fields(article, raw_metadata={"syndicated_from": []})
+
+    assert article["raw_metadata"] == {}
+    assert full_metadata(updated) == {"syndicated_from": [], "raw_item": {"id": 1}}
+
+
 # ── Language Detection Tests ──────────────────────────
 
 
@@ -190,11 +281,34 @@ def test_detect_language_halfwidth_katakana():
 # ── Trends Utility Tests ─────────────────────────────
 
 
+def _crawl_row(row_id, source="s1", relevant=True, topics=(), geo_tags=(), hours_ago=1, note=None):
+    from datetime import datetime, timezone, timedelta
+
+    return {
+        "id": row_id,
+        "source_feed_id": source,
+        "was_relevant": relevant,
+        "field_note_id": note,
+        "classification_data": {"topics": list(topics), "geo_tags": list(geo_tags)},
+        "fetched_at": (datetime.now(timezone.utc) - timedelta(hours=hours_ago)).isoformat(),
+    }
+
+
+@pytest.fixture
+def analytics(tmp_path):
+    import utils.analytics as analytics
+
+    analytics.reset()
+    with patch("utils.analytics.HAYSTACK_DATA_DIR", str(tmp_path)):
+        yield analytics
+    analytics.reset()
+
+
 @pytest.mark.asyncio
-async def test_get_topic_trends_empty():
+async def test_get_topic_trends_empty(analytics):
     from utils.trends import get_topic_trends
 
-    with patch("utils.trends._request", new_callable=AsyncMock) as mock_req:
+    with patch("utils.analytics.query_crawls", new_callable=AsyncMock) as mock_req:
         mock_req.return_value = []
         result = await get_topic_trends()
 
@@ -202,16 +316,16 @@ async def test_get_topic_trends_empty():
 
 
 @pytest.mark.asyncio
-async def test_get_topic_trends_counts():
+async def test_get_topic_trends_counts(analytics):
     from utils.trends import get_topic_trends
 
     mock_records = [
-        {"classification_data": {"topics": ["tourism", "snow_conditions"]}, "source_feed_id": "s1"},
-        {"classification_data": {"topics": ["tourism"]}, "source_feed_id": "s2"},
-        {"classification_data": {"topics": ["tourism", "events"]}, "source_feed_id": "s3"},
+        _crawl_row("c1", "s1", topics=["tourism", "snow_conditions"]),
+        _crawl_row("c2", "s2", topics=["tourism"]),
+        _crawl_row("c3", "s3", topics=["tourism", "events"]),
     ]
 
-    with patch("utils.trends._request", new_callable=AsyncMock) as mock_req:
+    with patch("utils.analytics.query_crawls", new_callable=AsyncMock) as mock_req:
         mock_req.return_value = mock_records
         result = await get_topic_trends(min_count=2)
 
@@ -222,16 +336,16 @@ async def test_get_topic_trends_counts():
 
 
 @pytest.mark.asyncio
-async def test_get_geo_trends():
+async def test_get_geo_trends(analytics):
     from utils.trends import get_geo_trends
 
     mock_records = [
-        {"classification_data": {"geo_tags": ["niseko", "kutchan"]}},
-        {"classification_data": {"geo_tags": ["niseko"]}},
-        {"classification_data": {"geo_tags": ["hirafu"]}},
+        _crawl_row("c1", geo_tags=["niseko", "kutchan"]),
+        _crawl_row("c2", geo_tags=["niseko"]),
+        _crawl_row("c3", geo_tags=["hirafu"]),
     ]
 
-    with patch("utils.trends._request", new_callable=AsyncMock) as mock_req:
+    with patch("utils.analytics.query_crawls", new_callable=AsyncMock) as mock_req:
         mock_req.return_value = mock_records
         result = await get_geo_trends()
 
@@ -240,6 +354,125 @@ async def test_get_geo_trends():
     assert niseko["count"] == 2
 
 
+@pytest.mark.asyncio
+async def test_trends_window_excludes_old_buckets(analytics):
+    from utils.trends import get_topic_trends
+
+    mock_records = [
+        _crawl_row("c1", topics=["weather"], hours_ago=30),
+        _crawl_row("c2", topics=["weather"], hours_ago=2),
+        _crawl_row("c3", topics=["weather"], hours_ago=1),
+    ]
+
+    with patch("utils.analytics.query_crawls", new_callable=AsyncMock) as mock_req:
+        mock_req.return_value = mock_records
+        day = await get_topic_trends(hours=24)
+        week = await get_topic_trends(hours=168)
+
+    assert day[0]["count"] == 2
+    assert week[0]["count"] == 3
+    mock_req.assert_called_once()  # Catch-up happens once, then answers from memory
+
+
+@pytest.mark.asyncio
+async def test_get_source_stats_single_query(analytics):
+    from utils.trends import get_source_stats
+
+    sources = [{"id": "s1", "name": "Town", "source_type": "rss"}]
+    rows = [
+        _crawl_row("c1", "s1", note="fn-1"),
+        _crawl_row("c2", "s1", relevant=False),
+    ]
+
+    with patch("utils.trends.get_active_sources", new_callable=AsyncMock) as mock_sources, \
+         patch("utils.analytics.query_crawls", new_callable=AsyncMock) as mock_req:
+        mock_sources.return_value = sources
+        mock_req.return_value = rows
+        result = await get_source_stats()
+
+    mock_sources.assert_called_once()
+    assert result[0]["recent_crawled"] == 2
+    assert result[0]["recent_relevant"] == 1
+    assert result[0]["recent_published"] == 1
+
+
+@pytest.mark.asyncio
+async def test_analytics_live_writes_and_snapshot(analytics):
+    """Writes buffered during catch-up are not double counted; snapshot round-trips."""
+    row = _crawl_row("c1", topics=["weather"])
+    analytics.observe(row)  # Written before the store caught up
+
+    with patch("utils.analytics.query_crawls", new_callable=AsyncMock) as mock_req:
+        mock_req.return_value = [row]
+        store = await analytics.ensure_ready()
+        analytics.observe(_crawl_row("c2", topics=["weather"]))
+        await analytics.save_snapshot()
+
+    assert store.topic_counts(24)[0]["weather"] == 2
+
+    analytics.reset()
+    with patch("utils.analytics.query_crawls", new_callable=AsyncMock) as mock_req:
+        mock_req.return_value = []
+        store = await analytics.ensure_ready()
+
+    assert store.topic_counts(24)[0]["weather"] == 2
+    assert mock_req.call_args.kwargs["since"] == store.high_water
+
+
+def test_trend_engine_burst_and_velocity():
+    from utils.trend_engine import TrendEngine
+
+    engine = TrendEngine()
+    now = 1_700_000_000.0
+    # Steady: one event a day for a week
+    for day in range(7):
+        engine.add("events", now - day * 86400)
+    # Burst: ten events in the last hour
+    for minute in range(10):
+        engine.add("avalanche", now - minute * 300)
+
+    steady = engine.score("events", now)
+    burst = engine.score("avalanche", now)
+
+    assert burst["burst_z"] > 3.0
+    assert burst["velocity"] > 0
+    assert steady["burst_z"] < burst["burst_z"]
+    assert burst["counts"]["1h"] > steady["counts"]["1h"]
+
+
+def test_trend_engine_late_events_and_eviction():
+    from utils.trend_engine import TrendEngine
+
+    now = 1_700_000_000.0
+    in_order, late = TrendEngine(), TrendEngine()
+    for ts in (now - 7200, now - 3600, now):
+        in_order.add("snow", ts)
+    for ts in (now, now - 7200, now - 3600):
+        late.add("snow", ts)
+    assert in_order.score("snow", now) == late.score("snow", now)
+
+    bounded = TrendEngine(max_keys=2)
+    bounded.add("old", now - 6 * 86400)
+    bounded.add("a", now)
+    bounded.add("b", now)
+    assert len(bounded) == 2
+    assert bounded.score("old") is None
+
+
+@pytest.mark.asyncio
+async def test_get_topic_trends_marks_burst_hot(analytics):
+    from utils.trends import get_topic_trends
+
+    rows = [_crawl_row(f"c{i}", f"s{i % 3}", topics=["avalanche"], hours_ago=0) for i in range(6)]
+
+    with patch("utils.analytics.query_crawls", new_callable=AsyncMock) as mock_req:
+        mock_req.return_value = rows
+        result = await get_topic_trends()
+
+    assert result[0]["trend"] == "hot"
+    assert result[0]["burst_z"] >= 3.0
+
+
 # ── Adaptive Threshold Tests ────────────────────────
 
 
@@ -286,9 +519,12 @@ def test_adaptive_threshold_ignores_unknown_topics():
 @pytest.mark.asyncio
 async def test_refresh_topic_thresholds_high_acceptance():
     """Topics with >60% acceptance should get lower thresholds."""
+    import utils.adaptive_threshold as at
     from utils.adaptive_threshold import refresh_topic_thresholds
     from config import MIN_RELEVANCE_SCORE
 
+    at.reset()
+
     # 8 published out of 10 = 80% acceptance → should lower threshold
     mock_records = [
         {"classification_data": {"topics": ["tourism"]}, "field_note_id": f"fn-{i}"}
@@ -298,7 +534,7 @@ async def test_refresh_topic_thresholds_high_acceptance():
         for _ in range(2)
     ]
 
-    with patch("utils.adaptive_threshold._request", new_callable=AsyncMock) as mock_req:
+    with patch("utils.adaptive_threshold.query_crawls", new_callable=AsyncMock) as mock_req:
         mock_req.return_value = mock_records
         thresholds = await refresh_topic_thresholds()
 
@@ -309,9 +545,12 @@ async def test_refresh_topic_thresholds_high_acceptance():
 @pytest.mark.asyncio
 async def test_refresh_topic_thresholds_low_acceptance():
     """Topics with <20% acceptance should get higher thresholds."""
+    import utils.adaptive_threshold as at
     from utils.adaptive_threshold import refresh_topic_thresholds
     from config import MIN_RELEVANCE_SCORE
 
+    at.reset()
+
     # 1 published out of 10 = 10% acceptance → should raise threshold
     mock_records = [
         {"classification_data": {"topics": ["gossip"]}, "field_note_id": "fn-1"}
@@ -320,7 +559,7 @@ async def test_refresh_topic_thresholds_low_acceptance():
         for _ in range(9)
     ]
 
-    with patch("utils.adaptive_threshold._request", new_callable=AsyncMock) as mock_req:
+    with patch("utils.adaptive_threshold.query_crawls", new_callable=AsyncMock) as mock_req:
         mock_req.return_value = mock_records
         thresholds = await refresh_topic_thresholds()
 
@@ -331,15 +570,47 @@ async def test_refresh_topic_thresholds_low_acceptance():
 @pytest.mark.asyncio
 async def test_refresh_topic_thresholds_skips_low_data():
     """Topics with fewer than 10 data points should be skipped."""
+    import utils.adaptive_threshold as at
     from utils.adaptive_threshold import refresh_topic_thresholds
 
+    at.reset()
+
     mock_records = [
         {"classification_data": {"topics": ["rare_topic"]}, "field_note_id": None}
         for _ in range(5)
     ]
 
-    with patch("utils.adaptive_threshold._request", new_callable=AsyncMock) as mock_req:
+    with patch("utils.adaptive_threshold.query_crawls", new_callable=AsyncMock) as mock_req:
         mock_req.return_value = mock_records
         thresholds = await refresh_topic_thresholds()
 
     assert "rare_topic" not in thresholds
+
+
+@pytest.mark.asyncio
+async def test_refresh_topic_thresholds_incremental():
+    """After seeding, crawl writes slide the window without re-reading crawl_history."""
+    import utils.adaptive_threshold as at
+    from config import MIN_RELEVANCE_SCORE
+
+    at.reset()
+    seed = [{"classification_data": {"topics": ["events"]}, "field_note_id": None} for _ in range(10)]
+
+    with patch("utils.adaptive_threshold.query_crawls", new_callable=AsyncMock) as mock_req, \
+         patch.object(at, "WINDOW_SIZE", 10):
+        mock_req.return_value = seed
+        first = await at.refresh_topic_thresholds()
+        for i in range(10):
+            at.observe_crawl({
+                "was_relevant": True,
+                "classification_data": {"topics": ["events"]},
+                "field_note_id": f"fn-{i}",
+            })
+        at.observe_crawl({"was_relevant": False, "classification_data": {"topics": ["events"]}})
+        second = await at.refresh_topic_thresholds()
+
+    mock_req.assert_called_once()
+    assert first["events"] > MIN_RELEVANCE_SCORE
+    assert second["events"] < MIN_RELEVANCE_SCORE  # Window now all published
+    assert at._topic_stats["events"] == [10, 10]
+    at.reset()
@@ -141,3 +141,98 @@ def test_after_field_notes_routes_to_archive():
     from graph.pipeline import _route_after_field_notes
     state = {"flagged_articles": []}
     assert _route_after_field_notes(state) == "archive"
+
+
+# ── Source Status Write-Back Tests ────────────────────
+
+
+@pytest.mark.asyncio
+async def test_collect_node_tracks_source_status():
+    from graph.nodes.collect import collect_node
+
+    sources = [
+        {"id": "s1", "name": "Good", "source_type": "rss"},
+        {"id": "s2", "name": "Broken", "source_type": "rss"},
+    ]
+
+    with patch("graph.nodes.collect._agents") as mock_agents:
+        agent = AsyncMock()
+        agent.collect.return_value = ([], [{"source_id": "s2", "error": "HTTP 500"}])
+        mock_agents.get.return_value = agent
+
+        result = await collect_node({"_sources": sources, "cycle_type": "main"})
+
+    status = result["_source_status"]
+    assert status["s1"]["error"] is None
+    assert status["s2"]["error"] == "HTTP 500"
+
+
+@pytest.mark.asyncio
+async def test_deep_scrape_cycle_enables_deep_fetch():
+    from graph.nodes.collect import collect_node
+
+    sources = [
+        {"id": "s1", "name": "Heavy", "source_type": "scrape", "config": {"max_entries": 5}},
+        {"id": "s2", "name": "Opted out", "source_type": "scrape", "config": {"deep_fetch": False}},
+    ]
+
+    with patch("graph.nodes.collect._agents") as mock_agents:
+        agent = AsyncMock()
+        agent.collect.return_value = ([], [])
+        mock_agents.get.return_value = agent
+
+        await collect_node({"_sources": sources, "cycle_type": "deep_scrape"})
+
+    configs = [s["config"] for s in agent.collect.call_args.args[0]]
+    assert configs == [{"deep_fetch": True, "max_entries": 5}, {"deep_fetch": False}]
+
+
+@pytest.mark.asyncio
+async def test_collect_warms_only_scraper_hosts_through_robots():
+    from graph.nodes.collect import collect_node
+    from utils.robots import prefetch
+
+    sources = [
+        {"id": "s1", "name": "Feed", "source_type": "rss", "url": "https://feeds.example.com/rss"},
+        {"id": "s2", "name": "Town", "source_type": "scrape", "url": "https://town.example.jp/news"},
+        {"id": "s3", "name": "Reddit", "source_type": "social", "url": "https://reddit.com/r/niseko"},
+    ]
+
+    with patch("graph.nodes.collect._agents") as mock_agents, \
+         patch("graph.nodes.collect.warm_up", new_callable=AsyncMock) as mock_warm:
+        mock_agents.get.return_value.collect = AsyncMock(return_value=([], []))
+        mock_warm.return_value = {}
+        await collect_node({"_sources": sources, "cycle_type": "main"})
+
+    mock_warm.assert_awaited_once_with(
+        ["https://feeds.example.com/rss"], probe_urls=["https://town.example.jp/news"], probe=prefetch,
+    )
+
+
+@pytest.mark.asyncio
+async def test_complete_run_coalesces_source_writes():
+    import db.client as db
+    from db.supabase_backend import SupabaseBackend
+
+    status = {
+        "s1": {"fetched_at": "2025-01-01T00:00:00+00:00", "error": None},
+        "s2": {"fetched_at": "2025-01-01T00:00:00+00:00", "error": None},
+        "s3": {"fetched_at": "2025-01-01T00:00:00+00:00", "error": "timeout"},
+    }
+    sources = [{"id": "s1"}, {"id": "s2"}, {"id": "s3", "consecutive_errors": 2}]
+
+    db.set_backend(SupabaseBackend())
+    try:
+        with patch("db.supabase_backend._request", new_callable=AsyncMock) as mock_req:
+            await db.complete_run("run-1", stats={}, errors=[], sources_polled=[],
+                                  source_status=status, sources=sources)
+    finally:
+        db.set_backend(None)
+
+    assert mock_req.call_count == 3
+    bulk, failed, run = mock_req.call_args_list
+    assert bulk.args[1] == "source_feeds?id=in.(s1,s2)"
+    assert bulk.kwargs["json"]["consecutive_errors"] == 0
+    assert failed.args[1] == "source_feeds?id=in.(s3)"
+    assert failed.kwargs["json"]["consecutive_errors"] == 3
+    assert run.args[1] == "pipeline_runs?id=eq.run-1"
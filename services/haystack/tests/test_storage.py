@@ -0,0 +1,207 @@
+"""Tests for the pluggable storage layer (embedded SQLite backend)."""
+
+import pytest
+
+
+@pytest.fixture
+def sqlite_backend():
+    import db.client as db
+    from db.sqlite_backend import SQLiteBackend
+
+    backend = SQLiteBackend(":memory:")
+    db.set_backend(backend)
+    yield backend
+    db.set_backend(None)
+
+
+@pytest.mark.asyncio
+async def test_sqlite_active_sources_order_and_filter(sqlite_backend):
+    from db.client import get_active_sources
+
+    sqlite_backend.upsert_source({"id": "s1", "name": "Old", "source_type": "rss",
+                                  "last_fetched_at": "2025-01-02T00:00:00+00:00"})
+    sqlite_backend.upsert_source({"id": "s2", "name": "Never", "source_type": "rss",
+                                  "config": {"max_entries": 5}})
+    sqlite_backend.upsert_source({"id": "s3", "name": "Scraper", "source_type": "scrape"})
+    sqlite_backend.upsert_source({"id": "s4", "name": "Off", "source_type": "rss", "is_active": 0})
+
+    sources = await get_active_sources(source_type="rss")
+
+    assert [s["id"] for s in sources] == ["s2", "s1"]
+    assert sources[0]["config"] == {"max_entries": 5}
+    assert sources[0]["is_active"] is True
+
+
+@pytest.mark.asyncio
+async def test_sqlite_crawl_roundtrip_and_duplicate_check(sqlite_backend):
+    from unittest.mock import patch
+    from db.client import check_duplicate, record_crawl
+
+    with patch("db.client._notify_crawl_written"):
+        row = await record_crawl(
+            source_feed_id="s1", source_url="https://example.com/a",
+            content_fingerprint="ab" * 8, pipeline_run_id="run-1",
+            raw_data={"title": "ニセコ"}, was_relevant=True, field_note_id="fn-1",
+        )
+
+    match = await check_duplicate("ab" * 8)
+    assert match == {"id": row["id"], "source_url": "https://example.com/a", "field_note_id": "fn-1"}
+    assert await check_duplicate("cd" * 8) is None
+
+
+@pytest.mark.asyncio
+async def test_sqlite_run_lifecycle_and_moderation(sqlite_backend):
+    from db.client import complete_run, create_moderation_item, create_run
+
+    run = await create_run("manual")
+    await complete_run(run["id"], stats={"raw": 3}, errors=[], sources_polled=["A"])
+    item = await create_moderation_item("Flagged", metadata={"reason": "risk"})
+
+    stored = sqlite_backend._conn.execute(
+        "SELECT status, stats FROM pipeline_runs WHERE id = ?", (run["id"],)
+    ).fetchone()
+    assert stored["status"] == "completed"
+    assert stored["stats"] == '{"raw": 3}'
+    assert item["status"] == "pending"
+
+
+@pytest.mark.asyncio
+async def test_sqlite_serves_run_and_history_reads(sqlite_backend):
+    """Runs, analytics catch-up and reliability windows read the local database."""
+    from unittest.mock import patch
+    from db.client import create_run, get_recent_runs, get_run_by_id, record_crawls
+    from utils.reliability import _source_window
+
+    first = await create_run("manual")
+    second = await create_run("scheduled")
+    with patch("db.client._notify_crawl_written"):
+        await record_crawls([
+            {"source_feed_id": "s1", "source_url": f"https://example.com/{i}",
+             "content_fingerprint": f"fp-{i}", "pipeline_run_id": first["id"],
+             "raw_data": {}, "was_relevant": i != 1, "field_note_id": "fn" if i == 2 else None}
+            for i in range(3)
+        ])
+
+    assert (await get_run_by_id(first["id"]))["run_type"] == "manual"
+    assert [r["id"] for r in await get_recent_runs(limit=5)] == [second["id"], first["id"]]
+    assert await get_run_by_id("missing") is None
+
+    rows = await sqlite_backend.query_crawls(
+        ["source_url", "was_relevant"], since="2000-01-01", newest_first=False, limit=2, offset=1
+    )
+    assert [r["source_url"] for r in rows] == ["https://example.com/1", "https://example.com/2"]
+    assert rows[0]["was_relevant"] is False
+    assert sorted(await _source_window("s1")) == [False, True]
+
+
+@pytest.mark.asyncio
+async def test_moderation_sender_bulk_inserts_and_links_crawls(sqlite_backend):
+    from unittest.mock import AsyncMock, patch
+    from graph.nodes.moderation_sender import moderation_sender_node
+
+    def flagged(n):
+        raw = {"source_id": "s1", "source_url": f"https://example.com/{n}", "title": f"Story {n}",
+               "source_name": "Test", "raw_metadata": {"feed": "rss"}}
+        classified = {"raw": raw, "content_fingerprint": f"fp-{n}", "topics": ["events"],
+                      "relevance_score": 0.7, "priority": "normal"}
+        return {"classified": classified, "what": f"Story {n}", "confidence_score": 20,
+                "risk_flags": [{"type": "high_defamation_risk"}]}
+
+    spy = AsyncMock(wraps=sqlite_backend.insert_moderation_items)
+    with patch.object(sqlite_backend, "insert_moderation_items", spy), \
+         patch.object(sqlite_backend, "insert_moderation_item") as single, \
+         patch("db.client._notify_crawl_written"):
+        result = await moderation_sender_node({
+            "run_id": "run-1", "flagged_articles": [flagged(1), flagged(2)], "stats": {},
+        })
+
+    assert result["stats"]["moderation_sent_count"] == 2
+    spy.assert_awaited_once()
+    single.assert_not_called()
+    links = sqlite_backend._conn.execute(
+        "SELECT c.content_fingerprint, m.type FROM crawl_history c"
+        " JOIN moderation_queue m ON m.id = c.moderation_item_id ORDER BY 1"
+    ).fetchall()
+    assert [tuple(r) for r in links] == [("fp-1", "haystack_flagged"), ("fp-2", "haystack_flagged")]
+
+
+@pytest.mark.asyncio
+async def test_breaking_alerts_share_one_insert(sqlite_backend):
+    from unittest.mock import AsyncMock, patch
+    from graph.nodes.breaking_news import _send_breaking_alerts
+
+    articles = [
+        {"raw": {"title": f"Alert {n}", "source_name": "NHK", "source_url": f"https://nhk.or.jp/{n}"},
+         "topics": ["safety"], "relevance_score": 0.9}
+        for n in range(3)
+    ]
+    spy = AsyncMock(wraps=sqlite_backend.insert_moderation_items)
+    with patch.object(sqlite_backend, "insert_moderation_items", spy):
+        await _send_breaking_alerts(articles)
+
+    spy.assert_awaited_once()
+    rows = sqlite_backend._conn.execute(
+        "SELECT type, metadata FROM moderation_queue ORDER BY created_at"
+    ).fetchall()
+    assert [r["type"] for r in rows] == ["breaking_alert"] * 3
+    assert '"alert_type": "breaking_news"' in rows[0]["metadata"]
+
+
+@pytest.mark.asyncio
+async def test_resumed_run_does_not_repeat_notes_or_alerts(sqlite_backend):
+    """Re-running the note and alert writes of a run (resume) creates nothing twice."""
+    from unittest.mock import AsyncMock, patch
+    from db.client import idempotency_id
+    from graph.nodes.breaking_news import _send_breaking_alerts
+    from graph.nodes.field_note_creator import create_note
+
+    raw = {"source_id": "s1", "source_url": "https://nhk.or.jp/1", "title": "Alert",
+           "source_name": "NHK", "body": "Body"}
+    classified = {"raw": raw, "content_fingerprint": "fp-1", "topics": ["safety"], "geo_tags": [],
+                  "priority": "breaking", "relevance_score": 0.9}
+    enriched = {"classified": classified, "what": "Alert", "confidence_score": 80}
+
+    for _ in range(2):
+        await _send_breaking_alerts([classified], "run-1")
+    alerts = sqlite_backend._conn.execute("SELECT id FROM moderation_queue").fetchall()
+    assert [r["id"] for r in alerts] == [idempotency_id("run-1", "breaking_alert", "fp-1")]
+
+    note_id = idempotency_id("run-1", "field_note", "fp-1")
+    with patch("graph.nodes.field_note_creator.create_field_note",
+               AsyncMock(return_value={"id": note_id})) as create, \
+         patch("graph.nodes.field_note_creator.mark_source_dirty"), \
+         patch("db.client._notify_crawl_written"):
+        first = await create_note(enriched, "run-1")
+        second = await create_note(enriched, "run-1")
+
+    create.assert_awaited_once()
+    assert create.call_args.kwargs["field_note_id"] == note_id
+    assert first == second
+    assert sqlite_backend._conn.execute("SELECT COUNT(*) FROM crawl_history").fetchone()[0] == 1
+
+
+@pytest.mark.asyncio
+async def test_resumed_run_does_not_requeue_flagged_articles(sqlite_backend):
+    from unittest.mock import patch
+    from db.client import idempotency_id
+    from graph.nodes.moderation_sender import moderation_sender_node
+
+    raw = {"source_id": "s1", "source_url": "https://example.com/1", "title": "Story",
+           "source_name": "Test"}
+    classified = {"raw": raw, "content_fingerprint": "fp-1", "topics": [], "relevance_score": 0.7}
+    state = {"run_id": "run-1", "stats": {}, "flagged_articles": [
+        {"classified": classified, "what": "Story", "confidence_score": 20, "risk_flags": []},
+    ]}
+
+    with patch("db.client._notify_crawl_written"):
+        # Interrupted after the queue insert, before the crawl record
+        with patch("graph.nodes.moderation_sender.write_crawl_records"):
+            await moderation_sender_node(state)
+        first = await moderation_sender_node(state)
+        second = await moderation_sender_node(state)
+
+    assert first["stats"]["moderation_sent_count"] == second["stats"]["moderation_sent_count"] == 1
+    queued = sqlite_backend._conn.execute("SELECT id FROM moderation_queue").fetchall()
+    assert [r["id"] for r in queued] == [idempotency_id("run-1", "moderation", "fp-1")]
+    links = sqlite_backend._conn.execute("SELECT moderation_item_id FROM crawl_history").fetchall()
+    assert [r[0] for r in links] == [queued[0]["id"]]
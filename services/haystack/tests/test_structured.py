@@ -0,0 +1,97 @@
+"""Tests for JSON-LD / OpenGraph / microdata article extraction."""
+
+from utils.structured import articles_from_html, normalize_date, page_article
+
+LISTING_HTML = """<html><head>
+<script type="application/ld+json">
+{"@context": "https://schema.org", "@graph": [
+  {"@type": "WebSite", "name": "Niseko Town"},
+  {"@type": "ItemList", "itemListElement": [
+    {"@type": "ListItem", "position": 1, "item": {
+      "@type": "NewsArticle", "headline": "Road closure on Route 5",
+      "url": "/news/route-5", "datePublished": "2025-02-10T09:00:00+09:00",
+      "description": "Route 5 closed for snow clearing.",
+      "author": {"@type": "Organization", "name": "Niseko Town Office"}}},
+    {"@type": "ListItem", "position": 2, "item": {
+      "@type": ["BlogPosting"], "headline": "Festival &amp; fireworks",
+      "url": "https://example.com/news/festival", "datePublished": "2025-02-11"}}
+  ]}
+]}
+</script>
+</head><body><p>Listing</p></body></html>"""
+
+ARTICLE_HTML = """<html><head>
+<meta property="og:type" content="article">
+<meta property="og:title" content="Gondola hours extended">
+<meta property="og:description" content="Night skiing until 8pm.">
+<meta property="article:published_time" content="2025-02-12T08:30:00Z">
+<script type="application/ld+json">
+{"@type": "NewsArticle", "headline": "Gondola hours extended",
+ "articleBody": "<p>The gondola will run until 8pm.</p><p>Lift tickets are unchanged.</p>"}
+</script>
+</head><body><h1>Gondola hours extended</h1></body></html>"""
+
+MICRODATA_HTML = """<html><body>
+<div itemscope itemtype="https://schema.org/NewsArticle">
+  <h1 itemprop="headline">Snowfall record broken</h1>
+  <time itemprop="datePublished" datetime="2025-01-30T07:00:00+09:00">Jan 30</time>
+  <span itemprop="author" itemscope itemtype="https://schema.org/Person">
+    <span itemprop="name">K. Sato</span></span>
+  <div itemprop="articleBody"><p>Kutchan recorded 2.1m of snow in January.</p></div>
+</div>
+</body></html>"""
+
+
+# ── Listing Tests ─────────────────────────────────────
+
+
+def test_articles_from_json_ld_graph_and_item_list():
+    articles = articles_from_html(LISTING_HTML, "https://example.com/news/")
+
+    assert [a.title for a in articles] == ["Road closure on Route 5", "Festival & fireworks"]
+    assert articles[0].url == "https://example.com/news/route-5"
+    assert articles[0].published_at == "2025-02-10T09:00:00+09:00"
+    assert articles[0].author == "Niseko Town Office"
+    assert articles[1].published_at == "2025-02-11T00:00:00"
+    assert all(a.method == "json_ld" and a.in_list for a in articles)
+
+
+def test_articles_from_html_ignores_broken_json_ld():
+    page = '<script type="application/ld+json">{"@type": "NewsArticle",</script>'
+    assert articles_from_html(page, "https://example.com/") == []
+
+
+def test_articles_from_microdata():
+    articles = articles_from_html(MICRODATA_HTML, "https://example.com/snow")
+
+    assert len(articles) == 1
+    assert articles[0].title == "Snowfall record broken"
+    assert articles[0].author == "K. Sato"
+    assert articles[0].body == "Kutchan recorded 2.1m of snow in January."
+    assert articles[0].method == "microdata"
+    assert not articles[0].in_list
+
+
+# ── Page Tests ────────────────────────────────────────
+
+
+def test_page_article_merges_json_ld_and_opengraph():
+    article = page_article(ARTICLE_HTML, "https://example.com/gondola")
+
+    assert article.method == "json_ld"
+    assert "The gondola will run until 8pm." in article.body
+    assert "<p>" not in article.body
+    assert article.description == "Night skiing until 8pm."
+    assert article.published_at == "2025-02-12T08:30:00+00:00"
+
+
+def test_page_article_skips_non_article_opengraph():
+    page = '<meta property="og:type" content="website"><meta property="og:title" content="Home">'
+    assert page_article(page, "https://example.com/") is None
+
+
+def test_normalize_date():
+    assert normalize_date("2025-02-10T01:00:00Z") == "2025-02-10T01:00:00+00:00"
+    assert normalize_date(["2025-02-10"]) == "2025-02-10T00:00:00"
+    assert normalize_date("February 10, 2025") is None
+    assert normalize_date(None) is None
@@ -0,0 +1,127 @@
+"""Tests for push-based tip ingestion (micro-batching and the tips sweep)."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from tip_events import LocalTipEvents, TipBatcher
+
+
+# ── Micro-batching Tests ──────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_burst_of_tips_triggers_one_run():
+    runs = []
+
+    async def run(batch):
+        runs.append(batch)
+
+    batcher = TipBatcher(run, window=0.01)
+    for tip_id in ("t1", "t2", "t3", "t2"):
+        batcher.notify(tip_id)
+    await asyncio.sleep(0.05)
+
+    assert runs == [{"t1", "t2", "t3"}]
+    assert batcher.status()["batches"] == 1
+    assert batcher.status()["events"] == 4
+
+
+@pytest.mark.asyncio
+async def test_tips_during_a_run_get_one_follow_up_run():
+    runs = []
+    release = asyncio.Event()
+
+    async def run(batch):
+        runs.append(batch)
+        if len(runs) == 1:
+            await release.wait()
+
+    batcher = TipBatcher(run, window=0.01)
+    batcher.notify("t1")
+    await asyncio.sleep(0.03)
+    batcher.notify("t2")
+    batcher.notify("t3")
+    release.set()
+    await asyncio.sleep(0.05)
+
+    assert runs == [{"t1"}, {"t2", "t3"}]
+
+
+@pytest.mark.asyncio
+async def test_failed_run_does_not_stop_batching():
+    runs = []
+
+    async def run(batch):
+        runs.append(batch)
+        if len(runs) == 1:
+            raise RuntimeError("pipeline down")
+
+    batcher = TipBatcher(run, window=0.01)
+    batcher.notify("t1")
+    await asyncio.sleep(0.03)
+    batcher.notify("t2")
+    await asyncio.sleep(0.03)
+
+    assert runs == [{"t1"}, {"t2"}]
+
+
+# ── Lifecycle Tests ───────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_local_events_trigger_tips_pipeline():
+    import tip_events
+
+    source = LocalTipEvents()
+    with patch("tip_events.TIP_BATCH_WINDOW_SECONDS", 0.01), \
+         patch("graph.pipeline.run_pipeline", new_callable=AsyncMock) as mock_run:
+        mock_run.return_value = {"stats": {"field_notes_created": 1}}
+        assert await tip_events.start_tip_events(source) is True
+        try:
+            source.publish("tip-1")
+            await asyncio.sleep(0.05)
+            assert tip_events.get_tip_events_status()["batches"] == 1
+        finally:
+            await tip_events.stop_tip_events()
+
+    mock_run.assert_awaited_once_with(run_type="event", cycle_type="tips")
+    assert tip_events.get_tip_events_status() == {"mode": "poll"}
+
+
+@pytest.mark.asyncio
+async def test_poll_mode_does_not_subscribe():
+    import tip_events
+
+    with patch("tip_events.TIP_INGESTION_MODE", "poll"):
+        assert await tip_events.start_tip_events() is False
+
+
+# ── Tips Sweep Tests ──────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_tips_job_skips_pipeline_when_nothing_pending():
+    from scheduler import _run_tips_cycle
+
+    with patch("db.client.has_pending_tips", AsyncMock(return_value=False)), \
+         patch("scheduler._run_cycle", new_callable=AsyncMock) as mock_cycle:
+        await _run_tips_cycle()
+
+    mock_cycle.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_tips_job_runs_when_tips_pending_or_check_fails():
+    from scheduler import _run_tips_cycle
+
+    with patch("db.client.has_pending_tips", AsyncMock(return_value=True)), \
+         patch("scheduler._run_cycle", new_callable=AsyncMock) as mock_cycle:
+        await _run_tips_cycle()
+    mock_cycle.assert_awaited_once_with("tips")
+
+    with patch("db.client.has_pending_tips", AsyncMock(side_effect=RuntimeError("down"))), \
+         patch("scheduler._run_cycle", new_callable=AsyncMock) as mock_cycle:
+        await _run_tips_cycle()
+    mock_cycle.assert_awaited_once_with("tips")
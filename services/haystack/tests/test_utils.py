@@ -43,6 +43,28 @@ def test_hamming_distance():
     assert hamming_distance("f0", "0f") == 8
 
 
+# ── Persistence Tests ─────────────────────────────────
+
+
+def test_write_json_atomic(tmp_path):
+    import json
+    import os
+    from utils.persist import write_json_atomic
+
+    path = str(tmp_path / "state" / "data.json")
+    write_json_atomic(path, {"a": 1})
+    write_json_atomic(path, {"a": 2})
+    with open(path) as f:
+        assert json.load(f) == {"a": 2}
+
+    # A failed dump leaves the old file and no temp files behind
+    with pytest.raises(TypeError):
+        write_json_atomic(path, {"a": object()})
+    with open(path) as f:
+        assert json.load(f) == {"a": 2}
+    assert os.listdir(os.path.dirname(path)) == ["data.json"]
+
+
 # ── Text Utils Tests ──────────────────────────────────
 
 
@@ -105,6 +127,122 @@ async def test_rate_limiter_per_domain():
     # Both should succeed without blocking
 
 
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_requests_without_polling():
+    import time
+    from utils.rate_limiter import RateLimiter
+    limiter = RateLimiter(default_rate=20.0, default_burst=1)
+
+    with patch("utils.rate_limiter.asyncio.sleep", wraps=asyncio.sleep) as mock_sleep:
+        started = time.monotonic()
+        await asyncio.gather(*(limiter.acquire("https://example.com/p") for _ in range(3)))
+        elapsed = time.monotonic() - started
+
+    assert 0.09 <= elapsed < 0.3
+    # One exact sleep per waiting request
+    assert mock_sleep.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_aimd_and_retry_after():
+    import time
+    from utils.rate_limiter import INCREASE_STEP, RateLimiter
+    limiter = RateLimiter(default_rate=100.0, default_burst=1)
+    url = "https://busy.example.com/page"
+
+    await limiter.acquire(url)
+    await limiter.record_response(url, 429)
+    await limiter.record_response(url, 429)  # same interval: one decrease
+    assert limiter.stats()["busy.example.com"]["factor"] == 0.5
+
+    await limiter.record_response(url, 200)
+    assert limiter.stats()["busy.example.com"]["factor"] == 0.5 + INCREASE_STEP
+
+    # Overriding the rate keeps the backoff
+    limiter.set_domain_rate("busy.example.com", rate=50.0)
+    assert limiter.stats()["busy.example.com"]["factor"] == 0.5 + INCREASE_STEP
+
+    await asyncio.sleep(0.05)
+    await limiter.record_response(url, 503, retry_after="0.2")
+    started = time.monotonic()
+    await limiter.acquire(url)
+    assert time.monotonic() - started >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_caps_concurrency_per_domain():
+    from utils.rate_limiter import RateLimiter
+    limiter = RateLimiter(default_rate=1000.0, default_burst=10, max_concurrency=2)
+    in_flight = peak = 0
+
+    async def fetch(url):
+        nonlocal in_flight, peak
+        async with limiter.limit(url):
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    await asyncio.gather(*(fetch("https://example.com/p") for _ in range(6)))
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_shared_state_across_workers(tmp_path):
+    import time
+    from utils.rate_limiter import RateLimiter, SQLiteRateState
+    path = str(tmp_path / "limits.db")
+    worker_a = RateLimiter(default_rate=10.0, default_burst=1, state=SQLiteRateState(path))
+    worker_b = RateLimiter(default_rate=10.0, default_burst=1, state=SQLiteRateState(path))
+
+    await worker_a.acquire("https://example.com/a")
+    started = time.monotonic()
+    await worker_b.acquire("https://example.com/b")
+
+    # Worker B waits for the slot worker A just used
+    assert time.monotonic() - started >= 0.08
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_waits_for_locked_state_off_the_event_loop(tmp_path):
+    import sqlite3
+    import time
+    from utils.rate_limiter import RateLimiter, SQLiteRateState
+    path = str(tmp_path / "limits.db")
+    limiter = RateLimiter(default_rate=10.0, default_burst=1, state=SQLiteRateState(path))
+
+    # Another worker holds the write lock
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    acquire = asyncio.create_task(limiter.acquire("https://example.com/a"))
+
+    started = time.monotonic()
+    await asyncio.sleep(0.05)
+    assert time.monotonic() - started < 0.5  # The loop kept running
+    assert not acquire.done()
+
+    other.execute("COMMIT")
+    await asyncio.wait_for(acquire, timeout=2)
+    other.close()
+
+
+def test_rate_state_reads_see_only_committed_updates(tmp_path):
+    from utils.rate_limiter import SQLiteRateState, _initial_state
+    state = SQLiteRateState(str(tmp_path / "limits.db"))
+
+    # An update in progress on the writer connection (worker thread)
+    state._conn.execute("BEGIN IMMEDIATE")
+    state._conn.execute("INSERT INTO rate_limits VALUES ('example.com', 9.0, 0.5, 0.0, 0.0)")
+
+    assert state.get("example.com") == _initial_state()
+    assert state.domains() == []
+
+    state._conn.execute("COMMIT")
+    assert state.get("example.com")["factor"] == 0.5
+    assert state.domains() == ["example.com"]
+    state.close()
+
+
 # ── Robots.txt Tests ──────────────────────────────────
 
 
@@ -122,3 +260,398 @@ async def test_robots_fail_open():
 
         result = await is_allowed("https://unreachable.example.com/page")
         assert result is True
+
+
+def _robots_client(get):
+    """Patch target for utils.robots.httpx.AsyncClient with the given get()."""
+    client = MagicMock()
+    instance = AsyncMock()
+    instance.get = get
+    client.return_value.__aenter__ = AsyncMock(return_value=instance)
+    client.return_value.__aexit__ = AsyncMock(return_value=False)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_robots_single_flight_and_negative_cache():
+    """Concurrent cold lookups share one fetch; failures are cached briefly."""
+    from utils import robots
+    robots.clear_cache()
+
+    async def failing_get(url, **kwargs):
+        await asyncio.sleep(0.01)
+        raise Exception("Network error")
+
+    get = AsyncMock(side_effect=failing_get)
+    with patch("utils.robots.httpx.AsyncClient", _robots_client(get)):
+        results = await asyncio.gather(
+            *(robots.is_allowed(f"https://down.example.com/p{i}") for i in range(5))
+        )
+        assert await robots.is_allowed("https://down.example.com/later") is True
+
+    assert results == [True] * 5
+    assert get.await_count == 1
+    entry = robots._cache["https://down.example.com"]
+    assert entry.parser is None
+    assert entry.expires - robots.time.time() <= robots.NEGATIVE_TTL
+
+
+def test_robots_ttl_from_cache_headers():
+    import httpx
+    from utils.robots import DEFAULT_TTL, MAX_TTL, MIN_TTL, _ttl
+
+    assert _ttl(httpx.Headers({})) == DEFAULT_TTL
+    assert _ttl(httpx.Headers({"cache-control": "public, max-age=7200"})) == 7200
+    assert _ttl(httpx.Headers({"cache-control": "max-age=7200", "age": "200"})) == 7000
+    assert _ttl(httpx.Headers({"cache-control": "no-store"})) == MIN_TTL
+    assert _ttl(httpx.Headers({"cache-control": "max-age=31536000"})) == MAX_TTL
+    assert _ttl(httpx.Headers({
+        "date": "Mon, 01 Jan 2024 00:00:00 GMT",
+        "expires": "Mon, 01 Jan 2024 02:00:00 GMT",
+    })) == 7200
+    assert _ttl(httpx.Headers({"expires": "0"})) == MIN_TTL
+
+
+@pytest.mark.asyncio
+async def test_robots_cache_persists_across_restarts(tmp_path):
+    import httpx
+    from utils import robots
+    robots.clear_cache()
+
+    resp = httpx.Response(200, text="User-agent: *\nDisallow: /private/\nCrawl-delay: 3\n")
+    get = AsyncMock(return_value=resp)
+    with patch("utils.robots.HAYSTACK_DATA_DIR", str(tmp_path)):
+        with patch("utils.robots.httpx.AsyncClient", _robots_client(get)):
+            assert await robots.is_allowed("https://example.jp/private/x") is False
+        robots.save_cache()
+
+        # "Restart": empty memory, reload from disk without fetching
+        robots._cache.clear()
+        robots._loaded = False
+        get = AsyncMock(side_effect=Exception("should not fetch"))
+        with patch("utils.robots.httpx.AsyncClient", _robots_client(get)):
+            assert await robots.is_allowed("https://example.jp/public") is True
+            assert await robots.get_crawl_delay("https://example.jp/") == 3.0
+
+    get.assert_not_awaited()
+    robots.clear_cache()
+
+
+# ── Robots Matcher Tests ──────────────────────────────
+
+
+ROBOTS_TXT = """
+User-agent: *
+Disallow: /private/
+Allow: /private/press/
+Disallow: /*.pdf$
+Disallow: /search?q=
+
+User-agent: NisekoGazetBot
+Disallow: /drafts
+Crawl-delay: 2
+
+User-agent: OtherBot
+Disallow: /
+""".splitlines()
+
+
+def test_robots_matcher_longest_match_wins():
+    from utils.robots_matcher import CompiledRobots
+
+    robots = CompiledRobots(ROBOTS_TXT)
+    ua = "GenericBot/2.0"
+
+    assert robots.can_fetch(ua, "https://x.jp/news/1") is True
+    assert robots.can_fetch(ua, "https://x.jp/private/a") is False
+    # Longer Allow beats shorter Disallow regardless of order in the file
+    assert robots.can_fetch(ua, "https://x.jp/private/press/release") is True
+    assert robots.can_fetch(ua, "https://x.jp/files/map.pdf") is False
+    assert robots.can_fetch(ua, "https://x.jp/files/map.pdf?v=2") is True
+    assert robots.can_fetch(ua, "https://x.jp/search?q=snow") is False
+    assert robots.can_fetch(ua, "https://x.jp/robots.txt") is True
+
+
+def test_robots_matcher_picks_user_agent_group():
+    from utils.robots import USER_AGENT
+    from utils.robots_matcher import CompiledRobots
+
+    robots = CompiledRobots(ROBOTS_TXT)
+
+    # Our own group replaces the "*" group entirely
+    assert robots.can_fetch(USER_AGENT, "https://x.jp/private/a") is True
+    assert robots.can_fetch(USER_AGENT, "https://x.jp/drafts/1") is False
+    assert robots.crawl_delay(USER_AGENT) == 2.0
+    assert robots.can_fetch("OtherBot", "https://x.jp/") is False
+    assert CompiledRobots([]).can_fetch(USER_AGENT, "https://x.jp/any") is True
+
+
+def test_robots_matcher_requires_exact_product_token():
+    from utils.robots import USER_AGENT
+    from utils.robots_matcher import CompiledRobots
+
+    robots = CompiledRobots([
+        "User-agent: bot",
+        "Disallow: /",
+        "",
+        "User-agent: nisekogazetbot",
+        "Allow: /",
+    ])
+    assert robots.can_fetch(USER_AGENT, "https://x.jp/news/1") is True
+
+    # A partial name is not ours: the "*" group applies
+    robots = CompiledRobots(["User-agent: niseko", "Disallow: /", "User-agent: *", "Disallow: /tmp"])
+    assert robots.can_fetch(USER_AGENT, "https://x.jp/news/1") is True
+    assert robots.can_fetch(USER_AGENT, "https://x.jp/tmp/a") is False
+
+
+def test_robots_matcher_tie_prefers_allow_and_normalizes_encoding():
+    from utils.robots_matcher import CompiledRobots
+
+    robots = CompiledRobots([
+        "User-agent: *",
+        "Disallow: /page",
+        "Allow: /page",
+        "Disallow: /café",
+    ])
+    assert robots.can_fetch("Bot", "https://x.jp/page") is True
+    assert robots.can_fetch("Bot", "https://x.jp/caf%C3%A9/menu") is False
+
+
+@pytest.mark.asyncio
+async def test_filter_allowed_checks_batch_per_domain():
+    from utils import robots
+    from utils.robots_matcher import CompiledRobots
+
+    robots.clear_cache()
+    robots._cache["https://a.jp"] = robots._Entry(["User-agent: *", "Disallow: /x"], robots.time.time() + 60)
+    robots._cache["https://b.jp"] = robots._Entry(None, robots.time.time() + 60)
+
+    urls = ["https://a.jp/x/1", "https://a.jp/y", "https://b.jp/x/1", "https://a.jp/x"]
+    with patch("utils.robots._fetch", AsyncMock(side_effect=AssertionError("cached"))):
+        assert await robots.filter_allowed(urls) == ["https://a.jp/y", "https://b.jp/x/1"]
+    assert isinstance(robots._cache["https://a.jp"].parser, CompiledRobots)
+    robots.clear_cache()
+
+
+# ── Limited Transport Tests ───────────────────────────
+
+
+def _limited_client(max_bytes, kinds=("html", "xml"), truncate=True, **response):
+    import httpx
+    from utils.http import LimitedTransport
+
+    def handler(request):
+        return httpx.Response(**{"status_code": 200, **response})
+
+    inner = httpx.MockTransport(handler)
+    return httpx.AsyncClient(transport=LimitedTransport(max_bytes, kinds, truncate, transport=inner))
+
+
+@pytest.mark.asyncio
+async def test_limited_transport_truncates_markup():
+    from utils.http import truncated
+
+    page = b"<html><body>" + b"x" * 5000 + b"</body></html>"
+    async with _limited_client(1000, headers={"content-type": "text/html"}, content=page) as client:
+        resp = await client.get("https://example.com/")
+
+    assert len(resp.content) == 1000
+    assert truncated(resp) is True
+
+    async with _limited_client(10_000, headers={"content-type": "text/html"}, content=page) as client:
+        resp = await client.get("https://example.com/")
+    assert resp.content == page
+    assert truncated(resp) is False
+
+
+@pytest.mark.asyncio
+async def test_limited_transport_caps_decompressed_size():
+    import gzip
+    from utils.http import truncated
+
+    body = gzip.compress(b"<rss>" + b"a" * 1_000_000)
+    headers = {"content-type": "application/rss+xml", "content-encoding": "gzip"}
+    async with _limited_client(2000, headers=headers, content=body) as client:
+        resp = await client.get("https://example.com/feed")
+
+    assert resp.content.startswith(b"<rss>aaa")
+    assert len(resp.content) == 2000
+    assert truncated(resp) is True
+
+
+@pytest.mark.asyncio
+async def test_limited_transport_rejects_unexpected_content():
+    from utils.http import UnsupportedContentType
+
+    async with _limited_client(1000, headers={"content-type": "video/mp4"}, content=b"\x00" * 10) as client:
+        with pytest.raises(UnsupportedContentType):
+            await client.get("https://example.com/video")
+
+    # Untyped bodies are sniffed: a PDF is rejected, a feed accepted
+    pdf = {"headers": {"content-type": "application/octet-stream"}, "content": b"%PDF-1.7 ..."}
+    async with _limited_client(1000, **pdf) as client:
+        with pytest.raises(UnsupportedContentType):
+            await client.get("https://example.com/file")
+    async with _limited_client(1000, content=b'\xef\xbb\xbf<?xml version="1.0"?><rss/>') as client:
+        resp = await client.get("https://example.com/feed")
+    assert resp.content.endswith(b"<rss/>")
+
+    # Error pages are left to raise_for_status
+    async with _limited_client(1000, status_code=404, headers={"content-type": "application/json"}, content=b"{}") as client:
+        resp = await client.get("https://example.com/missing")
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_limited_transport_rejects_oversized_json():
+    from utils.http import ResponseTooLarge
+
+    body = b"[" + b"1," * 1000 + b"1]"
+    async with _limited_client(100, ("json",), False, headers={"content-type": "application/json"}, content=body) as client:
+        with pytest.raises(ResponseTooLarge):
+            await client.get("https://example.com/api")
+
+
+# ── Connection Pool Tests ─────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_dns_cache_respects_ttl_and_serves_stale():
+    from utils.connections import DNSCache
+
+    cache = DNSCache(default_ttl=60)
+    lookup = AsyncMock(return_value=(["192.0.2.1"], 60))
+    with patch.object(cache, "_lookup", lookup):
+        assert await cache.resolve("example.com", 443) == ["192.0.2.1"]
+        assert await cache.resolve("example.com", 443) == ["192.0.2.1"]
+        assert lookup.await_count == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # IP literals are never looked up
+        assert await cache.resolve("127.0.0.1", 80) == ["127.0.0.1"]
+
+        # Expired: looked up again; a failed lookup falls back to the old addresses
+        with patch("utils.connections.time.time", return_value=10**10):
+            lookup.side_effect = OSError("SERVFAIL")
+            assert await cache.resolve("example.com", 443) == ["192.0.2.1"]
+        assert lookup.await_count == 2
+
+
+async def _keep_alive_server():
+    """Local HTTP/1.1 server answering every request on a kept-alive connection."""
+    connections, paths = [], []
+
+    async def handle(reader, writer):
+        connections.append(writer)
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError:
+                break
+            paths.append(head.split(b" ")[1].decode())
+            body = b"" if head.startswith(b"HEAD") else b"<rss/>"
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/rss+xml\r\n"
+                b"Content-Length: 6\r\n\r\n" + body
+            )
+            await writer.drain()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1], connections, paths
+
+
+@pytest.mark.asyncio
+async def test_warm_up_connection_is_reused_by_agents(monkeypatch):
+    import httpx
+    from utils import connections, robots
+    from utils.http import LimitedTransport
+
+    monkeypatch.setattr(robots, "_cache", {})
+    monkeypatch.setattr(robots, "_loaded", True)
+    server, port, opened, paths = await _keep_alive_server()
+    connections.clear_stats()
+    try:
+        url = f"http://localhost:{port}/feed.xml"
+        probe_urls = [url, f"http://localhost:{port}/other"]
+        hosts = await connections.warm_up([], probe_urls=probe_urls, probe=robots.prefetch)
+
+        # Warm-up only asks for robots.txt, never the sources themselves
+        assert list(hosts) == ["localhost"]
+        assert hosts["localhost"]["connected"] is True
+        assert "connect_ms" in hosts["localhost"]
+        assert paths == ["/robots.txt"]
+
+        # An agent-style client (closed after use) takes the warmed connection
+        for _ in range(2):
+            async with httpx.AsyncClient(transport=LimitedTransport(1000)) as client:
+                resp = await client.get(url)
+            assert resp.text == "<rss/>"
+
+        assert len(opened) == 1
+        stats = connections.connection_stats()
+        assert stats["hosts"]["localhost"]["connections"] == 1
+        assert stats["dns_cache"]["misses"] == 1
+
+        # Rules now cached: the next cycle still opens a connection, without a request
+        again = await connections.warm_up([], probe_urls=probe_urls, probe=robots.prefetch)
+        assert again["localhost"]["connected"] is True
+        assert paths == ["/robots.txt", "/feed.xml", "/feed.xml"]
+        assert connections.connection_stats()["hosts"]["localhost"]["connections"] == 2
+    finally:
+        await connections.close_pool()
+        connections.clear_stats()
+        server.close()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_preconnects_without_a_request():
+    import httpx
+    from utils import connections
+
+    server, port, opened, paths = await _keep_alive_server()
+    connections.clear_stats()
+    try:
+        url = f"http://localhost:{port}/feed.xml"
+        assert (await connections.warm_up([url]))["localhost"]["connected"] is True
+        # One waiting connection per host is enough
+        assert (await connections.warm_up([url]))["localhost"]["connected"] is False
+
+        async with httpx.AsyncClient(transport=connections.pooled_transport()) as client:
+            resp = await client.get(url)
+
+        assert resp.text == "<rss/>"
+        assert paths == ["/feed.xml"]
+        assert len(opened) == 1
+        assert connections.connection_stats()["hosts"]["localhost"]["connections"] == 1
+    finally:
+        await connections.close_pool()
+        connections.clear_stats()
+        server.close()
+
+
+@pytest.mark.asyncio
+async def test_shared_pool_honours_proxy_environment(monkeypatch):
+    import httpx
+    from utils import connections
+
+    server, port, _, paths = await _keep_alive_server()
+    for name in ("http_proxy", "https_proxy", "all_proxy", "no_proxy"):
+        monkeypatch.delenv(name, raising=False)
+        monkeypatch.delenv(name.upper(), raising=False)
+    monkeypatch.setenv("HTTP_PROXY", f"http://127.0.0.1:{port}")
+    monkeypatch.setenv("NO_PROXY", "direct.example")
+    await connections.close_pool()
+    try:
+        async with httpx.AsyncClient(transport=connections.pooled_transport()) as client:
+            resp = await client.get("http://feeds.example/rss.xml")
+            assert resp.text == "<rss/>"
+            with pytest.raises(httpx.ConnectError):
+                await client.get("http://direct.example:1/rss.xml")
+
+        # Proxied in absolute form; the NO_PROXY host never reached the proxy
+        assert paths == ["http://feeds.example/rss.xml"]
+    finally:
+        await connections.close_pool()
+        connections.clear_stats()
+        server.close()
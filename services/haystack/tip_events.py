@@ -0,0 +1,221 @@
+"""Push-based tip ingestion: run tips cycles when tips are approved.
+
+With TIP_INGESTION_MODE=listen, a dedicated Postgres connection LISTENs on
+the "haystack_tips" channel (migration 006 fires pg_notify when a tip is
+approved). Notifications are micro-batched: the first one opens a
+TIP_BATCH_WINDOW_SECONDS window, and everything that arrives in it is
+handled by a single tips pipeline run. Tips approved while that run is in
+progress trigger one follow-up run after it.
+
+The scheduler keeps a slow tips sweep (TIP_SWEEP_INTERVAL_MINUTES) to pick
+up anything missed while the listener was disconnected. LocalTipEvents is
+an in-process stand-in for the Postgres listener (tests, SQLite setups).
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+import structlog
+
+from config import DATABASE_URL, TIP_BATCH_WINDOW_SECONDS, TIP_INGESTION_MODE
+
+logger = structlog.get_logger()
+
+TIP_CHANNEL = "haystack_tips"
+
+# Seconds between reconnect attempts when the LISTEN connection drops
+_RECONNECT_DELAY_SECONDS = 30
+
+
+def listen_enabled() -> bool:
+    """Whether tips are pushed (listen mode with a database to listen on)."""
+    return TIP_INGESTION_MODE == "listen" and bool(DATABASE_URL)
+
+
+# ── Event sources ─────────────────────────────────────
+
+
+class LocalTipEvents:
+    """In-process tip events: publish() delivers like a NOTIFY would."""
+
+    def __init__(self):
+        self._on_tip: Optional[Callable[[str], None]] = None
+
+    async def start(self, on_tip: Callable[[str], None]) -> None:
+        self._on_tip = on_tip
+
+    def publish(self, tip_id: str) -> None:
+        if self._on_tip is not None:
+            self._on_tip(tip_id)
+
+    async def close(self) -> None:
+        self._on_tip = None
+
+
+class PostgresTipEvents:
+    """LISTEN on TIP_CHANNEL over a dedicated asyncpg connection.
+
+    asyncpg is imported only here (see db/postgres_backend.py). The
+    connection must be session-mode; the transaction pooler drops LISTENs.
+    """
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._conn = None
+        self._on_tip: Optional[Callable[[str], None]] = None
+        self._reconnect: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def start(self, on_tip: Callable[[str], None]) -> None:
+        self._on_tip = on_tip
+        await self._connect()
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        self._conn = await asyncpg.connect(self.dsn)
+        self._conn.add_termination_listener(self._on_terminated)
+        await self._conn.add_listener(TIP_CHANNEL, self._on_notify)
+        logger.info("tip_events.listening", channel=TIP_CHANNEL)
+
+    def _on_notify(self, conn, pid, channel, payload) -> None:
+        if self._on_tip is not None:
+            self._on_tip(payload)
+
+    def _on_terminated(self, conn) -> None:
+        if self._closed:
+            return
+        logger.warning("tip_events.disconnected")
+        if self._reconnect is None or self._reconnect.done():
+            self._reconnect = asyncio.create_task(self._reconnect_loop())
+
+    async def _reconnect_loop(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(_RECONNECT_DELAY_SECONDS)
+            try:
+                await self._connect()
+                return
+            except Exception as e:
+                logger.error("tip_events.reconnect_failed", error=str(e))
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._reconnect is not None:
+            self._reconnect.cancel()
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
+
+
+# ── Micro-batching ────────────────────────────────────
+
+
+class TipBatcher:
+    """Coalesce tip notifications into single-flight pipeline runs."""
+
+    def __init__(self, run: Callable[[set[str]], Awaitable[None]], window: float):
+        self._run = run
+        self.window = window
+        self._pending: set[str] = set()
+        self._first_pending_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self.events = 0
+        self.batches = 0
+        self.last_batch: dict = {}
+
+    def notify(self, tip_id: str) -> None:
+        self.events += 1
+        if not self._pending:
+            self._first_pending_at = time.monotonic()
+        self._pending.add(tip_id)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain())
+
+    async def _drain(self) -> None:
+        while self._pending:
+            # Let a burst of approvals accumulate into one run
+            await asyncio.sleep(self.window)
+            batch, self._pending = self._pending, set()
+            waited = time.monotonic() - self._first_pending_at
+            self.batches += 1
+            self.last_batch = {"tips": len(batch), "wait_ms": round(waited * 1000)}
+            logger.info("tip_events.batch", **self.last_batch)
+            try:
+                await self._run(batch)
+            except Exception as e:
+                logger.error("tip_events.batch_failed", tips=len(batch), error=str(e))
+
+    def status(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "running": self._task is not None and not self._task.done(),
+            "events": self.events,
+            "batches": self.batches,
+            "last_batch": self.last_batch,
+        }
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+
+# ── Lifecycle ─────────────────────────────────────────
+
+_source = None
+_batcher: Optional[TipBatcher] = None
+
+
+async def _run_tips_cycle(tip_ids: set[str]) -> None:
+    from graph.pipeline import run_pipeline
+
+    result = await run_pipeline(run_type="event", cycle_type="tips")
+    logger.info(
+        "tip_events.cycle_complete",
+        notified=len(tip_ids),
+        field_notes=result.get("stats", {}).get("field_notes_created", 0),
+    )
+
+
+async def start_tip_events(source=None) -> bool:
+    """Subscribe to tip approvals (listen mode, or the given source).
+
+    Returns False when tips stay on polling (poll mode, or the listener
+    could not connect).
+    """
+    global _source, _batcher
+
+    if source is None:
+        if not listen_enabled():
+            return False
+        source = PostgresTipEvents(DATABASE_URL)
+
+    batcher = TipBatcher(_run_tips_cycle, TIP_BATCH_WINDOW_SECONDS)
+    try:
+        await source.start(batcher.notify)
+    except Exception as e:
+        logger.error("tip_events.start_failed", error=str(e))
+        return False
+
+    _source, _batcher = source, batcher
+    return True
+
+
+async def stop_tip_events() -> None:
+    global _source, _batcher
+    if _source is not None:
+        await _source.close()
+    if _batcher is not None:
+        await _batcher.close()
+    _source = _batcher = None
+
+
+def get_tip_events_status() -> dict:
+    if _batcher is None:
+        return {"mode": "poll"}
+    return {"mode": "listen", **_batcher.status()}
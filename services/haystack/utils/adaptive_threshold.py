@@ -6,11 +6,13 @@ Topics with low acceptance get higher thresholds (fewer articles pass).
 Threshold adjustments are bounded: MIN_RELEVANCE_SCORE ± 0.15
 """
 
+import time
+from collections import deque
+
 import structlog
-from collections import defaultdict
 
 from config import MIN_RELEVANCE_SCORE
-from db.client import _request
+from db.client import query_crawls
 
 logger = structlog.get_logger()
 
@@ -19,12 +21,97 @@ MAX_ADJUSTMENT = 0.15
 MIN_THRESHOLD = 0.15
 MAX_THRESHOLD = 0.80
 
-# Cached thresholds (refreshed periodically)
+WINDOW_SIZE = 1000  # Most recent relevant crawl records considered
+MIN_DATA_POINTS = 10  # Per topic, before its threshold is adjusted
+RESEED_TTL_SECONDS = 6 * 3600  # Re-read the window from crawl_history this often
+
+# Cached thresholds (recomputed when the window changes)
 _topic_thresholds: dict[str, float] = {}
 
+# Sliding window of (topics, published) for recent relevant records, oldest
+# first, with per-topic [total, published] counters kept in step with it
+_window: deque[tuple[tuple[str, ...], bool]] = deque()
+_topic_stats: dict[str, list[int]] = {}
+_seeded_at: float | None = None
+_dirty = False
+
+
+def _push(topics: tuple[str, ...], published: bool) -> None:
+    _window.append((topics, published))
+    for topic in topics:
+        stats = _topic_stats.setdefault(topic, [0, 0])
+        stats[0] += 1
+        stats[1] += published
+
+    if len(_window) > WINDOW_SIZE:
+        old_topics, old_published = _window.popleft()
+        for topic in old_topics:
+            stats = _topic_stats[topic]
+            stats[0] -= 1
+            stats[1] -= old_published
+            if stats[0] == 0:
+                del _topic_stats[topic]
+
+
+def observe_crawl(record: dict) -> None:
+    """Slide a freshly written crawl_history row into the window.
+
+    Ignored until the window has been seeded, since the seed read will
+    include the row anyway.
+    """
+    global _dirty
+
+    if _seeded_at is None or not record.get("was_relevant"):
+        return
+    classification = record.get("classification_data") or {}
+    _push(tuple(classification.get("topics", [])), record.get("field_note_id") is not None)
+    _dirty = True
+
+
+async def _seed() -> None:
+    """Replace the window with the latest WINDOW_SIZE relevant records."""
+    global _seeded_at, _dirty
+
+    records = await query_crawls(
+        ["classification_data", "field_note_id"], relevant_only=True, limit=WINDOW_SIZE
+    )
+
+    _window.clear()
+    _topic_stats.clear()
+    for record in reversed(records):
+        classification = record.get("classification_data") or {}
+        _push(tuple(classification.get("topics", [])), record.get("field_note_id") is not None)
+
+    _seeded_at = time.monotonic()
+    _dirty = True
+
+
+def _compute_thresholds() -> dict[str, float]:
+    """Thresholds from the window's per-topic counters (O(topics))."""
+    thresholds = {}
+    for topic, (total, published) in _topic_stats.items():
+        if total < MIN_DATA_POINTS:
+            continue  # Not enough data
+
+        acceptance_rate = published / total
+
+        if acceptance_rate > 0.6:
+            # High acceptance → lower threshold (be more permissive)
+            adjustment = -MAX_ADJUSTMENT * min(1.0, (acceptance_rate - 0.6) / 0.4)
+        elif acceptance_rate < 0.2:
+            # Low acceptance → raise threshold (be more selective)
+            adjustment = MAX_ADJUSTMENT * min(1.0, (0.2 - acceptance_rate) / 0.2)
+        else:
+            adjustment = 0.0
+
+        threshold = MIN_RELEVANCE_SCORE + adjustment
+        threshold = max(MIN_THRESHOLD, min(MAX_THRESHOLD, threshold))
+        thresholds[topic] = round(threshold, 3)
+    return thresholds
+
 
 async def refresh_topic_thresholds() -> dict[str, float]:
-    """Recalculate per-topic relevance thresholds from crawl history.
+    """Bring per-topic relevance thresholds up to date.
 
     Logic:
     - For each topic, calculate: acceptance_rate = published / total_relevant
@@ -32,65 +119,29 @@ async def refresh_topic_thresholds() -> dict[str, float]:
     - Low acceptance (<20%): raise threshold by up to 0.15
     - Medium acceptance (20-60%): keep default
 
-    Only considers topics with at least 10 data points.
+    Only considers topics with at least 10 data points among the last
+    WINDOW_SIZE relevant records. The window is read from crawl_history on
+    first use and every RESEED_TTL_SECONDS (to pick up other writers); in
+    between it slides as crawl records are written (observe_crawl), and
+    thresholds are only recomputed when it has changed.
     """
-    global _topic_thresholds
+    global _topic_thresholds, _dirty
 
     try:
-        records = await _request(
-            "GET",
-            "crawl_history",
-            params={
-                "was_relevant": "eq.true",
-                "select": "classification_data,field_note_id",
-                "order": "fetched_at.desc",
-                "limit": "1000",
-            },
-        ) or []
-
-        if not records:
-            _topic_thresholds = {}
-            return {}
-
-        # Count per-topic: total relevant and total published
-        topic_stats: dict[str, dict[str, int]] = defaultdict(lambda: {"total": 0, "published": 0})
-
-        for record in records:
-            classification = record.get("classification_data") or {}
-            topics = classification.get("topics", [])
-            is_published = record.get("field_note_id") is not None
-
-            for topic in topics:
-                topic_stats[topic]["total"] += 1
-                if is_published:
-                    topic_stats[topic]["published"] += 1
-
-        # Calculate thresholds
-        thresholds = {}
-        for topic, stats in topic_stats.items():
-            if stats["total"] < 10:
-                continue  # Not enough data
-
-            acceptance_rate = stats["published"] / stats["total"]
-
-            if acceptance_rate > 0.6:
-                # High acceptance → lower threshold (be more permissive)
-                adjustment = -MAX_ADJUSTMENT * min(1.0, (acceptance_rate - 0.6) / 0.4)
-            elif acceptance_rate < 0.2:
-                # Low acceptance → raise threshold (be more selective)
-                adjustment = MAX_ADJUSTMENT * min(1.0, (0.2 - acceptance_rate) / 0.2)
-            else:
-                adjustment = 0.0
-
-            threshold = MIN_RELEVANCE_SCORE + adjustment
-            threshold = max(MIN_THRESHOLD, min(MAX_THRESHOLD, threshold))
-            thresholds[topic] = round(threshold, 3)
+        if _seeded_at is None or time.monotonic() - _seeded_at > RESEED_TTL_SECONDS:
+            await _seed()
 
+        if not _dirty:
+            return _topic_thresholds
+
+        thresholds = _compute_thresholds()
         _topic_thresholds = thresholds
+        _dirty = False
 
         logger.info(
             "adaptive_threshold.refreshed",
             topics=len(thresholds),
+            window=len(_window),
             adjustments={t: f"{v:.3f}" for t, v in thresholds.items() if v != MIN_RELEVANCE_SCORE},
         )
 
@@ -101,6 +152,16 @@ async def refresh_topic_thresholds() -> dict[str, float]:
         return _topic_thresholds
 
 
+def reset() -> None:
+    """Drop the window and cached thresholds; the next refresh reseeds."""
+    global _topic_thresholds, _seeded_at, _dirty
+    _topic_thresholds = {}
+    _window.clear()
+    _topic_stats.clear()
+    _seeded_at = None
+    _dirty = False
+
+
 def get_relevance_threshold(topics: list[str]) -> float:
     """Get the effective relevance threshold for a set of topics.
 
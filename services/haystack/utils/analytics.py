@@ -0,0 +1,304 @@
+"""Materialized analytics: rolling counters over crawl history for the admin dashboard.
+
+Every crawl_history write is folded into hourly buckets of per-topic,
+per-geo-tag and per-source counters (see observe()); topics and geo tags
+also feed decayed multi-horizon trend engines (utils/trend_engine.py).
+The /analytics endpoints then answer from memory instead of re-reading
+crawl_history on every request.
+
+The store is persisted as a JSON snapshot in HAYSTACK_DATA_DIR. On first use
+it loads the snapshot and catches up on rows written since (by other
+processes, or while this one was down) — see ensure_ready().
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import Counter
+from datetime import datetime, timezone, timedelta
+
+import structlog
+
+from config import HAYSTACK_DATA_DIR
+from db.client import query_crawls
+from utils.persist import write_json_atomic
+from utils.trend_engine import TrendEngine
+
+logger = structlog.get_logger()
+
+BUCKET_SECONDS = 3600  # One bucket per hour
+RETENTION_HOURS = 7 * 24  # Buckets older than this are dropped
+CATCHUP_PAGE_SIZE = 1000  # crawl_history rows per catch-up request
+SNAPSHOT_FILE = "analytics.json"
+SNAPSHOT_VERSION = 2  # Bump when the layout changes; older snapshots are rebuilt
+
+_CATCHUP_COLUMNS = ["id", "source_feed_id", "was_relevant", "field_note_id", "classification_data", "fetched_at"]
+
+
+def _timestamp_of(fetched_at: str | None) -> float:
+    """Unix time of an ISO timestamp (now if missing or unparseable)."""
+    try:
+        moment = datetime.fromisoformat(fetched_at.replace("Z", "+00:00"))
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+    except (AttributeError, ValueError):
+        moment = datetime.now(timezone.utc)
+    return moment.timestamp()
+
+
+def _current_bucket() -> int:
+    return int(time.time()) // BUCKET_SECONDS
+
+
+class _Bucket:
+    """Counters for one hour of crawl history."""
+
+    __slots__ = ("topics", "topic_sources", "geo", "sources")
+
+    def __init__(self):
+        self.topics: Counter[str] = Counter()
+        self.topic_sources: dict[str, set[str]] = {}
+        self.geo: Counter[str] = Counter()
+        # source_feed_id -> [crawled, relevant, published]
+        self.sources: dict[str, list[int]] = {}
+
+    def to_dict(self) -> dict:
+        return {
+            "topics": dict(self.topics),
+            "topic_sources": {t: sorted(s) for t, s in self.topic_sources.items()},
+            "geo": dict(self.geo),
+            "sources": self.sources,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "_Bucket":
+        bucket = cls()
+        bucket.topics.update(data.get("topics", {}))
+        bucket.topic_sources = {t: set(s) for t, s in data.get("topic_sources", {}).items()}
+        bucket.geo.update(data.get("geo", {}))
+        bucket.sources = {k: list(v) for k, v in data.get("sources", {}).items()}
+        return bucket
+
+
+class AnalyticsStore:
+    """Hourly-bucketed counters over the last RETENTION_HOURS of crawl history."""
+
+    def __init__(self):
+        self.buckets: dict[int, _Bucket] = {}
+        self.high_water: str | None = None  # Latest fetched_at observed
+        self.topic_trends = TrendEngine()
+        self.geo_trends = TrendEngine()
+
+    def observe(self, record: dict) -> None:
+        """Fold one crawl_history row into its hour bucket and the trend engines."""
+        ts = _timestamp_of(record.get("fetched_at"))
+        index = int(ts) // BUCKET_SECONDS
+        if index <= _current_bucket() - RETENTION_HOURS:
+            return
+
+        bucket = self.buckets.get(index)
+        if bucket is None:
+            bucket = self.buckets[index] = _Bucket()
+            self._prune()
+
+        source_id = record.get("source_feed_id") or "unknown"
+        counts = bucket.sources.setdefault(source_id, [0, 0, 0])
+        counts[0] += 1
+
+        if record.get("was_relevant"):
+            counts[1] += 1
+            classification = record.get("classification_data") or {}
+            for topic in classification.get("topics", []):
+                bucket.topics[topic] += 1
+                bucket.topic_sources.setdefault(topic, set()).add(source_id)
+                self.topic_trends.add(topic, ts)
+            for tag in classification.get("geo_tags", []):
+                bucket.geo[tag] += 1
+                self.geo_trends.add(tag, ts)
+
+        if record.get("field_note_id"):
+            counts[2] += 1
+
+        fetched_at = record.get("fetched_at")
+        if fetched_at and (self.high_water is None or fetched_at > self.high_water):
+            self.high_water = fetched_at
+
+    def _prune(self) -> None:
+        cutoff = _current_bucket() - RETENTION_HOURS
+        for index in [i for i in self.buckets if i <= cutoff]:
+            del self.buckets[index]
+
+    def _window(self, hours: int) -> list[_Bucket]:
+        hours = max(1, min(hours, RETENTION_HOURS))
+        start = _current_bucket() - hours + 1
+        return [b for i, b in self.buckets.items() if i >= start]
+
+    def topic_counts(self, hours: int) -> tuple[Counter[str], dict[str, set[str]]]:
+        """Topic mention counts and the sources mentioning each topic."""
+        counts: Counter[str] = Counter()
+        sources: dict[str, set[str]] = {}
+        for bucket in self._window(hours):
+            counts.update(bucket.topics)
+            for topic, ids in bucket.topic_sources.items():
+                sources.setdefault(topic, set()).update(ids)
+        return counts, sources
+
+    def geo_counts(self, hours: int) -> Counter[str]:
+        counts: Counter[str] = Counter()
+        for bucket in self._window(hours):
+            counts.update(bucket.geo)
+        return counts
+
+    def source_counts(self, hours: int = RETENTION_HOURS) -> dict[str, list[int]]:
+        """Per-source [crawled, relevant, published] totals."""
+        totals: dict[str, list[int]] = {}
+        for bucket in self._window(hours):
+            for source_id, counts in bucket.sources.items():
+                total = totals.setdefault(source_id, [0, 0, 0])
+                for i, value in enumerate(counts):
+                    total[i] += value
+        return totals
+
+    def to_dict(self) -> dict:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "high_water": self.high_water,
+            "buckets": {str(i): b.to_dict() for i, b in self.buckets.items()},
+            "topic_trends": self.topic_trends.to_dict(),
+            "geo_trends": self.geo_trends.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AnalyticsStore":
+        store = cls()
+        store.high_water = data.get("high_water")
+        store.buckets = {
+            int(i): _Bucket.from_dict(b) for i, b in data.get("buckets", {}).items()
+        }
+        store.topic_trends = TrendEngine.from_dict(data.get("topic_trends", {}))
+        store.geo_trends = TrendEngine.from_dict(data.get("geo_trends", {}))
+        store._prune()
+        return store
+
+
+# Process-wide store. Until ensure_ready() has caught up, live observations
+# are buffered so catch-up rows are not counted twice.
+_store = AnalyticsStore()
+_ready = False
+_pending: list[dict] = []
+_lock = asyncio.Lock()
+
+
+def get_store() -> AnalyticsStore:
+    return _store
+
+
+def observe(record: dict) -> None:
+    """Record a crawl_history row as it is written."""
+    if _ready:
+        _store.observe(record)
+    else:
+        _pending.append(record)
+
+
+def _snapshot_path() -> str:
+    return os.path.join(HAYSTACK_DATA_DIR, SNAPSHOT_FILE)
+
+
+def _load_snapshot() -> AnalyticsStore:
+    try:
+        with open(_snapshot_path(), encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != SNAPSHOT_VERSION:
+            logger.info("analytics.snapshot_outdated", version=data.get("version"))
+            return AnalyticsStore()
+        return AnalyticsStore.from_dict(data)
+    except FileNotFoundError:
+        return AnalyticsStore()
+    except (OSError, ValueError) as e:
+        logger.warning("analytics.snapshot_unreadable", error=str(e))
+        return AnalyticsStore()
+
+
+async def _catch_up(store: AnalyticsStore) -> set[str]:
+    """Fold crawl_history rows newer than the store's high-water mark into it.
+
+    Returns the IDs of the rows read, so buffered live observations of the
+    same rows can be skipped.
+    """
+    since = store.high_water or (
+        datetime.now(timezone.utc) - timedelta(hours=RETENTION_HOURS)
+    ).isoformat()
+    seen: set[str] = set()
+    offset = 0
+
+    while True:
+        rows = await query_crawls(
+            _CATCHUP_COLUMNS,
+            since=since,
+            newest_first=False,
+            limit=CATCHUP_PAGE_SIZE,
+            offset=offset,
+        )
+        for row in rows:
+            store.observe(row)
+            if row.get("id"):
+                seen.add(row["id"])
+        if len(rows) < CATCHUP_PAGE_SIZE:
+            return seen
+        offset += CATCHUP_PAGE_SIZE
+
+
+async def ensure_ready() -> AnalyticsStore:
+    """Load the snapshot and catch up from crawl_history (once per process).
+
+    If the database is unreachable the store stays unready and the next call
+    retries; callers get whatever has been materialized so far.
+    """
+    global _store, _ready
+
+    if _ready:
+        return _store
+
+    async with _lock:
+        if _ready:
+            return _store
+        store = _load_snapshot()
+        try:
+            seen = await _catch_up(store)
+        except Exception as e:
+            logger.error("analytics.catchup_failed", error=str(e))
+            return _store
+
+        for record in _pending:
+            if record.get("id") not in seen:
+                store.observe(record)
+        _pending.clear()
+        _store = store
+        _ready = True
+        logger.info("analytics.ready", buckets=len(store.buckets), high_water=store.high_water)
+
+    return _store
+
+
+async def save_snapshot() -> None:
+    """Persist the store to HAYSTACK_DATA_DIR (atomic replace)."""
+    await ensure_ready()
+    if not _ready:
+        return
+
+    path = _snapshot_path()
+    try:
+        write_json_atomic(path, _store.to_dict())
+        logger.debug("analytics.snapshot_saved", buckets=len(_store.buckets))
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning("analytics.snapshot_failed", error=str(e))
+
+
+def reset() -> None:
+    """Drop all in-memory state (tests, or to force a full rebuild)."""
+    global _store, _ready
+    _store = AnalyticsStore()
+    _ready = False
+    _pending.clear()
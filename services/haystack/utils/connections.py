@@ -0,0 +1,501 @@
+"""Shared HTTP connection pool with DNS caching and per-host timings.
+
+Collection agents used to create a client (and so a connection pool) per
+call: every cycle resolved the same feed hostnames again and paid a fresh
+TCP + TLS handshake per request. Now:
+- Agents, deep fetch and robots.txt lookups borrow one process-wide
+  connection pool (pooled_transport()); closing a client leaves the pool
+  and its keep-alive connections open.
+- Host names are resolved through a TTL cache. With dnspython installed
+  the record's own TTL is used (clamped to [MIN_DNS_TTL, MAX_DNS_TTL]);
+  otherwise the system resolver is used and entries live DNS_CACHE_TTL
+  seconds. A failed lookup falls back to the expired addresses, if any.
+- warm_up() opens connections to the hosts of a cycle's sources in
+  parallel before the agents run (collect_node). Hosts whose agent looks up
+  robots.txt first are connected by that lookup; the others get a bare TCP
+  connection (no request) that the pool's next request to the host takes
+  over, if it comes within CONNECTION_KEEPALIVE_SECONDS.
+- DNS, TCP connect and TLS handshake times are recorded per host
+  (connection_stats()), to tell slow networks apart from slow servers.
+- HTTP_PROXY / HTTPS_PROXY / ALL_PROXY / NO_PROXY from the environment are
+  honoured, as a plain httpx client would: proxied requests go through a
+  proxy pool built with the same caching backend.
+"""
+
+import asyncio
+import contextlib
+import ipaddress
+import socket
+import time
+import urllib.request
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Optional
+from urllib.parse import urlparse
+
+import httpcore
+import httpx
+import structlog
+
+from config import CONNECTION_KEEPALIVE_SECONDS, DNS_CACHE_TTL
+
+logger = structlog.get_logger()
+
+MIN_DNS_TTL = 30
+MAX_DNS_TTL = 3600
+WARMUP_CONCURRENCY = 16
+WARMUP_TIMEOUT = 10.0
+MAX_CONNECTIONS = 100
+
+try:
+    import dns.asyncresolver
+    import dns.exception
+    import dns.resolver
+except ImportError:  # optional: without it, DNS_CACHE_TTL applies to every host
+    dns = None
+
+
+# ── DNS cache ─────────────────────────────────────────
+
+
+class DNSCache:
+    """Resolved addresses per host name, kept for the record's TTL."""
+
+    def __init__(self, default_ttl: float = DNS_CACHE_TTL):
+        self._default_ttl = default_ttl
+        self._entries: dict[str, tuple[list[str], float]] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def resolve(self, host: str, port: int) -> list[str]:
+        """Addresses for host, from the cache while its TTL lasts."""
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+
+        entry = self._entries.get(host)
+        if entry and entry[1] > time.time():
+            self.hits += 1
+            return entry[0]
+
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            # Another task may have resolved it while we waited
+            entry = self._entries.get(host)
+            if entry and entry[1] > time.time():
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            try:
+                addresses, ttl = await self._lookup(host, port)
+            except (OSError, ValueError) as e:
+                if entry:
+                    logger.warning("connections.dns_stale", host=host, error=str(e))
+                    return entry[0]
+                raise httpcore.ConnectError(f"DNS lookup failed for {host}: {e}") from e
+            self._entries[host] = (addresses, time.time() + ttl)
+            return addresses
+
+    async def _lookup(self, host: str, port: int) -> tuple[list[str], float]:
+        if dns is not None:
+            try:
+                return await _lookup_dnspython(host)
+            except dns.exception.DNSException as e:
+                raise OSError(str(e)) from e
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        if not addresses:
+            raise OSError(f"no addresses for {host}")
+        return addresses, self._default_ttl
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+async def _lookup_dnspython(host: str) -> tuple[list[str], float]:
+    addresses, ttls = [], []
+    for rdtype in ("A", "AAAA"):
+        try:
+            answer = await dns.asyncresolver.resolve(host, rdtype)
+        except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
+            continue
+        addresses.extend(r.address for r in answer)
+        ttls.append(answer.rrset.ttl)
+    if not addresses:
+        raise OSError(f"no addresses for {host}")
+    return addresses, min(max(min(ttls), MIN_DNS_TTL), MAX_DNS_TTL)
+
+
+# ── Timed network backend ─────────────────────────────
+
+_host_stats: dict[str, dict] = {}
+
+
+def _record(host: str, **timings) -> None:
+    stats = _host_stats.setdefault(host, {"connections": 0, "errors": 0})
+    stats.update({k: round(v * 1000, 1) for k, v in timings.items()})
+    stats["updated_at"] = time.time()
+
+
+class _TimedStream(httpcore.AsyncNetworkStream):
+    """Network stream that records its TLS handshake time."""
+
+    def __init__(self, stream: httpcore.AsyncNetworkStream, host: str):
+        self._stream = stream
+        self._host = host
+
+    async def read(self, max_bytes: int, timeout: Optional[float] = None) -> bytes:
+        return await self._stream.read(max_bytes, timeout)
+
+    async def write(self, buffer: bytes, timeout: Optional[float] = None) -> None:
+        await self._stream.write(buffer, timeout)
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+    async def start_tls(self, ssl_context, server_hostname=None, timeout=None):
+        start = time.perf_counter()
+        stream = await self._stream.start_tls(ssl_context, server_hostname, timeout)
+        _record(self._host, tls_ms=time.perf_counter() - start)
+        return _TimedStream(stream, self._host)
+
+    def get_extra_info(self, info: str):
+        return self._stream.get_extra_info(info)
+
+
+class CachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """Resolves through a DNSCache and times DNS/connect per host.
+
+    Connects to the resolved address; TLS still verifies and sends SNI for
+    the host name (httpcore passes the origin host to start_tls). A stream
+    opened ahead by preconnect() is handed to the next connect to its host.
+    """
+
+    def __init__(self, resolver: DNSCache, backend: Optional[httpcore.AsyncNetworkBackend] = None):
+        self._resolver = resolver
+        self._backend = backend or httpcore.AnyIOBackend()
+        # (host, port) -> (monotonic open time, stream) opened by preconnect()
+        self._preconnected: dict[tuple[str, int], tuple[float, httpcore.AsyncNetworkStream]] = {}
+
+    async def _take_preconnected(self, host: str, port: int) -> Optional[httpcore.AsyncNetworkStream]:
+        entry = self._preconnected.pop((host, port), None)
+        if entry is None:
+            return None
+        opened, stream = entry
+        # Too old, or the server already closed it (readable while idle = EOF)
+        if time.monotonic() - opened > CONNECTION_KEEPALIVE_SECONDS or stream.get_extra_info("is_readable"):
+            await stream.aclose()
+            return None
+        return stream
+
+    async def preconnect(self, host: str, port: int, timeout: Optional[float] = None) -> bool:
+        """Open a TCP connection now for the next connect to host:port.
+
+        Returns False (and opens nothing) if a fresh one is already waiting.
+        """
+        waiting = await self._take_preconnected(host, port)
+        if waiting is None:
+            waiting = await self.connect_tcp(host, port, timeout=timeout)
+            opened = True
+        else:
+            opened = False
+        self._preconnected[(host, port)] = (time.monotonic(), waiting)
+        return opened
+
+    async def aclose(self) -> None:
+        """Close streams opened by preconnect() that were never used."""
+        entries, self._preconnected = list(self._preconnected.values()), {}
+        for _, stream in entries:
+            await stream.aclose()
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        if local_address is None and socket_options is None:
+            stream = await self._take_preconnected(host, port)
+            if stream is not None:
+                return stream
+
+        start = time.perf_counter()
+        try:
+            addresses = await self._resolver.resolve(host, port)
+        except httpcore.ConnectError:
+            _host_stats.setdefault(host, {"connections": 0, "errors": 0})["errors"] += 1
+            raise
+        resolved = time.perf_counter()
+
+        error: Exception = httpcore.ConnectError(f"no addresses for {host}")
+        for address in addresses:
+            try:
+                stream = await self._backend.connect_tcp(
+                    address, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+                continue
+            _host_stats.get(host, {}).pop("tls_ms", None)
+            _record(host, dns_ms=resolved - start, connect_ms=time.perf_counter() - resolved)
+            _host_stats[host]["connections"] += 1
+            return _TimedStream(stream, host)
+
+        _host_stats.setdefault(host, {"connections": 0, "errors": 0})["errors"] += 1
+        raise error
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+# ── Shared pool ───────────────────────────────────────
+
+resolver = DNSCache()
+_pool: Optional["SharedPoolTransport"] = None
+_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+# httpcore errors as the httpx errors callers catch (most specific first)
+_ERRORS = (
+    (httpcore.ConnectTimeout, httpx.ConnectTimeout),
+    (httpcore.ReadTimeout, httpx.ReadTimeout),
+    (httpcore.WriteTimeout, httpx.WriteTimeout),
+    (httpcore.PoolTimeout, httpx.PoolTimeout),
+    (httpcore.TimeoutException, httpx.TimeoutException),
+    (httpcore.ConnectError, httpx.ConnectError),
+    (httpcore.ReadError, httpx.ReadError),
+    (httpcore.WriteError, httpx.WriteError),
+    (httpcore.NetworkError, httpx.NetworkError),
+    (httpcore.ProxyError, httpx.ProxyError),
+    (httpcore.UnsupportedProtocol, httpx.UnsupportedProtocol),
+    (httpcore.RemoteProtocolError, httpx.RemoteProtocolError),
+    (httpcore.LocalProtocolError, httpx.LocalProtocolError),
+    (httpcore.ProtocolError, httpx.ProtocolError),
+)
+
+
+@contextlib.contextmanager
+def _httpx_errors():
+    try:
+        yield
+    except Exception as e:
+        for source, target in _ERRORS:
+            if isinstance(e, source):
+                raise target(str(e)) from e
+        raise
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    """An httpcore response body as an httpx stream; closing it frees the connection."""
+
+    def __init__(self, stream) -> None:
+        self._stream = stream
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        with _httpx_errors():
+            async for chunk in self._stream:
+                yield chunk
+
+    async def aclose(self) -> None:
+        if hasattr(self._stream, "aclose"):
+            await self._stream.aclose()
+
+
+class SharedPoolTransport(httpx.AsyncBaseTransport):
+    """httpx transport over httpcore pools using the caching network backend.
+
+    Requests go to a direct pool, or to a proxy pool when the environment
+    names a proxy for the scheme and NO_PROXY does not exempt the host.
+    Keep-alive is long enough to carry warmed connections through a
+    collection cycle.
+    """
+
+    def __init__(self) -> None:
+        self._ssl_context = httpx.create_ssl_context()
+        self._backend = CachingNetworkBackend(resolver)
+        self._direct = httpcore.AsyncConnectionPool(ssl_context=self._ssl_context, **self._pool_options())
+        self._proxies: dict[str, httpcore.AsyncHTTPProxy] = {}
+        env = urllib.request.getproxies()
+        for scheme in ("http", "https"):
+            proxy_url = env.get(scheme) or env.get("all")
+            if proxy_url:
+                self._proxies[scheme] = self._proxy_pool(proxy_url)
+
+    def _pool_options(self) -> dict:
+        return {
+            "max_connections": MAX_CONNECTIONS,
+            "max_keepalive_connections": MAX_CONNECTIONS,
+            "keepalive_expiry": CONNECTION_KEEPALIVE_SECONDS,
+            "network_backend": self._backend,
+        }
+
+    def _proxy_pool(self, proxy_url: str) -> httpcore.AsyncHTTPProxy:
+        if "://" not in proxy_url:
+            proxy_url = f"http://{proxy_url}"
+        url = httpx.URL(proxy_url)
+        if url.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported proxy scheme {url.scheme!r} in {proxy_url!r}")
+        auth = (url.username, url.password) if url.username else None
+        return httpcore.AsyncHTTPProxy(
+            proxy_url=httpcore.URL(
+                scheme=url.raw_scheme, host=url.raw_host, port=url.port, target=b"/"
+            ),
+            proxy_auth=auth,
+            ssl_context=self._ssl_context,
+            **self._pool_options(),
+        )
+
+    def _pool_for(self, url: httpx.URL):
+        proxy = self._proxies.get(url.scheme)
+        if proxy is None or urllib.request.proxy_bypass(url.host):
+            return self._direct
+        return proxy
+
+    async def preconnect(self, origin: str, timeout: Optional[float] = None) -> bool:
+        """Open a TCP connection to origin's host for this pool's next request there.
+
+        Returns False when nothing was opened: requests to the host go through
+        a proxy, or an earlier preconnect is still waiting.
+        """
+        url = httpx.URL(origin)
+        if self._pool_for(url) is not self._direct:
+            return False
+        port = url.port or (443 if url.scheme == "https" else 80)
+        # The host as httpcore passes it to connect_tcp (IDNA-encoded)
+        return await self._backend.preconnect(url.raw_host.decode("ascii"), port, timeout=timeout)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _httpx_errors():
+            response = await self._pool_for(request.url).handle_async_request(core_request)
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_ResponseStream(response.stream),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._direct.aclose()
+        for proxy in self._proxies.values():
+            await proxy.aclose()
+        await self._backend.aclose()
+
+
+def shared_pool() -> SharedPoolTransport:
+    """The process-wide pool (a fresh one per event loop: connections are loop-bound)."""
+    global _pool, _pool_loop
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool_loop is not loop:
+        _pool, _pool_loop = SharedPoolTransport(), loop
+    return _pool
+
+
+class _PooledTransport(httpx.AsyncBaseTransport):
+    """A client's handle on the shared pool; closing the client keeps the pool open."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await shared_pool().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
+def pooled_transport() -> httpx.AsyncBaseTransport:
+    """Transport for httpx.AsyncClient(transport=...) that uses the shared pool."""
+    return _PooledTransport()
+
+
+async def close_pool() -> None:
+    """Close the shared pool's connections (shutdown)."""
+    global _pool, _pool_loop
+    if _pool is not None:
+        await _pool.aclose()
+    _pool = _pool_loop = None
+
+
+# ── Warm-up ───────────────────────────────────────────
+
+
+def _origin(url: str) -> Optional[tuple[str, str]]:
+    """(scheme://netloc, host) of an http(s) URL, else None."""
+    parsed = urlparse(url)
+    if parsed.scheme in ("http", "https") and parsed.hostname:
+        return f"{parsed.scheme}://{parsed.netloc}", parsed.hostname
+    return None
+
+
+async def warm_up(
+    urls: Iterable[str],
+    probe_urls: Iterable[str] = (),
+    probe: Optional[Callable[[str], Awaitable]] = None,
+) -> dict[str, dict]:
+    """Connect to the hosts of urls and probe_urls in parallel.
+
+    For probe_urls, probe(origin) makes the connecting request through the
+    shared pool (collect_node passes the robots.txt lookup the scraper makes
+    first anyway). Other hosts, and probed hosts where the probe sent
+    nothing (its answer was cached), get a bare TCP connection: no request
+    is sent, and the pool's next request to the host takes it over.
+    Returns per-host results: {"connected": True} with the DNS/connect/TLS
+    timings when a connection was opened, else {"connected": False}.
+    """
+    probed = {o for o in map(_origin, probe_urls) if o} if probe else set()
+    origins = probed | {o for o in map(_origin, urls) if o}
+    if not origins:
+        return {}
+
+    limit = asyncio.Semaphore(WARMUP_CONCURRENCY)
+    pool = shared_pool()
+    results: dict[str, dict] = {}
+
+    async def warm(origin: str, host: str) -> None:
+        async with limit:
+            started_at, start = time.time(), time.perf_counter()
+            result: dict = {}
+            try:
+                connected = False
+                if (origin, host) in probed:
+                    await asyncio.wait_for(probe(origin), WARMUP_TIMEOUT)
+                    connected = _host_stats.get(host, {}).get("updated_at", 0) >= started_at
+                if not connected:
+                    connected = await pool.preconnect(origin, timeout=WARMUP_TIMEOUT)
+                result["connected"] = connected
+                if connected:
+                    timings = _host_stats.get(host, {})
+                    result.update({k: timings[k] for k in ("dns_ms", "connect_ms", "tls_ms") if k in timings})
+            except (httpx.TransportError, httpcore.ConnectError, httpcore.ConnectTimeout,
+                    asyncio.TimeoutError, OSError) as e:
+                result["error"] = str(e) or type(e).__name__
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        results[host] = result
+
+    await asyncio.gather(*(warm(origin, host) for origin, host in origins))
+    return results
+
+
+def connection_stats() -> dict:
+    """Latest DNS/connect/TLS timings per host, and DNS cache counters."""
+    return {
+        "dns_cache": {"hosts": len(resolver), "hits": resolver.hits, "misses": resolver.misses},
+        "hosts": {host: dict(stats) for host, stats in sorted(_host_stats.items())},
+    }
+
+
+def clear_stats() -> None:
+    _host_stats.clear()
+    resolver.clear()
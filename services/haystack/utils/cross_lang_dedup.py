@@ -1,9 +1,24 @@
-"""Cross-language deduplication: detect when JA and EN articles cover the same story."""
+"""Cross-language deduplication: detect when JA and EN articles cover the same story.
+
+Candidates come from a per-run, language-partitioned snapshot of recent relevant
+crawl history, ranked by multilingual embedding similarity. Pairs scoring at or
+above CROSS_LANG_MATCH_THRESHOLD are duplicates outright; only borderline
+scores are confirmed with the LLM. If the embedding
+model is unavailable, falls back to pairwise LLM comparison.
+"""
+
+import math
+from datetime import datetime, timezone, timedelta
 
 import structlog
 
-from db.client import _request
-from llm.client import generate_json
+from config import (
+    CROSS_LANG_WINDOW_HOURS,
+    CROSS_LANG_MATCH_THRESHOLD,
+    CROSS_LANG_BORDERLINE_THRESHOLD,
+)
+from db.client import query_crawls
+from llm.client import embed, generate_json
 from utils.text import truncate
 
 logger = structlog.get_logger()
@@ -33,6 +48,168 @@ Respond with:
   "reasoning": "Brief explanation"
 }}"""
 
+TOP_K = 3  # Nearest candidates considered per article
+MAX_LLM_CHECKS = 2  # LLM confirmations per article (borderline or fallback)
+HISTORY_LIMIT = 300  # Max crawl_history rows in a run's snapshot
+# Source types that are never checked (Reddit/Bluesky posts and reader tips
+# are almost never cross-language duplicates of news articles)
+SKIP_SOURCE_TYPES = ("social", "tip")
+
+# A recent-history snapshot is loaded once per pipeline run and partitioned by
+# language: {"en": [entry, ...], "ja": [entry, ...]}, newest first. Entry:
+# {"id", "field_note_id", "fingerprint", "source_url", "title", "body", "vector"}
+RecentHistory = dict[str, list[dict]]
+
+# Pass as embedding= when the caller's batch embed already failed: go straight
+# to the LLM fallback instead of retrying the embedding model per article
+EMBEDDING_UNAVAILABLE = object()
+
+
+def embedding_text(title: str, body: str) -> str:
+    """Text that gets embedded for an article (title + leading body)."""
+    return f"{title}\n{truncate(body, 800)}"
+
+
+def _normalize(vector: list[float]) -> list[float]:
+    """Scale a vector to unit length so cosine similarity is a dot product."""
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm == 0:
+        return vector
+    return [v / norm for v in vector]
+
+
+def _cosine(a: list[float], b: list[float]) -> float:
+    """Cosine similarity of two unit-normalized vectors."""
+    if len(a) != len(b):
+        raise ValueError(f"Vector dimensions differ: {len(a)} != {len(b)}")
+    return sum(x * y for x, y in zip(a, b))
+
+
+async def _reembed(entries: list[dict]) -> None:
+    """Replace history vectors from another embedding model (in place).
+
+    Entries that can't be embedded now lose their vector, so they are only
+    reachable through the LLM fallback.
+    """
+    vectors = await embed([embedding_text(e["title"], e["body"]) for e in entries])
+    for i, entry in enumerate(entries):
+        entry["vector"] = _normalize(vectors[i]) if vectors and i < len(vectors) else None
+
+
+def _title_language(title: str) -> str:
+    """Language proxy for rows recorded without one: any kana/kanji means Japanese."""
+    return "ja" if any(0x3040 <= ord(c) <= 0x9FFF for c in title) else "en"
+
+
+async def _fetch_recent(with_embeddings: bool) -> list[dict]:
+    since = (datetime.now(timezone.utc) - timedelta(hours=CROSS_LANG_WINDOW_HOURS)).isoformat()
+    columns = ["id", "raw_data", "source_url", "field_note_id", "content_fingerprint"]
+    if with_embeddings:
+        columns.append("embedding")
+    return await query_crawls(
+        columns,
+        since=since,
+        relevant_only=True,
+        exclude_duplicates=True,
+        limit=HISTORY_LIMIT,
+    )
+
+
+async def load_recent_history() -> RecentHistory:
+    """Load a language-partitioned snapshot of recent relevant crawl history.
+
+    Called once per pipeline run. Rows written before embeddings were stored
+    (or while the embedding model was down) are embedded here in one batch.
+    """
+    try:
+        rows = await _fetch_recent(with_embeddings=True)
+    except Exception as e:
+        # Column may not exist yet (migration 004 pending); each backend
+        # reports that with its own error type
+        logger.debug("cross_lang_dedup.embedding_column_missing", error=str(e))
+        rows = await _fetch_recent(with_embeddings=False)
+
+    history: RecentHistory = {"en": [], "ja": []}
+    missing = []
+    for row in rows:
+        raw_data = row.get("raw_data", {}) or {}
+        title = raw_data.get("title", "")
+        if not title:
+            continue
+        vector = row.get("embedding")
+        entry = {
+            "id": row.get("id"),
+            "field_note_id": row.get("field_note_id"),
+            "fingerprint": row.get("content_fingerprint"),
+            "source_url": row.get("source_url"),
+            "title": title,
+            "body": raw_data.get("body", ""),
+            "vector": _normalize(vector) if vector else None,
+        }
+        language = raw_data.get("language") or _title_language(title)
+        history.setdefault(language, []).append(entry)
+        if entry["vector"] is None:
+            missing.append(entry)
+
+    if missing:
+        vectors = await embed([embedding_text(e["title"], e["body"]) for e in missing])
+        for entry, vector in zip(missing, vectors or []):
+            entry["vector"] = _normalize(vector)
+
+    logger.info(
+        "cross_lang_dedup.history_loaded",
+        en=len(history.get("en", [])),
+        ja=len(history.get("ja", [])),
+        embedded=len(missing),
+    )
+    return history
+
+
+def remember(
+    history: RecentHistory,
+    article: dict,
+    fingerprint: str,
+    embedding: list[float] | None,
+) -> None:
+    """Add a relevant article from the current run to the snapshot.
+
+    Later articles in the same run can then dedup against it before it has
+    been written to crawl_history. Call it only once the article has been
+    classified relevant: history holds relevant articles only.
+    """
+    history.setdefault(article.get("language", "en"), []).insert(0, {
+        "id": None,
+        "field_note_id": None,
+        "fingerprint": fingerprint,
+        "source_url": article["source_url"],
+        "title": article["title"],
+        "body": article["body"],
+        "vector": _normalize(embedding) if embedding else None,
+    })
+
+
+def _duplicate_of(candidate: dict) -> str | None:
+    """Field note, crawl_history row, or (for in-run articles) fingerprint matched."""
+    return candidate.get("field_note_id") or candidate.get("id") or candidate.get("fingerprint")
+
+
+async def _llm_same_story(
+    title: str, body: str, language: str, candidate: dict
+) -> dict | None:
+    """Ask the LLM whether the article and a candidate cover the same story."""
+    prompt = CROSS_LANG_PROMPT.format(
+        lang_a=language,
+        title_a=title,
+        body_a=truncate(body, 800),
+        lang_b="ja" if language == "en" else "en",
+        title_b=candidate["title"],
+        body_b=truncate(candidate["body"], 800),
+    )
+    result = await generate_json(prompt, system=CROSS_LANG_SYSTEM)
+    if result.get("is_same_story") and result.get("confidence", 0) >= 0.7:
+        return result
+    return None
+
 
 async def check_cross_language_duplicate(
     title: str,
@@ -40,12 +217,19 @@ async def check_cross_language_duplicate(
     language: str,
     source_url: str,
     source_type: str = "",
+    embedding: list[float] | object | None = None,
+    history: RecentHistory | None = None,
 ) -> dict | None:
     """Check if a new article duplicates a recent article in a different language.
 
-    Only checks the last 24h of relevant crawl history. Uses LLM comparison
-    for articles that might overlap. Skips social media posts since they
-    rarely have cross-language duplicates.
+    Looks at relevant crawl history from the last CROSS_LANG_WINDOW_HOURS plus
+    articles already seen in the current run (see remember()).
+    Candidates are ranked by embedding cosine similarity: scores at or above
+    CROSS_LANG_MATCH_THRESHOLD match without an LLM call, scores in the
+    borderline band are confirmed by the LLM, lower scores are ignored.
+    Candidates without a vector are compared by the LLM; at most
+    MAX_LLM_CHECKS LLM calls are made per article.
+    Skips social media posts since they rarely have cross-language duplicates.
 
     Args:
         title: Article title
@@ -53,88 +237,94 @@ async def check_cross_language_duplicate(
         language: Language code ("en" or "ja")
         source_url: Source URL (to avoid self-matching)
         source_type: Source type (e.g. "social", "rss", "scrape")
+        embedding: Precomputed embedding of embedding_text(title, body), None
+            to embed here, or EMBEDDING_UNAVAILABLE to skip embedding
+        history: The run's recent-history snapshot (loaded here if not given)
 
     Returns:
         Dict with {"is_duplicate": True, "duplicate_of": id, "reasoning": str}
         or None if no cross-language duplicate found.
     """
-    # Skip cross-language dedup for social media — Reddit/Bluesky posts
-    # are almost never cross-language duplicates of news articles
-    if source_type in ("social", "tip"):
+    if source_type in SKIP_SOURCE_TYPES:
         return None
 
     # Only check opposite-language articles
     other_lang = "ja" if language == "en" else "en"
 
-    # Get recent relevant articles in the other language from crawl_history
-    recent = await _request(
-        "GET",
-        "crawl_history",
-        params={
-            "was_relevant": "eq.true",
-            "was_duplicate": "eq.false",
-            "select": "id,raw_data,source_url,field_note_id",
-            "order": "fetched_at.desc",
-            "limit": "20",
-        },
-    ) or []
-
-    if not recent:
-        return None
-
-    # Filter to other-language articles (check raw_data for language hint)
-    candidates = []
-    for record in recent:
-        raw_data = record.get("raw_data", {}) or {}
-        if record.get("source_url") == source_url:
-            continue
-        # We can't easily filter by language in the DB query since it's in raw_data
-        # Just check the title for CJK characters as a proxy
-        record_title = raw_data.get("title", "")
-        has_cjk = any(0x3040 <= ord(c) <= 0x9FFF for c in record_title)
-
-        if (other_lang == "ja" and has_cjk) or (other_lang == "en" and not has_cjk):
-            candidates.append(record)
-
+    if history is None:
+        history = await load_recent_history()
+    candidates = [
+        e for e in history.get(other_lang, [])
+        if e["source_url"] != source_url
+    ]
     if not candidates:
         return None
 
-    # Only check the top 3 candidates to limit LLM calls
-    for candidate in candidates[:3]:
-        raw_data = candidate.get("raw_data", {}) or {}
-        candidate_title = raw_data.get("title", "")
-        candidate_body = raw_data.get("body", "")
+    if embedding is EMBEDDING_UNAVAILABLE:
+        embedding = None
+    elif embedding is None:
+        vectors = await embed([embedding_text(title, body)])
+        embedding = vectors[0] if vectors else None
 
-        if not candidate_title:
-            continue
+    scored: list[tuple[float | None, dict]] = []
+    if embedding is not None:
+        vector = _normalize(embedding)
+        # Rows embedded by an older model: re-embed once for the whole run
+        stale = [e for e in candidates if e["vector"] and len(e["vector"]) != len(vector)]
+        if stale:
+            logger.info("cross_lang_dedup.dimension_mismatch", rows=len(stale), dimension=len(vector))
+            await _reembed(stale)
+        comparable = [e for e in candidates if e["vector"] and len(e["vector"]) == len(vector)]
+        scored = sorted(
+            ((_cosine(vector, e["vector"]), e) for e in comparable),
+            key=lambda pair: pair[0],
+            reverse=True,
+        )[:TOP_K]
+        candidates = [e for e in candidates if not (e["vector"] and len(e["vector"]) == len(vector))]
 
-        try:
-            prompt = CROSS_LANG_PROMPT.format(
-                lang_a=language,
-                title_a=title,
-                body_a=truncate(body, 800),
-                lang_b=other_lang,
-                title_b=candidate_title,
-                body_b=truncate(candidate_body, 800),
+    # Candidates without a vector (or all of them, if the embedding model is
+    # unavailable) go to the LLM, most recent first, after the scored ones
+    scored += [(None, e) for e in candidates[:MAX_LLM_CHECKS]]
+
+    llm_checks = 0
+    for score, candidate in scored:
+        if score is not None and score >= CROSS_LANG_MATCH_THRESHOLD:
+            logger.info(
+                "cross_lang_dedup.match",
+                title=title[:60],
+                match_title=candidate["title"][:60],
+                similarity=round(score, 3),
             )
+            return {
+                "is_duplicate": True,
+                "duplicate_of": _duplicate_of(candidate),
+                "reasoning": f"Embedding similarity {score:.2f} with '{candidate['title'][:80]}'",
+            }
 
-            result = await generate_json(prompt, system=CROSS_LANG_SYSTEM)
-
-            if result.get("is_same_story") and result.get("confidence", 0) >= 0.7:
-                logger.info(
-                    "cross_lang_dedup.match",
-                    title=title[:60],
-                    match_title=candidate_title[:60],
-                    confidence=result.get("confidence"),
-                )
-                return {
-                    "is_duplicate": True,
-                    "duplicate_of": candidate.get("field_note_id") or candidate.get("id"),
-                    "reasoning": result.get("reasoning", "Cross-language duplicate"),
-                }
+        if score is not None and score < CROSS_LANG_BORDERLINE_THRESHOLD:
+            continue  # Scored candidates are sorted: none of the rest can match
+        if llm_checks >= MAX_LLM_CHECKS:
+            break
 
+        llm_checks += 1
+        try:
+            result = await _llm_same_story(title, body, language, candidate)
         except Exception as e:
             logger.error("cross_lang_dedup.error", error=str(e))
             continue
 
+        if result:
+            logger.info(
+                "cross_lang_dedup.match",
+                title=title[:60],
+                match_title=candidate["title"][:60],
+                similarity=round(score, 3) if score is not None else None,
+                confidence=result.get("confidence"),
+            )
+            return {
+                "is_duplicate": True,
+                "duplicate_of": _duplicate_of(candidate),
+                "reasoning": result.get("reasoning", "Cross-language duplicate"),
+            }
+
     return None
@@ -0,0 +1,321 @@
+"""Main-content extraction for scraped pages (readability-style).
+
+Pages are reduced to their article text before they reach the LLM:
+
+1. Scripts, form controls, <nav>/<aside>/<footer> and elements whose
+   class/id tokens mark them as chrome (gnavi, pankuzu, sidebar, share, ...)
+   are dropped.
+2. Every block with enough text of its own is scored on length and
+   punctuation (both "," and the Japanese "、。"), discounted by its link
+   density, and the score flows to the enclosing containers.
+3. The container with the best score, weighted by its overall link
+   density and class/id hints, is the main content. Link lists left inside
+   it are removed before converting to text.
+
+Per-domain templates: once the same container path wins twice on a
+domain, later pages of that domain are extracted from that selector
+directly, skipping the scoring. A template that stops matching (three
+misses in a row) is relearned. Templates are kept in HAYSTACK_DATA_DIR
+(save_templates(), called after each pipeline run).
+"""
+
+import json
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlparse
+
+import soupsieve
+import structlog
+from bs4 import BeautifulSoup, Comment, NavigableString, Tag
+
+from config import HAYSTACK_DATA_DIR
+from utils.persist import write_json_atomic
+from utils.text import html_to_text
+
+logger = structlog.get_logger()
+
+TEMPLATES_FILE = "extract_templates.json"
+TEMPLATES_VERSION = 1
+
+# A block needs this much text of its own to be scored
+MIN_BLOCK_CHARS = 25
+# A template's selector must yield at least this much low-link-density text
+MIN_TEMPLATE_CHARS = 80
+TEMPLATE_CONFIRMATIONS = 2
+TEMPLATE_MAX_MISSES = 3
+
+# Not <form> (ASP.NET WebForms pages wrap the whole body in one) or <header>
+# (articles keep their headline and byline in one); site headers are
+# dropped by their class/id tokens instead
+_ALWAYS_DROP = "script, style, noscript, iframe, svg, button, select, nav, aside, footer"
+
+_UNLIKELY = {
+    "nav", "navi", "gnav", "gnavi", "hnav", "hnavi", "lnav", "lnavi", "menu", "breadcrumb",
+    "breadcrumbs", "pankuzu", "topicpath", "sidebar", "side", "footer", "header", "share",
+    "social", "sns", "comment", "comments", "related", "widget", "banner", "ad", "ads",
+    "advert", "pagetop", "sitemap", "skip", "tags", "rss", "utility", "bottom", "popup",
+}
+_LIKELY = {
+    "article", "content", "contents", "main", "entry", "post", "body", "text", "honbun",
+    "detail", "story", "news",
+}
+
+# Containers that can be the main content
+_CONTAINERS = {"div", "section", "article", "main", "td", "body", "blockquote", "dd"}
+_BLOCKS = _CONTAINERS | {
+    "p", "pre", "li", "ul", "ol", "dl", "dt", "table", "tbody", "thead", "tr", "th",
+    "h1", "h2", "h3", "h4", "h5", "h6", "center", "figure", "figcaption", "address",
+}
+_TAG_WEIGHT = {"article": 10, "main": 10, "div": 5, "section": 3, "td": 3, "blockquote": 3, "body": -5}
+_PUNCTUATION = re.compile(r"[,、，。]")
+_TOKEN_SPLIT = re.compile(r"[\s_\-]+")
+
+
+@dataclass
+class Extraction:
+    title: str
+    body: str
+    method: str  # "template", "scored" or "fallback"
+    selector: Optional[str] = None
+
+
+def extract(page: str | BeautifulSoup, url: Optional[str] = None) -> Extraction:
+    """Title and main body text of an HTML page.
+
+    With a url, the page's domain template is used (and learned).
+    Modifies a BeautifulSoup argument in place.
+    """
+    soup = page if isinstance(page, BeautifulSoup) else BeautifulSoup(page, "lxml")
+    title = _title(soup)
+    domain = urlparse(url).netloc if url else None
+
+    for tag in soup.select(_ALWAYS_DROP):
+        tag.decompose()
+    for comment in soup.find_all(string=lambda s: isinstance(s, Comment)):
+        comment.extract()
+    _drop_unlikely(soup)
+
+    if domain:
+        template = _template(domain)
+        if template:
+            try:
+                node = soup.select_one(template["selector"])
+            except soupsieve.SelectorSyntaxError:
+                # Unparseable (saved before ids/classes were escaped): a miss
+                node = None
+            if node is not None and _usable(node):
+                template["misses"] = 0
+                return Extraction(title, _text(node), "template", template["selector"])
+            template["misses"] += 1
+            _mark_dirty()
+
+    node = _best_candidate(soup)
+    if node is None:
+        body = html_to_text(str(soup.body)) if soup.body else ""
+        return Extraction(title, body, "fallback")
+
+    selector = _selector(node)
+    if domain:
+        _learn(domain, selector)
+    return Extraction(title, _text(node), "scored", selector)
+
+
+def _title(soup: BeautifulSoup) -> str:
+    title_el = soup.select_one("h1") or soup.select_one("title")
+    return title_el.get_text(strip=True) if title_el else "Untitled"
+
+
+def _tokens(el: Tag) -> set[str]:
+    attrs = " ".join(el.get("class") or []) + " " + (el.get("id") or "")
+    return {t for t in _TOKEN_SPLIT.split(attrs.lower()) if t}
+
+
+def _hint(el: Tag) -> int:
+    tokens = _tokens(el)
+    return 25 * (bool(tokens & _LIKELY) - bool(tokens & _UNLIKELY))
+
+
+def _drop_unlikely(soup: BeautifulSoup) -> None:
+    for el in soup.find_all(True):
+        if el.decomposed or el.name in ("html", "body"):
+            continue
+        tokens = _tokens(el)
+        if tokens & _UNLIKELY and not tokens & _LIKELY:
+            el.decompose()
+
+
+def _link_density(el: Tag) -> float:
+    text = len(el.get_text(strip=True))
+    if not text:
+        return 0.0
+    links = sum(len(a.get_text(strip=True)) for a in el.find_all("a"))
+    return links / text
+
+
+def _own_text(el: Tag) -> tuple[int, int]:
+    """(text chars, link chars) of el's inline content, excluding nested blocks."""
+    text = links = 0
+    for child in el.children:
+        if isinstance(child, NavigableString):
+            text += len(child.strip())
+        elif isinstance(child, Tag) and child.name not in _BLOCKS:
+            chars = len(child.get_text(strip=True))
+            text += chars
+            if child.name == "a":
+                links += chars
+            else:
+                links += sum(len(a.get_text(strip=True)) for a in child.find_all("a"))
+    return text, links
+
+
+def _best_candidate(soup: BeautifulSoup) -> Optional[Tag]:
+    scores: dict[int, float] = {}
+    nodes: dict[int, Tag] = {}
+
+    def add(node: Tag, score: float) -> None:
+        key = id(node)
+        if key not in scores:
+            nodes[key] = node
+            scores[key] = _TAG_WEIGHT.get(node.name, 0) + _hint(node)
+        scores[key] += score
+
+    for el in soup.find_all(_BLOCKS):
+        text, links = _own_text(el)
+        if text < MIN_BLOCK_CHARS or links / text > 0.5:
+            continue
+        own = el.get_text(" ", strip=True)
+        score = (1 + len(_PUNCTUATION.findall(own)) + min(text / 100, 3)) * (1 - links / text)
+
+        if el.name in _CONTAINERS:
+            add(el, score)
+        for level, ancestor in enumerate(el.parents):
+            if level > 2 or ancestor.name in (None, "[document]", "html"):
+                break
+            if ancestor.name in _CONTAINERS:
+                add(ancestor, score / max(level, 1))
+
+    if not scores:
+        return None
+
+    def final(key: int) -> tuple[float, int]:
+        node = nodes[key]
+        return scores[key] * (1 - _link_density(node)), len(list(node.parents))
+
+    return nodes[max(scores, key=final)]
+
+
+def _text(node: Tag) -> str:
+    """Text of the content node, without link lists left inside it."""
+    for el in node.find_all(["ul", "ol", "div", "table", "section", "p"]):
+        if el.decomposed:
+            continue
+        text = len(el.get_text(strip=True))
+        if text and text < 300 and _link_density(el) > 0.5:
+            el.decompose()
+    return html_to_text(str(node))
+
+
+def _usable(node: Tag) -> bool:
+    return len(node.get_text(strip=True)) >= MIN_TEMPLATE_CHARS and _link_density(node) < 0.3
+
+
+def _selector(node: Tag) -> str:
+    """CSS path from the nearest element with an id (or <body>) down to node."""
+    parts = []
+    for el in [node, *node.parents]:
+        if el.name in (None, "[document]", "html"):
+            break
+        if el.get("id"):
+            parts.append(f"{el.name}#{soupsieve.escape(el['id'])}")
+            break
+        if el.name == "body":
+            parts.append("body")
+            break
+        step = el.name
+        classes = el.get("class") or []
+        if classes:
+            step += f".{soupsieve.escape(classes[0])}"
+        siblings = [s for s in el.parent.find_all(el.name, recursive=False)] if el.parent else []
+        if len(siblings) > 1 and not classes:
+            step += f":nth-of-type({siblings.index(el) + 1})"
+        parts.append(step)
+    return " > ".join(reversed(parts))
+
+
+# ── Templates ─────────────────────────────────────────
+
+_templates: dict[str, dict] = {}
+_loaded = False
+_dirty = False
+
+
+def _mark_dirty() -> None:
+    global _dirty
+    _dirty = True
+
+
+def _template(domain: str) -> Optional[dict]:
+    """The domain's confirmed template, if any."""
+    if not _loaded:
+        _load_templates()
+    template = _templates.get(domain)
+    if template and template["confirmed"] >= TEMPLATE_CONFIRMATIONS and template["misses"] < TEMPLATE_MAX_MISSES:
+        return template
+    return None
+
+
+def _learn(domain: str, selector: str) -> None:
+    template = _templates.get(domain)
+    if template and template["selector"] == selector:
+        template["confirmed"] += 1
+        template["misses"] = 0
+    elif template is None or template["confirmed"] < TEMPLATE_CONFIRMATIONS or template["misses"] >= TEMPLATE_MAX_MISSES:
+        _templates[domain] = {"selector": selector, "confirmed": 1, "misses": 0}
+    else:
+        return
+    _templates[domain]["updated_at"] = time.time()
+    _mark_dirty()
+
+
+def _templates_path() -> str:
+    return os.path.join(HAYSTACK_DATA_DIR, TEMPLATES_FILE)
+
+
+def _load_templates() -> None:
+    global _loaded
+    _loaded = True
+    try:
+        with open(_templates_path(), encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError) as e:
+        logger.warning("extract.templates_unreadable", error=str(e))
+        return
+    if data.get("version") == TEMPLATES_VERSION:
+        for domain, template in data.get("templates", {}).items():
+            _templates.setdefault(domain, template)
+
+
+def save_templates() -> None:
+    """Persist learned templates to HAYSTACK_DATA_DIR (atomic replace)."""
+    global _dirty
+    if not _dirty:
+        return
+    path = _templates_path()
+    try:
+        write_json_atomic(path, {"version": TEMPLATES_VERSION, "templates": _templates})
+        _dirty = False
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning("extract.templates_save_failed", error=str(e))
+
+
+def clear_templates() -> None:
+    """Forget all templates (in memory; the file is not reloaded)."""
+    global _loaded, _dirty
+    _templates.clear()
+    _loaded = True
+    _dirty = False
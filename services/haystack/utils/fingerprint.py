@@ -1,7 +1,8 @@
-"""SimHash-based content fingerprinting for deduplication."""
+"""SimHash-based content fingerprinting and URL canonicalization for deduplication."""
 
 import hashlib
 import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 
 def _tokenize(text: str) -> list[str]:
@@ -60,3 +61,38 @@ def similarity(hash_a: str, hash_b: str, hash_bits: int = 64) -> float:
 def is_duplicate(hash_a: str, hash_b: str, threshold: float = 0.85) -> bool:
     """Check if two fingerprints are similar enough to be duplicates."""
     return similarity(hash_a, hash_b) >= threshold
+
+
+# Query parameters that never change the article a URL points to
+_TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src", "cmpid", "ito"}
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so syndicated copies of the same link compare equal.
+
+    Lowercases the host, unifies http/https, drops "www.", default ports, fragments,
+    tracking parameters (utm_* and friends) and trailing slashes, and sorts
+    the remaining query parameters.
+    """
+    parts = urlsplit(url.strip())
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return url.strip()  # tip://, listing-less sources, etc.
+
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and not (
+        (parts.scheme == "http" and parts.port == 80)
+        or (parts.scheme == "https" and parts.port == 443)
+    ):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+
+    # http and https copies of a link are the same article
+    return urlunsplit(("https", host, path, urlencode(query), ""))
@@ -0,0 +1,225 @@
+"""Size-capped HTTP responses for collection agents.
+
+A source URL that points at a video, an archive or a database dump must not
+be read into memory. LimitedTransport wraps the httpx transport, so agents
+keep using client.get() and resp.text / resp.json():
+- The Content-Type of a successful response is checked as soon as the
+  headers arrive. A type the source can't be parsed as is rejected before
+  the body is read; without a usable type (missing, octet-stream,
+  text/plain) the first body bytes are sniffed instead.
+- The body is read chunk by chunk, gzip/deflate decoded incrementally, and
+  never past max_bytes of decoded content. HTML and XML are kept truncated
+  (the parsers cope with a cut-off document) and the response is flagged
+  (truncated()); a JSON body over the limit raises ResponseTooLarge.
+
+Limits are per source type (RSS/SCRAPE/API_MAX_BYTES), overridable with
+the source config "max_bytes". Requests go through the shared connection
+pool (utils/connections.py).
+"""
+
+import zlib
+from typing import Optional
+
+import httpx
+
+from config import API_MAX_BYTES, RSS_MAX_BYTES, SCRAPE_MAX_BYTES
+from utils.connections import pooled_transport
+
+HTML_TYPES = {"text/html", "application/xhtml+xml"}
+XML_TYPES = {"application/xml", "text/xml", "application/rss+xml", "application/atom+xml", "application/rdf+xml"}
+JSON_TYPES = {"application/json", "text/json"}
+# Types that say nothing about the payload: decide from the first bytes
+UNTYPED = {"", "text/plain", "application/octet-stream", "binary/octet-stream"}
+
+# source type -> (max bytes, accepted kinds)
+SOURCE_LIMITS = {
+    "rss": (RSS_MAX_BYTES, ("xml", "html")),
+    "scrape": (SCRAPE_MAX_BYTES, ("html", "xml")),
+    "api": (API_MAX_BYTES, ("json",)),
+}
+
+_TRUNCATED = "haystack_truncated"
+
+
+class ResponseRejected(Exception):
+    """The response was not read because of its type or size."""
+
+
+class UnsupportedContentType(ResponseRejected):
+    pass
+
+
+class ResponseTooLarge(ResponseRejected):
+    pass
+
+
+def _kind(media_type: str) -> Optional[str]:
+    if media_type in HTML_TYPES:
+        return "html"
+    if media_type in XML_TYPES or media_type.endswith("+xml"):
+        return "xml"
+    if media_type in JSON_TYPES or media_type.endswith("+json"):
+        return "json"
+    return None
+
+
+def _sniff(head: bytes) -> Optional[str]:
+    """Kind of a body from its first bytes (markup or JSON), else None."""
+    head = head.removeprefix(b"\xef\xbb\xbf").lstrip()
+    if head.startswith(b"<?xml"):
+        return "xml"
+    if head.startswith(b"<"):
+        return "html"
+    if head[:1] in (b"{", b"["):
+        return "json"
+    return None
+
+
+def truncated(resp) -> bool:
+    """Whether the response body was cut at the transport's byte limit."""
+    return resp.extensions.get(_TRUNCATED) is True
+
+
+class _LimitedStream(httpx.AsyncByteStream):
+    def __init__(self, chunks, first: bytes, decoder, limit: int, truncate: bool, original):
+        self._chunks = chunks
+        self._first = first
+        self._decoder = decoder
+        self._limit = limit
+        self._truncate = truncate
+        self._original = original
+        self.extensions: dict = {}
+
+    async def __aiter__(self):
+        size = 0
+        data = self._first
+        try:
+            while True:
+                if size + len(data) > self._limit:
+                    if not self._truncate:
+                        raise ResponseTooLarge(f"Response exceeds {self._limit} bytes")
+                    self.extensions[_TRUNCATED] = True
+                    yield data[: self._limit - size]
+                    return
+                if data:
+                    size += len(data)
+                    yield data
+                raw = await anext(self._chunks, None)
+                if raw is None:
+                    break
+                data = self._decode(raw, self._limit - size)
+            if self._decoder is not None:
+                tail = self._decoder.flush()
+                if size + len(tail) > self._limit:
+                    if not self._truncate:
+                        raise ResponseTooLarge(f"Response exceeds {self._limit} bytes")
+                    self.extensions[_TRUNCATED] = True
+                    tail = tail[: self._limit - size]
+                if tail:
+                    yield tail
+        finally:
+            await self._original.aclose()
+
+    def _decode(self, raw: bytes, remaining: int) -> bytes:
+        if self._decoder is None:
+            return raw
+        # One byte past the limit is enough to know the body is too large
+        try:
+            return self._decoder.decompress(raw, remaining + 1)
+        except zlib.error as e:
+            raise httpx.DecodingError(f"Bad compressed body: {e}") from e
+
+    async def aclose(self) -> None:
+        await self._original.aclose()
+
+
+class LimitedTransport(httpx.AsyncBaseTransport):
+    """httpx transport that rejects unexpected content types and caps body size."""
+
+    def __init__(
+        self,
+        max_bytes: int,
+        kinds: tuple[str, ...] = ("html", "xml"),
+        truncate: bool = True,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.kinds = kinds
+        self.truncate = truncate
+        # Default: the shared pool (utils/connections.py), kept open on aclose()
+        self._transport = transport or pooled_transport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        # Only encodings we can decode (and bound) ourselves
+        request.headers["Accept-Encoding"] = "gzip, deflate"
+        response = await self._transport.handle_async_request(request)
+        if response.status_code == 204 or 300 <= response.status_code < 400:
+            return response
+
+        try:
+            return await self._limit(request, response)
+        except BaseException:
+            await response.aclose()
+            raise
+
+    async def _limit(self, request: httpx.Request, response: httpx.Response) -> httpx.Response:
+        media_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+        kind = _kind(media_type)
+        # Error pages are size-capped but not type-checked (raise_for_status reports them)
+        check_type = response.status_code < 300
+        if check_type and kind is None and media_type not in UNTYPED:
+            raise UnsupportedContentType(f"Unsupported content type {media_type!r} from {request.url}")
+
+        declared = response.headers.get("content-length", "")
+        encoding = response.headers.get("content-encoding", "").strip().lower()
+        if not self.truncate and not encoding and declared.isdigit() and int(declared) > self.max_bytes:
+            raise ResponseTooLarge(f"Response of {declared} bytes exceeds {self.max_bytes} from {request.url}")
+
+        decoder = None
+        headers = response.headers
+        if encoding in ("gzip", "x-gzip", "deflate"):
+            # zlib auto-detects the gzip/zlib header
+            decoder = zlib.decompressobj(32 + zlib.MAX_WBITS)
+            headers = [
+                (k, v) for k, v in response.headers.raw
+                if k.lower() not in (b"content-encoding", b"content-length")
+            ]
+
+        chunks = aiter(response.stream)
+        first = b""
+        while not first:
+            raw = await anext(chunks, None)
+            if raw is None:
+                break
+            try:
+                first = decoder.decompress(raw, self.max_bytes + 1) if decoder else raw
+            except zlib.error as e:
+                raise httpx.DecodingError(f"Bad {encoding} body from {request.url}: {e}") from e
+
+        if check_type and kind is None and first:
+            kind = _sniff(first[:1024])
+            if kind is None:
+                raise UnsupportedContentType(f"Non-text response ({media_type or 'untyped'}) from {request.url}")
+        if check_type and kind is not None and kind not in self.kinds:
+            raise UnsupportedContentType(f"Unexpected {kind} response from {request.url}")
+
+        stream = _LimitedStream(chunks, first, decoder, self.max_bytes, self.truncate, response.stream)
+        limited = httpx.Response(
+            response.status_code,
+            headers=headers,
+            stream=stream,
+            extensions={**response.extensions, _TRUNCATED: False},
+        )
+        # The stream sets the flag while the client reads the body
+        stream.extensions = limited.extensions
+        return limited
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def limited_transport(source_type: str, config: Optional[dict] = None) -> LimitedTransport:
+    """Transport with the byte limit and accepted content for a source type."""
+    max_bytes, kinds = SOURCE_LIMITS[source_type]
+    max_bytes = int((config or {}).get("max_bytes") or max_bytes)
+    return LimitedTransport(max_bytes, kinds, truncate="json" not in kinds)
@@ -0,0 +1,126 @@
+"""On-disk cache of fetched article pages, keyed by URL.
+
+Deep-fetched article pages are stored as their extracted title/body, the
+published_at/author from their structured metadata and the response
+validators (ETag / Last-Modified):
+- Within FRESH_SECONDS a cached page is used without any request.
+- After that the page is revalidated with If-None-Match /
+  If-Modified-Since; a 304 reuses the cached extraction.
+- Entries untouched for MAX_AGE_SECONDS are removed by prune().
+
+One JSON file per URL under HAYSTACK_DATA_DIR/pages. Entries written by
+an older extractor (CACHE_VERSION) are ignored.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+import structlog
+
+from config import HAYSTACK_DATA_DIR
+from utils.persist import write_json_atomic
+
+logger = structlog.get_logger()
+
+FRESH_SECONDS = 6 * 3600
+MAX_AGE_SECONDS = 7 * 86400
+CACHE_DIR = "pages"
+CACHE_VERSION = 3
+
+
+def _path(url: str) -> str:
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return os.path.join(HAYSTACK_DATA_DIR, CACHE_DIR, f"{key}.json")
+
+
+def load(url: str) -> Optional[dict]:
+    """The cached page for url, or None."""
+    try:
+        with open(_path(url), encoding="utf-8") as f:
+            entry = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.debug("page_cache.unreadable", url=url, error=str(e))
+        return None
+    if entry.get("version") != CACHE_VERSION or entry.get("url") != url:
+        return None
+    return entry
+
+
+def store(
+    url: str,
+    title: str,
+    body: str,
+    headers=None,
+    published_at: Optional[str] = None,
+    author: Optional[str] = None,
+) -> dict:
+    """Cache an extracted page with the response's validators (atomic replace)."""
+    headers = headers or {}
+    entry = {
+        "version": CACHE_VERSION,
+        "url": url,
+        "title": title,
+        "body": body,
+        "published_at": published_at,
+        "author": author,
+        "etag": headers.get("etag"),
+        "last_modified": headers.get("last-modified"),
+        "fetched_at": time.time(),
+    }
+    _write(url, entry)
+    return entry
+
+
+def touch(entry: dict) -> dict:
+    """Mark a cached page as revalidated (after a 304)."""
+    entry["fetched_at"] = time.time()
+    _write(entry["url"], entry)
+    return entry
+
+
+def _write(url: str, entry: dict) -> None:
+    path = _path(url)
+    try:
+        write_json_atomic(path, entry, ensure_ascii=False)
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning("page_cache.write_failed", url=url, error=str(e))
+
+
+def is_fresh(entry: Optional[dict]) -> bool:
+    return entry is not None and time.time() - entry.get("fetched_at", 0) < FRESH_SECONDS
+
+
+def validators(entry: Optional[dict]) -> dict:
+    """Conditional request headers for revalidating a cached page."""
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def prune() -> int:
+    """Delete entries older than MAX_AGE_SECONDS; returns how many."""
+    directory = os.path.join(HAYSTACK_DATA_DIR, CACHE_DIR)
+    cutoff = time.time() - MAX_AGE_SECONDS
+    removed = 0
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
@@ -0,0 +1,31 @@
+"""Atomic JSON files for local state in HAYSTACK_DATA_DIR."""
+
+import json
+import os
+import tempfile
+
+
+def write_json_atomic(path: str, data, **dump_kwargs) -> None:
+    """Write data as JSON to path via a unique temp file and os.replace.
+
+    Readers see the old or the new file, never a partial one, and concurrent
+    writers of the same path don't share a temp file. Raises OSError (or the
+    json.dump error); the temp file is removed on failure.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp", delete=False
+    ) as f:
+        tmp_path = f.name
+        try:
+            json.dump(data, f, **dump_kwargs)
+        except BaseException:
+            f.close()
+            os.unlink(tmp_path)
+            raise
+    try:
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -1,80 +1,285 @@
-"""Per-domain rate limiter using token bucket algorithm.
+"""Per-domain adaptive rate limiter.
 
-Ensures polite crawling by limiting request frequency per domain.
+Ensures polite crawling by limiting request frequency and concurrency per
+domain:
+- Rates are enforced with GCRA (a token bucket kept as one "theoretical
+  arrival time"). acquire() reserves the next slot and sleeps exactly until
+  it, so waiters never poll and are served in arrival order.
+- AIMD: a 429/503 halves the domain's rate (at most once per request
+  interval) and honours Retry-After; each successful response adds
+  INCREASE_STEP back, up to the configured rate.
+- limit(url) additionally caps in-flight requests per domain.
+
+State lives in process memory, or in a SQLite file (RATE_LIMIT_STATE_PATH)
+shared by every Haystack worker on the host, so they spend one budget per
+domain. Updates to the shared file may wait on another worker's lock, so
+they run in a thread, off the event loop. Concurrency caps are per process.
 """
 
 import asyncio
+import os
+import sqlite3
+import threading
 import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
 from urllib.parse import urlparse
 
 import structlog
 
+from config import DOMAIN_MAX_CONCURRENCY, RATE_LIMIT_STATE_PATH
+
 logger = structlog.get_logger()
 
 # Default: 1 request per 2 seconds per domain
 DEFAULT_RATE = 0.5  # requests per second
 DEFAULT_BURST = 3  # max burst tokens
 
+# AIMD bounds: never slow a domain below MIN_FACTOR of its configured rate
+MIN_FACTOR = 1 / 16
+INCREASE_STEP = 0.05
+MAX_RETRY_AFTER = 600  # seconds
 
-class _TokenBucket:
-    """Simple token bucket for rate limiting."""
+# Status codes that mean "slow down"
+THROTTLE_STATUSES = (429, 503)
 
-    def __init__(self, rate: float, burst: int):
-        self.rate = rate
-        self.burst = burst
-        self.tokens = float(burst)
-        self.last_refill = time.monotonic()
 
-    def _refill(self) -> None:
-        now = time.monotonic()
-        elapsed = now - self.last_refill
-        self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
-        self.last_refill = now
+def _initial_state() -> dict:
+    return {"tat": 0.0, "factor": 1.0, "blocked_until": 0.0, "last_decrease": 0.0}
 
-    async def acquire(self) -> None:
-        """Wait until a token is available, then consume it."""
-        while True:
-            self._refill()
-            if self.tokens >= 1.0:
-                self.tokens -= 1.0
-                return
-            # Calculate wait time for next token
-            wait = (1.0 - self.tokens) / self.rate
-            await asyncio.sleep(min(wait, 2.0))
+
+# ── State backends ────────────────────────────────────
+
+
+class MemoryRateState:
+    """Per-domain limiter state for this process."""
+
+    def __init__(self):
+        self._states: dict[str, dict] = {}
+
+    async def update(self, domain: str, fn: Callable[[dict], object]):
+        """Apply fn to the domain's state (mutating it) and return fn's result."""
+        state = self._states.setdefault(domain, _initial_state())
+        return fn(state)
+
+    def get(self, domain: str) -> dict:
+        return dict(self._states.get(domain) or _initial_state())
+
+    def domains(self) -> list[str]:
+        return list(self._states)
+
+    def clear(self) -> None:
+        self._states.clear()
+
+
+class SQLiteRateState:
+    """Per-domain limiter state shared between processes through a SQLite file.
+
+    Each update runs in a BEGIN IMMEDIATE transaction, so concurrent workers
+    serialize on the file lock and see each other's reservations. Waiting
+    for that lock happens in a worker thread. Reads (get, domains) use a
+    separate connection, so in WAL mode they see only committed state and
+    never wait for a transaction.
+    """
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            " domain TEXT PRIMARY KEY, tat REAL, factor REAL,"
+            " blocked_until REAL, last_decrease REAL)"
+        )
+        # One transaction at a time on the writer connection
+        self._lock = threading.Lock()
+        # Event-loop reads; never used inside a transaction
+        self._reader = sqlite3.connect(path, timeout=5.0, isolation_level=None)
+
+    @staticmethod
+    def _read(conn: sqlite3.Connection, domain: str) -> dict:
+        row = conn.execute(
+            "SELECT tat, factor, blocked_until, last_decrease FROM rate_limits WHERE domain = ?",
+            (domain,),
+        ).fetchone()
+        if row is None:
+            return _initial_state()
+        return dict(zip(("tat", "factor", "blocked_until", "last_decrease"), row))
+
+    async def update(self, domain: str, fn: Callable[[dict], object]):
+        return await asyncio.to_thread(self._update, domain, fn)
+
+    def _update(self, domain: str, fn: Callable[[dict], object]):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                state = self._read(self._conn, domain)
+                result = fn(state)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_limits VALUES (?, ?, ?, ?, ?)",
+                    (domain, state["tat"], state["factor"], state["blocked_until"], state["last_decrease"]),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return result
+
+    def get(self, domain: str) -> dict:
+        return self._read(self._reader, domain)
+
+    def domains(self) -> list[str]:
+        return [r[0] for r in self._reader.execute("SELECT domain FROM rate_limits")]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM rate_limits")
+
+    def close(self) -> None:
+        self._reader.close()
+        with self._lock:
+            self._conn.close()
+
+
+# ── Limiter ───────────────────────────────────────────
+
+
+def _parse_retry_after(value: Optional[str], now: float) -> Optional[float]:
+    """Retry-After (delta-seconds or HTTP-date) -> seconds to wait."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - now
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
 
 
 class RateLimiter:
     """Per-domain rate limiter."""
 
-    def __init__(self, default_rate: float = DEFAULT_RATE, default_burst: int = DEFAULT_BURST):
+    def __init__(
+        self,
+        default_rate: float = DEFAULT_RATE,
+        default_burst: int = DEFAULT_BURST,
+        max_concurrency: int = DOMAIN_MAX_CONCURRENCY,
+        state=None,
+    ):
         self._default_rate = default_rate
         self._default_burst = default_burst
-        self._buckets: dict[str, _TokenBucket] = {}
+        self._max_concurrency = max_concurrency
         self._overrides: dict[str, tuple[float, int]] = {}
-        self._lock = asyncio.Lock()
+        self._state = state or MemoryRateState()
+        self._slots: dict[str, asyncio.Semaphore] = {}
 
     def set_domain_rate(self, domain: str, rate: float, burst: int | None = None) -> None:
-        """Override rate limit for a specific domain."""
+        """Override rate limit for a specific domain.
+
+        Takes effect for the next reservation; the domain's reservations and
+        AIMD backoff are kept.
+        """
         self._overrides[domain] = (rate, burst or self._default_burst)
 
+    def _limits(self, domain: str) -> tuple[float, int]:
+        return self._overrides.get(domain, (self._default_rate, self._default_burst))
+
     async def acquire(self, url: str) -> None:
         """Wait until the rate limit allows a request to this URL's domain."""
         domain = urlparse(url).netloc
+        rate, burst = self._limits(domain)
+
+        def reserve(state: dict) -> float:
+            now = time.time()
+            interval = 1.0 / (rate * state["factor"])
+            tolerance = (burst - 1) * interval
+            start = max(now, state["tat"] - tolerance, state["blocked_until"])
+            state["tat"] = max(state["tat"], start) + interval
+            return start
 
-        async with self._lock:
-            if domain not in self._buckets:
-                rate, burst = self._overrides.get(
-                    domain, (self._default_rate, self._default_burst)
+        start = await self._state.update(domain, reserve)
+        while True:
+            wait = start - time.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if self._state.get(domain)["blocked_until"] <= time.time():
+                return
+            # A Retry-After arrived while we slept: queue again behind it
+            start = await self._state.update(domain, reserve)
+
+    @asynccontextmanager
+    async def limit(self, url: str):
+        """Hold a concurrency slot for the domain and take a rate-limit slot."""
+        domain = urlparse(url).netloc
+        slots = self._slots.get(domain)
+        if slots is None:
+            slots = self._slots[domain] = asyncio.Semaphore(self._max_concurrency)
+        async with slots:
+            await self.acquire(url)
+            yield
+
+    async def record_response(self, url: str, status_code: int, retry_after: Optional[str] = None) -> None:
+        """Adapt the domain's rate to a response (AIMD)."""
+        domain = urlparse(url).netloc
+        rate, _ = self._limits(domain)
+
+        def adapt(state: dict) -> None:
+            now = time.time()
+            if status_code in THROTTLE_STATUSES:
+                # One decrease per request interval: a burst of 429s is one signal
+                if now - state["last_decrease"] >= 1.0 / (rate * state["factor"]):
+                    state["factor"] = max(MIN_FACTOR, state["factor"] / 2)
+                    state["last_decrease"] = now
+                delay = _parse_retry_after(retry_after, now)
+                if delay:
+                    state["blocked_until"] = max(state["blocked_until"], now + delay)
+                    state["tat"] = max(state["tat"], state["blocked_until"])
+                logger.warning(
+                    "rate_limiter.throttled",
+                    domain=domain,
+                    status=status_code,
+                    factor=state["factor"],
+                    retry_after=delay,
                 )
-                self._buckets[domain] = _TokenBucket(rate, burst)
-            bucket = self._buckets[domain]
+            elif status_code < 400 and state["factor"] < 1.0:
+                state["factor"] = min(1.0, state["factor"] + INCREASE_STEP)
+
+        await self._state.update(domain, adapt)
 
-        await bucket.acquire()
+    def stats(self) -> dict:
+        """Current effective rate and backoff per domain."""
+        now = time.time()
+        result = {}
+        for domain in self._state.domains():
+            state = self._state.get(domain)
+            rate, burst = self._limits(domain)
+            result[domain] = {
+                "rate": round(rate * state["factor"], 4),
+                "burst": burst,
+                "factor": state["factor"],
+                "blocked_for": round(max(0.0, state["blocked_until"] - now), 1),
+            }
+        return result
 
     def clear(self) -> None:
         """Reset all rate limiters."""
-        self._buckets.clear()
+        self._state.clear()
+        self._slots.clear()
+
+
+def _shared_state():
+    if not RATE_LIMIT_STATE_PATH:
+        return None
+    try:
+        return SQLiteRateState(RATE_LIMIT_STATE_PATH)
+    except sqlite3.Error as e:
+        logger.error("rate_limiter.shared_state_failed", path=RATE_LIMIT_STATE_PATH, error=str(e))
+        return None
 
 
 # Shared instance
-rate_limiter = RateLimiter()
+rate_limiter = RateLimiter(state=_shared_state())
@@ -1,11 +1,17 @@
 """Source reliability scoring: tracks acceptance rates per source feed."""
 
+import asyncio
+from collections import deque
+
 import structlog
 
-from db.client import _request
+from db.client import query_crawls, update_source
 
 logger = structlog.get_logger()
 
+RELIABILITY_WINDOW = 100  # Relevant crawl records per source considered
+SEED_CONCURRENCY = 8  # Window queries in flight when seeding many sources
+
 # Reliability tiers and their default quality gate behavior
 TIER_CONFIG = {
     "official": {
@@ -31,58 +37,125 @@ def get_tier_config(reliability_tier: str) -> dict:
     return TIER_CONFIG.get(reliability_tier, TIER_CONFIG["standard"])
 
 
-async def update_source_reliability(source_feed_id: str) -> None:
-    """Recalculate reliability score for a source feed based on crawl history.
+# Rolling window of the last RELIABILITY_WINDOW relevant records per source:
+# published flags (oldest first) plus a running published count
+_windows: dict[str, deque[bool]] = {}
+_published: dict[str, int] = {}
+_last_scores: dict[str, float] = {}
+_dirty: set[str] = set()
 
-    Score = (articles that became field notes) / (total relevant articles) * 100
-    Only considers the last 100 crawl records for the source.
+
+def _push(source_feed_id: str, published: bool) -> None:
+    window = _windows.setdefault(source_feed_id, deque())
+    window.append(published)
+    _published[source_feed_id] = _published.get(source_feed_id, 0) + published
+    if len(window) > RELIABILITY_WINDOW:
+        _published[source_feed_id] -= window.popleft()
+
+
+def observe_crawl(record: dict) -> None:
+    """Slide a freshly written crawl_history row into its source's window.
+
+    Sources without a window yet are skipped; their window is read from
+    crawl_history (including this row) when they are first flushed.
     """
-    try:
-        # Count relevant articles from this source
-        relevant = await _request(
-            "GET",
-            "crawl_history",
-            params={
-                "source_feed_id": f"eq.{source_feed_id}",
-                "was_relevant": "eq.true",
-                "select": "id,field_note_id",
-                "order": "fetched_at.desc",
-                "limit": "100",
-            },
-        )
+    source_feed_id = record.get("source_feed_id")
+    if record.get("was_relevant") and source_feed_id in _windows:
+        _push(source_feed_id, record.get("field_note_id") is not None)
 
-        if not relevant:
-            return
 
-        total_relevant = len(relevant)
-        total_published = sum(1 for r in relevant if r.get("field_note_id"))
+def mark_source_dirty(source_feed_id: str) -> None:
+    """Schedule a source's reliability score for the next flush."""
+    _dirty.add(source_feed_id)
 
-        if total_relevant == 0:
-            return
 
+async def _source_window(source_id: str) -> list[bool]:
+    """Published flags of a source's newest RELIABILITY_WINDOW relevant records."""
+    rows = await query_crawls(
+        ["field_note_id"], source_feed_id=source_id, relevant_only=True, limit=RELIABILITY_WINDOW
+    )
+    return [row.get("field_note_id") is not None for row in rows]
+
+
+async def _seed_windows(source_ids: list[str]) -> None:
+    """Load the windows of several sources, one query per source in parallel.
+
+    Each source gets its own last-RELIABILITY_WINDOW rows, so busy sources
+    can't crowd quiet ones out (PostgREST cannot limit per group).
+    """
+    limit = asyncio.Semaphore(SEED_CONCURRENCY)
+
+    async def load(source_id: str) -> list[bool]:
+        async with limit:
+            return await _source_window(source_id)
+
+    windows = await asyncio.gather(*(load(s) for s in source_ids))
+
+    for source_id, flags in zip(source_ids, windows):
+        _windows[source_id] = deque()
+        _published[source_id] = 0
+        for published in reversed(flags):
+            _push(source_id, published)
+
+
+async def flush_reliability_updates() -> dict[str, float]:
+    """Recompute reliability for every source marked during the run.
+
+    Score = (articles that became field notes) / (total relevant articles) * 100
+    over the last RELIABILITY_WINDOW relevant crawl records for the source.
+    Sources seen for the first time are loaded with one query each;
+    after that the score comes from in-memory counters. Only scores that
+    changed are written back.
+
+    Returns the scores written, keyed by source ID.
+    """
+    if not _dirty:
+        return {}
+    source_ids = sorted(_dirty)
+    _dirty.clear()
+
+    unseeded = [s for s in source_ids if s not in _windows]
+    if unseeded:
+        try:
+            await _seed_windows(unseeded)
+        except Exception as e:
+            logger.error("reliability.seed_failed", sources=len(unseeded), error=str(e))
+            _dirty.update(unseeded)  # Retry on the next flush
+            source_ids = [s for s in source_ids if s in _windows]
+
+    written = {}
+    for source_id in source_ids:
+        total_relevant = len(_windows[source_id])
+        if total_relevant == 0:
+            continue
+        total_published = _published[source_id]
         score = round((total_published / total_relevant) * 100, 1)
+        if _last_scores.get(source_id) == score:
+            continue
 
         try:
-            await _request(
-                "PATCH",
-                f"source_feeds?id=eq.{source_feed_id}",
-                json={"reliability_score": score},
-            )
-        except Exception:
+            await update_source(source_id, {"reliability_score": score})
+        except Exception as e:
             # Column may not exist yet (migration 002 pending)
-            logger.debug("reliability.column_missing", source_feed_id=source_feed_id[:8])
+            logger.debug("reliability.update_failed", source_feed_id=source_id[:8], error=str(e))
+            continue
 
+        _last_scores[source_id] = score
+        written[source_id] = score
         logger.info(
             "reliability.updated",
-            source_feed_id=source_feed_id[:8],
+            source_feed_id=source_id[:8],
             score=score,
             published=total_published,
             relevant=total_relevant,
         )
 
-    except Exception as e:
-        logger.error(
-            "reliability.update_failed",
-            source_feed_id=source_feed_id[:8],
-            error=str(e),
-        )
+    return written
+
+
+def reset() -> None:
+    """Drop all windows and pending updates."""
+    _windows.clear()
+    _published.clear()
+    _last_scores.clear()
+    _dirty.clear()
@@ -1,23 +1,65 @@
 """robots.txt compliance checker.
 
-Caches parsed robots.txt per domain to avoid repeated fetches.
+Caches robots.txt per domain:
+- Each robots.txt is compiled once (utils/robots_matcher.py) and checked
+  with RFC 9309 longest-match semantics; filter_allowed() checks a batch of
+  URLs with one cache lookup per domain.
+- Concurrent lookups of a cold domain share one fetch (single-flight).
+- Fresh entries live for the response's Cache-Control max-age / Expires,
+  clamped to [MIN_TTL, MAX_TTL], or DEFAULT_TTL without cache headers.
+- A missing robots.txt (4xx) allows everything and is cached like a hit.
+  Unreachable hosts and 429/5xx are cached as failures for NEGATIVE_TTL,
+  and crawling stays allowed meanwhile (fail-open).
+- The cache is persisted as JSON in HAYSTACK_DATA_DIR (save_cache(), called
+  after each pipeline run) so restarts don't re-fetch every domain.
 """
 
 import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Optional
 from urllib.parse import urlparse
-from urllib.robotparser import RobotFileParser
 
 import httpx
 import structlog
 
+from config import HAYSTACK_DATA_DIR
+from utils.connections import pooled_transport
+from utils.persist import write_json_atomic
+from utils.robots_matcher import CompiledRobots
+
 logger = structlog.get_logger()
 
 USER_AGENT = "NisekoGazetBot/1.0 (+https://niseko-gazet.vercel.app)"
 
-# Cache: domain -> (RobotFileParser, expiry_timestamp)
-_cache: dict[str, tuple[RobotFileParser, float]] = {}
-_cache_ttl = 3600  # 1 hour
-_lock = asyncio.Lock()
+DEFAULT_TTL = 3600  # 1 hour, when the response has no cache headers
+MIN_TTL = 300
+MAX_TTL = 86400  # RFC 9309: don't use a cached robots.txt for more than 24h
+NEGATIVE_TTL = 300  # unreachable host / server error
+
+CACHE_FILE = "robots_cache.json"
+CACHE_VERSION = 1
+
+
+@dataclass
+class _Entry:
+    lines: Optional[list[str]]  # None: fetch failed (fail-open)
+    expires: float  # time.time()
+    parser: Optional[CompiledRobots] = field(default=None, repr=False)
+
+    def __post_init__(self):
+        if self.lines is not None and self.parser is None:
+            self.parser = CompiledRobots(self.lines)
+
+
+_cache: dict[str, _Entry] = {}
+_inflight: dict[str, asyncio.Future] = {}
+_loaded = False
+_dirty = False
+_stats = {"hits": 0, "fetches": 0, "shared": 0, "failures": 0}
 
 
 async def is_allowed(url: str, user_agent: str = USER_AGENT) -> bool:
@@ -36,6 +78,27 @@ async def is_allowed(url: str, user_agent: str = USER_AGENT) -> bool:
     return parser.can_fetch(user_agent, url)
 
 
+async def filter_allowed(urls: list[str], user_agent: str = USER_AGENT) -> list[str]:
+    """The subset of urls that robots.txt allows, in input order.
+
+    Each domain's rules are looked up once for the whole batch.
+    """
+    domains = {}
+    for url in urls:
+        parsed = urlparse(url)
+        domains.setdefault(f"{parsed.scheme}://{parsed.netloc}", None)
+    parsers = await asyncio.gather(*(_get_parser(domain) for domain in domains))
+    by_domain = dict(zip(domains, parsers))
+
+    allowed = []
+    for url in urls:
+        parsed = urlparse(url)
+        parser = by_domain[f"{parsed.scheme}://{parsed.netloc}"]
+        if parser is None or parser.can_fetch(user_agent, url):
+            allowed.append(url)
+    return allowed
+
+
 async def get_crawl_delay(url: str, user_agent: str = USER_AGENT) -> float | None:
     """Get the Crawl-delay directive for the given domain, if any."""
     parsed = urlparse(url)
@@ -49,43 +112,160 @@ async def get_crawl_delay(url: str, user_agent: str = USER_AGENT) -> float | Non
     return float(delay) if delay is not None else None
 
 
-async def _get_parser(domain: str) -> RobotFileParser | None:
-    """Get or fetch a cached RobotFileParser for the domain."""
-    import time
+async def prefetch(domain: str) -> None:
+    """Fetch and cache robots.txt for "scheme://netloc" unless already cached."""
+    await _get_parser(domain)
 
-    now = time.time()
 
-    async with _lock:
-        if domain in _cache:
-            parser, expiry = _cache[domain]
-            if now < expiry:
-                return parser
+async def _get_parser(domain: str) -> CompiledRobots | None:
+    """Cached compiled rules for the domain (None when robots.txt is unreachable)."""
+    if not _loaded:
+        _load_cache()
+
+    entry = _cache.get(domain)
+    if entry is not None and time.time() < entry.expires:
+        _stats["hits"] += 1
+        return entry.parser
+
+    inflight = _inflight.get(domain)
+    if inflight is not None:
+        _stats["shared"] += 1
+        try:
+            # shield: one waiter being cancelled must not cancel the shared fetch
+            return (await asyncio.shield(inflight)).parser
+        except asyncio.CancelledError:
+            if not inflight.cancelled():
+                raise
+            # The fetching task was cancelled: fetch ourselves
+            return await _get_parser(domain)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[domain] = future
+    try:
+        entry = await _fetch(domain)  # failures come back as negative entries
+        _store(domain, entry)
+        future.set_result(entry)
+    finally:
+        _inflight.pop(domain, None)
+        if not future.done():
+            future.cancel()
+    return entry.parser
+
 
-    # Fetch fresh robots.txt
+async def _fetch(domain: str) -> _Entry:
     robots_url = f"{domain}/robots.txt"
+    _stats["fetches"] += 1
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with httpx.AsyncClient(timeout=10.0, transport=pooled_transport()) as client:
             resp = await client.get(robots_url, follow_redirects=True)
+    except Exception as e:
+        _stats["failures"] += 1
+        logger.warning("robots.fetch_failed", domain=domain, error=str(e))
+        return _Entry(None, time.time() + NEGATIVE_TTL)
 
-        parser = RobotFileParser()
-        parser.set_url(robots_url)
+    if resp.status_code == 429 or resp.status_code >= 500:
+        _stats["failures"] += 1
+        logger.warning("robots.fetch_failed", domain=domain, status=resp.status_code)
+        return _Entry(None, time.time() + NEGATIVE_TTL)
 
-        if resp.status_code == 200:
-            parser.parse(resp.text.splitlines())
-        else:
-            # No robots.txt or error — allow everything
-            parser.parse([])
+    # 2xx: the rules; other 4xx: no robots.txt — allow everything
+    lines = resp.text.splitlines() if resp.status_code < 300 else []
+    return _Entry(lines, time.time() + _ttl(resp.headers))
 
-        async with _lock:
-            _cache[domain] = (parser, now + _cache_ttl)
 
-        return parser
+def _ttl(headers) -> float:
+    """Cache lifetime from Cache-Control / Expires, clamped to [MIN_TTL, MAX_TTL]."""
+    ttl = None
+    directives = {}
+    for part in headers.get("cache-control", "").split(","):
+        name, _, value = part.strip().lower().partition("=")
+        if name:
+            directives[name] = value.strip('"')
 
-    except Exception as e:
-        logger.warning("robots.fetch_failed", domain=domain, error=str(e))
-        return None  # fail-open
+    if "no-store" in directives or "no-cache" in directives:
+        ttl = 0
+    elif "max-age" in directives:
+        try:
+            ttl = int(directives["max-age"]) - int(headers.get("age", "0") or 0)
+        except ValueError:
+            ttl = None
+    elif headers.get("expires"):
+        try:
+            expires = parsedate_to_datetime(headers["expires"])
+            date = parsedate_to_datetime(headers["date"]) if headers.get("date") else None
+            ttl = (expires - date).total_seconds() if date else expires.timestamp() - time.time()
+        except (TypeError, ValueError):
+            ttl = 0  # invalid Expires means already expired
+
+    if ttl is None:
+        return DEFAULT_TTL
+    return min(max(ttl, MIN_TTL), MAX_TTL)
+
+
+def _store(domain: str, entry: _Entry) -> None:
+    global _dirty
+    _cache[domain] = entry
+    _dirty = True
+
+
+# ── Persistence ───────────────────────────────────────
+
+
+def _cache_path() -> str:
+    return os.path.join(HAYSTACK_DATA_DIR, CACHE_FILE)
+
+
+def _load_cache() -> None:
+    global _loaded
+    _loaded = True
+    try:
+        with open(_cache_path(), encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError) as e:
+        logger.warning("robots.cache_unreadable", error=str(e))
+        return
+    if data.get("version") != CACHE_VERSION:
+        return
+
+    now = time.time()
+    for domain, item in data.get("entries", {}).items():
+        if item["expires"] > now and domain not in _cache:
+            _cache[domain] = _Entry(item["lines"], item["expires"])
+    logger.debug("robots.cache_loaded", domains=len(_cache))
+
+
+def save_cache() -> None:
+    """Persist unexpired entries to HAYSTACK_DATA_DIR (atomic replace)."""
+    global _dirty
+    if not _dirty:
+        return
+
+    now = time.time()
+    data = {
+        "version": CACHE_VERSION,
+        "entries": {
+            domain: {"lines": entry.lines, "expires": entry.expires}
+            for domain, entry in _cache.items()
+            if entry.expires > now
+        },
+    }
+    path = _cache_path()
+    try:
+        write_json_atomic(path, data)
+        _dirty = False
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning("robots.cache_save_failed", error=str(e))
+
+
+def cache_stats() -> dict:
+    return {**_stats, "domains": len(_cache), "inflight": len(_inflight)}
 
 
 def clear_cache() -> None:
-    """Clear the robots.txt cache."""
+    """Clear the robots.txt cache (in memory; the file is not reloaded)."""
+    global _loaded, _dirty
     _cache.clear()
+    _loaded = True
+    _dirty = False
@@ -0,0 +1,157 @@
+"""Compiled robots.txt rules (RFC 9309 matching).
+
+A domain's robots.txt is parsed once into per-user-agent rule sets:
+- Plain path prefixes go into a character trie, so the longest matching
+  prefix is found in one walk over the URL path.
+- Rules with wildcards ("*", trailing "$") are compiled to regexes.
+
+The most specific (longest) matching rule wins; on a tie Allow wins. No
+matching rule means allowed. This replaces RobotFileParser, which checks
+rules in file order with no wildcard support.
+"""
+
+import re
+from typing import Optional
+from urllib.parse import quote, unquote, urlsplit
+
+# Characters kept as-is when normalizing paths and rule patterns
+_SAFE = "/?=&;:@+,!~'()*$%"
+
+
+def _normalize(path: str) -> str:
+    """Canonical percent-encoding so "/caf%C3%A9" and "/café" compare equal."""
+    return quote(unquote(path), safe=_SAFE)
+
+
+class _Trie:
+    __slots__ = ("children", "allow")
+
+    def __init__(self):
+        self.children: dict[str, "_Trie"] = {}
+        self.allow: Optional[bool] = None
+
+
+class RuleSet:
+    """Allow/Disallow rules of one user-agent group."""
+
+    def __init__(self, rules: list[tuple[bool, str]], crawl_delay: Optional[float] = None):
+        self.crawl_delay = crawl_delay
+        self._trie = _Trie()
+        self._patterns: list[tuple[int, bool, re.Pattern]] = []
+        for allow, path in rules:
+            path = _normalize(path)
+            if "*" in path or path.endswith("$"):
+                self._add_pattern(allow, path)
+            else:
+                self._add_prefix(allow, path)
+
+    def _add_prefix(self, allow: bool, path: str) -> None:
+        node = self._trie
+        for ch in path:
+            node = node.children.setdefault(ch, _Trie())
+        # Same path listed as both Allow and Disallow: Allow wins
+        node.allow = allow or bool(node.allow)
+
+    def _add_pattern(self, allow: bool, path: str) -> None:
+        anchored = path.endswith("$")
+        body = path[:-1] if anchored else path
+        regex = ".*".join(re.escape(part) for part in body.split("*"))
+        self._patterns.append((len(path), allow, re.compile(regex + ("$" if anchored else ""))))
+
+    def allowed(self, path: str) -> bool:
+        """Whether a normalized path (with query) may be fetched."""
+        best_len, best_allow = -1, True
+
+        node, depth = self._trie, 0
+        for ch in path:
+            node = node.children.get(ch)
+            if node is None:
+                break
+            depth += 1
+            if node.allow is not None:
+                best_len, best_allow = depth, node.allow
+
+        for length, allow, pattern in self._patterns:
+            if length < best_len or (length == best_len and not allow):
+                continue
+            if pattern.match(path):
+                best_len, best_allow = length, allow
+
+        return best_allow
+
+
+_ALLOW_ALL = RuleSet([])
+
+
+class CompiledRobots:
+    """One domain's robots.txt, compiled per user-agent on first use."""
+
+    def __init__(self, lines: list[str]):
+        # agent (lowercase) -> rules / crawl delay, merged across groups
+        self._groups: dict[str, list[tuple[bool, str]]] = {}
+        self._delays: dict[str, float] = {}
+        self._compiled: dict[str, RuleSet] = {}
+        self._parse(lines)
+
+    def _parse(self, lines: list[str]) -> None:
+        agents: list[str] = []
+        in_rules = False
+        for line in lines:
+            line = line.split("#", 1)[0].strip()
+            key, sep, value = line.partition(":")
+            if not sep:
+                continue
+            key, value = key.strip().lower(), value.strip()
+
+            if key == "user-agent":
+                if in_rules:
+                    agents, in_rules = [], False
+                agent = value.lower()
+                agents.append(agent)
+                self._groups.setdefault(agent, [])
+            elif key in ("allow", "disallow"):
+                in_rules = True
+                if value:  # an empty Disallow allows everything
+                    for agent in agents:
+                        self._groups[agent].append((key == "allow", value))
+            elif key == "crawl-delay":
+                in_rules = True
+                try:
+                    delay = float(value)
+                except ValueError:
+                    continue
+                for agent in agents:
+                    self._delays.setdefault(agent, delay)
+
+    def _agent(self, user_agent: str) -> Optional[str]:
+        """The group that applies to user_agent: its product token, else "*".
+
+        The product token must match a group name exactly (case-insensitive);
+        a group such as "bot" does not apply to "NisekoGazetBot".
+        """
+        token = user_agent.split("/", 1)[0].strip().lower()
+        if token in self._groups:
+            return token
+        return "*" if "*" in self._groups else None
+
+    def rules_for(self, user_agent: str) -> RuleSet:
+        ruleset = self._compiled.get(user_agent)
+        if ruleset is None:
+            agent = self._agent(user_agent)
+            ruleset = _ALLOW_ALL if agent is None else RuleSet(
+                self._groups[agent], self._delays.get(agent)
+            )
+            self._compiled[user_agent] = ruleset
+        return ruleset
+
+    def can_fetch(self, user_agent: str, url: str) -> bool:
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if path == "/robots.txt":
+            return True
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        return self.rules_for(user_agent).allowed(_normalize(path))
+
+    def crawl_delay(self, user_agent: str) -> Optional[float]:
+        return self.rules_for(user_agent).crawl_delay
@@ -0,0 +1,255 @@
+"""Structured article metadata: JSON-LD, OpenGraph and microdata.
+
+News sites often describe their articles in machine-readable form. Reading
+that is cheaper and more accurate than selector/DOM extraction, especially
+for publication dates:
+- JSON-LD (<script type="application/ld+json">, including @graph and
+  ItemList wrappers) and OpenGraph <meta> tags are read with regexes from
+  the raw HTML, without building a DOM.
+- Microdata is only parsed (with BeautifulSoup) when the page declares a
+  schema.org article itemtype.
+
+articles_from_html() lists every article a page describes (listing pages);
+page_article() merges what a page says about itself (article pages).
+"""
+
+import html
+import json
+import re
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Optional
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from utils.text import html_to_text
+
+_JSON_LD = re.compile(
+    r"<script[^>]*type\s*=\s*[\"']application/ld\+json[\"'][^>]*>(.*?)</script>",
+    re.I | re.S,
+)
+_META = re.compile(r"<meta\s[^>]*>", re.I)
+_ATTR = re.compile(r"([\w:-]+)\s*=\s*(?:\"([^\"]*)\"|'([^']*)')")
+_MICRODATA_TYPE = re.compile(r"^https?://schema\.org/(\w*Article|BlogPosting|Report)$", re.I)
+_MICRODATA = re.compile(
+    r"itemtype\s*=\s*[\"']https?://schema\.org/(\w*Article|BlogPosting|Report)[\"']", re.I
+)
+
+_ARTICLE_TYPES = {"BlogPosting", "LiveBlogPosting", "Report", "SocialMediaPosting"}
+
+
+@dataclass
+class StructuredArticle:
+    title: str
+    url: Optional[str] = None
+    body: Optional[str] = None  # full text (articleBody), when the page provides it
+    description: Optional[str] = None
+    published_at: Optional[str] = None
+    author: Optional[str] = None
+    method: str = "json_ld"  # "json_ld", "microdata" or "opengraph"
+    in_list: bool = False  # an entry of a JSON-LD ItemList
+
+
+def _is_article(node: dict) -> bool:
+    types = node.get("@type")
+    types = types if isinstance(types, list) else [types]
+    return any(
+        isinstance(t, str) and (t.endswith("Article") or t in _ARTICLE_TYPES) for t in types
+    )
+
+
+def _json_ld_nodes(page: str) -> list[tuple[dict, bool]]:
+    """All JSON-LD objects of the page, flattened out of lists/@graph/ItemList.
+
+    Each comes with whether it is an ItemList entry.
+    """
+    nodes: list[tuple[dict, bool]] = []
+
+    def walk(value, in_list: bool = False) -> None:
+        if isinstance(value, list):
+            for item in value:
+                walk(item, in_list)
+        elif isinstance(value, dict):
+            nodes.append((value, in_list))
+            walk(value.get("@graph"), in_list)
+            for element in value.get("itemListElement") or []:
+                walk(element.get("item") if isinstance(element, dict) and "item" in element else element, True)
+
+    for block in _JSON_LD.findall(page):
+        block = block.strip().removeprefix("<!--").removesuffix("-->").strip()
+        block = block.removeprefix("//<![CDATA[").removesuffix("//]]>").strip()
+        try:
+            walk(json.loads(block))
+        except ValueError:
+            continue
+    return nodes
+
+
+def _text(value) -> Optional[str]:
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("@id")
+    if not isinstance(value, str):
+        return None
+    value = html.unescape(value).strip()
+    if "<" in value:
+        value = html_to_text(value)
+    return value or None
+
+
+def _author(value) -> Optional[str]:
+    values = value if isinstance(value, list) else [value]
+    names = [n for n in (_text(v) for v in values) if n]
+    return ", ".join(names) or None
+
+
+def _url(value, base_url: str) -> Optional[str]:
+    url = _text(value)
+    return urljoin(base_url, url) if url else None
+
+
+def normalize_date(value) -> Optional[str]:
+    """ISO 8601 timestamp, or None when the value isn't a parseable date."""
+    value = _text(value)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).isoformat()
+    except ValueError:
+        return None
+
+
+def _from_json_ld(node: dict, base_url: str) -> Optional[StructuredArticle]:
+    title = _text(node.get("headline")) or _text(node.get("name"))
+    if not title:
+        return None
+    return StructuredArticle(
+        title=title,
+        url=_url(node.get("url") or node.get("mainEntityOfPage"), base_url),
+        body=_text(node.get("articleBody")),
+        description=_text(node.get("description")),
+        published_at=normalize_date(node.get("datePublished") or node.get("dateCreated")),
+        author=_author(node.get("author")),
+        method="json_ld",
+    )
+
+
+def _meta_tags(page: str) -> dict[str, str]:
+    tags = {}
+    for tag in _META.findall(page):
+        attrs = {m[0].lower(): m[1] or m[2] for m in _ATTR.findall(tag)}
+        key = attrs.get("property") or attrs.get("name")
+        if key and "content" in attrs:
+            tags.setdefault(key.lower(), html.unescape(attrs["content"]).strip())
+    return tags
+
+
+def _from_opengraph(page: str, base_url: str) -> Optional[StructuredArticle]:
+    tags = _meta_tags(page)
+    title = tags.get("og:title")
+    if not title or tags.get("og:type", "article") != "article":
+        return None
+    return StructuredArticle(
+        title=title,
+        url=_url(tags.get("og:url"), base_url),
+        description=tags.get("og:description") or tags.get("description"),
+        published_at=normalize_date(tags.get("article:published_time")),
+        author=tags.get("article:author") or tags.get("author"),
+        method="opengraph",
+    )
+
+
+def _from_microdata(page: str, base_url: str) -> Optional[StructuredArticle]:
+    if not _MICRODATA.search(page):
+        return None
+    soup = BeautifulSoup(page, "lxml")
+    scope = soup.find(attrs={"itemtype": _MICRODATA_TYPE})
+    if scope is None:
+        return None
+
+    def prop(name: str):
+        el = scope.find(attrs={"itemprop": name})
+        if el is None:
+            return None
+        if el.get("content"):
+            return el["content"]
+        if el.get("datetime"):
+            return el["datetime"]
+        if name == "url" and el.get("href"):
+            return el["href"]
+        if name == "author":
+            author = el.find(attrs={"itemprop": "name"})
+            return (author or el).get_text(" ", strip=True)
+        if name == "articleBody":
+            return html_to_text(str(el))
+        return el.get_text(" ", strip=True)
+
+    title = _text(prop("headline")) or _text(prop("name"))
+    if not title:
+        return None
+    return StructuredArticle(
+        title=title,
+        url=_url(prop("url") or prop("mainEntityOfPage"), base_url),
+        body=_text(prop("articleBody")),
+        description=_text(prop("description")),
+        published_at=normalize_date(prop("datePublished")),
+        author=_text(prop("author")),
+        method="microdata",
+    )
+
+
+def articles_from_html(page: str, base_url: str) -> list[StructuredArticle]:
+    """Every article the page describes in JSON-LD (or microdata), in page order."""
+    articles, seen = [], set()
+    for node, in_list in _json_ld_nodes(page):
+        if not _is_article(node):
+            continue
+        article = _from_json_ld(node, base_url)
+        if article and in_list:
+            article = replace(article, in_list=True)
+        key = article.url if article else None
+        if article and key not in seen:
+            seen.add(key)
+            articles.append(article)
+    if not articles:
+        article = _from_microdata(page, base_url)
+        if article:
+            articles.append(article)
+    return articles
+
+
+def page_article(page: str, page_url: str) -> Optional[StructuredArticle]:
+    """What the page says about its own article, merged across formats.
+
+    JSON-LD wins, then microdata, then OpenGraph; missing fields are filled
+    from the next format.
+    """
+    articles = articles_from_html(page, page_url)
+    own = next(
+        (a for a in articles if a.url in (None, page_url)),
+        articles[0] if len(articles) == 1 else None,
+    )
+    found = [own] if own else []
+    if not found or found[0].method != "microdata":
+        microdata = _from_microdata(page, page_url)
+        if microdata:
+            found.append(microdata)
+    opengraph = _from_opengraph(page, page_url)
+    if opengraph:
+        found.append(opengraph)
+    if not found:
+        return None
+
+    merged = found[0]
+    for other in found[1:]:
+        merged = replace(
+            merged,
+            **{
+                field: getattr(other, field)
+                for field in ("url", "body", "description", "published_at", "author")
+                if getattr(merged, field) is None and getattr(other, field) is not None
+            },
+        )
+    return merged
@@ -0,0 +1,99 @@
+"""Streaming trend engine: exponentially decayed counts at several horizons.
+
+Each key (a topic or geo tag) keeps one decayed count per horizon. An event
+at time t adds 1; the count then decays as exp(-Δt / τ). A count divided by
+its τ is a smoothed event rate over roughly that horizon, so comparing
+horizons gives velocity (is the short-term rate above the daily rate?) and
+acceleration (is that gap widening?). The 7-day rate is the baseline for a
+Poisson burst z-score of the last hour.
+
+Memory is bounded: at most MAX_KEYS keys per engine, evicting the key with
+the smallest 7-day weight.
+"""
+
+import math
+import time
+
+HORIZONS = {"1h": 3600.0, "6h": 6 * 3600.0, "24h": 24 * 3600.0, "7d": 7 * 24 * 3600.0}
+_TAUS = tuple(HORIZONS.values())
+MAX_KEYS = 2000
+
+# Expected hourly events below this are treated as this (avoids z-scores
+# exploding for topics that have never been seen before)
+MIN_BASELINE_PER_HOUR = 0.05
+
+
+class TrendEngine:
+    """Decayed multi-horizon counters for one kind of key."""
+
+    def __init__(self, max_keys: int = MAX_KEYS):
+        self.max_keys = max_keys
+        # key -> [last_update_ts, count_1h, count_6h, count_24h, count_7d]
+        self._counts: dict[str, list[float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, key: str, ts: float | None = None, weight: float = 1.0) -> None:
+        """Record an event for key at unix time ts (default: now)."""
+        ts = time.time() if ts is None else ts
+        entry = self._counts.get(key)
+        if entry is None:
+            if len(self._counts) >= self.max_keys:
+                self._evict(ts)
+            self._counts[key] = [ts, *(weight for _ in _TAUS)]
+            return
+
+        last = entry[0]
+        if ts >= last:
+            for i, tau in enumerate(_TAUS, start=1):
+                entry[i] = entry[i] * math.exp(-(ts - last) / tau) + weight
+            entry[0] = ts
+        else:
+            # Late event (e.g. replayed history): add it pre-decayed to last
+            for i, tau in enumerate(_TAUS, start=1):
+                entry[i] += weight * math.exp(-(last - ts) / tau)
+
+    def _evict(self, now: float) -> None:
+        weakest = min(self._counts, key=lambda k: self._decayed(self._counts[k], now)[-1])
+        del self._counts[weakest]
+
+    @staticmethod
+    def _decayed(entry: list[float], now: float) -> list[float]:
+        elapsed = max(0.0, now - entry[0])
+        return [entry[i] * math.exp(-elapsed / tau) for i, tau in enumerate(_TAUS, start=1)]
+
+    def score(self, key: str, now: float | None = None) -> dict | None:
+        """Decayed counts, velocity, acceleration and burst z-score for key.
+
+        Velocity and acceleration are in events per hour (and per hour per
+        horizon step); burst_z compares the last hour with the 7-day rate.
+        """
+        entry = self._counts.get(key)
+        if entry is None:
+            return None
+        now = time.time() if now is None else now
+
+        counts = self._decayed(entry, now)
+        r1h, r6h, r24h, r7d = (c / tau * 3600.0 for c, tau in zip(counts, _TAUS))
+
+        expected = max(r7d, MIN_BASELINE_PER_HOUR)
+        return {
+            "counts": {name: round(c, 3) for name, c in zip(HORIZONS, counts)},
+            "velocity": round(r1h - r24h, 4),
+            "acceleration": round((r1h - r6h) - (r6h - r24h), 4),
+            "burst_z": round((r1h - expected) / math.sqrt(expected), 3),
+        }
+
+    def scores(self, now: float | None = None) -> dict[str, dict]:
+        now = time.time() if now is None else now
+        return {key: self.score(key, now) for key in self._counts}
+
+    def to_dict(self) -> dict:
+        return {"max_keys": self.max_keys, "counts": self._counts}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TrendEngine":
+        engine = cls(max_keys=data.get("max_keys", MAX_KEYS))
+        engine._counts = {k: list(v) for k, v in data.get("counts", {}).items()}
+        return engine
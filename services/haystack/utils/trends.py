@@ -1,57 +1,45 @@
-"""Topic trend detection: analyze crawl history for emerging patterns."""
+"""Topic trend detection: analyze crawl history for emerging patterns.
+
+Counts come from the materialized analytics store (utils/analytics.py), so
+these calls do not query crawl_history.
+"""
+
+import time
 
 import structlog
-from collections import Counter
-from datetime import datetime, timezone, timedelta
 
-from db.client import _request
+from db.client import get_active_sources
+from utils.analytics import ensure_ready
 
 logger = structlog.get_logger()
 
+BURST_Z_HOT = 3.0  # Last-hour rate this many standard deviations above the weekly baseline
+
+_NO_SCORE = {"velocity": 0.0, "acceleration": 0.0, "burst_z": 0.0}
+
 
 async def get_topic_trends(hours: int = 24, min_count: int = 2) -> list[dict]:
-    """Analyze recent crawl history for trending topics.
+    """Rank topics among relevant articles from the last N hours.
 
-    Looks at classified articles from the last N hours and ranks topics
-    by frequency. Returns topics with at least min_count occurrences.
+    Returns topics with at least min_count occurrences in the window, with
+    velocity, acceleration and burst z-score from the streaming trend engine.
+    A topic is "hot" when it bursts above its weekly baseline across at least
+    two sources, "rising" when its last-hour rate exceeds its daily rate.
 
     Args:
-        hours: Time window to analyze (default: 24h)
+        hours: Time window to analyze (default: 24h, max: 7 days)
         min_count: Minimum occurrences to be considered trending
 
     Returns:
-        List of {"topic": str, "count": int, "sources": list[str], "trend": str}
-        sorted by count descending.
+        List of {"topic", "count", "source_count", "trend", "velocity",
+        "acceleration", "burst_z"} sorted by count descending.
     """
-    since = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
-
-    records = await _request(
-        "GET",
-        "crawl_history",
-        params={
-            "was_relevant": "eq.true",
-            "fetched_at": f"gte.{since}",
-            "select": "classification_data,source_feed_id",
-            "order": "fetched_at.desc",
-            "limit": "500",
-        },
-    ) or []
-
-    if not records:
-        return []
+    store = await ensure_ready()
+    topic_counter, topic_sources = store.topic_counts(hours)
+    now = time.time()
 
-    # Count topics and track which sources mention them
-    topic_counter: Counter[str] = Counter()
-    topic_sources: dict[str, set[str]] = {}
-
-    for record in records:
-        classification = record.get("classification_data") or {}
-        topics = classification.get("topics", [])
-        source_id = record.get("source_feed_id", "unknown")
-
-        for topic in topics:
-            topic_counter[topic] += 1
-            topic_sources.setdefault(topic, set()).add(source_id)
+    if not topic_counter:
+        return []
 
     # Build trending list
     trends = []
@@ -60,11 +48,11 @@ async def get_topic_trends(hours: int = 24, min_count: int = 2) -> list[dict]:
             break
 
         source_count = len(topic_sources.get(topic, set()))
+        score = store.topic_trends.score(topic, now) or _NO_SCORE
 
-        # Trend classification based on source diversity and volume
-        if source_count >= 3 and count >= 5:
+        if score["burst_z"] >= BURST_Z_HOT and source_count >= 2:
             trend = "hot"
-        elif source_count >= 2 or count >= 4:
+        elif score["velocity"] > 0:
             trend = "rising"
         else:
             trend = "steady"
@@ -74,73 +62,43 @@ async def get_topic_trends(hours: int = 24, min_count: int = 2) -> list[dict]:
             "count": count,
             "source_count": source_count,
             "trend": trend,
+            "velocity": score["velocity"],
+            "acceleration": score["acceleration"],
+            "burst_z": score["burst_z"],
         })
 
     return trends
 
 
 async def get_geo_trends(hours: int = 24) -> list[dict]:
-    """Analyze recent crawl history for geographic hotspots.
-
-    Returns geo_tags ranked by mention frequency.
-    """
-    since = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
-
-    records = await _request(
-        "GET",
-        "crawl_history",
-        params={
-            "was_relevant": "eq.true",
-            "fetched_at": f"gte.{since}",
-            "select": "classification_data",
-            "order": "fetched_at.desc",
-            "limit": "500",
-        },
-    ) or []
-
-    geo_counter: Counter[str] = Counter()
-
-    for record in records:
-        classification = record.get("classification_data") or {}
-        geo_tags = classification.get("geo_tags", [])
-        for tag in geo_tags:
-            geo_counter[tag] += 1
-
-    return [
-        {"geo_tag": tag, "count": count}
-        for tag, count in geo_counter.most_common(20)
-    ]
+    """Geographic hotspots: geo_tags ranked by mention frequency."""
+    store = await ensure_ready()
+    now = time.time()
+    result = []
+    for tag, count in store.geo_counts(hours).most_common(20):
+        score = store.geo_trends.score(tag, now) or _NO_SCORE
+        result.append({
+            "geo_tag": tag,
+            "count": count,
+            "velocity": score["velocity"],
+            "burst_z": score["burst_z"],
+        })
+    return result
 
 
 async def get_source_stats() -> list[dict]:
-    """Get per-source statistics for the admin dashboard."""
-    sources = await _request(
-        "GET",
-        "source_feeds",
-        params={
-            "is_active": "eq.true",
-            "select": "id,name,source_type,reliability_tier,reliability_score,last_fetched_at,consecutive_errors",
-            "order": "name.asc",
-        },
-    ) or []
+    """Get per-source statistics for the admin dashboard.
+
+    recent_* counts cover the analytics retention window (7 days).
+    """
+    sources = sorted(await get_active_sources(), key=lambda s: s.get("name") or "")
+
+    store = await ensure_ready()
+    counts = store.source_counts()
 
     result = []
     for source in sources:
-        # Get recent crawl counts for this source
-        recent = await _request(
-            "GET",
-            "crawl_history",
-            params={
-                "source_feed_id": f"eq.{source['id']}",
-                "select": "id,was_relevant,field_note_id",
-                "order": "fetched_at.desc",
-                "limit": "50",
-            },
-        ) or []
-
-        total = len(recent)
-        relevant = sum(1 for r in recent if r.get("was_relevant"))
-        published = sum(1 for r in recent if r.get("field_note_id"))
+        total, relevant, published = counts.get(source["id"], (0, 0, 0))
 
         result.append({
             "id": source["id"],